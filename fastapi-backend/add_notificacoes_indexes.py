@@ -0,0 +1,21 @@
+from app.core.database import engine
+from sqlalchemy import text
+
+def add_notificacoes_indexes():
+    """Criar os índices compostos de notificações em tabelas já existentes"""
+    with engine.connect() as conn:
+        try:
+            indexes = {
+                'ix_notificacoes_usuario_status_tipo': '(usuario_id, status, tipo)',
+                'ix_notificacoes_usuario_created_at': '(usuario_id, created_at)',
+                'ix_notificacoes_status_created_at': '(status, created_at)',
+            }
+            for name, columns in indexes.items():
+                conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON notificacoes {columns}'))
+                conn.commit()
+                print(f'✅ Índice {name} criado/verificado!')
+        except Exception as e:
+            print(f'❌ Erro: {e}')
+
+if __name__ == "__main__":
+    add_notificacoes_indexes()
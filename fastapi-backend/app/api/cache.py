@@ -0,0 +1,471 @@
+from itertools import chain
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import json
+import logging
+import threading
+import time
+from urllib.parse import parse_qsl
+
+from ..core.config import settings
+from ..core.difusao import difusao
+from ..core.security import verify_token
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # Dependência opcional, só necessária com RESPONSE_CACHE_URL=redis://...
+    redis = None
+
+# Tabelas usadas como tag por alguma rota; só elas disparam invalidação no commit
+_tabelas_monitoradas: Set[str] = set()
+
+
+class PoliticaCache:
+    """Política de cache declarada numa rota com @cache_resposta"""
+
+    def __init__(self, ttl: int, tags: Tuple[str, ...], vary_params: Optional[Tuple[str, ...]], por_usuario: bool):
+        self.ttl = ttl
+        self.tags = tags
+        self.vary_params = vary_params
+        self.por_usuario = por_usuario
+
+
+def cache_resposta(
+    ttl: int = 30,
+    tags: Iterable = (),
+    vary_params: Optional[Iterable[str]] = None,
+    por_usuario: bool = True
+):
+    """Guardar a resposta 200 de um GET no cache de respostas
+
+    Deve ficar abaixo do @router.get:
+
+        @router.get("/stats")
+        @cache_resposta(ttl=30, tags=(Criativo,), vary_params=("projeto_id",))
+        def get_stats(...): ...
+
+    ttl: segundos de validade.
+    tags: modelos cujas alterações (commit) invalidam as respostas guardadas.
+    vary_params: parâmetros de query que entram na chave (None = query string inteira).
+    por_usuario: chave separada por usuário do token; False compartilha a resposta
+    entre usuários autenticados (dados que não dependem de quem pede).
+    Sem token válido a requisição nunca usa o cache.
+    """
+    politica = PoliticaCache(
+        ttl=ttl,
+        tags=tuple(sorted(modelo.__table__.name for modelo in tags)),
+        vary_params=tuple(vary_params) if vary_params is not None else None,
+        por_usuario=por_usuario
+    )
+    _tabelas_monitoradas.update(politica.tags)
+
+    def decorar(funcao):
+        funcao.__politica_cache__ = politica
+        return funcao
+
+    return decorar
+
+
+class EntradaCache:
+    __slots__ = ("status", "headers", "body", "expira_em", "geracoes")
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, expira_em: float, geracoes: tuple):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expira_em = expira_em
+        self.geracoes = geracoes
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.body) + sum(len(nome) + len(valor) for nome, valor in self.headers)
+
+
+class MetricasCache:
+    """Contadores do cache de respostas (deste processo)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expiradas = 0
+        self.invalidadas = 0
+        self.ignoradas = 0  # sem token válido, resposta grande demais ou não-200
+
+    def incrementar(self, nome: str):
+        with self._lock:
+            setattr(self, nome, getattr(self, nome) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expiradas": self.expiradas,
+                "invalidadas": self.invalidadas,
+                "ignoradas": self.ignoradas,
+                "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0,
+            }
+
+
+metricas_cache = MetricasCache()
+
+
+class MemoriaBackend:
+    """LRU em processo com teto de memória (soma dos corpos e headers guardados)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entradas: "OrderedDict[str, EntradaCache]" = OrderedDict()
+        self._bytes = 0
+        self._geracoes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str, tags: Tuple[str, ...]) -> Tuple[Optional[EntradaCache], tuple]:
+        with self._lock:
+            geracoes = tuple(self._geracoes.get(tag, 0) for tag in tags)
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self._entradas.move_to_end(chave)
+            return entrada, geracoes
+
+    def guardar(self, chave: str, entrada: EntradaCache, ttl: int):
+        tamanho = entrada.tamanho
+        if tamanho > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior.tamanho
+            while self._entradas and self._bytes + tamanho > self.max_bytes:
+                _, removida = self._entradas.popitem(last=False)
+                self._bytes -= removida.tamanho
+                metricas_cache.incrementar("evictions")
+            self._entradas[chave] = entrada
+            self._bytes += tamanho
+
+    def remover(self, chave: str):
+        with self._lock:
+            entrada = self._entradas.pop(chave, None)
+            if entrada is not None:
+                self._bytes -= entrada.tamanho
+
+    def invalidar(self, tags: Iterable[str]):
+        # Entradas antigas ficam com geração defasada e são descartadas na leitura
+        with self._lock:
+            for tag in tags:
+                self._geracoes[tag] = self._geracoes.get(tag, 0) + 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def uso(self) -> dict:
+        with self._lock:
+            return {"backend": "memoria", "entradas": len(self._entradas), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class RedisBackend:
+    """Respostas e gerações das tags no Redis, compartilhadas entre workers"""
+
+    PREFIXO = "sistemaxi:cache:"
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+        self._geracoes_chave = self.PREFIXO + "tags"
+
+    def obter(self, chave: str, tags: Tuple[str, ...]) -> Tuple[Optional[EntradaCache], tuple]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self.PREFIXO + chave)
+        if tags:
+            pipe.hmget(self._geracoes_chave, tags)
+        resultado = pipe.execute()
+        geracoes = tuple(int(valor or 0) for valor in resultado[1]) if tags else ()
+        if resultado[0] is None:
+            return None, geracoes
+        cabecalho, body = resultado[0].split(b"\n", 1)
+        dados = json.loads(cabecalho)
+        entrada = EntradaCache(
+            dados["status"],
+            [(nome.encode("latin-1"), valor.encode("latin-1")) for nome, valor in dados["headers"]],
+            body,
+            dados["expira_em"],
+            tuple(dados["geracoes"])
+        )
+        return entrada, geracoes
+
+    def guardar(self, chave: str, entrada: EntradaCache, ttl: int):
+        cabecalho = json.dumps({
+            "status": entrada.status,
+            "headers": [[nome.decode("latin-1"), valor.decode("latin-1")] for nome, valor in entrada.headers],
+            "expira_em": entrada.expira_em,
+            "geracoes": list(entrada.geracoes),
+        }).encode()
+        self.client.set(self.PREFIXO + chave, cabecalho + b"\n" + entrada.body, ex=ttl)
+
+    def remover(self, chave: str):
+        self.client.delete(self.PREFIXO + chave)
+
+    def invalidar(self, tags: Iterable[str]):
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.hincrby(self._geracoes_chave, tag, 1)
+        pipe.execute()
+
+    def limpar(self):
+        for chave in self.client.scan_iter(match=self.PREFIXO + "r:*"):
+            self.client.delete(chave)
+
+    def uso(self) -> dict:
+        return {"backend": "redis", "entradas": sum(1 for _ in self.client.scan_iter(match=self.PREFIXO + "r:*"))}
+
+
+class RespostaCache:
+    """Cache de respostas HTTP por rota, com backend escolhido pela configuração
+
+    Com o LRU em memória cada worker tem o seu cache; invalidações e limpezas são
+    difundidas para os outros processos (CACHE_INVALIDACAO_URL). O Redis já é
+    compartilhado e dispensa a difusão.
+    """
+
+    def __init__(self):
+        self._backend = None
+        difusao.registrar("resposta_cache", self._invalidacao_remota)
+
+    @property
+    def backend(self):
+        # Criado sob demanda para não conectar em nada durante o import
+        if self._backend is None:
+            url = settings.response_cache_url
+            if url and url.startswith("redis"):
+                if redis is None:
+                    logger.warning("Pacote redis não instalado, usando cache de respostas em memória")
+                    self._backend = MemoriaBackend(settings.response_cache_max_mb * 1024 * 1024)
+                else:
+                    self._backend = RedisBackend(url)
+            else:
+                self._backend = MemoriaBackend(settings.response_cache_max_mb * 1024 * 1024)
+        return self._backend
+
+    @property
+    def _por_processo(self) -> bool:
+        return isinstance(self.backend, MemoriaBackend)
+
+    def invalidar(self, tabelas: Iterable[str]):
+        tabelas = [tabela for tabela in tabelas if tabela in _tabelas_monitoradas]
+        if tabelas:
+            try:
+                self.backend.invalidar(tabelas)
+            except Exception as e:
+                logger.error(f"Erro ao invalidar cache de respostas {tabelas}: {e}")
+            if self._por_processo:
+                difusao.publicar("resposta_cache", sorted(tabelas))
+
+    def limpar(self):
+        self.backend.limpar()
+        if self._por_processo:
+            difusao.publicar("resposta_cache", None)
+
+    def _invalidacao_remota(self, tabelas: Optional[List[str]]):
+        """Invalidação vinda de outro worker (None = descartar tudo)"""
+        if not self._por_processo:
+            return
+        if tabelas is None:
+            self.backend.limpar()
+        else:
+            self.backend.invalidar(tabelas)
+
+    def metricas(self) -> dict:
+        return {**metricas_cache.snapshot(), **self.backend.uso()}
+
+
+resposta_cache = RespostaCache()
+
+
+def _marcar_alteracoes(session: Session, flush_context) -> None:
+    """after_flush: anotar as tabelas monitoradas alteradas nesta transação"""
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tabela = getattr(getattr(obj, "__table__", None), "name", None)
+        if tabela in _tabelas_monitoradas:
+            session.info.setdefault("cache_tabelas", set()).add(tabela)
+
+
+def _marcar_execucao(orm_execute_state) -> None:
+    """do_orm_execute: UPDATE/DELETE em massa (query.update/delete) não passam pelo flush"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        tabela = mapper.local_table.name if mapper is not None else None
+        if tabela in _tabelas_monitoradas:
+            orm_execute_state.session.info.setdefault("cache_tabelas", set()).add(tabela)
+
+
+def _apos_commit(session: Session) -> None:
+    tabelas = session.info.pop("cache_tabelas", None)
+    if tabelas:
+        resposta_cache.invalidar(tabelas)
+
+
+def _apos_rollback(session: Session) -> None:
+    session.info.pop("cache_tabelas", None)
+
+
+event.listen(Session, "after_flush", _marcar_alteracoes)
+event.listen(Session, "do_orm_execute", _marcar_execucao)
+event.listen(Session, "after_commit", _apos_commit)
+event.listen(Session, "after_rollback", _apos_rollback)
+
+
+class RespostaCacheMiddleware:
+    """Middleware ASGI que serve e guarda respostas das rotas com @cache_resposta
+
+    A rota é resolvida antes da aplicação (mesma ordem do roteador), então um hit
+    não abre sessão, não consulta o banco nem serializa nada. O usuário vem do
+    token Bearer (assinatura e expiração verificadas); um usuário desativado pode
+    ainda receber respostas guardadas até o fim do TTL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rotas = None
+
+    def _politica(self, scope) -> Optional[PoliticaCache]:
+        roteador = scope["app"].router
+        if self._rotas is None:
+            self._rotas = [
+                rota for rota in roteador.routes
+                if hasattr(getattr(rota, "endpoint", None), "__politica_cache__")
+            ]
+        caminho = scope["path"]
+        if not any(rota.path_regex.match(caminho) for rota in self._rotas):
+            return None
+        # Outra rota registrada antes pode capturar o mesmo caminho
+        for rota in roteador.routes:
+            correspondencia, _ = rota.matches(scope)
+            if correspondencia == Match.FULL:
+                politica = getattr(getattr(rota, "endpoint", None), "__politica_cache__", None)
+                if politica is not None:
+                    # Um hit não passa pelo roteador: o template da rota fica disponível às métricas
+                    scope["route"] = rota
+                return politica
+        return None
+
+    @staticmethod
+    def _chave(scope, politica: PoliticaCache, cabecalhos: Dict[bytes, bytes]) -> Optional[str]:
+        partes = [scope["path"], cabecalhos.get(b"accept", b"").decode("latin-1")]
+        # Sem token válido não há cache: a resposta guardada nunca vaza para anônimos
+        autorizacao = cabecalhos.get(b"authorization", b"").decode("latin-1")
+        if not autorizacao.lower().startswith("bearer "):
+            return None
+        usuario_id = verify_token(autorizacao[7:].strip())
+        if usuario_id is None:
+            return None
+        if politica.por_usuario:
+            partes.append(usuario_id)
+        query = scope.get("query_string", b"").decode("latin-1")
+        if politica.vary_params is None:
+            partes.append("&".join(sorted(query.split("&"))))
+        else:
+            valores = dict(parse_qsl(query))
+            partes += [f"{nome}={valores.get(nome, '')}" for nome in politica.vary_params]
+        return "r:" + hashlib.sha1("|".join(partes).encode()).hexdigest()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not settings.response_cache_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        politica = self._politica(scope)
+        if politica is None:
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope["headers"])
+        chave = self._chave(scope, politica, cabecalhos)
+        if chave is None:
+            metricas_cache.incrementar("ignoradas")
+            await self.app(scope, receive, send)
+            return
+
+        backend = resposta_cache.backend
+        try:
+            entrada, geracoes = backend.obter(chave, politica.tags)
+        except Exception as e:
+            logger.error(f"Erro ao consultar cache de respostas: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        if entrada is not None:
+            if entrada.expira_em <= time.time():
+                metricas_cache.incrementar("expiradas")
+                backend.remover(chave)
+            elif entrada.geracoes != geracoes:
+                metricas_cache.incrementar("invalidadas")
+                backend.remover(chave)
+            else:
+                metricas_cache.incrementar("hits")
+                await self._enviar_entrada(entrada, cabecalhos, send)
+                return
+
+        metricas_cache.incrementar("misses")
+        await self._executar_e_guardar(scope, receive, send, politica, chave, geracoes)
+
+    @staticmethod
+    async def _enviar_entrada(entrada: EntradaCache, cabecalhos: Dict[bytes, bytes], send):
+        etag = dict(entrada.headers).get(b"etag")
+        if etag and etag in cabecalhos.get(b"if-none-match", b""):
+            headers = [(nome, valor) for nome, valor in entrada.headers if nome in (b"etag", b"cache-control")]
+            await send({"type": "http.response.start", "status": 304, "headers": headers + [(b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": entrada.status, "headers": entrada.headers + [(b"x-cache", b"HIT")]})
+        await send({"type": "http.response.body", "body": entrada.body})
+
+    async def _executar_e_guardar(self, scope, receive, send, politica: PoliticaCache, chave: str, geracoes: tuple):
+        # Gerações lidas ANTES de executar: uma escrita concluída durante a requisição
+        # torna a entrada guardada obsoleta já na próxima leitura
+        limite = settings.response_cache_max_entry_kb * 1024
+        estado = {"status": None, "headers": None, "partes": [], "tamanho": 0, "guardar": True}
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                estado["status"] = message["status"]
+                estado["headers"] = headers
+                if message["status"] != 200 or any(nome.lower() == b"set-cookie" for nome, _ in headers):
+                    estado["guardar"] = False
+                message["headers"] = headers + [(b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body" and estado["guardar"]:
+                corpo = message.get("body", b"")
+                estado["tamanho"] += len(corpo)
+                if estado["tamanho"] > limite:
+                    estado["guardar"] = False
+                    estado["partes"] = []
+                else:
+                    estado["partes"].append(corpo)
+                if not message.get("more_body", False) and estado["guardar"]:
+                    entrada = EntradaCache(
+                        estado["status"],
+                        estado["headers"],
+                        b"".join(estado["partes"]),
+                        time.time() + politica.ttl,
+                        geracoes
+                    )
+                    try:
+                        resposta_cache.backend.guardar(chave, entrada, politica.ttl)
+                    except Exception as e:
+                        logger.error(f"Erro ao guardar no cache de respostas: {e}")
+            await send(message)
+
+        await self.app(scope, receive, enviar)
+        if not estado["guardar"]:
+            metricas_cache.incrementar("ignoradas")
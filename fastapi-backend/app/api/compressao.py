@@ -0,0 +1,211 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from typing import List, Optional, Tuple
+import mimetypes
+import os
+import zlib
+
+from ..core.config import settings
+
+try:
+    import brotli
+except ImportError:  # Dependência opcional: sem o pacote brotli só gzip é negociado
+    brotli = None
+
+TIPOS_COMPRIMIVEIS = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# SSE precisa de cada evento entregue na hora; os demais já são comprimidos
+TIPOS_EXCLUIDOS = ("text/event-stream",)
+
+# Variantes pré-comprimidas geradas por precomprimir_uploads.py, por preferência
+EXTENSOES_CODIFICACAO = (("br", ".br"), ("gzip", ".gz"))
+
+
+def tipo_comprimivel(content_type: str) -> bool:
+    tipo = content_type.split(";", 1)[0].strip().lower()
+    if not tipo or tipo.startswith(TIPOS_EXCLUIDOS):
+        return False
+    return tipo.startswith(TIPOS_COMPRIMIVEIS) or tipo.endswith("+json")
+
+
+def codificacoes_aceitas(accept_encoding: str) -> List[str]:
+    """Codificações do Accept-Encoding com q > 0, da mais para a menos preferida"""
+    aceitas = []
+    for posicao, item in enumerate(accept_encoding.lower().split(",")):
+        partes = [parte.strip() for parte in item.split(";")]
+        if not partes[0]:
+            continue
+        q = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            # Empate: br antes de gzip (menor), depois a ordem do cliente
+            aceitas.append((-q, 0 if partes[0] == "br" else 1, posicao, partes[0]))
+    return [nome for *_, nome in sorted(aceitas)]
+
+
+def negociar(accept_encoding: str) -> Optional[str]:
+    for codificacao in codificacoes_aceitas(accept_encoding):
+        if codificacao == "br" and brotli is not None:
+            return "br"
+        if codificacao in ("gzip", "*"):
+            return "gzip"
+    return None
+
+
+class _Compressor:
+    """Compressão incremental: cada pedaço sai completo para o cliente (flush)"""
+
+    def __init__(self, codificacao: str):
+        if codificacao == "br":
+            self._br = brotli.Compressor(quality=settings.compressao_nivel_brotli)
+            self._gz = None
+        else:
+            self._br = None
+            self._gz = zlib.compressobj(settings.compressao_nivel_gzip, zlib.DEFLATED, 31)
+
+    def pedaco(self, dados: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(dados) + self._br.flush()
+        return self._gz.compress(dados) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def final(self, dados: bytes = b"") -> bytes:
+        if self._br is not None:
+            return self._br.process(dados) + self._br.finish()
+        return self._gz.compress(dados) + self._gz.flush()
+
+
+class CompressaoMiddleware:
+    """Compressão gzip/brotli negociada pelo Accept-Encoding
+
+    Respostas completas menores que COMPRESSAO_MIN_BYTES saem sem compressão (o
+    custo de CPU não compensa). Respostas em streaming (more_body) são comprimidas
+    pedaço a pedaço, sem bufferizar o corpo. Tipos binários, SSE e respostas já
+    codificadas passam direto.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD" or not settings.compressao_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        codificacao = negociar(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+
+        minimo = settings.compressao_min_bytes
+        estado = {"inicio": None, "compressor": None, "decidido": False}
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                estado["inicio"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            mais = message.get("more_body", False)
+
+            if not estado["decidido"]:
+                estado["decidido"] = True
+                inicio = estado["inicio"]
+                headers = MutableHeaders(raw=inicio["headers"])
+                elegivel = (
+                    inicio["status"] not in (204, 304)
+                    and "content-encoding" not in headers
+                    and tipo_comprimivel(headers.get("content-type", ""))
+                    and (mais or len(corpo) >= minimo)
+                )
+                if not elegivel:
+                    await send(inicio)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(codificacao)
+                headers["Content-Encoding"] = codificacao
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # Mesma entidade, bytes diferentes: o ETag passa a ser fraco
+                    headers["ETag"] = "W/" + etag
+                if mais:
+                    estado["compressor"] = compressor
+                    del headers["Content-Length"]
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": compressor.pedaco(corpo), "more_body": True})
+                else:
+                    comprimido = compressor.final(corpo)
+                    headers["Content-Length"] = str(len(comprimido))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": comprimido})
+                return
+
+            compressor = estado["compressor"]
+            if compressor is None:
+                await send(message)
+            elif mais:
+                await send({"type": "http.response.body", "body": compressor.pedaco(corpo), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.final(corpo)})
+
+        await self.app(scope, receive, enviar)
+
+
+class ArquivosPrecomprimidos(StaticFiles):
+    """StaticFiles que serve file.ext.br / file.ext.gz quando o cliente aceita
+
+    As variantes são geradas por precomprimir_uploads.py e só são usadas se forem
+    mais novas que o original; o Content-Type continua o do arquivo original.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        variante = self._variante(str(full_path), stat_result, request_headers.get("accept-encoding", ""))
+        if variante is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        caminho, codificacao, stat_variante = variante
+        # Last-Modified/ETag/Content-Length vêm da variante, o Content-Type do original
+        response = FileResponse(
+            caminho,
+            status_code=status_code,
+            media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+            stat_result=stat_variante
+        )
+        response.headers["content-encoding"] = codificacao
+        response.headers.add_vary_header("Accept-Encoding")
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _variante(full_path: str, stat_result, accept_encoding: str) -> Optional[Tuple[str, str, os.stat_result]]:
+        aceitas = codificacoes_aceitas(accept_encoding)
+        for codificacao, extensao in EXTENSOES_CODIFICACAO:
+            if codificacao not in aceitas and "*" not in aceitas:
+                continue
+            caminho = full_path + extensao
+            try:
+                stat_variante = os.stat(caminho)
+            except OSError:
+                continue
+            if stat_variante.st_mtime >= stat_result.st_mtime:
+                return caminho, codificacao, stat_variante
+        return None
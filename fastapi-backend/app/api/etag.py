@@ -0,0 +1,83 @@
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List
+import hashlib
+
+from ..core.database import get_db
+from ..models.user import User
+from .deps import get_current_active_user
+
+
+def impressao_tabelas(db: Session, modelos: Iterable) -> List:
+    """count, max(updated_at) e max(created_at) de cada tabela numa única consulta"""
+    colunas = []
+    for modelo in modelos:
+        colunas.append(select(func.count()).select_from(modelo).scalar_subquery())
+        colunas.append(select(func.max(modelo.updated_at)).scalar_subquery())
+        colunas.append(select(func.max(modelo.created_at)).scalar_subquery())
+    return list(db.execute(select(*colunas)).one())
+
+
+def _etags_aceitos(cabecalho: str) -> set:
+    return {valor.strip().removeprefix("W/") for valor in cabecalho.split(",") if valor.strip()}
+
+
+def etag(*modelos, por_usuario: bool = False):
+    """Dependência declarativa de GET condicional para dados de referência
+
+    Uso: @router.get("", dependencies=[etag(Setor)])
+
+    A versão dos dados é a impressão das tabelas informadas no banco (count e max
+    das datas) junto com a URL completa, então é a mesma em todos os workers. Se o
+    If-None-Match do cliente bate, responde 304 antes de o endpoint rodar, sem
+    consultar nem serializar a lista. Com por_usuario=True a versão também inclui o usuário, para
+    listas que dependem de quem pede (ex.: projetos acessíveis).
+    """
+    def verificar(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+    ) -> None:
+        partes = [str(request.url.path), str(request.url.query), request.headers.get("accept", "")]
+        partes += [str(valor) for valor in impressao_tabelas(db, modelos)]
+        if por_usuario:
+            partes += [str(current_user.id), str(current_user.is_admin)]
+        valor = '"' + hashlib.sha1("|".join(partes).encode()).hexdigest()[:20] + '"'
+
+        cabecalhos = {"ETag": valor, "Cache-Control": "private, no-cache"}
+        aceitos = _etags_aceitos(request.headers.get("if-none-match", ""))
+        if valor in aceitos or "*" in aceitos:
+            raise HTTPException(status_code=304, headers=cabecalhos)
+
+        response.headers.update(cabecalhos)
+        # Endpoints que devolvem um Response pronto não herdam os headers acima
+        request.state.etag = cabecalhos
+
+    return Depends(verificar)
+
+
+class ETagMiddleware:
+    """Acrescenta o ETag calculado pela dependência às respostas 200 montadas pelo endpoint"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                cabecalhos = scope.get("state", {}).get("etag")
+                if cabecalhos:
+                    existentes = {nome.lower() for nome, _ in message.get("headers", [])}
+                    if b"etag" not in existentes:
+                        message["headers"] = list(message.get("headers", [])) + [
+                            (nome.lower().encode(), valor.encode()) for nome, valor in cabecalhos.items()
+                        ]
+            await send(message)
+
+        await self.app(scope, receive, enviar)
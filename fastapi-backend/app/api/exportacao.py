@@ -0,0 +1,287 @@
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, Session
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from xml.sax.saxutils import escape
+import csv
+import enum
+import io
+import logging
+import re
+import time
+import zipfile
+
+from ..core.database import SessionLocal
+from .streaming import LINHAS_POR_LOTE, TAMANHO_PEDACO
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_EXPORTACAO = ("csv", "xlsx")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Colunas exportadas: (título no cabeçalho, expressão selecionada na consulta)
+ColunasExportacao = Sequence[Tuple[str, Any]]
+
+# Última linha de uma planilha do Excel (a primeira é o cabeçalho)
+LIMITE_LINHAS_XLSX = 1_048_575
+LIMITE_CELULA_XLSX = 32_767
+
+# Texto que o Excel/LibreOffice interpretaria como fórmula ao abrir um CSV
+# (injeção de CSV); telefones e números com sinal continuam como estão. No XLSX
+# o texto vai em células inlineStr, que nunca são avaliadas: lá fica como está
+_INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+_NUMERICO = re.compile(r"^[+-]?[\d\s().,-]+$")
+# Caracteres de controle proibidos em XML 1.0
+_CONTROLE_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+
+
+def _texto_seguro(texto: str) -> str:
+    if texto.startswith(_INICIO_FORMULA) and not _NUMERICO.match(texto):
+        return "'" + texto
+    return texto
+
+
+def _valor_csv(valor: Any) -> Any:
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    if isinstance(valor, enum.Enum):
+        valor = valor.value
+    if isinstance(valor, Decimal):
+        return format(valor, "f")
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, str):
+        return _texto_seguro(valor)
+    return str(valor)
+
+
+def gerar_csv(titulos: Sequence[str], linhas: Iterable[Sequence[Any]], separador: str = ",") -> Iterator[bytes]:
+    """CSV em UTF-8 com BOM (o Excel reconhece a codificação), em pedaços de ~64 KB"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, delimiter=separador, lineterminator="\r\n")
+    buffer.write("\ufeff")
+    escritor.writerow(titulos)
+    for linha in linhas:
+        escritor.writerow([_valor_csv(valor) for valor in linha])
+        if buffer.tell() >= TAMANHO_PEDACO:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _letra_coluna(indice: int) -> str:
+    letras = ""
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+# Estilos (cellXfs): 0 padrão, 1 data, 2 data e hora, 3 cabeçalho em negrito
+_ESTILO_DATA, _ESTILO_DATA_HORA, _ESTILO_CABECALHO = 1, 2, 3
+
+
+def _celula_xlsx(referencia: str, valor: Any, estilo: int = 0) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, enum.Enum):
+        valor = valor.value
+    if isinstance(valor, bool):
+        return f'<c r="{referencia}" t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, Decimal)) or (isinstance(valor, float) and valor == valor and abs(valor) != float("inf")):
+        numero = format(valor, "f") if isinstance(valor, Decimal) else repr(valor)
+        return f'<c r="{referencia}"><v>{numero}</v></c>'
+    if isinstance(valor, datetime):
+        if valor.tzinfo is not None:
+            valor = valor.astimezone(timezone.utc).replace(tzinfo=None)
+        serial = (valor - _EPOCA_EXCEL).total_seconds() / 86400
+        return f'<c r="{referencia}" s="{_ESTILO_DATA_HORA}"><v>{serial:.8f}</v></c>'
+    if isinstance(valor, date):
+        serial = (valor - _EPOCA_EXCEL.date()).days
+        return f'<c r="{referencia}" s="{_ESTILO_DATA}"><v>{serial}</v></c>'
+    texto = _CONTROLE_XML.sub("", str(valor))[:LIMITE_CELULA_XLSX]
+    espaco = ' xml:space="preserve"' if texto != texto.strip() else ""
+    atributo_estilo = f' s="{estilo}"' if estilo else ""
+    return f'<c r="{referencia}" t="inlineStr"{atributo_estilo}><is><t{espaco}>{escape(texto)}</t></is></c>'
+
+
+_NS_PLANILHA = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_RELACOES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PACOTE = "http://schemas.openxmlformats.org/package/2006/relationships"
+_CABECALHO_XML = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_PARTES_FIXAS_XLSX = {
+    "[Content_Types].xml": (
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        f'<Relationships xmlns="{_NS_PACOTE}">'
+        f'<Relationship Id="rId1" Type="{_NS_RELACOES}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        f'<Relationships xmlns="{_NS_PACOTE}">'
+        f'<Relationship Id="rId1" Type="{_NS_RELACOES}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_NS_RELACOES}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        f'<styleSheet xmlns="{_NS_PLANILHA}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="4">'
+        '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '</cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+
+class _SaidaSemSeek:
+    """Destino do ZipFile sem seek: o zipfile grava descritores de dados após
+    cada arquivo e o gerador retira os bytes acumulados a cada pedaço"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, dados: bytes) -> int:
+        self.buffer += dados
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def retirar(self) -> bytes:
+        dados = bytes(self.buffer)
+        self.buffer.clear()
+        return dados
+
+
+def gerar_xlsx(titulos: Sequence[str], linhas: Iterable[Sequence[Any]], nome_planilha: str = "Dados") -> Iterator[bytes]:
+    """Planilha XLSX escrita em streaming (zip sem seek, strings inline)
+
+    Sem dependências: o XML da planilha é comprimido à medida que as linhas
+    chegam e os bytes saem em pedaços, com memória constante. Acima do limite
+    de linhas do Excel o restante é descartado (com aviso no log).
+    """
+    saida = _SaidaSemSeek()
+    nome_planilha = re.sub(r"[\[\]:*?/\\]", " ", nome_planilha)[:31] or "Dados"
+    referencias = [_letra_coluna(indice) for indice in range(len(titulos))]
+    with zipfile.ZipFile(saida, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as pacote:
+        for nome, conteudo in _PARTES_FIXAS_XLSX.items():
+            pacote.writestr(nome, _CABECALHO_XML + conteudo)
+        pacote.writestr("xl/workbook.xml", (
+            f'{_CABECALHO_XML}<workbook xmlns="{_NS_PLANILHA}" xmlns:r="{_NS_RELACOES}">'
+            f'<sheets><sheet name="{escape(nome_planilha)}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        yield saida.retirar()
+
+        with pacote.open("xl/worksheets/sheet1.xml", "w") as planilha:
+            pedaco: List[str] = [
+                f'{_CABECALHO_XML}<worksheet xmlns="{_NS_PLANILHA}"><sheetViews><sheetView workbookViewId="0">'
+                '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+                '<sheetData><row r="1">',
+                *(_celula_xlsx(f"{ref}1", titulo, _ESTILO_CABECALHO) for ref, titulo in zip(referencias, titulos)),
+                "</row>",
+            ]
+            tamanho = 0
+            numero = 1
+            for linha in linhas:
+                numero += 1
+                if numero > LIMITE_LINHAS_XLSX + 1:
+                    logger.warning(f"Exportação XLSX truncada em {LIMITE_LINHAS_XLSX} linhas (limite do Excel)")
+                    break
+                celulas = "".join(_celula_xlsx(f"{ref}{numero}", valor) for ref, valor in zip(referencias, linha))
+                texto = f'<row r="{numero}">{celulas}</row>'
+                pedaco.append(texto)
+                tamanho += len(texto)
+                if tamanho >= TAMANHO_PEDACO:
+                    planilha.write("".join(pedaco).encode("utf-8"))
+                    pedaco.clear()
+                    tamanho = 0
+                    dados = saida.retirar()
+                    if dados:
+                        yield dados
+            pedaco.append("</sheetData></worksheet>")
+            planilha.write("".join(pedaco).encode("utf-8"))
+    yield saida.retirar()
+
+
+def resposta_exportacao(
+    montar_query: Callable[[Session], Query],
+    colunas: ColunasExportacao,
+    formato: str,
+    nome_arquivo: str,
+    separador: str = ",",
+    linhas_por_lote: int = LINHAS_POR_LOTE
+) -> StreamingResponse:
+    """Exportar o resultado de uma consulta em CSV ou XLSX, direto do cursor
+
+    Só as colunas exportadas são selecionadas (with_entities, sem montar
+    objetos ORM) e as linhas vêm do cursor do servidor em lotes (yield_per;
+    no PostgreSQL, cursor nomeado): a memória não cresce com o total de linhas.
+    Como em resposta_streaming, a consulta roda numa sessão própria.
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+    titulos = [titulo for titulo, _ in colunas]
+    expressoes = [expressao for _, expressao in colunas]
+
+    def gerar() -> Iterator[bytes]:
+        db = SessionLocal()
+        inicio = time.perf_counter()
+        total = 0
+        try:
+            linhas = montar_query(db).with_entities(*expressoes).yield_per(linhas_por_lote)
+
+            def contar():
+                nonlocal total
+                for linha in linhas:
+                    total += 1
+                    yield linha
+
+            if formato == "csv":
+                yield from gerar_csv(titulos, contar(), separador)
+            else:
+                yield from gerar_xlsx(titulos, contar(), nome_arquivo)
+            logger.info(f"Exportação {nome_arquivo}.{formato}: {total} linhas em {time.perf_counter() - inicio:.1f}s")
+        except Exception as e:
+            # O status 200 já foi enviado: só resta registrar e encerrar o corpo
+            logger.error(f"Erro durante exportação {nome_arquivo}.{formato} após {total} linhas: {e}")
+            raise
+        finally:
+            db.close()
+
+    arquivo = f"{nome_arquivo}-{datetime.utcnow():%Y%m%d-%H%M}.{formato}"
+    return StreamingResponse(
+        gerar(),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{arquivo}"'}
+    )
@@ -0,0 +1,29 @@
+"""
+Parâmetro ?include= das listagens: relacionamentos aninhados na resposta
+
+O valor é uma lista separada por vírgulas (include=projeto,setor). O service
+traduz cada relação pedida numa opção de carregamento (joinedload/selectinload)
+e não carrega as demais, então o número de consultas não depende do número de
+linhas.
+"""
+from fastapi import HTTPException, status
+from typing import Iterable, List, Optional
+
+
+def interpretar_include(valor: Optional[str], permitidas: Iterable[str], padrao: Iterable[str] = ()) -> List[str]:
+    """'projeto, setor' -> ['projeto', 'setor'], na ordem de `permitidas`
+
+    Parâmetro ausente (None) devolve `padrao`; vazio, nenhuma relação. Relação
+    desconhecida é 400 em vez de ser ignorada em silêncio.
+    """
+    permitidas = list(permitidas)
+    if valor is None:
+        return list(padrao)
+    pedidas = {parte.strip() for parte in valor.split(",") if parte.strip()}
+    desconhecidas = sorted(pedidas - set(permitidas))
+    if desconhecidas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"include inválido: {', '.join(desconhecidas)} (permitidos: {', '.join(permitidas)})"
+        )
+    return [relacao for relacao in permitidas if relacao in pedidas]
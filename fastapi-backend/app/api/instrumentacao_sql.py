@@ -0,0 +1,78 @@
+import logging
+
+from ..core.config import settings
+from ..core.instrumentacao_sql import EstatisticasConsultas, estatisticas_requisicao
+from ..core.metricas import Contador, Histograma, registro
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+consultas_por_requisicao = registro.registrar(Histograma(
+    "db_queries_per_request", "Consultas SQL por requisição", ("route",), BUCKETS_CONSULTAS
+))
+n_mais_1_detectados = registro.registrar(Contador(
+    "db_n_plus_one_detected_total", "Requisições que repetiram a mesma instrução SQL acima do limite", ("route",)
+))
+
+
+def server_timing_ativo() -> bool:
+    """SQL_SERVER_TIMING explícito ou, sem valor, apenas em development"""
+    if settings.sql_server_timing is not None:
+        return settings.sql_server_timing
+    return settings.environment == "development"
+
+
+class ConsultasMiddleware:
+    """Consultas SQL por requisição: Server-Timing, avisos de excesso e de N+1
+
+    As estatísticas ficam numa ContextVar lida pelos hooks de cursor do engine
+    (app/core/instrumentacao_sql.py). O header Server-Timing sai no início da
+    resposta, então em respostas em streaming não conta as consultas feitas
+    durante o envio do corpo; o log e as métricas, emitidos no fim, contam.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.server_timing = server_timing_ativo()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estatisticas = EstatisticasConsultas()
+        token = estatisticas_requisicao.set(estatisticas)
+
+        async def enviar(message):
+            if message["type"] == "http.response.start" and self.server_timing and estatisticas.total:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={estatisticas.tempo * 1000:.1f};desc="{estatisticas.total} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            estatisticas_requisicao.reset(token)
+            self._registrar(scope, estatisticas)
+
+    def _registrar(self, scope, estatisticas: EstatisticasConsultas):
+        rota = getattr(scope.get("route"), "path", None) or scope["path"]
+        if scope.get("route") is not None:
+            consultas_por_requisicao.observar((rota,), estatisticas.total)
+        descricao = f"{scope['method']} {rota}"
+
+        if estatisticas.total > settings.sql_max_consultas:
+            logger.warning(f"{descricao}: {estatisticas.total} consultas (limite {settings.sql_max_consultas})")
+        if estatisticas.tempo * 1000 > settings.sql_max_tempo_ms:
+            logger.warning(f"{descricao}: {estatisticas.tempo * 1000:.0f}ms de banco (limite {settings.sql_max_tempo_ms}ms)")
+        repetidas = estatisticas.repetidas(settings.sql_n_mais_1_limite)
+        if repetidas:
+            if scope.get("route") is not None:
+                n_mais_1_detectados.inc((rota,))
+            formato, vezes = repetidas[0]
+            logger.warning(f"{descricao}: possível N+1, instrução repetida {vezes}x: {formato[:300]}")
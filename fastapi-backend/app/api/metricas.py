@@ -0,0 +1,103 @@
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+import time
+
+from ..core.config import settings
+from ..core.database import engine
+from ..core.metricas import BUCKETS_TAMANHO, Contador, Gauge, Histograma, registro
+from .cache import resposta_cache
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Requisições que não casaram com nenhuma rota: um rótulo só, para não explodir
+# a cardinalidade com caminhos arbitrários (scanners, 404)
+ROTA_DESCONHECIDA = "<sem rota>"
+
+requisicoes = registro.registrar(Contador(
+    "http_requests_total", "Requisições HTTP por rota", ("method", "route", "status")
+))
+latencia = registro.registrar(Histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route")
+))
+tamanho_resposta = registro.registrar(Histograma(
+    "http_response_size_bytes", "Tamanho do corpo das respostas por rota", ("method", "route"), BUCKETS_TAMANHO
+))
+em_andamento = registro.registrar(Gauge(
+    "http_requests_in_progress", "Requisições em andamento", ("method",)
+))
+
+
+class MetricasMiddleware:
+    """Contagem, latência e tamanho de resposta por template de rota
+
+    O template (ex.: /api/v1/projects/{project_id}) é lido de scope["route"], que
+    o roteador preenche ao despachar a requisição. O gauge de requisições em
+    andamento é por método: a rota só é conhecida depois que a requisição já está
+    dentro da aplicação. Todas as atualizações rodam no event loop, sem lock.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        chave_metodo = (metodo,)
+        em_andamento.valores[chave_metodo] = em_andamento.valores.get(chave_metodo, 0) + 1
+        estado = [500, 0]  # status, bytes
+        inicio = time.perf_counter()
+
+        async def enviar(message):
+            if message["type"] == "http.response.start":
+                estado[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                estado[1] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            em_andamento.valores[chave_metodo] -= 1
+            rota = scope.get("route")
+            template = getattr(rota, "path", None) or ROTA_DESCONHECIDA
+            chave = (metodo, template)
+            requisicoes.inc((metodo, template, estado[0]))
+            latencia.observar(chave, duracao)
+            tamanho_resposta.observar(chave, estado[1])
+
+
+@registro.coletor
+def _metricas_pool() -> list:
+    """Estado do pool de conexões do SQLAlchemy no momento da coleta"""
+    pool = engine.pool
+    gauge = Gauge("db_pool_connections", "Conexões do pool do banco por estado", ("estado",))
+    for estado, funcao in (("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow"), ("size", "size")):
+        if hasattr(pool, funcao):
+            gauge.set((estado,), getattr(pool, funcao)())
+    return [gauge]
+
+
+@registro.coletor
+def _metricas_cache() -> list:
+    """Contadores do cache de respostas (app/api/cache.py)"""
+    dados = resposta_cache.metricas()
+    eventos = Contador("response_cache_events_total", "Eventos do cache de respostas", ("evento",))
+    for evento in ("hits", "misses", "evictions", "expiradas", "invalidadas", "ignoradas"):
+        eventos.inc((evento,), dados.get(evento, 0))
+    uso = Gauge("response_cache_usage", "Uso do cache de respostas", ("medida",))
+    for medida in ("entradas", "bytes"):
+        if medida in dados:
+            uso.set((medida,), dados[medida])
+    return [eventos, uso]
+
+
+def resposta_metricas(request: Request) -> Response:
+    """Corpo do /metrics; com METRICS_TOKEN definido exige Authorization: Bearer <token>"""
+    if settings.metrics_token:
+        if request.headers.get("authorization", "") != f"Bearer {settings.metrics_token}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(content=registro.texto(), media_type=PROMETHEUS_MEDIA_TYPE)
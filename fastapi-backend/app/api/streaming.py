@@ -0,0 +1,92 @@
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Query, Session
+from typing import Any, Callable, Iterator, Optional
+import json
+import logging
+
+from ..core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:  # Dependência opcional: sem orjson as respostas usam o encoder padrão
+    orjson = None
+    DefaultJSONResponse = JSONResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Linhas buscadas por vez no cursor e bytes acumulados antes de enviar um pedaço
+LINHAS_POR_LOTE = 1000
+TAMANHO_PEDACO = 64 * 1024
+
+
+def dumps(obj: Any) -> bytes:
+    """Codificar em JSON (orjson quando disponível)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def formato_streaming(request: Request) -> Optional[str]:
+    """Modo de resposta pedido pelo cliente
+
+    Accept: application/x-ndjson -> "ndjson" (um objeto por linha)
+    ?stream=true                 -> "json"   (array JSON enviado aos pedaços)
+    caso contrário               -> None     (lista montada em memória, como antes)
+    """
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    if request.query_params.get("stream", "").lower() in ("1", "true", "yes"):
+        return "json"
+    return None
+
+
+def resposta_streaming(
+    montar_query: Callable[[Session], Query],
+    converter: Callable[[Any], Any],
+    formato: str = "json",
+    linhas_por_lote: int = LINHAS_POR_LOTE
+) -> StreamingResponse:
+    """Codificar as linhas à medida que saem do cursor (yield_per), com memória constante
+
+    A consulta roda numa sessão própria, aberta e fechada pelo gerador: a sessão
+    da requisição já pode ter sido encerrada enquanto o corpo ainda é enviado.
+    O gerador é síncrono, então o Starlette o consome num threadpool e o fetch
+    não bloqueia o event loop.
+    """
+
+    def gerar() -> Iterator[bytes]:
+        db = SessionLocal()
+        try:
+            linhas = montar_query(db).yield_per(linhas_por_lote)
+            pedaco = bytearray(b"[" if formato == "json" else b"")
+            primeiro = True
+            for linha in linhas:
+                if formato == "ndjson":
+                    pedaco += dumps(converter(linha))
+                    pedaco += b"\n"
+                else:
+                    if not primeiro:
+                        pedaco += b","
+                    pedaco += dumps(converter(linha))
+                    primeiro = False
+                if len(pedaco) >= TAMANHO_PEDACO:
+                    yield bytes(pedaco)
+                    pedaco.clear()
+            if formato == "json":
+                pedaco += b"]"
+            if pedaco:
+                yield bytes(pedaco)
+        except Exception as e:
+            # O status 200 já foi enviado: só resta registrar e encerrar o corpo
+            logger.error(f"Erro durante resposta em streaming: {e}")
+            raise
+        finally:
+            db.close()
+
+    media_type = NDJSON_MEDIA_TYPE if formato == "ndjson" else "application/json"
+    return StreamingResponse(gerar(), media_type=media_type)
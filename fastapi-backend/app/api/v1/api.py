@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, users, projects, atividades, setores, documentos, casas_parceiras, criativos, user_projects, leads, kanban_columns, clientes, propostas, notificacoes
+from .endpoints import auth, users, projects, atividades, setores, documentos, casas_parceiras, criativos, user_projects, leads, kanban_columns, clientes, propostas, notificacoes, search, cache, jobs, relatorios_mensais
 from . import relatorios_diarios, credenciais_acesso, metricas_redes_sociais
 
 api_router = APIRouter()
@@ -21,4 +21,8 @@ api_router.include_router(leads.router, prefix="/leads", tags=["leads"])
 api_router.include_router(kanban_columns.router, prefix="/kanban-columns", tags=["kanban-columns"])
 api_router.include_router(clientes.router, prefix="/clientes", tags=["clientes"])
 api_router.include_router(propostas.router, prefix="/propostas", tags=["propostas"])
-api_router.include_router(notificacoes.router, prefix="/notificacoes", tags=["notificacoes"]) 
\ No newline at end of file
+api_router.include_router(notificacoes.router, prefix="/notificacoes", tags=["notificacoes"]) 
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(cache.router, prefix="/cache", tags=["cache"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(relatorios_mensais.router, prefix="/relatorios-mensais", tags=["relatorios-mensais"])
@@ -1,27 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 from uuid import UUID
 from ....core.database import get_db
 from ....schemas.atividade import AtividadeCreate, AtividadeResponse, AtividadeUpdate
-from ....services.atividade_service import AtividadeService
+from ....services.atividade_service import AtividadeService, ORDENACOES_ATIVIDADE, RELACOES_ATIVIDADE
 from ....models.user import User
 from ...deps import get_current_active_user
+from ...inclusao import interpretar_include
 
 router = APIRouter()
 
 
+def filtros_atividades(
+    status_atividade: Optional[List[str]] = Query(None, alias="status", description="Repetível: ?status=Atrasada&status=Em andamento"),
+    prazo_de: Optional[date] = Query(None),
+    prazo_ate: Optional[date] = Query(None, description="Inclusivo"),
+    setor_id: Optional[UUID] = Query(None),
+    responsavel_id: Optional[UUID] = Query(None),
+    projeto_id: Optional[UUID] = Query(None),
+    ordenar: str = Query("-created_at", pattern=f"^-?({'|'.join(ORDENACOES_ATIVIDADE)})$")
+) -> dict:
+    """Filtros e ordenação das listagens de atividades (v1 e legado)"""
+    return {
+        "status": status_atividade,
+        "prazo_de": prazo_de,
+        "prazo_ate": prazo_ate,
+        "setor_id": setor_id,
+        "responsavel_id": responsavel_id,
+        "projeto_id": projeto_id,
+        "ordenar": ordenar,
+    }
+
+
 @router.get("/", response_model=List[AtividadeResponse])
 @router.get("", response_model=List[AtividadeResponse])  # Route without trailing slash
 def read_atividades(
     skip: int = 0,
     limit: int = 100,
+    include: Optional[str] = Query(None, description="projeto,responsavel,setor (padrão: todos; vazio: nenhum)"),
+    filtros: dict = Depends(filtros_atividades),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get atividades for current user"""
+    """Get atividades for current user
+
+    Os relacionamentos do include vêm na mesma consulta (JOIN); os não pedidos
+    vêm como null. Sem o parâmetro, todos são incluídos, como antes.
+    """
+    relacoes = interpretar_include(include, RELACOES_ATIVIDADE, padrao=RELACOES_ATIVIDADE)
     atividades = AtividadeService.get_atividades(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db, user_id=current_user.id, skip=skip, limit=limit, relacoes=relacoes, **filtros
     )
     return atividades
 
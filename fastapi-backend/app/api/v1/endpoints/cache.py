@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from ....api.cache import resposta_cache
+from ....core.config import settings
+from ....core.difusao import difusao
+from ....models.user import User
+from ...deps import get_current_admin_user
+
+router = APIRouter()
+
+
+@router.get("/metricas")
+def metricas_cache_respostas(current_user: User = Depends(get_current_admin_user)):
+    """Contadores de hit/miss/eviction do cache de respostas deste worker (apenas admin)"""
+    return {"ativo": settings.response_cache_enabled, **resposta_cache.metricas(), "difusao": difusao.metricas()}
+
+
+@router.post("/limpar")
+def limpar_cache_respostas(current_user: User = Depends(get_current_admin_user)):
+    """Descartar todas as respostas guardadas, em todos os workers (apenas admin)"""
+    resposta_cache.limpar()
+    return {"message": "Cache de respostas limpo"}
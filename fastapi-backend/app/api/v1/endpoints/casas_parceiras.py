@@ -14,11 +14,18 @@ from ....services.casa_parceira_service import CasaParceiraService
 from ....services.project_service import ProjectService
 from ....models.user import User
 from ...deps import get_current_active_user
+from ...etag import etag
+from ....models.casa_parceira import CasaParceira
+from ....models.project import Project
 
 router = APIRouter()
 
 
-@router.get("/projeto/{projeto_id}", response_model=List[CasaParceiraResponse])
+@router.get(
+    "/projeto/{projeto_id}",
+    response_model=List[CasaParceiraResponse],
+    dependencies=[etag(CasaParceira, Project)]
+)
 def get_casas_by_projeto(
     projeto_id: UUID,
     db: Session = Depends(get_db),
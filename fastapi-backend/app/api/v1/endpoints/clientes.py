@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
+from datetime import date
 import logging
 from ....core.database import get_db
-from ....schemas.cliente import ClienteCreate, ClienteResponse, ClienteUpdate
+from ....schemas.cliente import (
+    ClienteCreate,
+    ClienteResponse,
+    ClienteUpdate,
+    ClienteSimilarResponse,
+    ClienteDuplicatasRelatorio
+)
 from ....services.cliente_service import ClienteService
+from ....services.cliente_similaridade_service import ClienteSimilaridadeService
 from ....models.user import User
+from ....models.cliente import Cliente
 from ...deps import get_current_active_user
+from ...exportacao import resposta_exportacao
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +29,95 @@ router = APIRouter()
 def read_clientes(
     skip: int = 0,
     limit: int = 100,
+    data_inicio: Optional[date] = Query(None, description="Cadastrados a partir de"),
+    data_fim: Optional[date] = Query(None, description="Cadastrados até"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all clientes"""
-    clientes = ClienteService.get_clientes(db, skip=skip, limit=limit)
+    clientes = ClienteService.get_clientes(db, skip=skip, limit=limit, data_inicio=data_inicio, data_fim=data_fim)
     return clientes
 
 
+COLUNAS_EXPORTACAO = [
+    ("ID", Cliente.id),
+    ("Nome", Cliente.nome),
+    ("CPF", Cliente.cpf),
+    ("Data de nascimento", Cliente.data_nascimento),
+    ("Empreendimento", Cliente.empreendimento),
+    ("Email", Cliente.email),
+    ("Telefone", Cliente.telefone),
+    ("WhatsApp", Cliente.whatsapp),
+    ("Origem do lead", Cliente.origem_lead),
+    ("Observações", Cliente.observacoes),
+    ("Cadastrado em", Cliente.created_at),
+]
+
+
+@router.get("/exportar")
+def exportar_clientes(
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    separador: str = Query(",", pattern="^[,;]$", description="Separador do CSV"),
+    data_inicio: Optional[date] = Query(None, description="Cadastrados a partir de"),
+    data_fim: Optional[date] = Query(None, description="Cadastrados até"),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Exportar os clientes (mesmos filtros da listagem) em CSV ou XLSX, em streaming"""
+    return resposta_exportacao(
+        lambda s: ClienteService.query_clientes(s, data_inicio, data_fim),
+        COLUNAS_EXPORTACAO,
+        formato,
+        "clientes",
+        separador
+    )
+
+
+@router.get("/similar", response_model=List[ClienteSimilarResponse])
+def read_clientes_similares(
+    nome: Optional[str] = Query(None, max_length=255),
+    email: Optional[str] = Query(None, max_length=255),
+    cpf: Optional[str] = Query(None, max_length=20),
+    telefone: Optional[str] = Query(None, max_length=30),
+    whatsapp: Optional[str] = Query(None, max_length=30),
+    excluir_id: Optional[UUID] = Query(None, description="Ignorar este cliente (ao editar)"),
+    min_score: float = Query(0.45, ge=0, le=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Clientes parecidos com os dados informados (usar antes de criar um cliente)"""
+    resultados = ClienteSimilaridadeService.buscar_similares(
+        db,
+        nome=nome,
+        email=email,
+        cpf=cpf,
+        telefone=telefone,
+        whatsapp=whatsapp,
+        excluir_id=excluir_id,
+        min_score=min_score,
+        limit=limit
+    )
+    return [
+        ClienteSimilarResponse(cliente=ClienteResponse.model_validate(cliente), score=score, motivos=motivos)
+        for cliente, score, motivos in resultados
+    ]
+
+
+@router.get("/duplicates", response_model=ClienteDuplicatasRelatorio)
+def read_clientes_duplicados(
+    min_score: float = Query(0.6, ge=0, le=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Relatório de possíveis clientes duplicados em toda a base (apenas admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem gerar o relatório de duplicatas"
+        )
+    return ClienteSimilaridadeService.relatorio_duplicatas(db, min_score=min_score)
+
+
 @router.get("/{cliente_id}", response_model=ClienteResponse)
 def read_cliente(
     cliente_id: UUID,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -8,12 +8,16 @@ import logging
 from ....core.database import get_db
 from ....api.deps import get_current_user
 from ....models.user import User
-from ....models.criativo import StatusCriativo
+from ....models.criativo import Criativo, StatusCriativo
+from ....models.criativo_status_counter import CriativoStatusCounter
+from ....models.project import Project
+from ....models.user_project import UserProject
+from ....api.cache import cache_resposta
 from ....schemas.criativo import (
     CriativoCreate, CriativoUpdate, CriativoResponse,
     CriativosKanbanResponse, CriativosStats, StatusCriativo as StatusCriativoSchema
 )
-from ....services.criativo_service import CriativoService
+from ....services.criativo_service import CriativoService, CRIATIVO_RESPONSE
 from ....services.minio_service import minio_service
 
 router = APIRouter()
@@ -185,7 +189,7 @@ def list_criativos(
 ):
     """Listar criativos acessíveis ao usuário"""
     criativo_service = CriativoService(db)
-    return criativo_service.get_user_criativos(
+    criativos = criativo_service.get_user_criativos(
         user_id=current_user.id,
         user_is_admin=current_user.is_admin,
         projeto_id=projeto_id,
@@ -194,9 +198,12 @@ def list_criativos(
         skip=skip,
         limit=limit
     )
+    # Dados já tipados pelo banco: serializar direto, sem revalidar no response_model
+    return CRIATIVO_RESPONSE.resposta_lista(criativos)
 
 
 @router.get("/kanban", response_model=CriativosKanbanResponse)
+@cache_resposta(ttl=30, tags=(Criativo, Project, UserProject), vary_params=("projeto_id",))
 def get_kanban_view(
     projeto_id: Optional[UUID] = Query(None, description="Filtrar por projeto"),
     db: Session = Depends(get_db),
@@ -204,14 +211,16 @@ def get_kanban_view(
 ):
     """Buscar criativos organizados para visualização Kanban (filtrado por usuário)"""
     criativo_service = CriativoService(db)
-    return criativo_service.get_user_kanban_view(
+    kanban = criativo_service.get_user_kanban_view(
         user_id=current_user.id,
         user_is_admin=current_user.is_admin,
         projeto_id=projeto_id
     )
+    return Response(content=kanban.model_dump_json(), media_type="application/json")
 
 
 @router.get("/stats", response_model=CriativosStats)
+@cache_resposta(ttl=30, tags=(Criativo, CriativoStatusCounter, Project, UserProject), vary_params=("projeto_id",))
 def get_criativos_stats(
     projeto_id: Optional[UUID] = Query(None, description="Filtrar por projeto"),
     db: Session = Depends(get_db),
@@ -226,6 +235,23 @@ def get_criativos_stats(
     )
 
 
+@router.post("/stats/rebuild")
+def rebuild_criativos_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recalcular os contadores de status dos criativos (apenas admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem recalcular estatísticas"
+        )
+    
+    criativo_service = CriativoService(db)
+    total = criativo_service.rebuild_status_counters()
+    return {"message": "Contadores recalculados com sucesso", "contadores": total}
+
+
 @router.get("/{criativo_id}", response_model=CriativoResponse)
 def get_criativo(
     criativo_id: UUID,
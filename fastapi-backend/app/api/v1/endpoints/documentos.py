@@ -1,21 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import uuid
+import logging
 
 from ....schemas import documento as schemas
 from ....core.database import get_db
 from ....services.minio_service import minio_service
 from ....services.documento_service import DocumentoService
 from ....api.deps import get_current_active_user  # For authentication
+from ....api.streaming import formato_streaming, resposta_streaming
 from ....models.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # IMPORTANTE: GET deve vir ANTES de POST para evitar conflitos de roteamento
 @router.get("/", response_model=List[schemas.DocumentoResponse])
 @router.get("", response_model=List[schemas.DocumentoResponse])  # Suporte para rota sem trailing slash
 def list_documentos(
+    request: Request,
     db: Session = Depends(get_db),
     pasta: Optional[str] = Query(None, description="Filtrar por pasta"),  # Query parameter explícito
     skip: int = Query(0, ge=0),
@@ -25,7 +30,19 @@ def list_documentos(
     """
     Retrieve documents. Can be filtered by 'pasta'.
     The frontend filters by key.startsWith(folder), so this should align.
+
+    Com ?stream=true ou Accept: application/x-ndjson os documentos são enviados aos
+    pedaços; nesse modo `limit` só se aplica quando informado explicitamente.
     """
+    formato = formato_streaming(request)
+    if formato:
+        limite = limit if "limit" in request.query_params else None
+        return resposta_streaming(
+            lambda s: DocumentoService.query_documentos(s, pasta=pasta).offset(skip).limit(limite),
+            _documento_com_url,
+            formato
+        )
+
     if pasta:
         db_documentos = DocumentoService.get_documentos_by_pasta(db, pasta=pasta, skip=skip, limit=limit)
     else:
@@ -42,6 +59,25 @@ def list_documentos(
         response_docs.append(doc_response)
     return response_docs
 
+def _documento_com_url(db_doc) -> dict:
+    """Documento no formato de DocumentoResponse, com a URL pré-assinada"""
+    try:
+        url = minio_service.get_download_url(db_doc.key)
+    except Exception as e:
+        logger.warning(f"Error generating download URL for {db_doc.key}: {e}")
+        url = None
+    return {
+        "nome": db_doc.nome,
+        "tamanho": db_doc.tamanho,
+        "tipo": db_doc.tipo,
+        "pasta": db_doc.pasta,
+        "id": db_doc.id,
+        "key": db_doc.key,
+        "url": url,
+        "created_at": db_doc.created_at,
+        "updated_at": db_doc.updated_at,
+    }
+
 @router.post("/", response_model=schemas.DocumentoResponse)
 @router.post("", response_model=schemas.DocumentoResponse)  # Suporte para rota sem trailing slash
 def create_documento_entry(
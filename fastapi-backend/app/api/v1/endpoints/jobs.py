@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import uuid
+
+from ....core.database import get_db
+from ....models.job import Job, StatusJob
+from ....models.user import User
+from ....schemas.job import JobResponse
+from ....services import job_worker
+from ....services import tarefas  # noqa: F401  (registra as tarefas: tentativas e prioridade padrão)
+from ....services.job_service import JobService
+from ...deps import get_current_active_user, get_current_admin_user
+
+router = APIRouter()
+
+
+def _job_do_usuario(db: Session, job_id: uuid.UUID, current_user: User) -> Job:
+    """Job visível para o usuário (o próprio ou qualquer um, se admin) ou 404"""
+    job = JobService.obter(db, job_id)
+    if job is None or (not current_user.is_admin and job.criado_por_id != current_user.id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job não encontrado")
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+def listar_jobs(
+    status_job: Optional[StatusJob] = Query(None, alias="status"),
+    tipo: Optional[str] = Query(None),
+    todos: bool = Query(False, description="Jobs de todos os usuários (apenas admin)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Listar os jobs do usuário, mais recentes primeiro"""
+    usuario_id = None if (todos and current_user.is_admin) else current_user.id
+    return JobService.listar(db, usuario_id=usuario_id, status=status_job, tipo=tipo, skip=skip, limit=limit)
+
+
+@router.get("/metricas")
+def metricas_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Jobs por status e o worker deste processo, se houver (apenas admin)"""
+    return {
+        "por_status": JobService.contagem_por_status(db),
+        "worker_no_processo": job_worker.worker_api.metricas() if job_worker.worker_api else None,
+    }
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def obter_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Status, progresso e resultado de um job"""
+    return _job_do_usuario(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancelar", response_model=JobResponse)
+def cancelar_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Cancelar um job pendente ou em execução (este para no próximo progresso)"""
+    job = _job_do_usuario(db, job_id, current_user)
+    if not JobService.cancelar(db, job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job já finalizado ({job.status.value})"
+        )
+    return job
@@ -8,6 +8,8 @@ from ....schemas.kanban_column import KanbanColumnCreate, KanbanColumnResponse,
 from ....services.kanban_column_service import KanbanColumnService
 from ....models.user import User
 from ...deps import get_current_active_user
+from ...etag import etag
+from ....models.kanban_column import KanbanColumn
 
 router = APIRouter()
 
@@ -16,8 +18,8 @@ class ReorderColumnsRequest(BaseModel):
     columns: List[dict]  # [{"id": "uuid", "order": 0}]
 
 
-@router.get("/", response_model=List[KanbanColumnResponse])
-@router.get("", response_model=List[KanbanColumnResponse])
+@router.get("/", response_model=List[KanbanColumnResponse], dependencies=[etag(KanbanColumn)])
+@router.get("", response_model=List[KanbanColumnResponse], dependencies=[etag(KanbanColumn)])
 def read_columns(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
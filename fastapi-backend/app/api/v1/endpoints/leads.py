@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import List, Optional
+from datetime import date
 from pydantic import BaseModel
 
 from ....core.database import get_db
 from ....api.deps import get_current_user
 from ....models.user import User
+from ....models.lead import Lead
+from ....models.project import Project
 from ....schemas.lead import LeadCreate, LeadUpdate, LeadResponse, LeadStage
 from ....services.lead_service import LeadService
+from ...exportacao import resposta_exportacao
 
 
 class MoveLeadRequest(BaseModel):
@@ -33,12 +37,52 @@ async def create_lead(
 async def get_leads(
     skip: int = 0,
     limit: int = 100,
+    projeto_id: Optional[UUID] = None,
+    stage: Optional[LeadStage] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Listar leads do usuário"""
     service = LeadService(db)
-    return service.get_leads(current_user.id, skip, limit)
+    return service.get_leads(current_user.id, skip, limit, projeto_id, stage, data_inicio, data_fim)
+
+
+COLUNAS_EXPORTACAO = [
+    ("ID", Lead.id),
+    ("Nome", Lead.nome),
+    ("Email", Lead.email),
+    ("Telefone", Lead.telefone),
+    ("Empresa", Lead.empresa),
+    ("Estágio", Lead.stage),
+    ("Status", Lead.status),
+    ("Projeto", Project.name),
+    ("Tags", Lead.tags),
+    ("Observações", Lead.observacoes),
+    ("Criado em", Lead.created_at),
+]
+
+
+@router.get("/exportar")
+def exportar_leads(
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    separador: str = Query(",", pattern="^[,;]$", description="Separador do CSV"),
+    projeto_id: Optional[UUID] = None,
+    stage: Optional[LeadStage] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Exportar os leads (mesmos filtros da listagem) em CSV ou XLSX, em streaming"""
+    return resposta_exportacao(
+        lambda s: LeadService(s).query_leads(current_user.id, projeto_id, stage, data_inicio, data_fim)
+        .outerjoin(Project, Lead.projeto_id == Project.id),
+        COLUNAS_EXPORTACAO,
+        formato,
+        "leads",
+        separador
+    )
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
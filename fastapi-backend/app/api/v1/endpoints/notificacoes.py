@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
+import json
 import logging
 
-from ....core.database import get_db
+from ....core.config import settings
+from ....core.database import get_db, SessionLocal
+from ....core.security import verify_token
+from ....schemas.serializacao import Serializador
 from ....schemas.notificacao import (
     NotificacaoCreate,
     NotificacaoResponse,
@@ -12,6 +18,14 @@ from ....schemas.notificacao import (
     NotificacaoCountResponse
 )
 from ....services.notificacao_service import NotificacaoService
+from ....services.notificacao_broker import notificacao_broker
+from ....services.job_service import JobService
+from ....services.notificacao_retencao_service import (
+    NotificacaoRetencaoService,
+    MODOS_RETENCAO,
+    metricas_retencao
+)
+from ....services.user_service import UserService
 from ....models.user import User
 from ....models.notificacao import Notificacao
 from ...deps import get_current_active_user
@@ -21,42 +35,47 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def serialize_notificacao(notificacao: Notificacao) -> NotificacaoResponse:
-    """Serializar notificação ORM para resposta"""
+# Campos copiados direto da linha; from_user_name/avatar são resolvidos à parte
+NOTIFICACAO_RESPONSE = Serializador(NotificacaoResponse, {
+    campo: getattr(Notificacao, campo) for campo in (
+        "id", "tipo", "titulo", "mensagem", "usuario_id", "from_user_id",
+        "contexto_tipo", "contexto_id", "contexto_nome", "action_url",
+        "status", "created_at", "updated_at", "read_at",
+    )
+})
+
+
+def serialize_notificacao(notificacao: Notificacao, avatar_cache: Optional[Dict[str, Optional[str]]] = None) -> NotificacaoResponse:
+    """Serializar notificação ORM para resposta
+
+    avatar_cache evita gerar uma presigned URL por linha quando várias
+    notificações compartilham o mesmo remetente.
+    """
     from_user_name = None
     from_user_avatar = None
     
     if notificacao.from_user:
         from_user_name = notificacao.from_user.name
         # Se houver foto de perfil, gerar presigned URL
-        if notificacao.from_user.foto_perfil:
+        foto_perfil = notificacao.from_user.foto_perfil
+        if foto_perfil and avatar_cache is not None and foto_perfil in avatar_cache:
+            from_user_avatar = avatar_cache[foto_perfil]
+        elif foto_perfil:
             try:
                 from ....services.minio_service import minio_service
                 from_user_avatar = minio_service.get_download_url(
-                    notificacao.from_user.foto_perfil,
+                    foto_perfil,
                     expires_in_seconds=604800
                 )
             except Exception as e:
                 logger.warning(f"Erro ao gerar URL da foto: {e}")
+            if avatar_cache is not None:
+                avatar_cache[foto_perfil] = from_user_avatar
     
-    return NotificacaoResponse(
-        id=notificacao.id,
-        tipo=notificacao.tipo,
-        titulo=notificacao.titulo,
-        mensagem=notificacao.mensagem,
-        usuario_id=notificacao.usuario_id,
-        from_user_id=notificacao.from_user_id,
-        from_user_name=from_user_name,
-        from_user_avatar=from_user_avatar,
-        contexto_tipo=notificacao.contexto_tipo,
-        contexto_id=notificacao.contexto_id,
-        contexto_nome=notificacao.contexto_nome,
-        action_url=notificacao.action_url,
-        status=notificacao.status,
-        created_at=notificacao.created_at,
-        updated_at=notificacao.updated_at,
-        read_at=notificacao.read_at
-    )
+    dados = NOTIFICACAO_RESPONSE.dicionario(notificacao)
+    dados["from_user_name"] = from_user_name
+    dados["from_user_avatar"] = from_user_avatar
+    return NotificacaoResponse.model_construct(**dados)
 
 
 @router.post("/", response_model=NotificacaoResponse)
@@ -100,11 +119,20 @@ def criar_notificacao(
 @router.post("/multiple", response_model=List[NotificacaoResponse])
 def criar_notificacao_multiplos(
     notificacao: NotificacaoCreate,
-    usuario_ids: List[uuid.UUID] = Query(..., description="Lista de IDs dos usuários destinatários"),
+    usuario_ids: Optional[List[uuid.UUID]] = Query(None, description="Lista de IDs dos usuários destinatários"),
+    projeto_id: Optional[uuid.UUID] = Query(None, description="Enviar para todos os membros do projeto"),
+    setor_id: Optional[uuid.UUID] = Query(None, description="Enviar para todos os usuários do setor"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Criar notificações para múltiplos usuários (apenas admin ou gestor de projeto)"""
+    """Criar notificações para múltiplos usuários (apenas admin ou gestor de projeto)
+
+    Audiências acima de NOTIFICACAO_FANOUT_SYNC_LIMIT viram um job da fila
+    (processado em lotes pelo worker) e a resposta é 202 com o job_id, para
+    acompanhar em /api/v1/jobs/{job_id}. Com o header Idempotency-Key, reenviar
+    a mesma requisição devolve o mesmo job em vez de notificar duas vezes.
+    """
     # Verificar permissão
     if not NotificacaoService.verificar_permissao_criar(db, current_user.id):
         raise HTTPException(
@@ -112,7 +140,14 @@ def criar_notificacao_multiplos(
             detail="Apenas administradores e gestores de projeto podem criar notificações"
         )
     
-    if not usuario_ids or len(usuario_ids) == 0:
+    destinatarios = NotificacaoService.resolver_destinatarios(
+        db,
+        usuario_ids=usuario_ids,
+        projeto_id=projeto_id,
+        setor_id=setor_id
+    )
+    
+    if not destinatarios:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Selecione pelo menos um usuário destinatário"
@@ -120,20 +155,38 @@ def criar_notificacao_multiplos(
     
     from_user_id = notificacao.from_user_id or current_user.id
     
+    if len(destinatarios) > settings.notificacao_fanout_sync_limit:
+        job = JobService.enfileirar(
+            db,
+            "notificacoes.fanout",
+            payload={
+                "notificacao": notificacao.model_dump(mode="json"),
+                "usuario_ids": [str(usuario_id) for usuario_id in destinatarios],
+                "from_user_id": str(from_user_id),
+            },
+            chave_idempotencia=f"notificacoes.fanout:{current_user.id}:{idempotency_key}" if idempotency_key else None,
+            criado_por_id=current_user.id
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": "Envio de notificações agendado",
+                "destinatarios": len(destinatarios),
+                "job_id": str(job.id),
+                "status": job.status.value
+            }
+        )
+    
     db_notificacoes = NotificacaoService.criar_notificacao_multiplos_usuarios(
         db=db,
         notificacao=notificacao,
-        usuario_ids=usuario_ids,
+        usuario_ids=destinatarios,
         from_user_id=from_user_id
     )
     
-    # Carregar relacionamentos
-    notif_ids = [n.id for n in db_notificacoes]
-    notificacoes_com_relacoes = db.query(Notificacao).options(
-        joinedload(Notificacao.from_user)
-    ).filter(Notificacao.id.in_(notif_ids)).all()
-    
-    return [serialize_notificacao(n) for n in notificacoes_com_relacoes]
+    # Todas compartilham o mesmo remetente: um único carregamento e uma única URL de avatar
+    avatar_cache: Dict[str, Optional[str]] = {}
+    return [serialize_notificacao(n, avatar_cache) for n in db_notificacoes]
 
 
 @router.get("/", response_model=List[NotificacaoResponse])
@@ -146,6 +199,7 @@ def listar_notificacoes(
     current_user: User = Depends(get_current_active_user)
 ):
     """Listar notificações do usuário atual"""
+    # Remetente já vem no mesmo SELECT, na ordem da listagem
     notificacoes = NotificacaoService.listar_notificacoes_usuario(
         db=db,
         usuario_id=current_user.id,
@@ -154,13 +208,95 @@ def listar_notificacoes(
         apenas_nao_lidas=apenas_nao_lidas
     )
     
-    # Carregar relacionamentos
-    notif_ids = [n.id for n in notificacoes]
-    notificacoes_com_relacoes = db.query(Notificacao).options(
-        joinedload(Notificacao.from_user)
-    ).filter(Notificacao.id.in_(notif_ids)).all()
+    avatar_cache: Dict[str, Optional[str]] = {}
+    return NOTIFICACAO_RESPONSE.resposta_lista([serialize_notificacao(n, avatar_cache) for n in notificacoes])
+
+
+def _autenticar_stream(authorization: Optional[str], token: Optional[str]) -> uuid.UUID:
+    """Autenticar conexões de stream (EventSource não envia headers, então aceita ?token=)
+
+    Usa uma sessão curta: conexões de longa duração não devem segurar o pool do banco.
+    """
+    if not token and authorization and authorization.startswith("Bearer "):
+        token = authorization.replace("Bearer ", "")
     
-    return [serialize_notificacao(n) for n in notificacoes_com_relacoes]
+    user_id = verify_token(token) if token else None
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    db = SessionLocal()
+    try:
+        user = UserService.get_user(db, user_id=user_id)
+        if user is None or not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials"
+            )
+        return user.id
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+async def stream_notificacoes(
+    request: Request,
+    token: Optional[str] = Query(None, description="JWT (alternativa ao header Authorization)")
+):
+    """Stream de notificações em tempo real (Server-Sent Events)"""
+    usuario_id = await run_in_threadpool(
+        _autenticar_stream, request.headers.get("authorization"), token
+    )
+    assinatura = notificacao_broker.assinar(usuario_id)
+    
+    async def eventos():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                evento = await assinatura.proximo(settings.notificacao_stream_heartbeat)
+                if await request.is_disconnected():
+                    break
+                if evento is None:
+                    # Heartbeat para manter proxies e o cliente cientes da conexão
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+        finally:
+            notificacao_broker.cancelar(assinatura)
+    
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_notificacoes(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None)
+):
+    """Canal WebSocket de notificações em tempo real"""
+    try:
+        usuario_id = await run_in_threadpool(
+            _autenticar_stream, websocket.headers.get("authorization"), token
+        )
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    assinatura = notificacao_broker.assinar(usuario_id)
+    try:
+        while True:
+            evento = await assinatura.proximo(settings.notificacao_stream_heartbeat)
+            await websocket.send_json(evento or {"tipo": "ping"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        notificacao_broker.cancelar(assinatura)
 
 
 @router.get("/count", response_model=NotificacaoCountResponse)
@@ -176,6 +312,61 @@ def contar_notificacoes(
     return NotificacaoCountResponse(**counts)
 
 
+@router.get("/retencao/metricas")
+def metricas_retencao_notificacoes(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Métricas da política de retenção e tamanho das tabelas (apenas admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem consultar a retenção de notificações"
+        )
+    
+    return {
+        "politica": {
+            "dias": settings.notificacao_retencao_dias,
+            "modo": settings.notificacao_retencao_modo,
+            "lote": settings.notificacao_retencao_lote,
+            "intervalo_horas": settings.notificacao_retencao_intervalo_horas,
+        },
+        "particionada": NotificacaoRetencaoService.tabela_particionada(db),
+        "tabelas": NotificacaoRetencaoService.tamanho_tabelas(db),
+        **metricas_retencao.snapshot()
+    }
+
+
+@router.post("/retencao/executar", status_code=status.HTTP_202_ACCEPTED)
+def executar_retencao_notificacoes(
+    dias: Optional[int] = Query(None, ge=1, description="Idade mínima em dias (padrão: NOTIFICACAO_RETENCAO_DIAS)"),
+    modo: Optional[str] = Query(None, description="archive ou delete (padrão: NOTIFICACAO_RETENCAO_MODO)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Enfileirar a política de retenção como job (apenas admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem executar a retenção de notificações"
+        )
+    if modo is not None and modo not in MODOS_RETENCAO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Modo inválido. Use: {', '.join(MODOS_RETENCAO)}"
+        )
+    if metricas_retencao.em_execucao or JobService.existe_ativo(db, "notificacoes.retencao"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A retenção de notificações já está em execução"
+        )
+    
+    job = JobService.enfileirar(
+        db, "notificacoes.retencao", payload={"dias": dias, "modo": modo}, criado_por_id=current_user.id
+    )
+    return {"message": "Retenção de notificações agendada", "job_id": str(job.id), "status": job.status.value}
+
+
 @router.patch("/{notificacao_id}/read", response_model=NotificacaoResponse)
 def marcar_como_lida(
     notificacao_id: uuid.UUID,
@@ -1,49 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 import uuid
 from ....core.database import get_db
 from ....schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
 from ....schemas.user import UserResponse
+from ....schemas.serializacao import Serializador
 from ....services.project_service import ProjectService
+from ....services.job_service import JobService
 from ....models.user import User
 from ....models.project import Project
+from ....models.user_project import UserProject
 from ...deps import get_current_active_user
+from ...etag import etag
+from ...cache import cache_resposta
 
 router = APIRouter()
 
 
+# Mesmo formato de UserResponse.model_validate(owner).model_dump(), sem validar
+_OWNER = Serializador(UserResponse, {campo: campo for campo in UserResponse.model_fields})
+
+PROJECT_RESPONSE = Serializador(ProjectResponse, {
+    campo: getattr(Project, campo) for campo in (
+        "id", "name", "description", "status", "startDate", "endDate",
+        "budget", "owner_id", "created_at", "updated_at",
+    )
+})
+
+
 def serialize_project(project) -> ProjectResponse:
     """Serialize Project ORM object to ProjectResponse"""
-    # Serialize owner if available
-    owner_dict = None
-    if project.owner:
-        owner_response = UserResponse.model_validate(project.owner)
-        owner_dict = owner_response.model_dump()
-    
-    # Serialize cliente if available (se houver relação)
-    cliente_dict = None
-    # TODO: Adicionar relação com cliente quando disponível
-    
-    return ProjectResponse(
-        id=project.id,
-        name=project.name,
-        description=project.description,
-        status=project.status,
-        startDate=project.startDate,
-        endDate=project.endDate,
-        budget=project.budget,
-        owner_id=project.owner_id,
-        created_at=project.created_at,
-        updated_at=project.updated_at,
-        atividades=[],  # Será preenchido se necessário
-        owner=owner_dict,
-        cliente=cliente_dict
-    )
+    dados = PROJECT_RESPONSE.dicionario(project)
+    dados["atividades"] = []  # Será preenchido se necessário
+    dados["owner"] = _OWNER.dicionario(project.owner) if project.owner else None
+    dados["cliente"] = None  # TODO: Adicionar relação com cliente quando disponível
+    return ProjectResponse.model_construct(**dados)
 
 
-@router.get("/", response_model=List[ProjectResponse])
-@router.get("", response_model=List[ProjectResponse])  # Route without trailing slash
+# A lista depende de quem pede (projetos próprios + atribuídos), daí por_usuario
+@router.get("/", response_model=List[ProjectResponse], dependencies=[etag(Project, UserProject, User, por_usuario=True)])
+@router.get("", response_model=List[ProjectResponse], dependencies=[etag(Project, UserProject, User, por_usuario=True)])  # Route without trailing slash
+@cache_resposta(ttl=30, tags=(Project, UserProject, User))
 def read_projects(
     skip: int = 0,
     limit: int = 100,
@@ -60,7 +59,7 @@ def read_projects(
         joinedload(Project.owner)
     ).filter(Project.id.in_(project_ids)).all()
     
-    return [serialize_project(p) for p in projects_with_relations][skip:skip+limit]
+    return PROJECT_RESPONSE.resposta_lista([serialize_project(p) for p in projects_with_relations][skip:skip+limit])
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -128,10 +127,15 @@ def update_project(
 @router.delete("/{project_id}")
 def delete_project(
     project_id: uuid.UUID,
+    assincrono: bool = Query(False, description="Excluir em segundo plano (202 com job_id)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Delete project - only owners and admins can delete"""
+    """Delete project - only owners and admins can delete
+
+    Projetos com muitos dados dependentes podem ser excluídos pela fila de
+    jobs (assincrono=true); o progresso fica em /api/v1/jobs/{job_id}.
+    """
     # Check if project exists and user has permission
     project = ProjectService.get_project(db, project_id=project_id)
     if project is None:
@@ -143,6 +147,18 @@ def delete_project(
             detail="Not enough permissions"
         )
     
+    if assincrono:
+        job = JobService.enfileirar(
+            db,
+            "projetos.excluir",
+            payload={"project_id": str(project_id)},
+            criado_por_id=current_user.id
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"message": "Exclusão do projeto agendada", "job_id": str(job.id), "status": job.status.value}
+        )
+    
     try:
         success = ProjectService.delete_project(db, project_id=project_id)
         if not success:
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
+from datetime import date
 from pydantic import BaseModel
 from ....core.database import get_db
 from ....schemas.proposta import PropostaCreate, PropostaResponse, PropostaUpdate
 from ....services.proposta_service import PropostaService
 from ....models.user import User
+from ....models.cliente import Cliente
+from ....models.proposta import Proposta
 from ...deps import get_current_active_user
+from ...exportacao import resposta_exportacao
 
 router = APIRouter()
 
@@ -22,14 +26,58 @@ def read_propostas(
     skip: int = 0,
     limit: int = 100,
     cliente_id: Optional[UUID] = None,
+    status_proposta: Optional[str] = Query(None, alias="status"),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get all propostas"""
-    propostas = PropostaService.get_propostas(db, skip=skip, limit=limit, cliente_id=cliente_id)
+    propostas = PropostaService.get_propostas(
+        db, skip=skip, limit=limit, cliente_id=cliente_id,
+        status=status_proposta, data_inicio=data_inicio, data_fim=data_fim
+    )
     return propostas
 
 
+COLUNAS_EXPORTACAO = [
+    ("ID", Proposta.id),
+    ("Título", Proposta.titulo),
+    ("Cliente", Cliente.nome),
+    ("Status", Proposta.status),
+    ("Progresso", Proposta.progresso),
+    ("Valor", Proposta.valor),
+    ("Prioridade", Proposta.prioridade),
+    ("Ordem", Proposta.ordem),
+    ("Responsável", User.name),
+    ("Data de criação", Proposta.data_criacao),
+    ("Descrição", Proposta.descricao),
+    ("Observações", Proposta.observacoes),
+]
+
+
+@router.get("/exportar")
+def exportar_propostas(
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    separador: str = Query(",", pattern="^[,;]$", description="Separador do CSV"),
+    cliente_id: Optional[UUID] = None,
+    status_proposta: Optional[str] = Query(None, alias="status"),
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Exportar as propostas (mesmos filtros da listagem) em CSV ou XLSX, em streaming"""
+    return resposta_exportacao(
+        lambda s: PropostaService.query_propostas(s, cliente_id, status_proposta, data_inicio, data_fim)
+        .outerjoin(Cliente, Proposta.cliente_id == Cliente.id)
+        .outerjoin(User, Proposta.responsavel_id == User.id),
+        COLUNAS_EXPORTACAO,
+        formato,
+        "propostas",
+        separador
+    )
+
+
 @router.get("/{proposta_id}", response_model=PropostaResponse)
 def read_proposta(
     proposta_id: UUID,
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+import uuid
+
+from ....core.database import get_db
+from ....models.user import User
+from ....schemas.job import JobAgendadoResponse
+from ....schemas.relatorio_mensal import RelatorioMensalResponse
+from ....services import tarefas  # noqa: F401  (registra a tarefa relatorios.mensal)
+from ....services.relatorio_mensal_service import RelatorioMensalService, competencia, formatos_disponiveis
+from ....services.user_project_service import UserProjectService
+from ...deps import get_current_active_user
+
+router = APIRouter()
+
+
+def _verificar_acesso(db: Session, projeto_id: uuid.UUID, current_user: User):
+    if not UserProjectService.user_has_access_to_project(db, current_user.id, projeto_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sem acesso a este projeto"
+        )
+
+
+def _validar_pedido(ano: int, mes: int, formato: str):
+    hoje = date.today()
+    if (ano, mes) > (hoje.year, hoje.month):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Competência futura"
+        )
+    if formato not in formatos_disponiveis():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Formato {formato} indisponível neste servidor (disponíveis: {', '.join(formatos_disponiveis())})"
+        )
+
+
+def _com_url(relatorio, atualizado: Optional[bool] = None) -> RelatorioMensalResponse:
+    resposta = RelatorioMensalResponse.model_validate(relatorio)
+    resposta.atualizado = atualizado
+    resposta.url = RelatorioMensalService.url_download(relatorio)
+    return resposta
+
+
+@router.post("/projeto/{projeto_id}", response_model=RelatorioMensalResponse)
+def solicitar_relatorio_mensal(
+    projeto_id: uuid.UUID,
+    ano: int = Query(..., ge=2000, le=2100),
+    mes: int = Query(..., ge=1, le=12),
+    formato: str = Query("html", pattern="^(html|pdf)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Relatório mensal do projeto (financeiro, redes sociais e criativos)
+
+    Se os dados do mês não mudaram desde a última geração, devolve o arquivo
+    em cache com o link de download. Senão a geração vai para a fila e a
+    resposta é 202 com o job_id (GET /api/v1/jobs/{job_id}; o resultado traz o
+    relatorio_id). Pedidos repetidos enquanto o job roda recebem o mesmo job.
+    """
+    _verificar_acesso(db, projeto_id, current_user)
+    _validar_pedido(ano, mes, formato)
+
+    relatorio, job = RelatorioMensalService.solicitar(db, projeto_id, ano, mes, formato, current_user.id)
+    if relatorio is not None:
+        return _com_url(relatorio, atualizado=True)
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=JobAgendadoResponse(
+            message="Geração do relatório mensal agendada",
+            job_id=job.id,
+            status=job.status,
+            detalhes={"competencia": competencia(ano, mes), "formato": formato}
+        ).model_dump(mode="json")
+    )
+
+
+@router.get("/projeto/{projeto_id}", response_model=List[RelatorioMensalResponse])
+def listar_relatorios_mensais(
+    projeto_id: uuid.UUID,
+    competencia_filtro: Optional[str] = Query(None, alias="competencia", pattern=r"^\d{4}-\d{2}$"),
+    limit: int = Query(24, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Relatórios mensais já gerados do projeto (download em /{id}/download)"""
+    _verificar_acesso(db, projeto_id, current_user)
+    return RelatorioMensalService.listar(db, projeto_id, competencia_filtro, limit)
+
+
+@router.get("/projeto/{projeto_id}/{ano}/{mes}", response_model=RelatorioMensalResponse)
+def obter_relatorio_mensal(
+    projeto_id: uuid.UUID,
+    ano: int,
+    mes: int,
+    formato: str = Query("html", pattern="^(html|pdf)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Último relatório gerado do mês, com `atualizado` = dados sem mudança desde a geração"""
+    _verificar_acesso(db, projeto_id, current_user)
+    if not 1 <= mes <= 12:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Mês inválido")
+
+    relatorios = [r for r in RelatorioMensalService.listar(db, projeto_id, competencia(ano, mes)) if r.formato == formato]
+    if not relatorios:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Relatório mensal ainda não gerado"
+        )
+    versao = RelatorioMensalService.versao_dados(db, projeto_id, ano, mes)
+    return _com_url(relatorios[0], atualizado=relatorios[0].versao_dados == versao)
+
+
+@router.get("/{relatorio_id}/download")
+def baixar_relatorio_mensal(
+    relatorio_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Redirecionar para o link temporário do arquivo no MinIO"""
+    relatorio = RelatorioMensalService.obter(db, relatorio_id)
+    if relatorio is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relatório não encontrado")
+    _verificar_acesso(db, relatorio.projeto_id, current_user)
+    return RedirectResponse(RelatorioMensalService.url_download(relatorio), status_code=status.HTTP_307_TEMPORARY_REDIRECT)
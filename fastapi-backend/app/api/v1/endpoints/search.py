@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ....core.database import get_db
+from ....models.user import User
+from ....schemas.search import SearchResponse
+from ....services.search_service import SearchService, ENTIDADES
+from ...deps import get_current_active_user
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchResponse)
+@router.get("", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto buscado; cada palavra casa por prefixo"),
+    tipos: Optional[List[str]] = Query(None, description=f"Filtrar por tipo: {', '.join(ENTIDADES)}"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Busca unificada em leads, clientes, propostas, atividades e criativos"""
+    return SearchService.buscar(db, current_user, q, tipos=tipos, limit=limit)
+
+
+@router.post("/reindex")
+def reindex_search(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Reconstruir o índice de busca a partir das tabelas (apenas admin)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem reconstruir o índice de busca"
+        )
+    
+    total = SearchService.reindexar(db)
+    return {"message": "Índice de busca reconstruído com sucesso", "documentos": total}
@@ -6,14 +6,16 @@ import uuid
 from ....core.database import get_db
 from ....models.user import User
 from ....api.deps import get_current_active_user
+from ....api.etag import etag
+from ....models.setor import Setor
 from ....schemas.setor import SetorCreate, SetorUpdate, SetorResponse
 from ....services.setor_service import SetorService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[SetorResponse])
-@router.get("", response_model=List[SetorResponse])
+@router.get("/", response_model=List[SetorResponse], dependencies=[etag(Setor)])
+@router.get("", response_model=List[SetorResponse], dependencies=[etag(Setor)])
 def read_setores(
     skip: int = 0,
     limit: int = 100,
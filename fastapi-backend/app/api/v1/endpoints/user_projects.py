@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
@@ -28,8 +29,11 @@ def serialize_user_project(user_project, db: Session = None) -> UserProjectRespo
         # Importar a função serialize_project do endpoint de projetos
         from .projects import serialize_project
         
+        # Owner já carregado junto (get_project_users): serializar direto
+        if "owner" not in inspect(user_project.project).unloaded:
+            project_dict = serialize_project(user_project.project).model_dump()
         # Se temos acesso ao db, recarregar com relacionamentos
-        if db:
+        elif db:
             from sqlalchemy.orm import joinedload
             from ....models.project import Project
             project_with_relations = db.query(Project).options(
@@ -9,6 +9,7 @@ from ....services.user_service import UserService
 from ....services.minio_service import minio_service
 from ....models.user import User
 from ...deps import get_current_active_user, get_current_admin_user
+from ...etag import etag
 
 logger = logging.getLogger(__name__)
 
@@ -215,7 +216,7 @@ def change_password(
     return {"message": "Senha alterada com sucesso"}
 
 
-@router.get("/for-assignment")
+@router.get("/for-assignment", dependencies=[etag(User)])
 def get_users_for_assignment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
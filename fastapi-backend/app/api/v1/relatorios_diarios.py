@@ -11,10 +11,14 @@ from ...schemas.relatorio_diario import (
     RelatorioDiarioUpdate,
     RelatorioDiarioResponse,
     EstatisticasRelatorio,
+    MetricasGrupo,
     FiltroRelatorio
 )
 from ..deps import get_current_user
+from ..cache import cache_resposta
+from ..exportacao import resposta_exportacao
 from ...models.user import User
+from ...models.relatorio_diario import RelatorioDiario
 
 router = APIRouter()
 
@@ -88,6 +92,53 @@ def list_relatorios_projeto(
     )
 
 
+COLUNAS_EXPORTACAO = [
+    ("Data", RelatorioDiario.data_referente),
+    ("Criação de criativos", RelatorioDiario.criacao_criativos),
+    ("Identidade visual", RelatorioDiario.identidade_visual),
+    ("Outras atividades", RelatorioDiario.outras_atividades),
+    ("Valor investido", RelatorioDiario.valor_investido),
+    ("Leads", RelatorioDiario.leads),
+    ("Custo por lead", RelatorioDiario.custo_por_lead),
+    ("Registros", RelatorioDiario.registros),
+    ("Custo por registro", RelatorioDiario.custo_por_registro),
+    ("Depósito", RelatorioDiario.deposito),
+    ("FTD", RelatorioDiario.ftd),
+    ("Custo por FTD", RelatorioDiario.custo_por_ftd),
+    ("Valor FTD", RelatorioDiario.valor_ftd),
+    ("CPA", RelatorioDiario.cpa),
+    ("Comissão CPA", RelatorioDiario.comissao_cpa),
+    ("Revshare", RelatorioDiario.revshare),
+    ("Total comissão do dia", RelatorioDiario.total_comissao_dia),
+    ("Observações", RelatorioDiario.observacoes),
+    ("Criado em", RelatorioDiario.created_at),
+]
+
+
+@router.get("/projeto/{projeto_id}/exportar")
+def exportar_relatorios_projeto(
+    projeto_id: uuid.UUID,
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    separador: str = Query(",", pattern="^[,;]$", description="Separador do CSV"),
+    data_inicio: Optional[date] = Query(None),
+    data_fim: Optional[date] = Query(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Exportar os relatórios do projeto (mesmos filtros da listagem) em CSV ou XLSX, em streaming"""
+    filtro = FiltroRelatorio(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        projeto_id=projeto_id
+    )
+    return resposta_exportacao(
+        lambda s: RelatorioDiarioService(s).query_relatorios(projeto_id, filtro),
+        COLUNAS_EXPORTACAO,
+        formato,
+        "relatorios-diarios",
+        separador
+    )
+
+
 @router.put("/{relatorio_id}", response_model=RelatorioDiarioResponse)
 def update_relatorio(
     relatorio_id: uuid.UUID,
@@ -126,6 +177,7 @@ def delete_relatorio(
 
 
 @router.get("/projeto/{projeto_id}/estatisticas", response_model=EstatisticasRelatorio)
+@cache_resposta(ttl=60, tags=(RelatorioDiario,), por_usuario=False)
 def get_estatisticas_projeto(
     projeto_id: uuid.UUID,
     data_inicio: Optional[date] = Query(None),
@@ -166,6 +218,7 @@ def get_relatorios_periodo(
 
 
 @router.get("/projeto/{projeto_id}/ultimos", response_model=List[RelatorioDiarioResponse])
+@cache_resposta(ttl=60, tags=(RelatorioDiario,), por_usuario=False)
 def get_ultimos_relatorios(
     projeto_id: uuid.UUID,
     limit: int = Query(7, ge=1, le=30, description="Número de relatórios a retornar"),
@@ -195,6 +248,7 @@ def check_relatorio_data(
 
 
 @router.get("/dashboard/consolidado", response_model=dict)
+@cache_resposta(ttl=60, tags=(RelatorioDiario,), vary_params=("data_inicio", "data_fim", "projeto_id"), por_usuario=False)
 def get_dashboard_consolidado(
     data_inicio: Optional[date] = Query(None),
     data_fim: Optional[date] = Query(None),
@@ -204,4 +258,26 @@ def get_dashboard_consolidado(
 ):
     """Obter dados consolidados de todos os relatórios para o dashboard"""
     service = RelatorioDiarioService(db)
-    return service.get_dashboard_consolidado(data_inicio, data_fim, projeto_id) 
\ No newline at end of file
+    return service.get_dashboard_consolidado(data_inicio, data_fim, projeto_id)
+
+
+@router.get("/dashboard/metricas", response_model=List[MetricasGrupo])
+@cache_resposta(ttl=60, tags=(RelatorioDiario,), vary_params=("agrupar_por", "data_inicio", "data_fim", "projeto_id"), por_usuario=False)
+def get_metricas_agrupadas(
+    agrupar_por: str = Query("projeto", pattern="^(projeto|mes)$", description="projeto ou mes (AAAA-MM)"),
+    data_inicio: Optional[date] = Query(None),
+    data_fim: Optional[date] = Query(None),
+    projeto_id: Optional[uuid.UUID] = Query(None, description="ID do projeto específico para filtrar"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Totais e custos médios ponderados (custo por lead/registro/FTD) por projeto ou por mês"""
+    service = RelatorioDiarioService(db)
+    
+    filtro = FiltroRelatorio(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        projeto_id=projeto_id
+    )
+    
+    return service.get_metricas_agrupadas(agrupar_por, filtro)
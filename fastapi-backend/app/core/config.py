@@ -1,8 +1,11 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional, List, ClassVar
 from pydantic import Field
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -21,6 +24,7 @@ class Settings(BaseSettings):
     
     # Database - será sobrescrito abaixo se existir no ambiente
     database_url: str = Field(default="sqlite:///./squad.db", alias="DATABASE_URL")
+    database_connect_timeout: int = Field(default=10, alias="DATABASE_CONNECT_TIMEOUT")  # segundos (PostgreSQL)
     
     # JWT
     jwt_secret_key: str = Field(default="your-super-secret-jwt-key", alias="JWT_SECRET_KEY")
@@ -44,6 +48,69 @@ class Settings(BaseSettings):
     minio_secret_key: str = Field(default="NFVv61Z0ZhKXbRhZSIPHo1wZa9FEcvFGZsUsPCsn", alias="MINIO_SECRET_KEY")
     minio_bucket_name: str = Field(default="squad", alias="MINIO_BUCKET_NAME")
     minio_use_ssl: bool = Field(default=True, alias="MINIO_USE_SSL")
+    minio_region: str = Field(default="", alias="MINIO_REGION")  # vazio = descoberta pelo cliente (1 chamada extra)
+    minio_timeout_conexao: float = Field(default=5.0, alias="MINIO_TIMEOUT_CONEXAO")  # segundos
+    minio_timeout_leitura: float = Field(default=60.0, alias="MINIO_TIMEOUT_LEITURA")  # segundos
+    minio_retry_segundos: int = Field(default=30, alias="MINIO_RETRY_SEGUNDOS")  # espera após falha na inicialização
+
+    # Notificações
+    notificacao_fanout_sync_limit: int = Field(default=1000, alias="NOTIFICACAO_FANOUT_SYNC_LIMIT")
+    notificacao_fanout_chunk_size: int = Field(default=1000, alias="NOTIFICACAO_FANOUT_CHUNK_SIZE")
+    notificacao_count_cache: bool = Field(default=False, alias="NOTIFICACAO_COUNT_CACHE")  # cache por processo
+    notificacao_broker_url: str = Field(default="", alias="NOTIFICACAO_BROKER_URL")  # vazio = pela difusão entre workers (CACHE_INVALIDACAO_URL) ou, sem ela, em memória
+    notificacao_stream_heartbeat: int = Field(default=15, alias="NOTIFICACAO_STREAM_HEARTBEAT")  # segundos
+    notificacao_stream_buffer: int = Field(default=100, alias="NOTIFICACAO_STREAM_BUFFER")  # eventos por conexão
+    notificacao_retencao_dias: int = Field(default=90, alias="NOTIFICACAO_RETENCAO_DIAS")  # lidas mais antigas que isso
+    notificacao_retencao_modo: str = Field(default="archive", alias="NOTIFICACAO_RETENCAO_MODO")  # archive | delete
+    notificacao_retencao_lote: int = Field(default=500, alias="NOTIFICACAO_RETENCAO_LOTE")  # linhas por transação
+    notificacao_retencao_pausa: float = Field(default=0.1, alias="NOTIFICACAO_RETENCAO_PAUSA")  # segundos entre lotes
+    notificacao_retencao_intervalo_horas: int = Field(default=0, alias="NOTIFICACAO_RETENCAO_INTERVALO_HORAS")  # 0 = desligado
+
+    # Cache de respostas HTTP (rotas com @cache_resposta)
+    response_cache_enabled: bool = Field(default=True, alias="RESPONSE_CACHE_ENABLED")
+    response_cache_url: str = Field(default="", alias="RESPONSE_CACHE_URL")  # vazio = LRU em memória, redis://... entre workers
+    response_cache_max_mb: int = Field(default=64, alias="RESPONSE_CACHE_MAX_MB")  # teto do LRU em memória
+    response_cache_max_entry_kb: int = Field(default=1024, alias="RESPONSE_CACHE_MAX_ENTRY_KB")  # respostas maiores não são guardadas
+
+    # Invalidação dos caches por processo entre workers (gunicorn com vários workers)
+    cache_invalidacao_url: str = Field(default="", alias="CACHE_INVALIDACAO_URL")  # vazio = um processo só; postgres = LISTEN/NOTIFY no DATABASE_URL; redis://...
+
+    # Compressão de respostas (gzip/brotli)
+    compressao_enabled: bool = Field(default=True, alias="COMPRESSAO_ENABLED")
+    compressao_min_bytes: int = Field(default=1024, alias="COMPRESSAO_MIN_BYTES")  # respostas menores saem sem compressão
+    compressao_nivel_gzip: int = Field(default=6, alias="COMPRESSAO_NIVEL_GZIP")  # 1-9
+    compressao_nivel_brotli: int = Field(default=4, alias="COMPRESSAO_NIVEL_BROTLI")  # 0-11; acima de ~5 fica caro para respostas dinâmicas
+
+    # Métricas Prometheus (/metrics)
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    metrics_token: str = Field(default="", alias="METRICS_TOKEN")  # vazio = /metrics sem autenticação
+
+    # Instrumentação SQL por requisição (contagem de consultas, N+1)
+    sql_instrumentacao_enabled: bool = Field(default=True, alias="SQL_INSTRUMENTACAO_ENABLED")
+    sql_server_timing: Optional[bool] = Field(default=None, alias="SQL_SERVER_TIMING")  # vazio = só em development
+    sql_max_consultas: int = Field(default=30, alias="SQL_MAX_CONSULTAS")  # acima disso loga aviso
+    sql_max_tempo_ms: int = Field(default=500, alias="SQL_MAX_TEMPO_MS")  # tempo total de banco por requisição
+    sql_n_mais_1_limite: int = Field(default=10, alias="SQL_N_MAIS_1_LIMITE")  # repetições da mesma instrução
+
+    # Inicialização e readiness (/ready)
+    schema_no_startup: Optional[bool] = Field(default=None, alias="SCHEMA_NO_STARTUP")  # vazio = só em development; em produção rodar preparar_banco.py antes do deploy
+    readiness_dependencias: str = Field(default="banco", alias="READINESS_DEPENDENCIAS")  # o /ready só responde 200 com estas aquecidas (+ schema com SCHEMA_NO_STARTUP); as demais aparecem como degradadas
+
+    # Fila de jobs (tabela jobs, executada por python worker.py)
+    jobs_worker_no_processo: Optional[bool] = Field(default=None, alias="JOBS_WORKER_NO_PROCESSO")  # vazio = só em development; em produção usar o processo worker do Procfile
+    jobs_concorrencia: int = Field(default=2, alias="JOBS_CONCORRENCIA")  # jobs simultâneos por worker
+    jobs_intervalo_polling: float = Field(default=1.0, alias="JOBS_INTERVALO_POLLING")  # segundos sem job antes de consultar de novo
+    jobs_lease_segundos: int = Field(default=300, alias="JOBS_LEASE_SEGUNDOS")  # sem progresso nesse tempo, o job volta para a fila
+    jobs_backoff_base: int = Field(default=10, alias="JOBS_BACKOFF_BASE")  # segundos; dobra a cada tentativa
+    jobs_backoff_max: int = Field(default=3600, alias="JOBS_BACKOFF_MAX")
+    jobs_retencao_dias: int = Field(default=7, alias="JOBS_RETENCAO_DIAS")  # jobs finalizados mais antigos são removidos
+
+    # Relatórios mensais de projeto (gerados pela fila de jobs, guardados no MinIO)
+    relatorio_mensal_pasta: str = Field(default="relatorios-mensais", alias="RELATORIO_MENSAL_PASTA")
+    relatorio_mensal_url_expiracao: int = Field(default=3600, alias="RELATORIO_MENSAL_URL_EXPIRACAO")  # segundos de validade do link de download
+
+    # Varredura de prazos das atividades (job atividades.atrasadas, a cada 15 minutos)
+    atividades_atraso_lote: int = Field(default=5000, alias="ATIVIDADES_ATRASO_LOTE")  # atividades marcadas como Atrasada por UPDATE/commit
 
 
 # Create global settings instance
@@ -57,9 +124,9 @@ if env_database_url:
         env_database_url = env_database_url[1:].strip()
     # Forçar uso da variável de ambiente
     settings.database_url = env_database_url
-    print(f"🔧 DATABASE_URL lida do ambiente: {env_database_url[:30]}...")
+    logger.info("DATABASE_URL lida do ambiente")
 else:
-    print(f"⚠️  DATABASE_URL não encontrada no ambiente, usando: {settings.database_url}")
+    logger.warning("DATABASE_URL não encontrada no ambiente, usando o padrão da configuração")
 
 # Limpar DATABASE_URL se tiver '=' no início (correção para Railway)
 if settings.database_url and settings.database_url.startswith('='):
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+# (nome, mínimo, máximo) dos cinco campos: minuto hora dia mês dia-da-semana
+_CAMPOS: Tuple[Tuple[str, int, int], ...] = (
+    ("minuto", 0, 59),
+    ("hora", 0, 23),
+    ("dia", 1, 31),
+    ("mes", 1, 12),
+    ("dia_semana", 0, 6),
+)
+
+_ATALHOS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+
+def _valores_campo(expressao: str, minimo: int, maximo: int, nome: str) -> FrozenSet[int]:
+    valores = set()
+    for parte in expressao.split(","):
+        passo = 1
+        if "/" in parte:
+            parte, passo_texto = parte.split("/", 1)
+            passo = int(passo_texto)
+            if passo < 1:
+                raise ValueError(f"Passo inválido no campo {nome}: {passo_texto}")
+        if parte == "*":
+            inicio, fim = minimo, maximo
+        elif "-" in parte:
+            inicio, fim = (int(valor) for valor in parte.split("-", 1))
+        else:
+            inicio = int(parte)
+            fim = maximo if passo > 1 else inicio
+        # 7 também é domingo no dia-da-semana
+        limite = 7 if nome == "dia_semana" else maximo
+        if inicio < minimo or fim > limite or inicio > fim:
+            raise ValueError(f"Valor fora do intervalo no campo {nome}: {parte}")
+        valores.update(valor % 7 if nome == "dia_semana" else valor for valor in range(inicio, fim + 1, passo))
+    return frozenset(valores)
+
+
+class ExpressaoCron:
+    """Expressão cron de cinco campos (minuto hora dia mês dia-da-semana)
+
+    Aceita *, listas (1,15), intervalos (1-5), passos (*/10, 8-18/2) e os
+    atalhos @hourly, @daily, @weekly e @monthly. Como no cron, se dia e
+    dia-da-semana forem ambos restritos, basta um deles coincidir. Horários em
+    UTC (datetime ingênuo), como o resto da aplicação.
+    """
+
+    def __init__(self, expressao: str):
+        self.expressao = expressao.strip()
+        campos = _ATALHOS.get(self.expressao, self.expressao).split()
+        if len(campos) != 5:
+            raise ValueError(f"Expressão cron deve ter 5 campos: {expressao!r}")
+        self.minutos, self.horas, self.dias, self.meses, self.dias_semana = (
+            _valores_campo(campo, minimo, maximo, nome) for campo, (nome, minimo, maximo) in zip(campos, _CAMPOS)
+        )
+        self._dia_restrito = campos[2] != "*"
+        self._dia_semana_restrito = campos[4] != "*"
+
+    def _dia_coincide(self, momento: datetime) -> bool:
+        # datetime.weekday(): segunda = 0; no cron domingo = 0
+        dia_semana = (momento.weekday() + 1) % 7
+        if self._dia_restrito and self._dia_semana_restrito:
+            return momento.day in self.dias or dia_semana in self.dias_semana
+        return momento.day in self.dias and dia_semana in self.dias_semana
+
+    def proxima(self, apos: datetime) -> datetime:
+        """Primeiro horário depois de `apos` (exclusivo) que satisfaz a expressão"""
+        momento = apos.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=366 * 5)
+        while momento < limite:
+            if momento.month not in self.meses:
+                ano, mes = (momento.year + 1, 1) if momento.month == 12 else (momento.year, momento.month + 1)
+                momento = momento.replace(year=ano, month=mes, day=1, hour=0, minute=0)
+                continue
+            if not self._dia_coincide(momento):
+                momento = (momento + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if momento.hour not in self.horas:
+                momento = (momento + timedelta(hours=1)).replace(minute=0)
+                continue
+            if momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+                continue
+            return momento
+        raise ValueError(f"Expressão cron sem ocorrência nos próximos 5 anos: {self.expressao!r}")
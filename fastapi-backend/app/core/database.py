@@ -2,8 +2,12 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .instrumentacao_sql import instrumentar_engine
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # FORÇAR leitura DIRETA de DATABASE_URL do ambiente (Railway)
 # Ignora completamente settings.database_url se existir no ambiente
 env_db_url = os.getenv("DATABASE_URL")
@@ -12,16 +16,13 @@ if env_db_url:
     if env_db_url.startswith('='):
         env_db_url = env_db_url[1:].strip()
     database_url = env_db_url
-    print(f"✅ database.py: DATABASE_URL do ambiente Railway: {env_db_url.split('@')[0] if '@' in env_db_url else env_db_url[:50]}...")
-    print(f"   Tipo detectado: {'PostgreSQL' if 'postgresql' in database_url.lower() else 'SQLite'}")
 else:
     # Fallback: usar do settings
     database_url = settings.database_url.strip()
     # Remover '=' no início se existir
     if database_url.startswith('='):
         database_url = database_url[1:].strip()
-    print(f"⚠️  database.py: DATABASE_URL não encontrada no ambiente, usando fallback: {database_url[:50]}...")
-    print(f"   ⚠️  ATENÇÃO: Isso significa que a variável DATABASE_URL não está configurada no Railway!")
+    logger.warning("DATABASE_URL não encontrada no ambiente, usando o fallback da configuração")
 
 # Create database engine
 if database_url.startswith("sqlite"):
@@ -33,9 +34,15 @@ else:
     # PostgreSQL configuration
     engine = create_engine(
         database_url, 
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        # Falhar rápido com o banco inacessível em vez de segurar o startup/readiness
+        connect_args={"connect_timeout": settings.database_connect_timeout}
     )
 
+# Contagem de consultas por requisição e detecção de N+1 (ConsultasMiddleware)
+if settings.sql_instrumentacao_enabled:
+    instrumentar_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create declarative base
@@ -0,0 +1,239 @@
+from sqlalchemy.engine import make_url
+from typing import Any, Callable, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # Dependência opcional, só necessária com CACHE_INVALIDACAO_URL=redis://...
+    redis = None
+
+# Canal único (NOTIFY / pub-sub); o tipo da mensagem escolhe o tratador
+CANAL = "sistemaxi_invalidacao"
+
+
+class LocalBackend:
+    """Um processo só: não há para quem difundir"""
+
+    def publicar(self, mensagem: str):
+        pass
+
+    def parar(self):
+        pass
+
+
+class _BackendComEscuta:
+    """Thread de escuta com reconexão; ao reconectar, avisa que mensagens podem ter se perdido"""
+
+    def __init__(self, receber: Callable[[str], None], ressincronizar: Callable[[], None]):
+        self.receber = receber
+        self.ressincronizar = ressincronizar
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._escutar_sempre, name="difusao-invalidacao", daemon=True)
+        self._thread.start()
+
+    def _escutar_sempre(self):
+        conectou_antes = False
+        while not self._parar.is_set():
+            try:
+                self._escutar(conectou_antes)
+            except Exception as e:
+                if self._parar.is_set():
+                    return
+                logger.warning(f"Escuta de invalidações interrompida, reconectando: {e}")
+                time.sleep(1)
+            conectou_antes = True
+
+    def _escutar(self, reconexao: bool):
+        raise NotImplementedError
+
+    def parar(self):
+        self._parar.set()
+
+
+class PostgresBackend(_BackendComEscuta):
+    """LISTEN/NOTIFY no próprio PostgreSQL da aplicação (sem infraestrutura extra)
+
+    Uma conexão dedicada por processo escuta o canal; a publicação usa outra
+    conexão em autocommit, reaberta se cair.
+    """
+
+    def __init__(self, dsn: str, receber: Callable[[str], None], ressincronizar: Callable[[], None]):
+        self.dsn = dsn
+        self._conexao_publicacao = None
+        self._lock = threading.Lock()
+        super().__init__(receber, ressincronizar)
+
+    def _escutar(self, reconexao: bool):
+        import psycopg
+        with psycopg.connect(self.dsn, autocommit=True) as conexao:
+            conexao.execute(f"LISTEN {CANAL}")
+            if reconexao:
+                self.ressincronizar()
+            while not self._parar.is_set():
+                for notificacao in conexao.notifies(timeout=5.0):
+                    self.receber(notificacao.payload)
+
+    def publicar(self, mensagem: str):
+        import psycopg
+        with self._lock:
+            for tentativa in range(2):
+                try:
+                    if self._conexao_publicacao is None or self._conexao_publicacao.closed:
+                        self._conexao_publicacao = psycopg.connect(self.dsn, autocommit=True)
+                    self._conexao_publicacao.execute("SELECT pg_notify(%s, %s)", (CANAL, mensagem))
+                    return
+                except psycopg.OperationalError:
+                    self._conexao_publicacao = None
+                    if tentativa:
+                        raise
+
+
+class RedisBackend(_BackendComEscuta):
+    """Pub/sub do Redis entre os workers (de todos os containers)"""
+
+    def __init__(self, url: str, receber: Callable[[str], None], ressincronizar: Callable[[], None]):
+        self.client = redis.Redis.from_url(url)
+        super().__init__(receber, ressincronizar)
+
+    def _escutar(self, reconexao: bool):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CANAL)
+        if reconexao:
+            self.ressincronizar()
+        while not self._parar.is_set():
+            mensagem = pubsub.get_message(timeout=5.0)
+            if mensagem is not None:
+                self.receber(mensagem["data"].decode())
+
+    def publicar(self, mensagem: str):
+        self.client.publish(CANAL, mensagem)
+
+
+def _dsn_postgres(url: str) -> Optional[str]:
+    """URL do SQLAlchemy (postgresql+psycopg://...) no formato aceito pelo psycopg"""
+    try:
+        url_banco = make_url(url)
+    except Exception:
+        return None
+    if not url_banco.drivername.startswith("postgres"):
+        return None
+    return url_banco.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class DifusaoInvalidacao:
+    """Invalidação dos caches por processo entre os workers
+
+    Cada worker guarda seus caches em memória (sem estado compartilhado); uma
+    escrita invalida o cache local na hora e publica uma mensagem curta para os
+    demais processos, que invalidam a mesma chave. Tratadores recebem os dados
+    publicados, ou None para "invalidar tudo" (depois de uma reconexão, quando
+    mensagens podem ter se perdido).
+
+    CACHE_INVALIDACAO_URL: vazio = um processo só; "postgres" = LISTEN/NOTIFY no
+    DATABASE_URL; redis://... = pub/sub do Redis.
+    """
+
+    def __init__(self):
+        self._tratadores: Dict[str, List[Callable[[Any], None]]] = {}
+        self._backend = None
+        self._pid = None
+        self._origem = None
+        self._lock = threading.Lock()
+        self.publicadas = 0
+        self.recebidas = 0
+
+    def registrar(self, tipo: str, tratador: Callable[[Any], None]):
+        self._tratadores.setdefault(tipo, []).append(tratador)
+
+    @property
+    def backend(self):
+        # Criado sob demanda e refeito após um fork (gunicorn --preload): threads e
+        # conexões do processo mestre não existem no worker
+        if self._backend is None or self._pid != os.getpid():
+            with self._lock:
+                if self._backend is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._origem = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+                    self._backend = self._criar_backend()
+        return self._backend
+
+    def _criar_backend(self):
+        url = settings.cache_invalidacao_url
+        if not url:
+            return LocalBackend()
+        if url.startswith("redis"):
+            if redis is None:
+                logger.warning("Pacote redis não instalado, invalidação de caches só local")
+                return LocalBackend()
+            return RedisBackend(url, self._receber, self._ressincronizar)
+        try:
+            # Importado só aqui: são ~140ms de importação que só valem com PostgreSQL
+            import psycopg  # noqa: F401
+        except ImportError:
+            psycopg = None
+        dsn = _dsn_postgres(settings.database_url if url == "postgres" else url)
+        if dsn is None or psycopg is None:
+            logger.warning("CACHE_INVALIDACAO_URL=postgres exige PostgreSQL e psycopg; invalidação de caches só local")
+            return LocalBackend()
+        return PostgresBackend(dsn, self._receber, self._ressincronizar)
+
+    def iniciar(self):
+        """Abrir a escuta no startup do worker (sem esperar a primeira publicação)"""
+        self.backend
+
+    def publicar(self, tipo: str, dados: Any = None):
+        """Avisar os outros processos; o processo atual já invalidou o seu cache"""
+        backend = self.backend
+        if isinstance(backend, LocalBackend):
+            return
+        try:
+            backend.publicar(json.dumps({"origem": self._origem, "tipo": tipo, "dados": dados}, default=str))
+            self.publicadas += 1
+        except Exception as e:
+            logger.error(f"Erro ao difundir invalidação '{tipo}': {e}")
+
+    def _receber(self, mensagem: str):
+        try:
+            dados = json.loads(mensagem)
+        except ValueError:
+            return
+        if dados.get("origem") == self._origem:
+            return
+        self.recebidas += 1
+        self._despachar(dados.get("tipo"), dados.get("dados"))
+
+    def _ressincronizar(self):
+        logger.info("Escuta de invalidações reconectada; descartando os caches locais")
+        for tipo in self._tratadores:
+            self._despachar(tipo, None)
+
+    def _despachar(self, tipo: str, dados: Any):
+        for tratador in self._tratadores.get(tipo, ()):
+            try:
+                tratador(dados)
+            except Exception as e:
+                logger.error(f"Erro ao aplicar invalidação '{tipo}': {e}")
+
+    def parar(self):
+        if self._backend is not None and self._pid == os.getpid():
+            self._backend.parar()
+
+    def metricas(self) -> dict:
+        backend = self._backend if self._pid == os.getpid() else None
+        return {
+            "backend": type(backend).__name__ if backend is not None else None,
+            "publicadas": self.publicadas,
+            "recebidas": self.recebidas,
+        }
+
+
+difusao = DifusaoInvalidacao()
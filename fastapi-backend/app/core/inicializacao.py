@@ -0,0 +1,238 @@
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from .config import settings
+from .database import SessionLocal, create_tables, engine
+
+logger = logging.getLogger(__name__)
+
+
+def schema_no_startup() -> bool:
+    """SCHEMA_NO_STARTUP explícito ou, sem valor, apenas em development"""
+    if settings.schema_no_startup is not None:
+        return settings.schema_no_startup
+    return settings.environment == "development"
+
+
+def _etapa_tabelas():
+    # Registrar todos os modelos no metadata (fora do app.main nada mais os importa)
+    from .. import models  # noqa: F401
+    create_tables()
+
+
+def _etapa_revisoes():
+    """Revisões versionadas pendentes (migrations/NNN_*.py)"""
+    from .migracoes import aplicar_revisoes
+    aplicadas = aplicar_revisoes(engine)
+    if aplicadas:
+        logger.info(f"Revisões aplicadas: {', '.join(aplicadas)}")
+
+
+def _etapa_contadores_criativos():
+    """Popular contadores de status dos criativos na primeira execução"""
+    from ..models import Criativo, CriativoStatusCounter
+    from ..services.criativo_service import CriativoService
+    db = SessionLocal()
+    try:
+        if db.query(CriativoStatusCounter).first() is None and db.query(Criativo).first() is not None:
+            total = CriativoService(db).rebuild_status_counters()
+            logger.info(f"Contadores de criativos recalculados ({total} linhas)")
+    finally:
+        db.close()
+
+
+def _etapa_indice_busca():
+    """Índice de busca textual (tsvector/GIN ou FTS5) e carga inicial"""
+    from ..models import SearchDocument
+    from ..services.search_service import SearchService
+    backend = SearchService.preparar_indice(engine)
+    db = SessionLocal()
+    try:
+        if db.query(SearchDocument).first() is None:
+            total = SearchService.reindexar(db)
+            logger.info(f"Índice de busca populado ({total} documentos, {backend})")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _etapa_indices_clientes():
+    """Busca aproximada de clientes (pg_trgm no PostgreSQL)"""
+    from ..services.cliente_similaridade_service import ClienteSimilaridadeService
+    ClienteSimilaridadeService.preparar_indices(engine)
+
+
+def _etapa_admin_padrao():
+    """Garantir um admin padrão num banco vazio (não popula dados de negócio)"""
+    from ..models import User
+    from .security import get_password_hash
+    db = SessionLocal()
+    try:
+        if db.query(User).first() is None:
+            db.add(User(
+                name="Admin",
+                username="admin",
+                email="admin@sistemaxi.com",
+                hashed_password=get_password_hash("admin1234"),
+                is_active=True,
+                is_admin=True,
+            ))
+            db.commit()
+            logger.info("Usuário admin padrão criado (admin@sistemaxi.com / admin1234)")
+    finally:
+        db.close()
+
+
+ETAPAS_BANCO = [
+    ("tabelas", _etapa_tabelas),
+    ("revisoes", _etapa_revisoes),
+    ("contadores_criativos", _etapa_contadores_criativos),
+    ("indice_busca", _etapa_indice_busca),
+    ("indices_clientes", _etapa_indices_clientes),
+    ("admin_padrao", _etapa_admin_padrao),
+]
+
+
+def preparar_banco() -> Dict[str, Optional[str]]:
+    """Criar/verificar o schema e os dados derivados (etapa de migração)
+
+    Executado por preparar_banco.py antes do deploy e, em development, no
+    aquecimento do startup. Cada etapa é independente: a falha de uma é
+    registrada e as seguintes continuam. Devolve etapa -> erro (None se ok).
+    """
+    resultado = {}
+    for nome, etapa in ETAPAS_BANCO:
+        inicio = time.perf_counter()
+        try:
+            etapa()
+            resultado[nome] = None
+            logger.info(f"Etapa '{nome}' concluída em {(time.perf_counter() - inicio) * 1000:.0f}ms")
+        except Exception as e:
+            resultado[nome] = str(e)
+            logger.warning(f"Falha na etapa '{nome}': {e}")
+    return resultado
+
+
+class EstadoProntidao:
+    """Estado das dependências aquecidas em segundo plano, lido pelo /ready
+
+    O /ready responde 200 com as `obrigatorias` prontas (READINESS_DEPENDENCIAS,
+    mais o schema quando ele é preparado no startup). As demais dependências
+    aquecidas que ainda não estão prontas aparecem como degradadas no corpo.
+    """
+
+    def __init__(self):
+        self.obrigatorias = [nome.strip() for nome in settings.readiness_dependencias.split(",") if nome.strip()]
+        # Com SCHEMA_NO_STARTUP o schema é preparado em segundo plano: antes dele
+        # terminar as tabelas podem nem existir
+        if schema_no_startup() and "schema" not in self.obrigatorias:
+            self.obrigatorias.append("schema")
+        self.monitoradas = set(self.obrigatorias) | {"banco", "minio"}
+        self.dependencias: Dict[str, dict] = {}
+        self.inicio = time.perf_counter()
+        self.pronto_em: Optional[float] = None
+
+    def registrar(self, nome: str, pronto: bool, duracao: float, erro: Optional[str] = None):
+        self.dependencias[nome] = {"pronto": pronto, "ms": round(duracao * 1000, 1), "erro": erro}
+        if self.pronto and self.pronto_em is None:
+            self.pronto_em = time.perf_counter() - self.inicio
+            logger.info(f"Aplicação pronta em {self.pronto_em * 1000:.0f}ms após o startup")
+
+    @property
+    def pronto(self) -> bool:
+        return all(self.dependencias.get(nome, {}).get("pronto") for nome in self.obrigatorias)
+
+    @property
+    def banco_pronto(self) -> bool:
+        """Banco acessível e, quando preparado no startup, schema criado"""
+        etapas = ("banco", "schema") if schema_no_startup() else ("banco",)
+        return all(self.dependencias.get(nome, {}).get("pronto") for nome in etapas)
+
+    @property
+    def degradadas(self) -> list:
+        """Dependências fora de READINESS_DEPENDENCIAS que ainda não aqueceram"""
+        return sorted(
+            nome for nome in self.monitoradas | set(self.dependencias)
+            if nome not in self.obrigatorias and not self.dependencias.get(nome, {}).get("pronto")
+        )
+
+    def resumo(self) -> dict:
+        degradadas = self.degradadas
+        if not self.pronto:
+            status = "starting"
+        else:
+            status = "degraded" if degradadas else "ready"
+        return {
+            "status": status,
+            "dependencias": {
+                nome: self.dependencias.get(nome, {"pronto": False, "ms": None, "erro": None})
+                for nome in sorted(self.monitoradas | set(self.dependencias))
+            },
+            "degradadas": degradadas,
+            "pronto_em_ms": round(self.pronto_em * 1000, 1) if self.pronto_em is not None else None,
+        }
+
+
+prontidao = EstadoProntidao()
+
+
+def _verificar_banco():
+    with engine.connect() as conexao:
+        conexao.execute(text("SELECT 1"))
+
+
+def _aquecer_minio():
+    from ..services.minio_service import minio_service
+    if not minio_service.aquecer():
+        raise RuntimeError("MinIO indisponível")
+
+
+async def _aquecer(nome: str, funcao: Callable, tentativas_ate: float, intervalo: float = 2.0):
+    """Executar `funcao` no threadpool até dar certo, com novas tentativas espaçadas"""
+    inicio = time.perf_counter()
+    while True:
+        try:
+            await run_in_threadpool(funcao)
+            prontidao.registrar(nome, True, time.perf_counter() - inicio)
+            return True
+        except Exception as e:
+            prontidao.registrar(nome, False, time.perf_counter() - inicio, str(e))
+            if time.perf_counter() - inicio > tentativas_ate:
+                logger.warning(f"Dependência '{nome}' não aqueceu: {e}")
+                return False
+            await asyncio.sleep(intervalo)
+            intervalo = min(intervalo * 2, 30.0)
+
+
+async def aquecer_dependencias():
+    """Aquecer banco e MinIO em paralelo, sem bloquear o início do servidor
+
+    O banco é tentado por até 5 minutos (o Postgres do Railway pode subir junto
+    com a aplicação); o schema só roda aqui com SCHEMA_NO_STARTUP. O MinIO segue
+    tentando indefinidamente em segundo plano (a própria MinioService espaça as
+    tentativas), e o /ready só responde 200 quando todas as dependências de
+    READINESS_DEPENDENCIAS (e o schema, quando preparado aqui) estiverem
+    prontas; o MinIO fora da lista aparece como degradado.
+    """
+    # Com gunicorn --preload o módulo foi importado no mestre, antes do fork:
+    # o tempo até ficar pronto conta a partir do startup deste worker
+    prontidao.inicio = time.perf_counter()
+
+    async def banco():
+        if await _aquecer("banco", _verificar_banco, tentativas_ate=300):
+            if schema_no_startup():
+                inicio = time.perf_counter()
+                erros = await run_in_threadpool(preparar_banco)
+                falhas = {nome: erro for nome, erro in erros.items() if erro}
+                prontidao.registrar(
+                    "schema", not falhas, time.perf_counter() - inicio,
+                    "; ".join(f"{nome}: {erro}" for nome, erro in falhas.items()) or None
+                )
+
+    await asyncio.gather(banco(), _aquecer("minio", _aquecer_minio, tentativas_ate=float("inf")))
@@ -0,0 +1,135 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from typing import Dict, Iterator, List, Optional
+import re
+import threading
+import time
+
+# Listas de parâmetros expandidas (IN (?, ?, ?)) e literais variam entre execuções
+# da mesma consulta; o formato normalizado identifica o "shape" da instrução.
+_LISTA_PARAMETROS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+))*\s*\)")
+_NUMEROS = re.compile(r"\b\d+\b")
+_ESPACOS = re.compile(r"\s+")
+_MAX_FORMATOS_EM_CACHE = 5000
+
+_formatos: Dict[str, str] = {}
+
+
+def formato_consulta(instrucao: str) -> str:
+    """Shape da instrução SQL: listas IN colapsadas, números e espaços normalizados"""
+    formato = _formatos.get(instrucao)
+    if formato is None:
+        formato = _LISTA_PARAMETROS.sub("(?)", instrucao)
+        formato = _NUMEROS.sub("N", formato)
+        formato = _ESPACOS.sub(" ", formato).strip()
+        if len(_formatos) >= _MAX_FORMATOS_EM_CACHE:
+            _formatos.clear()
+        _formatos[instrucao] = formato
+    return formato
+
+
+class EstatisticasConsultas:
+    """Consultas executadas num escopo (uma requisição ou um bloco de teste)"""
+
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0
+        self.formatos: Dict[str, int] = {}
+
+    def registrar(self, instrucao: str, duracao: float):
+        self.total += 1
+        self.tempo += duracao
+        formato = formato_consulta(instrucao)
+        self.formatos[formato] = self.formatos.get(formato, 0) + 1
+
+    def repetidas(self, minimo: int) -> List[tuple]:
+        """(formato, vezes) das instruções executadas pelo menos `minimo` vezes"""
+        return sorted(
+            ((formato, vezes) for formato, vezes in self.formatos.items() if vezes >= minimo),
+            key=lambda item: -item[1]
+        )
+
+    def resumo(self, limite: int = 5) -> str:
+        linhas = [f"{self.total} consultas em {self.tempo * 1000:.1f}ms"]
+        for formato, vezes in self.repetidas(2)[:limite]:
+            linhas.append(f"  {vezes}x {formato[:200]}")
+        return "\n".join(linhas)
+
+
+# Estatísticas da requisição atual. Os endpoints síncronos rodam no threadpool com
+# uma cópia do contexto, que referencia o mesmo objeto mutável.
+estatisticas_requisicao: ContextVar[Optional[EstatisticasConsultas]] = ContextVar(
+    "estatisticas_requisicao", default=None
+)
+
+# Observadores globais (contar_consultas), independentes do contexto: o TestClient
+# executa a aplicação em outra thread, fora do contexto do teste
+_observadores: List[EstatisticasConsultas] = []
+_lock_observadores = threading.Lock()
+
+
+def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("instrumentacao_inicio", []).append(time.perf_counter())
+
+
+def _apos_execucao(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("instrumentacao_inicio")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    estatisticas = estatisticas_requisicao.get()
+    if estatisticas is not None:
+        estatisticas.registrar(statement, duracao)
+    if _observadores:
+        with _lock_observadores:
+            for observador in _observadores:
+                observador.registrar(statement, duracao)
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registrar os hooks de cursor no engine (idempotente)"""
+    if not event.contains(engine, "before_cursor_execute", _antes_execucao):
+        event.listen(engine, "before_cursor_execute", _antes_execucao)
+        event.listen(engine, "after_cursor_execute", _apos_execucao)
+
+
+@contextmanager
+def contar_consultas() -> Iterator[EstatisticasConsultas]:
+    """Contar todas as consultas executadas dentro do bloco (em qualquer thread)
+
+        with contar_consultas() as consultas:
+            client.get("/api/atividades?include=projeto", headers=headers)
+        print(consultas.resumo())
+    """
+    estatisticas = EstatisticasConsultas()
+    with _lock_observadores:
+        _observadores.append(estatisticas)
+    try:
+        yield estatisticas
+    finally:
+        with _lock_observadores:
+            _observadores.remove(estatisticas)
+
+
+@contextmanager
+def assert_max_consultas(maximo: int, max_repeticoes: Optional[int] = None) -> Iterator[EstatisticasConsultas]:
+    """Helper de teste: falha se o bloco executar mais de `maximo` consultas
+
+    max_repeticoes também limita quantas vezes a mesma instrução pode se repetir
+    (N+1). Uso em pytest:
+
+        def test_lista_atividades_sem_n_mais_1(client, headers):
+            with assert_max_consultas(4, max_repeticoes=1):
+                client.get("/api/atividades?include=projeto,responsavel,setor", headers=headers)
+    """
+    with contar_consultas() as estatisticas:
+        yield estatisticas
+    if estatisticas.total > maximo:
+        raise AssertionError(f"Esperado no máximo {maximo} consultas, executadas {estatisticas.resumo()}")
+    if max_repeticoes is not None:
+        repetidas = estatisticas.repetidas(max_repeticoes + 1)
+        if repetidas:
+            formato, vezes = repetidas[0]
+            raise AssertionError(f"Instrução repetida {vezes}x (máximo {max_repeticoes}): {formato[:300]}")
@@ -0,0 +1,136 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence
+import threading
+import time
+
+# Métricas em processo no formato texto do Prometheus. Implementação própria e
+# mínima (sem prometheus_client): cada observação é um lookup de dict e um
+# incremento, para caber no orçamento de overhead por requisição. Com vários
+# workers cada processo expõe os seus valores; o Prometheus agrega por instância.
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_TAMANHO = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _rotulos(nomes: Sequence[str], valores: Sequence) -> str:
+    if not nomes:
+        return ""
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        texto = str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pares.append(f'{nome}="{texto}"')
+    return "{" + ",".join(pares) + "}"
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.valores: Dict[tuple, float] = {}
+
+    def inc(self, chave: tuple = (), valor: float = 1):
+        self.valores[chave] = self.valores.get(chave, 0) + valor
+
+    def linhas(self) -> Iterator[str]:
+        for chave, valor in list(self.valores.items()):
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {valor}"
+
+
+class Gauge(Contador):
+    tipo = "gauge"
+
+    def set(self, chave: tuple, valor: float):
+        self.valores[chave] = valor
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.buckets = tuple(buckets)
+        # chave -> [contagem por bucket (não cumulativa, +Inf no fim), soma]
+        self.valores: Dict[tuple, list] = {}
+
+    def observar(self, chave: tuple, valor: float):
+        serie = self.valores.get(chave)
+        if serie is None:
+            serie = self.valores[chave] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def linhas(self) -> Iterator[str]:
+        nomes_le = self.rotulos + ("le",)
+        for chave, (contagens, soma) in list(self.valores.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + ("+Inf",), contagens):
+                acumulado += contagem
+                yield f"{self.nome}_bucket{_rotulos(nomes_le, chave + (limite,))} {acumulado}"
+            yield f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {soma}"
+            yield f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}"
+
+
+class RegistroMetricas:
+    """Métricas registradas + coletores chamados na hora da coleta (pool, cache...)"""
+
+    def __init__(self):
+        self.metricas: List = []
+        self.coletores: List[Callable[[], List]] = []
+
+    def registrar(self, metrica):
+        self.metricas.append(metrica)
+        return metrica
+
+    def coletor(self, funcao: Callable[[], List]):
+        """Função que devolve métricas já preenchidas, executada a cada /metrics"""
+        self.coletores.append(funcao)
+        return funcao
+
+    def texto(self) -> str:
+        metricas = list(self.metricas)
+        for coletor in self.coletores:
+            try:
+                metricas.extend(coletor())
+            except Exception:
+                continue
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.linhas())
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+# Chamadas a serviços externos (MinIO), feitas a partir de threads do threadpool
+_lock_externos = threading.Lock()
+chamadas_externas = registro.registrar(Contador(
+    "external_calls_total", "Chamadas a serviços externos", ("servico", "operacao", "resultado")
+))
+duracao_externas = registro.registrar(Histograma(
+    "external_call_duration_seconds", "Duração das chamadas a serviços externos", ("servico", "operacao")
+))
+
+
+@contextmanager
+def medir_chamada(servico: str, operacao: str):
+    """Contar e cronometrar uma chamada externa: with medir_chamada("minio", "put_object"): ..."""
+    inicio = time.perf_counter()
+    resultado = "ok"
+    try:
+        yield
+    except Exception:
+        resultado = "erro"
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        with _lock_externos:
+            chamadas_externas.inc((servico, operacao, resultado))
+            duracao_externas.observar((servico, operacao), duracao)
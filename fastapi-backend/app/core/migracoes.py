@@ -0,0 +1,168 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, select, text
+from sqlalchemy.engine import Connection, Engine
+from typing import Dict, List, Optional, Sequence, Tuple
+import importlib.util
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Revisões versionadas em fastapi-backend/migrations/NNN_nome.py. Só entram os
+# módulos que definem REVISAO (os scripts antigos da pasta são ignorados). Cada
+# revisão expõe DESCRICAO e upgrade(ctx) e deve ser idempotente: se falhar no
+# meio, a próxima execução repete a revisão inteira.
+PASTA_REVISOES = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "migrations")
+_ARQUIVO_REVISAO = re.compile(r"^(\d{3,})_\w+\.py$")
+
+# Chave do advisory lock do PostgreSQL: dois deploys simultâneos não aplicam a
+# mesma revisão em paralelo
+_CHAVE_LOCK = 4_204_201
+
+_metadata = MetaData()
+schema_revisoes = Table(
+    "schema_revisoes", _metadata,
+    Column("revisao", String(32), primary_key=True),
+    Column("descricao", String(255), nullable=False),
+    Column("aplicada_em", DateTime, nullable=False),
+    Column("duracao_ms", Integer, nullable=False),
+)
+
+
+class Indice:
+    """Índice criado por uma revisão, com uma consulta que deve usá-lo (EXPLAIN)"""
+
+    def __init__(self, nome: str, tabela: str, colunas: Sequence[str], verificacao: Optional[str] = None, unico: bool = False):
+        self.nome = nome
+        self.tabela = tabela
+        self.colunas = tuple(colunas)
+        self.verificacao = verificacao
+        self.unico = unico
+
+
+class ContextoMigracao:
+    """Conexão em autocommit passada ao upgrade() das revisões"""
+
+    def __init__(self, conexao: Connection):
+        self.conexao = conexao
+        self.dialeto = conexao.dialect.name
+
+    def executar(self, sql: str, **parametros):
+        return self.conexao.execute(text(sql), parametros)
+
+    def criar_indice(self, indice: Indice):
+        """CREATE INDEX idempotente; no PostgreSQL, CONCURRENTLY (sem travar escritas)
+
+        Um CREATE INDEX CONCURRENTLY interrompido deixa o índice marcado como
+        inválido; nesse caso ele é removido e criado de novo.
+        """
+        unico = "UNIQUE " if indice.unico else ""
+        colunas = ", ".join(f'"{coluna}"' for coluna in indice.colunas)
+        if self.dialeto == "postgresql":
+            valido = self.executar(
+                "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :nome",
+                nome=indice.nome
+            ).scalar()
+            if valido is False:
+                logger.warning(f"Índice {indice.nome} inválido (criação interrompida); recriando")
+                self.executar(f'DROP INDEX CONCURRENTLY IF EXISTS "{indice.nome}"')
+            self.executar(f'CREATE {unico}INDEX CONCURRENTLY IF NOT EXISTS "{indice.nome}" ON "{indice.tabela}" ({colunas})')
+        else:
+            self.executar(f'CREATE {unico}INDEX IF NOT EXISTS "{indice.nome}" ON "{indice.tabela}" ({colunas})')
+
+
+class Revisao:
+    def __init__(self, revisao: str, descricao: str, modulo):
+        self.revisao = revisao
+        self.descricao = descricao
+        self.modulo = modulo
+
+    @property
+    def indices(self) -> List[Indice]:
+        return list(getattr(self.modulo, "INDICES", []))
+
+
+def revisoes_disponiveis(pasta: str = PASTA_REVISOES) -> List[Revisao]:
+    """Revisões da pasta migrations/, em ordem numérica"""
+    revisoes = []
+    for arquivo in sorted(os.listdir(pasta), key=lambda nome: (len(nome.split("_")[0]), nome)):
+        if not _ARQUIVO_REVISAO.match(arquivo):
+            continue
+        spec = importlib.util.spec_from_file_location(f"migrations.{arquivo[:-3]}", os.path.join(pasta, arquivo))
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+        if hasattr(modulo, "REVISAO"):
+            revisoes.append(Revisao(str(modulo.REVISAO), getattr(modulo, "DESCRICAO", arquivo), modulo))
+    return revisoes
+
+
+def revisoes_aplicadas(engine: Engine) -> Dict[str, datetime]:
+    _metadata.create_all(engine, checkfirst=True)
+    with engine.connect() as conexao:
+        return {linha.revisao: linha.aplicada_em for linha in conexao.execute(select(schema_revisoes))}
+
+
+def aplicar_revisoes(engine: Engine, ate: Optional[str] = None, simular: bool = False) -> List[str]:
+    """Aplicar as revisões pendentes (até `ate`, inclusive) e registrá-las
+
+    simular=True só lista o que seria aplicado. Devolve as revisões aplicadas.
+    """
+    _metadata.create_all(engine, checkfirst=True)
+    pendentes = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+        postgres = conexao.dialect.name == "postgresql"
+        if postgres and not simular:
+            conexao.execute(text("SELECT pg_advisory_lock(:chave)"), {"chave": _CHAVE_LOCK})
+        try:
+            aplicadas = {linha.revisao for linha in conexao.execute(select(schema_revisoes.c.revisao))}
+            for revisao in revisoes_disponiveis():
+                if ate is not None and int(revisao.revisao) > int(ate):
+                    break
+                if revisao.revisao in aplicadas:
+                    continue
+                pendentes.append(revisao.revisao)
+                if simular:
+                    continue
+                logger.info(f"Aplicando revisão {revisao.revisao}: {revisao.descricao}")
+                inicio = time.perf_counter()
+                revisao.modulo.upgrade(ContextoMigracao(conexao))
+                conexao.execute(schema_revisoes.insert().values(
+                    revisao=revisao.revisao,
+                    descricao=revisao.descricao[:255],
+                    aplicada_em=datetime.utcnow(),
+                    duracao_ms=int((time.perf_counter() - inicio) * 1000),
+                ))
+        finally:
+            if postgres and not simular:
+                conexao.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": _CHAVE_LOCK})
+    return pendentes
+
+
+def plano(conexao: Connection, sql: str) -> str:
+    """Texto do plano de execução (EXPLAIN no PostgreSQL, EXPLAIN QUERY PLAN no SQLite)"""
+    if conexao.dialect.name == "postgresql":
+        return "\n".join(linha[0] for linha in conexao.execute(text(f"EXPLAIN {sql}")))
+    return "\n".join(str(linha[-1]) for linha in conexao.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def verificar_indices(engine: Engine, revisoes: Optional[List[Revisao]] = None) -> List[Tuple[Indice, bool, str]]:
+    """Rodar EXPLAIN na consulta de verificação de cada índice e conferir se ele é usado
+
+    No PostgreSQL, com enable_seqscan desligado na transação: em tabelas pequenas
+    o planejador prefere a varredura sequencial mesmo com o índice certo, e o que
+    interessa aqui é que o índice sirva para a consulta.
+    """
+    resultados = []
+    with engine.connect() as conexao:
+        if conexao.dialect.name == "postgresql":
+            conexao.execute(text("SET LOCAL enable_seqscan = off"))
+        for revisao in revisoes if revisoes is not None else revisoes_disponiveis():
+            for indice in revisao.indices:
+                if not indice.verificacao:
+                    continue
+                texto = plano(conexao, indice.verificacao)
+                resultados.append((indice, indice.nome in texto, texto))
+        conexao.rollback()
+    return resultados
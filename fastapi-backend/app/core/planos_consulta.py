@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import time
+
+from .instrumentacao_sql import formato_consulta
+
+# Consultas representativas dos services, registradas com @consulta_representativa
+# e executadas pelo verificar_planos.py contra um banco populado
+CONSULTAS_REPRESENTATIVAS: List["ConsultaRepresentativa"] = []
+
+
+class ConsultaRepresentativa:
+    """Chamada real de um service cujas instruções SQL têm o plano verificado
+
+    `executar(db, contexto)` chama o service; todas as instruções que ele emitir
+    são capturadas e passam pelo EXPLAIN. `permitir_varredura` lista as tabelas
+    em que a varredura sequencial é esperada (agregações sobre a tabela inteira).
+    `max_consultas` limita quantas instruções a chamada pode emitir: pega o N+1
+    de relacionamentos carregados linha a linha.
+    """
+
+    def __init__(self, servico: str, nome: str, executar: Callable, permitir_varredura: Sequence[str] = (),
+                 max_consultas: Optional[int] = None):
+        self.servico = servico
+        self.nome = nome
+        self.executar = executar
+        self.permitir_varredura = tuple(permitir_varredura)
+        self.max_consultas = max_consultas
+
+    @property
+    def chave(self) -> str:
+        return f"{self.servico}.{self.nome}"
+
+
+def consulta_representativa(servico: str, nome: str, permitir_varredura: Sequence[str] = (),
+                            max_consultas: Optional[int] = None):
+    """Registrar uma chamada de service no catálogo de planos verificados"""
+    def decorador(funcao: Callable) -> Callable:
+        CONSULTAS_REPRESENTATIVAS.append(ConsultaRepresentativa(servico, nome, funcao, permitir_varredura, max_consultas))
+        return funcao
+    return decorador
+
+
+@contextmanager
+def capturar_instrucoes(engine: Engine) -> Iterator[List[Tuple[str, Any]]]:
+    """Capturar (instrução, parâmetros do driver) dos SELECTs, UPDATEs e DELETEs executados no bloco
+
+    INSERTs ficam de fora: o plano não tem escolha de índice a verificar.
+    """
+    capturadas: List[Tuple[str, Any]] = []
+
+    def _antes_execucao(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+            capturadas.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _antes_execucao)
+    try:
+        yield capturadas
+    finally:
+        event.remove(engine, "before_cursor_execute", _antes_execucao)
+
+
+class PlanoConsulta:
+    """Plano de execução de uma instrução, reduzido ao que é comparado entre execuções"""
+
+    def __init__(self, instrucao: str, custo: Optional[float], varreduras: List[str], indices: List[str],
+                 texto: str, tempo_ms: Optional[float] = None):
+        self.instrucao = instrucao
+        self.custo = custo
+        self.varreduras = varreduras
+        self.indices = indices
+        self.texto = texto
+        self.tempo_ms = tempo_ms
+
+    @property
+    def formato(self) -> str:
+        """Hash do shape da instrução: muda quando o service passa a emitir outro SQL"""
+        return hashlib.sha1(formato_consulta(self.instrucao).encode()).hexdigest()[:12]
+
+    def para_json(self) -> dict:
+        return {
+            "formato": self.formato,
+            "custo": self.custo,
+            "varreduras": self.varreduras,
+            "indices": self.indices,
+            "tempo_ms": self.tempo_ms,
+            "instrucao": formato_consulta(self.instrucao)[:500],
+        }
+
+
+def _nos_postgres(no: dict) -> Iterator[dict]:
+    yield no
+    for filho in no.get("Plans", []):
+        yield from _nos_postgres(filho)
+
+
+def explicar(conexao: Connection, instrucao: str, parametros: Any = None, analisar: bool = False) -> PlanoConsulta:
+    """EXPLAIN de uma instrução capturada, com os mesmos parâmetros do driver
+
+    PostgreSQL: EXPLAIN (FORMAT JSON), com custo estimado do nó raiz e os nós
+    Seq Scan; analisar=True usa EXPLAIN ANALYZE (executa a consulta). SQLite:
+    EXPLAIN QUERY PLAN, sem custo; "SCAN tabela" sem índice é a varredura
+    completa, e analisar=True mede o tempo executando a instrução.
+    """
+    parametros = parametros if parametros is not None else ()
+    if conexao.dialect.name == "postgresql":
+        opcoes = "ANALYZE, BUFFERS, FORMAT JSON" if analisar else "FORMAT JSON"
+        resultado = conexao.exec_driver_sql(f"EXPLAIN ({opcoes}) {instrucao}", parametros).scalar()
+        documento = (json.loads(resultado) if isinstance(resultado, str) else resultado)[0]
+        raiz = documento["Plan"]
+        nos = list(_nos_postgres(raiz))
+        return PlanoConsulta(
+            instrucao,
+            custo=raiz.get("Total Cost"),
+            varreduras=sorted({no["Relation Name"] for no in nos if no.get("Node Type") == "Seq Scan"}),
+            indices=sorted({no["Index Name"] for no in nos if no.get("Index Name")}),
+            texto=json.dumps(raiz, indent=1),
+            tempo_ms=documento.get("Execution Time"),
+        )
+
+    linhas = conexao.exec_driver_sql(f"EXPLAIN QUERY PLAN {instrucao}", parametros).fetchall()
+    detalhes = [str(linha[-1]) for linha in linhas]
+    varreduras, indices = set(), set()
+    for detalhe in detalhes:
+        partes = detalhe.split()
+        if " USING " in detalhe and " INDEX " in detalhe:
+            indices.add(partes[partes.index("INDEX") + 1])
+        elif len(partes) >= 2 and partes[0] == "SCAN" and not partes[1].startswith("("):
+            varreduras.add(partes[1])
+    tempo_ms = None
+    if analisar:
+        inicio = time.perf_counter()
+        conexao.exec_driver_sql(instrucao, parametros).fetchall()
+        tempo_ms = round((time.perf_counter() - inicio) * 1000, 3)
+    return PlanoConsulta(instrucao, None, sorted(varreduras), sorted(indices), "\n".join(detalhes), tempo_ms)
+
+
+def tamanhos_tabelas(conexao: Connection) -> Dict[str, int]:
+    """Linhas por tabela: estimativa do planejador no PostgreSQL, COUNT(*) no SQLite"""
+    if conexao.dialect.name == "postgresql":
+        return {
+            nome: int(linhas)
+            for nome, linhas in conexao.execute(text(
+                "SELECT c.relname, c.reltuples FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relkind = 'r' AND n.nspname = current_schema()"
+            ))
+        }
+    return {
+        nome: conexao.execute(text(f'SELECT COUNT(*) FROM "{nome}"')).scalar()
+        for nome in inspect(conexao).get_table_names()
+    }
+
+
+def _tabela_da_varredura(nome: str, tamanhos: Dict[str, int]) -> str:
+    """No SQLite o plano mostra o alias (users_1); resolver para a tabela"""
+    if nome in tamanhos:
+        return nome
+    base, _, sufixo = nome.rpartition("_")
+    return base if sufixo.isdigit() and base in tamanhos else nome
+
+
+def problemas_plano(plano: PlanoConsulta, tamanhos: Dict[str, int], min_linhas: int,
+                    permitidas: Sequence[str] = ()) -> List[str]:
+    """Varreduras sequenciais em tabelas com pelo menos `min_linhas` linhas"""
+    problemas = []
+    for nome in plano.varreduras:
+        tabela = _tabela_da_varredura(nome, tamanhos)
+        linhas = tamanhos.get(tabela, 0)
+        if linhas >= min_linhas and tabela not in permitidas:
+            problemas.append(f"varredura sequencial em {tabela} ({linhas} linhas)")
+    return problemas
+
+
+def regressoes_plano(atual: dict, base: dict, tolerancia: float) -> List[str]:
+    """Piora do custo estimado além da tolerância e varreduras novas em relação à base"""
+    regressoes = []
+    if atual.get("custo") is not None and base.get("custo"):
+        variacao = atual["custo"] / base["custo"] - 1
+        if variacao > tolerancia:
+            regressoes.append(f"custo {base['custo']:.1f} -> {atual['custo']:.1f} ({variacao:+.0%})")
+    novas = sorted(set(atual.get("varreduras", [])) - set(base.get("varreduras", [])))
+    if novas:
+        regressoes.append(f"novas varreduras: {', '.join(novas)}")
+    perdidos = sorted(set(base.get("indices", [])) - set(atual.get("indices", [])))
+    if perdidos and novas:
+        regressoes.append(f"índices não usados mais: {', '.join(perdidos)}")
+    return regressoes
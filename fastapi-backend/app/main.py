@@ -1,9 +1,18 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from .core.config import settings
 from .core.database import test_connection, create_tables, SessionLocal
+from .core.difusao import difusao
+from .core.inicializacao import aquecer_dependencias, prontidao
+from .services.job_worker import iniciar_worker_api, parar_worker_api, worker_no_processo
 from .api.v1.api import api_router
+from .api.streaming import DefaultJSONResponse, formato_streaming, resposta_streaming
+from .api.etag import ETagMiddleware, etag
+from .api.cache import RespostaCacheMiddleware
+from .api.compressao import ArquivosPrecomprimidos, CompressaoMiddleware
+from .api.metricas import MetricasMiddleware, resposta_metricas
+from .api.instrumentacao_sql import ConsultasMiddleware
+from .api.inclusao import interpretar_include
 from .api.v1.endpoints import atividades, setores
 from fastapi import Depends
 from .api.deps import get_current_active_user
@@ -12,8 +21,8 @@ from .models.user import User
 from .models import (
     User, Project, Atividade, Setor, Documento, CasaParceira,
     RelatorioDiario, CredencialAcesso, MetricasRedesSociais,
-    Criativo, UserProject, Lead, KanbanColumn, Cliente,
-    Proposta, FinanceTransaction, Notificacao
+    Criativo, CriativoStatusCounter, UserProject, Lead, KanbanColumn, Cliente,
+    Proposta, FinanceTransaction, Notificacao, NotificacaoArquivada, SearchDocument
 )
 from .core.security import get_password_hash
 from fastapi import Request
@@ -22,9 +31,11 @@ from .services.project_service import ProjectService
 from .schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate
 from sqlalchemy.orm import Session
 from .core.database import get_db
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Sequence
 import uuid
 import os
+import asyncio
+from starlette.concurrency import run_in_threadpool
 from .api.deps import get_current_admin_user
 
 # Create FastAPI app
@@ -33,9 +44,23 @@ app = FastAPI(
     version=settings.project_version,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=DefaultJSONResponse
 )
 
+# add_middleware empilha por fora: as middlewares internas vêm antes do CORS, para que
+# o cache de respostas não guarde headers de CORS de uma origem e sirva a outra
+# ETag nas respostas prontas (Response) das rotas com GET condicional
+app.add_middleware(ETagMiddleware)
+# Cache de respostas das rotas com @cache_resposta
+app.add_middleware(RespostaCacheMiddleware)
+# Compressão por fora do cache: o cache guarda a resposta original e cada cliente
+# recebe a codificação que negociou
+app.add_middleware(CompressaoMiddleware)
+# Consultas SQL por requisição (Server-Timing em development, avisos de N+1)
+if settings.sql_instrumentacao_enabled:
+    app.add_middleware(ConsultasMiddleware)
+
 # Set up CORS FIRST (antes de outras middlewares)
 # IMPORTANTE: Não pode usar allow_origins=["*"] com allow_credentials=True
 # Precisamos especificar as origens explicitamente
@@ -77,6 +102,10 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Métricas por rota: a mais externa, para medir também compressão, cache e CORS
+if settings.metrics_enabled:
+    app.add_middleware(MetricasMiddleware)
+
 # Handle preflight requests
 @app.options("/{full_path:path}")
 async def preflight_handler(full_path: str):
@@ -86,8 +115,8 @@ async def preflight_handler(full_path: str):
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-# Servir arquivos estáticos de upload
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+# Servir arquivos estáticos de upload (com variantes .br/.gz de precomprimir_uploads.py)
+app.mount("/uploads", ArquivosPrecomprimidos(directory=UPLOAD_DIR), name="uploads")
 
 # Include API router
 app.include_router(api_router, prefix=settings.api_v1_str)
@@ -96,8 +125,8 @@ app.include_router(api_router, prefix=settings.api_v1_str)
 # app.include_router(atividades.router, prefix="/api/atividades", tags=["atividades-legacy"])
 
 # Legacy projects endpoints - proxy to versioned API
-@app.get("/api/projects", response_model=List[ProjectResponse])
-@app.get("/api/projects/", response_model=List[ProjectResponse])
+@app.get("/api/projects", response_model=List[ProjectResponse], dependencies=[etag(Project, User)])
+@app.get("/api/projects/", response_model=List[ProjectResponse], dependencies=[etag(Project, User)])
 async def get_projects_legacy(
     skip: int = 0,
     limit: int = 100,
@@ -165,8 +194,8 @@ async def get_influencers(current_user: User = Depends(get_current_active_user))
 # Legacy users routes removed - use /api/v1/users instead
 
 # Legacy users endpoint for assignment
-@app.get("/api/users/for-assignment")
-@app.get("/api/users/for-assignment/")
+@app.get("/api/users/for-assignment", dependencies=[etag(User)])
+@app.get("/api/users/for-assignment/", dependencies=[etag(User)])
 async def get_users_for_assignment_legacy(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -186,14 +215,29 @@ async def get_users_for_assignment_legacy(
     ]
 
 # Legacy users endpoint (same as for-assignment for compatibility)
-@app.get("/api/users")
-@app.get("/api/users/")
+@app.get("/api/users", dependencies=[etag(User)])
+@app.get("/api/users/", dependencies=[etag(User)])
 async def get_users_legacy(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Legacy users endpoint for edit pages"""
+    """Legacy users endpoint for edit pages
+
+    Com ?stream=true ou Accept: application/x-ndjson a lista é enviada aos pedaços,
+    sem limite, lendo só as colunas usadas.
+    """
     from .services.user_service import UserService
+
+    formato = formato_streaming(request)
+    if formato:
+        return resposta_streaming(
+            lambda s: s.query(User.id, User.name, User.email)
+            .filter(User.is_active.is_(True))
+            .order_by(User.created_at),
+            lambda linha: {"id": str(linha[0]), "name": linha[1], "email": linha[2]},
+            formato
+        )
     
     users = UserService.get_users(db, skip=0, limit=1000)
     return [
@@ -351,40 +395,41 @@ async def debug_setores_auth(request: Request):
             "headers": headers_info
         }
 
+async def _loop_retencao_notificacoes():
+    """Executar a retenção de notificações periodicamente, fora do event loop"""
+    from .services.notificacao_retencao_service import executar_retencao
+    while True:
+        await asyncio.sleep(settings.notificacao_retencao_intervalo_horas * 3600)
+        await run_in_threadpool(executar_retencao)
+
+async def _iniciar_worker_jobs():
+    """Subir o worker de jobs do processo quando o banco (e o schema) estiver pronto"""
+    while not prontidao.banco_pronto:
+        await asyncio.sleep(0.5)
+    await run_in_threadpool(iniciar_worker_api)
+    print("⚙️  Worker de jobs rodando no processo da API")
+
 @app.on_event("startup")
 async def startup_event():
-    """Startup event handler"""
+    """Startup event handler
+
+    Não bloqueia: banco, schema (só com SCHEMA_NO_STARTUP) e MinIO aquecem em
+    segundo plano e o /ready indica quando terminaram. Em produção o schema é
+    preparado antes do deploy por preparar_banco.py.
+    """
     print("🚀 Iniciando Sistemaxi API...")
+    app.state.aquecimento = asyncio.create_task(aquecer_dependencias())
+    # Escuta das invalidações de cache dos outros workers (CACHE_INVALIDACAO_URL)
+    difusao.iniciar()
     
-    # Test database connection
-    if test_connection():
-        # Create tables if they don't exist
-        create_tables()
-        print("📊 Tabelas do banco criadas/verificadas com sucesso!")
-
-        # Ensure a default admin exists for local/dev usage (does not populate business data)
-        try:
-            db = SessionLocal()
-            try:
-                if db.query(User).first() is None:
-                    admin_user = User(
-                        name="Admin",
-                        username="admin",
-                        email="admin@sistemaxi.com",
-                        hashed_password=get_password_hash("admin1234"),
-                        is_active=True,
-                        is_admin=True,
-                    )
-                    db.add(admin_user)
-                    db.commit()
-                    print("✅ Usuário admin padrão criado (admin@sistemaxi.com / admin1234)")
-            finally:
-                db.close()
-        except Exception as e:
-            print(f"⚠️  Falha ao garantir admin padrão: {e}")
-    else:
-        print("⚠️  Falha na conexão com banco de dados! A aplicação continuará, mas algumas funcionalidades podem não funcionar.")
-        # Não fazer exit(1) para permitir que a API inicie mesmo sem banco
+    # Fila de jobs no próprio processo (development); em produção, python worker.py
+    if worker_no_processo():
+        app.state.worker_jobs = asyncio.create_task(_iniciar_worker_jobs())
+    
+    # Política de retenção de notificações em segundo plano (desligada por padrão)
+    if settings.notificacao_retencao_intervalo_horas > 0:
+        asyncio.create_task(_loop_retencao_notificacoes())
+        print(f"🧹 Retenção de notificações a cada {settings.notificacao_retencao_intervalo_horas}h")
     
     # Get port from environment (Railway provides PORT)
     port = os.getenv("PORT", "3001")
@@ -395,6 +440,19 @@ async def startup_event():
     print(f"📚 Documentação em: {protocol}://{public_url}/docs")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Interromper o aquecimento em segundo plano, o worker de jobs e a escuta de invalidações"""
+    aquecimento = getattr(app.state, "aquecimento", None)
+    if aquecimento is not None and not aquecimento.done():
+        aquecimento.cancel()
+    worker_jobs = getattr(app.state, "worker_jobs", None)
+    if worker_jobs is not None and not worker_jobs.done():
+        worker_jobs.cancel()
+    await run_in_threadpool(parar_worker_api)
+    difusao.parar()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -405,12 +463,23 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Métricas no formato texto do Prometheus"""
+    return resposta_metricas(request)
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness: responde assim que o servidor sobe)"""
     return {"status": "healthy", "version": settings.project_version}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 só depois que as dependências de READINESS_DEPENDENCIAS aqueceram"""
+    return DefaultJSONResponse(prontidao.resumo(), status_code=200 if prontidao.pronto else 503)
+
+
 @app.get("/api/init-database")
 async def init_database_endpoint(secret: str = None):
     """
@@ -499,54 +568,74 @@ async def init_database_endpoint(secret: str = None):
 @app.get("/api/atividades")
 @app.get("/api/atividades/")
 async def get_atividades_legacy(
+    request: Request,
     include: str = "",
+    filtros: dict = Depends(atividades.filtros_atividades),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Legacy atividades list endpoint"""
-    from .services.atividade_service import AtividadeService
+    """Legacy atividades list endpoint
+
+    include=projeto,responsavel,setor: relacionamentos aninhados, carregados na
+    mesma consulta. Aceita os mesmos filtros e ordenação de /api/v1/atividades.
+    Com ?stream=true ou Accept: application/x-ndjson todas as atividades visíveis são
+    enviadas aos pedaços (yield_per), sem o limite de 1000.
+    """
+    from .services.atividade_service import AtividadeService, RELACOES_ATIVIDADE
+
+    relacoes = interpretar_include(include, RELACOES_ATIVIDADE)
+    formato = formato_streaming(request)
+    if formato:
+        return resposta_streaming(
+            lambda s: AtividadeService.query_atividades(s, user_id=current_user.id, relacoes=relacoes, **filtros),
+            lambda atividade: _atividade_legacy(atividade, relacoes),
+            formato
+        )
     
-    atividades = AtividadeService.get_atividades(db, user_id=current_user.id, skip=0, limit=1000)
+    atividades_usuario = AtividadeService.get_atividades(
+        db, user_id=current_user.id, skip=0, limit=1000, relacoes=relacoes, **filtros
+    )
     
     # Convert to frontend format
-    result = []
-    for atividade in atividades:
-        atividade_data = {
-            "id": str(atividade.id),
-            "nome": atividade.nome,
-            "descricao": atividade.descricao,
-            "status": atividade.status,
-            "prioridade": atividade.prioridade,
-            "projetoId": str(atividade.projeto_id) if atividade.projeto_id else None,
-            "responsavelId": str(atividade.responsavel_id) if atividade.responsavel_id else None,
-            "setorId": str(atividade.setor_id) if atividade.setor_id else None,
-            "createdAt": atividade.created_at.isoformat() if atividade.created_at else None,
-            "updatedAt": atividade.updated_at.isoformat() if atividade.updated_at else None,
+    return [_atividade_legacy(atividade, relacoes) for atividade in atividades_usuario]
+
+
+def _atividade_legacy(atividade: Atividade, include: Sequence[str]) -> Dict[str, Any]:
+    """Atividade no formato de campos do frontend"""
+    atividade_data = {
+        "id": str(atividade.id),
+        "nome": atividade.nome,
+        "descricao": atividade.descricao,
+        "status": atividade.status,
+        "prioridade": atividade.prioridade,
+        "projetoId": str(atividade.projeto_id) if atividade.projeto_id else None,
+        "responsavelId": str(atividade.responsavel_id) if atividade.responsavel_id else None,
+        "setorId": str(atividade.setor_id) if atividade.setor_id else None,
+        "createdAt": atividade.created_at.isoformat() if atividade.created_at else None,
+        "updatedAt": atividade.updated_at.isoformat() if atividade.updated_at else None,
+    }
+    
+    # Add nested objects if requested
+    if "projeto" in include and atividade.projeto:
+        atividade_data["projeto"] = {
+            "id": str(atividade.projeto.id),
+            "name": atividade.projeto.name
+        }
+    
+    if "responsavel" in include and atividade.responsavel:
+        atividade_data["responsavel"] = {
+            "id": str(atividade.responsavel.id),
+            "username": atividade.responsavel.username,
+            "email": atividade.responsavel.email
+        }
+    
+    if "setor" in include and atividade.setor:
+        atividade_data["setor"] = {
+            "id": str(atividade.setor.id),
+            "nome": atividade.setor.nome
         }
-        
-        # Add nested objects if requested
-        if "projeto" in include and atividade.projeto:
-            atividade_data["projeto"] = {
-                "id": str(atividade.projeto.id),
-                "name": atividade.projeto.name
-            }
-        
-        if "responsavel" in include and atividade.responsavel:
-            atividade_data["responsavel"] = {
-                "id": str(atividade.responsavel.id),
-                "username": atividade.responsavel.username,
-                "email": atividade.responsavel.email
-            }
-        
-        if "setor" in include and atividade.setor:
-            atividade_data["setor"] = {
-                "id": str(atividade.setor.id),
-                "nome": atividade.setor.nome
-            }
-        
-        result.append(atividade_data)
     
-    return result
+    return atividade_data
 
 @app.get("/api/atividades/{atividade_id}")
 @app.get("/api/atividades/{atividade_id}/")
@@ -8,12 +8,16 @@ from .relatorio_diario import RelatorioDiario
 from .credencial_acesso import CredencialAcesso
 from .metricas_redes_sociais import MetricasRedesSociais
 from .criativo import Criativo
+from .criativo_status_counter import CriativoStatusCounter
 from .user_project import UserProject, ProjectRole
 from .lead import Lead
 from .kanban_column import KanbanColumn
 from .cliente import Cliente
 from .proposta import Proposta
 from .finance_transaction import FinanceTransaction
-from .notificacao import Notificacao, NotificationType, NotificationStatus
+from .search_document import SearchDocument
+from .notificacao import Notificacao, NotificacaoArquivada, NotificationType, NotificationStatus
+from .job import Job, StatusJob
+from .relatorio_mensal import RelatorioMensal
 
-__all__ = ["User", "Project", "Atividade", "Setor", "Documento", "CasaParceira", "RelatorioDiario", "CredencialAcesso", "MetricasRedesSociais", "Criativo", "UserProject", "ProjectRole", "Lead", "KanbanColumn", "Cliente", "Proposta", "FinanceTransaction", "Notificacao", "NotificationType", "NotificationStatus"] 
\ No newline at end of file
+__all__ = ["User", "Project", "Atividade", "Setor", "Documento", "CasaParceira", "RelatorioDiario", "CredencialAcesso", "MetricasRedesSociais", "Criativo", "CriativoStatusCounter", "UserProject", "ProjectRole", "Lead", "KanbanColumn", "Cliente", "Proposta", "FinanceTransaction", "Notificacao", "NotificacaoArquivada", "NotificationType", "NotificationStatus", "SearchDocument", "Job", "StatusJob", "RelatorioMensal"] 
\ No newline at end of file
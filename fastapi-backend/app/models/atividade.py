@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -28,4 +28,13 @@ class Atividade(BaseModel):
         "RelatorioDiario",
         secondary="relatorio_atividade_association",
         back_populates="atividades_realizadas"
-    ) 
\ No newline at end of file
+    )
+
+    __table_args__ = (
+        # Filtro de acesso: responsável ou projeto do usuário
+        Index("ix_atividades_responsavel_id", "responsavel_id"),
+        Index("ix_atividades_projeto_id", "projeto_id"),
+        # Filtros da listagem: status com faixa/ordem de prazo, setor
+        Index("ix_atividades_status_prazo", "status", "prazo"),
+        Index("ix_atividades_setor_id", "setor_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Date, ForeignKey
+from sqlalchemy import Column, String, Text, Date, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -24,3 +24,7 @@ class Cliente(BaseModel):
     lead_origem = relationship("Lead", foreign_keys=[lead_id], uselist=False)
     propostas = relationship("Proposta", back_populates="cliente", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Listagem ordenada por data de criação
+        Index("ix_clientes_created_at", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Integer
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -77,6 +77,11 @@ class Criativo(Base):
     criado_por = relationship("User", foreign_keys=[criado_por_id])
     editor = relationship("User", foreign_keys=[editor_id])
     projeto = relationship("Project")
+
+    __table_args__ = (
+        # Criativos dos projetos acessíveis, filtrados por status (kanban, listagem)
+        Index("ix_criativos_projeto_status", "projeto_id", "status"),
+    )
     
     # Propriedades para compatibilidade com o frontend
     @property
@@ -97,4 +102,4 @@ class Criativo(Base):
         
     @property
     def editado_por_id(self):
-        return self.editor_id 
\ No newline at end of file
+        return self.editor_id
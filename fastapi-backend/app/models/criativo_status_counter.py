@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from .base import Base
+from .criativo import StatusCriativo
+
+
+class CriativoStatusCounter(Base):
+    """Contador materializado de criativos por projeto e status
+
+    Mantido na mesma transação das escritas em CriativoService, para que as
+    estatísticas não precisem varrer a tabela de criativos.
+    """
+    __tablename__ = "criativo_status_counters"
+
+    projeto_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(SQLEnum(StatusCriativo), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
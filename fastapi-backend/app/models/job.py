@@ -0,0 +1,54 @@
+from sqlalchemy import Column, String, Integer, Text, JSON, ForeignKey, Index, DateTime, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+import enum
+
+
+class StatusJob(str, enum.Enum):
+    PENDENTE = "pendente"  # Aguardando executar_em ou um worker livre
+    EXECUTANDO = "executando"  # Reivindicado por um worker (lease em bloqueado_ate)
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"  # Esgotou max_tentativas
+    CANCELADO = "cancelado"
+
+
+class Job(BaseModel):
+    """Tarefa da fila persistente, executada pelos workers (python worker.py)
+
+    Horários em UTC sem fuso (datetime.utcnow), comparados pelo worker.
+    """
+    __tablename__ = "jobs"
+
+    tipo = Column(String(100), nullable=False)  # nome registrado com @tarefa
+    payload = Column(JSON, nullable=True)
+    status = Column(SQLEnum(StatusJob), nullable=False, default=StatusJob.PENDENTE)
+    prioridade = Column(Integer, nullable=False, default=0)  # maior sai primeiro
+
+    # Agendamento e novas tentativas
+    executar_em = Column(DateTime, nullable=False)
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False, default=3)
+
+    # Execução: worker que reivindicou o job e até quando (lease renovado pelo progresso)
+    bloqueado_por = Column(String(255), nullable=True)
+    bloqueado_ate = Column(DateTime, nullable=True)
+    iniciado_em = Column(DateTime, nullable=True)
+    concluido_em = Column(DateTime, nullable=True)
+
+    # Progresso e resultado, visíveis em /api/v1/jobs
+    progresso = Column(Integer, nullable=False, default=0)  # 0-100
+    progresso_mensagem = Column(String(500), nullable=True)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(Text, nullable=True)
+
+    # Mesma chave = mesmo job (reenvios de formulário, cron em vários workers)
+    chave_idempotencia = Column(String(255), nullable=True, unique=True)
+    criado_por_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        # Reivindicação: pendentes vencidos por prioridade e horário
+        Index("ix_jobs_status_executar_em", "status", "executar_em"),
+        # Recuperação de leases expirados e listagem por usuário
+        Index("ix_jobs_status_bloqueado_ate", "status", "bloqueado_ate"),
+        Index("ix_jobs_criado_por_created_at", "criado_por_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from uuid import uuid4
@@ -50,3 +50,10 @@ class Lead(Base):
     criado_por = relationship("User", foreign_keys=[criado_por_id])
     projeto = relationship("Project")
     column = relationship("KanbanColumn", back_populates="leads", foreign_keys=[column_id])
+
+    __table_args__ = (
+        # Listagem por data, leads por criador/estágio e por coluna do kanban
+        Index("ix_leads_created_at", "created_at"),
+        Index("ix_leads_criado_por_stage", "criado_por_id", "stage"),
+        Index("ix_leads_column_id", "column_id"),
+    )
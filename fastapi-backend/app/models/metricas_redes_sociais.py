@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Text, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Date, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -30,5 +30,10 @@ class MetricasRedesSociais(Base):
     # Relacionamentos
     projeto = relationship("Project", back_populates="metricas_redes_sociais")
     
+    __table_args__ = (
+        # Métricas do projeto por período, ordenadas pela data
+        Index("ix_metricas_redes_sociais_projeto_data", "projeto_id", "data_referente"),
+    )
+
     def __repr__(self):
         return f"<MetricasRedesSociais(id={self.id}, projeto_id={self.projeto_id}, data={self.data_referente})>" 
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, ForeignKey, Text, Index, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
+from datetime import datetime
 import uuid
 import enum
 
@@ -45,4 +46,29 @@ class Notificacao(BaseModel):
     # Relationships
     usuario = relationship("User", foreign_keys=[usuario_id], backref="notificacoes_recebidas")
     from_user = relationship("User", foreign_keys=[from_user_id], backref="notificacoes_enviadas")
+    
+    __table_args__ = (
+        # Contadores por usuário (total / não lidas / urgentes) sem tocar na tabela
+        Index("ix_notificacoes_usuario_status_tipo", "usuario_id", "status", "tipo"),
+        # Listagem por usuário ordenada por data e varredura da política de retenção
+        Index("ix_notificacoes_usuario_created_at", "usuario_id", "created_at"),
+        Index("ix_notificacoes_status_created_at", "status", "created_at"),
+    )
+
 
+class NotificacaoArquivada(BaseModel):
+    """Notificações removidas da tabela principal pela política de retenção (modo archive)"""
+    __tablename__ = "notificacoes_arquivadas"
+    
+    tipo = Column(SQLEnum(NotificationType), nullable=False)
+    titulo = Column(String, nullable=False)
+    mensagem = Column(Text, nullable=False)
+    status = Column(SQLEnum(NotificationStatus), nullable=False)
+    usuario_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    from_user_id = Column(UUID(as_uuid=True), nullable=True)
+    contexto_tipo = Column(String, nullable=True)
+    contexto_id = Column(UUID(as_uuid=True), nullable=True)
+    contexto_nome = Column(String, nullable=True)
+    action_url = Column(String, nullable=True)
+    read_at = Column(String, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Numeric
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -23,4 +23,9 @@ class Project(BaseModel):
     credenciais_acesso = relationship("CredencialAcesso", back_populates="projeto", lazy="selectin", cascade="delete")
     metricas_redes_sociais = relationship("MetricasRedesSociais", back_populates="projeto", lazy="selectin", cascade="delete")
     user_projects = relationship("UserProject", back_populates="project", cascade="all, delete-orphan")
-    # funnel_stages = relationship("FunnelStage", back_populates="projeto", lazy="selectin", cascade="delete")  # TODO: Create FunnelStage model 
\ No newline at end of file
+    # funnel_stages = relationship("FunnelStage", back_populates="projeto", lazy="selectin", cascade="delete")  # TODO: Create FunnelStage model
+
+    __table_args__ = (
+        # Projetos do dono (checagens de acesso)
+        Index("ix_projects_owner_id", "owner_id"),
+    )
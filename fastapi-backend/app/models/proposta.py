@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, Numeric, ForeignKey, DateTime
+from sqlalchemy import Column, String, Text, Integer, Numeric, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -35,3 +35,8 @@ class Proposta(BaseModel):
     cliente = relationship("Cliente", back_populates="propostas")
     responsavel = relationship("User", foreign_keys=[responsavel_id])
 
+    __table_args__ = (
+        # Propostas por cliente e listagem ordenada
+        Index("ix_propostas_cliente_id", "cliente_id"),
+        Index("ix_propostas_ordem_prioridade", "ordem", "prioridade"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Numeric, Integer, Boolean, Text, ForeignKey, Table
+from sqlalchemy import Column, String, DateTime, Numeric, Integer, Boolean, Text, ForeignKey, Table, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -75,5 +75,10 @@ class RelatorioDiario(Base):
     # Relationships
     projeto = relationship("Project", back_populates="relatorios_diarios")
     
+    __table_args__ = (
+        # Relatórios do projeto por período, ordenados pela data
+        Index("ix_relatorios_diarios_projeto_data", "projeto_id", "data_referente"),
+    )
+
     def __repr__(self):
         return f"<RelatorioDiario(id={self.id}, projeto_id={self.projeto_id}, data_referente={self.data_referente})>" 
\ No newline at end of file
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from .base import BaseModel
+
+
+class RelatorioMensal(BaseModel):
+    """Relatório mensal de projeto já gerado (arquivo no MinIO)
+
+    A chave do cache é (projeto, competência, formato, versao_dados): a versão é
+    uma impressão digital dos dados de origem do mês, então uma nova geração só
+    acontece quando relatórios diários, métricas ou criativos mudaram.
+    """
+    __tablename__ = "relatorios_mensais"
+
+    projeto_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    competencia = Column(String(7), nullable=False)  # AAAA-MM
+    formato = Column(String(10), nullable=False)  # html ou pdf
+    versao_dados = Column(String(64), nullable=False)
+
+    objeto_key = Column(String(500), nullable=False)
+    tamanho_bytes = Column(Integer, nullable=False, default=0)
+
+    gerado_por_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    job_id = Column(UUID(as_uuid=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("projeto_id", "competencia", "formato", "versao_dados", name="uq_relatorios_mensais_versao"),
+        # Último relatório gerado do projeto por competência
+        Index("ix_relatorios_mensais_projeto_competencia", "projeto_id", "competencia", "created_at"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from .base import Base
+
+
+class SearchDocument(Base):
+    """Documento do índice de busca unificado (leads, clientes, propostas, atividades e criativos)
+
+    Mantido pelo SearchService a cada flush da sessão. No PostgreSQL a coluna
+    search_vector (tsvector gerado + GIN) é criada fora do ORM; no SQLite o
+    índice é a tabela virtual FTS5 search_documents_fts.
+    """
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entidade = Column(String(20), nullable=False)  # lead, cliente, proposta, atividade, criativo
+    entidade_id = Column(UUID(as_uuid=True), nullable=False)
+    projeto_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # NULL = visível para todos
+
+    # Exibição
+    titulo = Column(String(255), nullable=False)
+    subtitulo = Column(String(255), nullable=True)
+
+    # Texto normalizado (minúsculo, sem acentos) que alimenta o índice
+    termos_titulo = Column(Text, nullable=False, default="")
+    termos = Column(Text, nullable=False, default="")
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("entidade", "entidade_id", name="uq_search_documents_entidade"),
+    )
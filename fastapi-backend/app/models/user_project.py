@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import BaseModel
@@ -25,5 +25,6 @@ class UserProject(BaseModel):
     
     # Constraint para evitar duplicatas
     __table_args__ = (
+        Index("ix_user_projects_user_project", "user_id", "project_id"),
         {"schema": None},
     ) 
\ No newline at end of file
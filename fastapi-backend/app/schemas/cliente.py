@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, date
 import uuid
 
@@ -42,3 +42,42 @@ class ClienteResponse(ClienteBase):
     class Config:
         from_attributes = True
 
+
+class ClienteSimilarResponse(BaseModel):
+    cliente: ClienteResponse
+    score: float  # 0-1
+    motivos: List[str]  # cpf, email, telefone, nome
+
+
+class ClienteDuplicataResumo(BaseModel):
+    id: uuid.UUID
+    nome: Optional[str] = None
+    email: Optional[str] = None
+    cpf: Optional[str] = None
+
+
+class ClienteDuplicataPar(BaseModel):
+    cliente_id: uuid.UUID
+    similar_id: uuid.UUID
+    score: float
+    motivos: List[str]
+
+
+class ClienteDuplicataGrupo(BaseModel):
+    clientes: List[ClienteDuplicataResumo]
+    pares: List[ClienteDuplicataPar]
+    score_max: float
+
+
+class ClienteBlocoIgnorado(BaseModel):
+    campo: str
+    valor: str
+    clientes: int
+
+
+class ClienteDuplicatasRelatorio(BaseModel):
+    total_clientes: int
+    comparacoes: int
+    grupos: List[ClienteDuplicataGrupo]
+    blocos_ignorados: List[ClienteBlocoIgnorado]
+    duracao_segundos: float
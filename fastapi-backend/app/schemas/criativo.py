@@ -98,18 +98,6 @@ class CriativoResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    @classmethod
-    def from_orm_with_mapping(cls, orm_obj):
-        """Converter objeto ORM com mapeamento de prioridade"""
-        data = {}
-        for field_name in cls.model_fields.keys():
-            if hasattr(orm_obj, field_name):
-                value = getattr(orm_obj, field_name)
-                if field_name == 'prioridade' and isinstance(value, int):
-                    value = PRIORIDADE_MAP.get(value, PrioridadeCriativo.MEDIA)
-                data[field_name] = value
-        return cls(**data)
-
 
 class CriativoKanban(BaseModel):
     """Schema específico para visualização Kanban"""
@@ -126,26 +114,6 @@ class CriativoKanban(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    @classmethod
-    def from_orm_with_mapping(cls, orm_obj):
-        """Converter objeto ORM com mapeamento de prioridade"""
-        prioridade = PRIORIDADE_MAP.get(orm_obj.prioridade, PrioridadeCriativo.MEDIA)
-        
-        return cls(
-            id=orm_obj.id,
-            titulo=orm_obj.titulo,  # Propriedade virtual
-            descricao=orm_obj.descricao,
-            status=orm_obj.status,
-            tipo_arquivo=orm_obj.tipo_arquivo,  # Propriedade virtual
-            prioridade=prioridade,
-            prazo=orm_obj.prazo,
-            criado_por_id=orm_obj.criado_por_id,
-            editado_por_id=orm_obj.editado_por_id,  # Propriedade virtual
-            projeto_id=orm_obj.projeto_id,
-            created_at=orm_obj.created_at,
-            updated_at=orm_obj.updated_at
-        )
-
 
 class CriativosKanbanResponse(BaseModel):
     """Resposta completa do Kanban com criativos agrupados por status"""
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+import uuid
+from ..models.job import StatusJob
+
+
+class JobResponse(BaseModel):
+    id: uuid.UUID
+    tipo: str
+    status: StatusJob
+    prioridade: int
+    tentativas: int
+    max_tentativas: int
+    executar_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    progresso: int
+    progresso_mensagem: Optional[str] = None
+    resultado: Optional[Any] = None
+    erro: Optional[str] = None
+    chave_idempotencia: Optional[str] = None
+    criado_por_id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobAgendadoResponse(BaseModel):
+    """Resposta 202 dos endpoints que delegam o trabalho à fila"""
+    message: str
+    job_id: uuid.UUID
+    status: StatusJob
+    detalhes: Optional[Dict[str, Any]] = None
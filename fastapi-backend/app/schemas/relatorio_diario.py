@@ -19,18 +19,15 @@ class RelatorioDiarioBase(BaseModel):
     
     # Métricas de leads
     leads: Optional[int] = Field(None, ge=0, description="Número de leads")
-    custo_por_lead: Optional[Decimal] = Field(None, ge=0, description="Custo por lead em R$")
     
     # Métricas de registros
     registros: Optional[int] = Field(None, ge=0, description="Número de registros")
-    custo_por_registro: Optional[Decimal] = Field(None, ge=0, description="Custo por registro em R$")
     
     # Métricas de depósito
     deposito: Optional[Decimal] = Field(None, ge=0, description="Valor de depósito em R$")
     
     # Métricas de FTD
     ftd: Optional[int] = Field(None, ge=0, description="Número de FTDs")
-    custo_por_ftd: Optional[Decimal] = Field(None, ge=0, description="Custo por FTD em R$")
     valor_ftd: Optional[Decimal] = Field(None, ge=0, description="Valor de FTD em R$")
     
     # Métricas de CPA
@@ -65,18 +62,15 @@ class RelatorioDiarioUpdate(BaseModel):
     
     # Métricas de leads
     leads: Optional[int] = Field(None, ge=0)
-    custo_por_lead: Optional[Decimal] = Field(None, ge=0)
     
     # Métricas de registros
     registros: Optional[int] = Field(None, ge=0)
-    custo_por_registro: Optional[Decimal] = Field(None, ge=0)
     
     # Métricas de depósito
     deposito: Optional[Decimal] = Field(None, ge=0)
     
     # Métricas de FTD
     ftd: Optional[int] = Field(None, ge=0)
-    custo_por_ftd: Optional[Decimal] = Field(None, ge=0)
     valor_ftd: Optional[Decimal] = Field(None, ge=0)
     
     # Métricas de CPA
@@ -106,6 +100,12 @@ class AtividadeSimples(BaseModel):
 class RelatorioDiarioResponse(RelatorioDiarioBase):
     id: uuid.UUID
     projeto_id: uuid.UUID
+    
+    # Custos unitários calculados no servidor (valor_investido / quantidade)
+    custo_por_lead: Optional[Decimal] = Field(None, description="Custo por lead em R$")
+    custo_por_registro: Optional[Decimal] = Field(None, description="Custo por registro em R$")
+    custo_por_ftd: Optional[Decimal] = Field(None, description="Custo por FTD em R$")
+    
     created_at: datetime
     updated_at: Optional[datetime] = None
     atividades_realizadas: Optional[List[AtividadeSimples]] = []
@@ -114,7 +114,7 @@ class RelatorioDiarioResponse(RelatorioDiarioBase):
         from_attributes = True
 
 
-# Schema para estatísticas/resumos
+# Schema para estatísticas/resumos (media_custo_* = soma investida / soma das quantidades)
 class EstatisticasRelatorio(BaseModel):
     total_relatorios: int
     total_valor_investido: Decimal
@@ -128,6 +128,13 @@ class EstatisticasRelatorio(BaseModel):
     media_custo_por_ftd: Optional[Decimal] = None
 
 
+# Estatísticas de um grupo (projeto ou mês AAAA-MM) em /dashboard/metricas
+class MetricasGrupo(EstatisticasRelatorio):
+    grupo: str
+    projeto_id: Optional[uuid.UUID] = None
+    projeto_nome: Optional[str] = None
+
+
 # Schema para filtros
 class FiltroRelatorio(BaseModel):
     data_inicio: Optional[date] = None
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class RelatorioMensalResponse(BaseModel):
+    id: uuid.UUID
+    projeto_id: uuid.UUID
+    competencia: str
+    formato: str
+    versao_dados: str
+    tamanho_bytes: int
+    gerado_por_id: Optional[uuid.UUID] = None
+    job_id: Optional[uuid.UUID] = None
+    created_at: Optional[datetime] = None
+    atualizado: Optional[bool] = None  # versão igual à dos dados atuais (só na consulta por competência)
+    url: Optional[str] = None  # link temporário de download
+
+    class Config:
+        from_attributes = True
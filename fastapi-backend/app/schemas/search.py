@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional
+import uuid
+
+
+class SearchHit(BaseModel):
+    tipo: str  # lead, cliente, proposta, atividade, criativo
+    id: uuid.UUID
+    titulo: str
+    subtitulo: Optional[str] = None
+    projeto_id: Optional[uuid.UUID] = None
+    score: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    resultados: List[SearchHit]
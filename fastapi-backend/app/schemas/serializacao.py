@@ -0,0 +1,90 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+from enum import Enum
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def conversor_enum(destino: Type[Enum], padrao: Any = None) -> Callable[[Any], Any]:
+    """Converter o enum do modelo (ou seu valor) para o enum do schema por lookup"""
+    mapa = {membro.value: membro for membro in destino}
+
+    def converter(valor):
+        if valor is None:
+            return padrao
+        return mapa.get(getattr(valor, "value", valor), padrao)
+
+    return converter
+
+
+class Serializador(Generic[M]):
+    """Serializador pré-compilado de dados do banco para um schema de resposta
+
+    Os campos são resolvidos uma única vez (attrgetter) e o schema é montado com
+    model_construct, sem revalidar dados que já vieram tipados do banco. Serve
+    tanto para objetos ORM quanto para linhas de uma projeção de colunas
+    (db.query(*serializador.colunas())), que evita materializar o objeto ORM.
+
+    campos: nome do campo no schema -> atributo ORM (coluna) ou nome de atributo.
+    conversores: nome do campo -> função aplicada ao valor lido.
+    """
+
+    def __init__(
+        self,
+        schema: Type[M],
+        campos: Dict[str, Any],
+        conversores: Optional[Dict[str, Callable[[Any], Any]]] = None
+    ):
+        self.schema = schema
+        self._nomes = tuple(campos)
+        origens = [attr if isinstance(attr, str) else attr.key for attr in campos.values()]
+        self._colunas = [
+            attr.label(nome) for nome, attr in campos.items() if not isinstance(attr, str)
+        ]
+        self._ler_objeto = self._getter(origens)
+        self._conversores = [
+            (nome, funcao) for nome, funcao in (conversores or {}).items() if nome in campos
+        ]
+        self._adapter_lista = TypeAdapter(List[schema])
+
+    @staticmethod
+    def _getter(nomes) -> Callable[[Any], tuple]:
+        getter = attrgetter(*nomes)
+        if len(nomes) == 1:
+            return lambda fonte: (getter(fonte),)
+        return getter
+
+    def colunas(self) -> list:
+        """Colunas rotuladas com os nomes do schema, para consultas de projeção"""
+        if len(self._colunas) != len(self._nomes):
+            raise ValueError(f"{self.schema.__name__}: projeção exige que todos os campos sejam colunas")
+        return list(self._colunas)
+
+    def _construir(self, valores: Iterable[Any]) -> M:
+        dados = dict(zip(self._nomes, valores))
+        for nome, funcao in self._conversores:
+            dados[nome] = funcao(dados[nome])
+        return self.schema.model_construct(**dados)
+
+    def de_objeto(self, obj) -> M:
+        return self._construir(self._ler_objeto(obj))
+
+    def de_linha(self, linha) -> M:
+        """Linha de db.query(*colunas()): leitura posicional, bem mais barata que por nome"""
+        return self._construir(linha)
+
+    def dicionario(self, obj) -> dict:
+        """Mesmo formato de schema.model_validate(obj).model_dump(), sem validar"""
+        dados = dict(zip(self._nomes, self._ler_objeto(obj)))
+        for nome, funcao in self._conversores:
+            dados[nome] = funcao(dados[nome])
+        return dados
+
+    def json_lista(self, itens: List[M]) -> bytes:
+        return self._adapter_lista.dump_json(itens)
+
+    def resposta_lista(self, itens: List[M]) -> Response:
+        """Resposta JSON pronta: o FastAPI não revalida contra o response_model"""
+        return Response(content=self.json_lista(itens), media_type="application/json")
@@ -1,24 +1,133 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import String, select, type_coerce, union, update
+from sqlalchemy.orm import Query, Session, joinedload, noload
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 from uuid import UUID
 from ..models.atividade import Atividade
+from ..models.notificacao import NotificationType
+from ..models.project import Project
 from ..schemas.atividade import AtividadeCreate, AtividadeUpdate
+from ..schemas.notificacao import NotificacaoCreate
+from .notificacao_service import NotificacaoService
+from .search_service import SearchService
+
+# Relações aceitas no ?include= e a estratégia de carregamento de cada uma. São
+# todas many-to-one: JOIN na mesma consulta, compatível com yield_per (uma
+# coleção usaria selectinload, uma consulta por relação e não por linha).
+RELACOES_ATIVIDADE = {
+    "projeto": joinedload,
+    "responsavel": joinedload,
+    "setor": joinedload,
+}
+
+# ?ordenar=campo ou -campo (decrescente); o id desempata para a paginação ser estável
+ORDENACOES_ATIVIDADE = {
+    "prazo": Atividade.prazo,
+    "created_at": Atividade.created_at,
+    "updated_at": Atividade.updated_at,
+    "nome": Atividade.nome,
+    "status": Atividade.status,
+}
+
+# Varredura de prazos: status que passam a "Atrasada" quando o prazo vence
+STATUS_ATRASADA = "Atrasada"
+STATUS_PENDENTES = ("Não iniciada", "Em andamento")
+# Nomes citados na notificação agregada de cada responsável
+EXEMPLOS_POR_NOTIFICACAO = 3
 
 
 class AtividadeService:
     """Service for managing atividades"""
     
     @staticmethod
-    def get_atividades(db: Session, skip: int = 0, limit: int = 100, user_id: Optional[UUID] = None) -> List[Atividade]:
+    def get_atividades(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        user_id: Optional[UUID] = None,
+        relacoes: Iterable[str] = (),
+        status: Optional[List[str]] = None,
+        prazo_de: Optional[date] = None,
+        prazo_ate: Optional[date] = None,
+        setor_id: Optional[UUID] = None,
+        responsavel_id: Optional[UUID] = None,
+        projeto_id: Optional[UUID] = None,
+        ordenar: Optional[str] = None
+    ) -> List[Atividade]:
         """Get all atividades"""
+        return AtividadeService.query_atividades(
+            db, user_id=user_id, relacoes=relacoes, status=status, prazo_de=prazo_de, prazo_ate=prazo_ate,
+            setor_id=setor_id, responsavel_id=responsavel_id, projeto_id=projeto_id, ordenar=ordenar
+        ).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def _acessiveis(user_id: UUID):
+        """Ids das atividades visíveis: o usuário é o responsável ou dono do projeto
+
+        UNION de dois ramos servidos por índice (responsavel_id; projects.owner_id
+        com JOIN em atividades.projeto_id), juntado à consulta principal. O OR com
+        EXISTS correlacionado (projeto.has(owner_id=...)) não usa índice nenhum:
+        vira uma varredura de atividades com a subconsulta avaliada linha a linha.
+        """
+        return union(
+            select(Atividade.id).where(Atividade.responsavel_id == user_id),
+            select(Atividade.id).join(Project, Project.id == Atividade.projeto_id).where(Project.owner_id == user_id),
+        ).subquery("atividades_acessiveis")
+
+    @staticmethod
+    def query_atividades(
+        db: Session,
+        user_id: Optional[UUID] = None,
+        relacoes: Iterable[str] = (),
+        status: Optional[List[str]] = None,
+        prazo_de: Optional[date] = None,
+        prazo_ate: Optional[date] = None,
+        setor_id: Optional[UUID] = None,
+        responsavel_id: Optional[UUID] = None,
+        projeto_id: Optional[UUID] = None,
+        ordenar: Optional[str] = None
+    ) -> Query:
+        """Query (sem executar) das atividades visíveis ao usuário
+
+        relacoes: chaves de RELACOES_ATIVIDADE carregadas na mesma consulta; as
+        outras não são carregadas (ficam None), então serializar a lista nunca
+        dispara consultas por linha. As coleções selectin do projeto (casas,
+        relatórios, credenciais...) ficam de fora, a serialização não as usa.
+        prazo_ate é inclusivo (o dia inteiro).
+        """
         query = db.query(Atividade)
         if user_id:
-            # Filter by user's projects or assigned atividades
-            query = query.filter(
-                (Atividade.responsavel_id == user_id) |
-                (Atividade.projeto.has(owner_id=user_id))
+            acessiveis = AtividadeService._acessiveis(user_id)
+            query = query.join(acessiveis, acessiveis.c.id == Atividade.id)
+
+        if status:
+            query = query.filter(Atividade.status.in_(status))
+        if prazo_de:
+            query = query.filter(Atividade.prazo >= prazo_de)
+        if prazo_ate:
+            query = query.filter(Atividade.prazo < prazo_ate + timedelta(days=1))
+        if setor_id:
+            query = query.filter(Atividade.setor_id == setor_id)
+        if responsavel_id:
+            query = query.filter(Atividade.responsavel_id == responsavel_id)
+        if projeto_id:
+            query = query.filter(Atividade.projeto_id == projeto_id)
+
+        relacoes = set(relacoes)
+        for relacao, estrategia in RELACOES_ATIVIDADE.items():
+            atributo = getattr(Atividade, relacao)
+            if relacao in relacoes:
+                query = query.options(estrategia(atributo).lazyload("*"))
+            else:
+                query = query.options(noload(atributo))
+
+        if ordenar:
+            coluna = ORDENACOES_ATIVIDADE[ordenar.lstrip("-")]
+            query = query.order_by(
+                (coluna.desc() if ordenar.startswith("-") else coluna.asc()).nulls_last(),
+                Atividade.id
             )
-        return query.offset(skip).limit(limit).all()
+        return query
     
     @staticmethod
     def get_atividade(db: Session, atividade_id: UUID) -> Optional[Atividade]:
@@ -54,4 +163,105 @@ class AtividadeService:
             db.delete(db_atividade)
             db.commit()
             return True
-        return False 
\ No newline at end of file
+        return False
+
+    @staticmethod
+    def _marcar_lote(db: Session, status: str, agora: datetime, a_partir_de: Optional[datetime],
+                     tamanho_lote: int) -> List[Tuple]:
+        """Um UPDATE ... RETURNING das `tamanho_lote` atividades `status` vencidas de menor prazo (sem commit)
+
+        Devolve (id, responsavel_id, nome, prazo), ids e responsáveis em texto.
+
+        Um status por vez: a subconsulta lê ix_atividades_status_prazo já na ordem
+        de prazo, sem ordenação. As linhas marcadas saem da faixa (mudam de
+        status) e `a_partir_de` (o maior prazo do lote anterior) faz o lote
+        seguinte começar depois delas no índice, em vez de reler as entradas já
+        atualizadas.
+        """
+        vencidas = select(Atividade.id).where(Atividade.status == status, Atividade.prazo < agora)
+        if a_partir_de is not None:
+            vencidas = vencidas.where(Atividade.prazo >= a_partir_de)
+        vencidas = vencidas.order_by(Atividade.prazo).limit(tamanho_lote).scalar_subquery()
+
+        # UPDATE do Core, sem objetos ORM na sessão, e o responsável em texto em
+        # vez de um uuid.UUID por linha
+        tabela = Atividade.__table__
+        return db.execute(
+            update(tabela)
+            .where(tabela.c.id.in_(vencidas))
+            .values(status=STATUS_ATRASADA)
+            .returning(
+                type_coerce(tabela.c.id, String),
+                type_coerce(tabela.c.responsavel_id, String),
+                tabela.c.nome,
+                tabela.c.prazo
+            )
+        ).all()
+
+    @staticmethod
+    def marcar_atrasadas(
+        db: Session,
+        agora: Optional[datetime] = None,
+        tamanho_lote: int = 5000,
+        por_responsavel: Optional[Dict[str, dict]] = None,
+        ao_progredir: Optional[Callable[[int, Dict[str, dict]], None]] = None
+    ) -> Tuple[int, Dict[str, dict]]:
+        """Marcar como "Atrasada" as atividades pendentes com prazo vencido, em lotes
+
+        Um commit por lote (locks curtos, progresso visível). Devolve o total
+        marcado e, por responsável (id em texto), {"total", "exemplos"} para a
+        notificação agregada. `por_responsavel` continua uma agregação anterior
+        (checkpoint do job) e ao_progredir(total, por_responsavel) é chamado
+        após o commit de cada lote. Atividades sem prazo, sem status ou já
+        concluídas não são tocadas.
+        """
+        agora = agora or datetime.now()
+        por_responsavel = por_responsavel if por_responsavel is not None else {}
+        total = 0
+        for status in STATUS_PENDENTES:
+            a_partir_de = None
+            while True:
+                marcadas = AtividadeService._marcar_lote(db, status, agora, a_partir_de, tamanho_lote)
+                # O UPDATE do Core não passa pelo after_flush da busca: o status
+                # (subtítulo do documento) é regravado no mesmo commit
+                SearchService.reindexar_ids(db, "atividade", [linha[0] for linha in marcadas], tamanho_lote)
+                db.commit()
+                for _id, responsavel_id, nome, _prazo in marcadas:
+                    if responsavel_id is None:
+                        continue
+                    agregado = por_responsavel.get(responsavel_id)
+                    if agregado is None:
+                        agregado = por_responsavel[responsavel_id] = {"total": 0, "exemplos": []}
+                    agregado["total"] += 1
+                    if len(agregado["exemplos"]) < EXEMPLOS_POR_NOTIFICACAO:
+                        agregado["exemplos"].append(nome)
+                total += len(marcadas)
+                if marcadas and ao_progredir is not None:
+                    ao_progredir(total, por_responsavel)
+                if len(marcadas) < tamanho_lote:
+                    break
+                a_partir_de = max(prazo for *_, prazo in marcadas)
+        return total, por_responsavel
+
+    @staticmethod
+    def notificar_atrasadas(db: Session, por_responsavel: Dict[str, dict], tamanho_lote: int = 1000) -> int:
+        """Uma notificação por responsável com as atividades que passaram do prazo
+
+        Recebe a agregação de marcar_atrasadas; as notificações são gravadas em
+        INSERTs em lote (NotificacaoService.criar_notificacoes).
+        """
+        notificacoes = []
+        for responsavel_id, agregado in por_responsavel.items():
+            quantidade, exemplos = agregado["total"], agregado["exemplos"]
+            citadas = ", ".join(f'"{nome}"' for nome in exemplos)
+            if quantidade > len(exemplos):
+                citadas += f" e mais {quantidade - len(exemplos)}"
+            notificacoes.append(NotificacaoCreate(
+                tipo=NotificationType.NUDGE,
+                titulo="Atividade atrasada" if quantidade == 1 else f"{quantidade} atividades atrasadas",
+                mensagem=f"Prazo vencido: {citadas}.",
+                usuario_id=UUID(responsavel_id),
+                contexto_tipo="activity",
+                action_url=f"/atividades?status={STATUS_ATRASADA}"
+            ))
+        return NotificacaoService.criar_notificacoes(db, notificacoes, tamanho_lote=tamanho_lote)
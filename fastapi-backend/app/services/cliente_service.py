@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from typing import List, Optional
 from uuid import UUID
+from datetime import date, timedelta
 from ..models.cliente import Cliente
 from ..schemas.cliente import ClienteCreate, ClienteUpdate
 
@@ -9,9 +10,25 @@ class ClienteService:
     """Service for managing clientes"""
     
     @staticmethod
-    def get_clientes(db: Session, skip: int = 0, limit: int = 100) -> List[Cliente]:
+    def get_clientes(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> List[Cliente]:
         """Get all clientes"""
-        return db.query(Cliente).order_by(Cliente.created_at.desc()).offset(skip).limit(limit).all()
+        return ClienteService.query_clientes(db, data_inicio, data_fim).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def query_clientes(db: Session, data_inicio: Optional[date] = None, data_fim: Optional[date] = None) -> Query:
+        """Query (sem executar) dos clientes por data de cadastro, para listagem e exportação"""
+        query = db.query(Cliente)
+        if data_inicio:
+            query = query.filter(Cliente.created_at >= data_inicio)
+        if data_fim:
+            query = query.filter(Cliente.created_at < data_fim + timedelta(days=1))
+        return query.order_by(Cliente.created_at.desc())
     
     @staticmethod
     def get_cliente(db: Session, cliente_id: UUID) -> Optional[Cliente]:
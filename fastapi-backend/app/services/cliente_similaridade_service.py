@@ -0,0 +1,364 @@
+from sqlalchemy import func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import defaultdict
+import logging
+import re
+import threading
+import time
+
+from ..models.cliente import Cliente
+from .search_service import normalizar
+
+logger = logging.getLogger(__name__)
+
+_PALAVRA = re.compile(r"[^\W_]+")
+
+# Sufixo do telefone comparado (ignora +55, DDD e formatação)
+DIGITOS_TELEFONE = 8
+
+
+def trigramas(texto: Optional[str]) -> Set[str]:
+    """Trigramas no mesmo formato do pg_trgm: cada palavra com "  " antes e " " depois"""
+    grams = set()
+    for palavra in _PALAVRA.findall(normalizar(texto)):
+        palavra = f"  {palavra} "
+        grams.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return grams
+
+
+def similaridade(a: Set[str], b: Set[str]) -> float:
+    """Similaridade de trigramas (equivalente ao similarity() do pg_trgm)"""
+    if not a or not b:
+        return 0.0
+    comuns = len(a & b)
+    return comuns / (len(a) + len(b) - comuns)
+
+
+def _digitos(valor: Optional[str]) -> str:
+    return re.sub(r"\D", "", valor or "")
+
+
+def _sufixo_telefone(valor: Optional[str]) -> Optional[str]:
+    digitos = _digitos(valor)
+    return digitos[-DIGITOS_TELEFONE:] if len(digitos) >= DIGITOS_TELEFONE else None
+
+
+class PerfilCliente:
+    """Chaves normalizadas de um cliente usadas na comparação"""
+
+    __slots__ = ("id", "nome", "trigramas", "email", "cpf", "telefones")
+
+    def __init__(self, id, nome=None, email=None, cpf=None, telefone=None, whatsapp=None):
+        self.id = id
+        self.nome = nome
+        self.trigramas = trigramas(nome)
+        self.email = (email or "").strip().lower() or None
+        self.cpf = _digitos(cpf) or None
+        self.telefones = {s for s in (_sufixo_telefone(telefone), _sufixo_telefone(whatsapp)) if s}
+
+    @classmethod
+    def de_cliente(cls, cliente) -> "PerfilCliente":
+        return cls(cliente.id, cliente.nome, cliente.email, cliente.cpf, cliente.telefone, cliente.whatsapp)
+
+
+def comparar(a: PerfilCliente, b: PerfilCliente, min_nome: float) -> Tuple[float, List[str]]:
+    """Pontuação (0-1) e motivos da semelhança entre dois clientes"""
+    motivos = []
+    score = 0.0
+    if a.cpf and a.cpf == b.cpf:
+        motivos.append("cpf")
+        score = 1.0
+    if a.email and a.email == b.email:
+        motivos.append("email")
+        score = max(score, 0.95)
+    if a.telefones & b.telefones:
+        motivos.append("telefone")
+        score = max(score, 0.9)
+    nome = similaridade(a.trigramas, b.trigramas)
+    if nome >= min_nome:
+        motivos.append("nome")
+        score = max(score, nome)
+    if len(motivos) > 1:
+        # Mais de um sinal independente reforça a suspeita
+        score = min(1.0, score + 0.05 * (len(motivos) - 1))
+    return round(score, 4), motivos
+
+
+class IndiceNgramas:
+    """Índice invertido de trigramas em memória (fallback sem pg_trgm)"""
+
+    def __init__(self, perfis: Iterable[PerfilCliente]):
+        self.perfis: Dict[object, PerfilCliente] = {}
+        self.postagens: Dict[str, Set] = defaultdict(set)
+        self.por_email: Dict[str, Set] = defaultdict(set)
+        self.por_cpf: Dict[str, Set] = defaultdict(set)
+        self.por_telefone: Dict[str, Set] = defaultdict(set)
+        for perfil in perfis:
+            self.perfis[perfil.id] = perfil
+            for gram in perfil.trigramas:
+                self.postagens[gram].add(perfil.id)
+            if perfil.email:
+                self.por_email[perfil.email].add(perfil.id)
+            if perfil.cpf:
+                self.por_cpf[perfil.cpf].add(perfil.id)
+            for telefone in perfil.telefones:
+                self.por_telefone[telefone].add(perfil.id)
+
+    def candidatos(self, perfil: PerfilCliente, min_nome: float) -> Set:
+        ids = set()
+        if perfil.email:
+            ids |= self.por_email.get(perfil.email, set())
+        if perfil.cpf:
+            ids |= self.por_cpf.get(perfil.cpf, set())
+        for telefone in perfil.telefones:
+            ids |= self.por_telefone.get(telefone, set())
+        if perfil.trigramas:
+            # Para similaridade >= min_nome é preciso compartilhar pelo menos essa fração dos trigramas
+            minimo = max(1, int(min_nome * len(perfil.trigramas)))
+            contagem: Dict[object, int] = defaultdict(int)
+            for gram in perfil.trigramas:
+                for cliente_id in self.postagens.get(gram, ()):
+                    contagem[cliente_id] += 1
+            ids |= {cliente_id for cliente_id, n in contagem.items() if n >= minimo}
+        return ids
+
+
+class _CacheIndice:
+    """Índice em memória invalidado pela assinatura da tabela (count + datas máximas)
+
+    A assinatura é barata de consultar e muda em qualquer insert/update/delete,
+    inclusive feitos por outros processos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._indice: Optional[IndiceNgramas] = None
+
+    def obter(self, db: Session) -> IndiceNgramas:
+        assinatura = tuple(db.query(
+            func.count(Cliente.id), func.max(Cliente.created_at), func.max(Cliente.updated_at)
+        ).one())
+        with self._lock:
+            if self._indice is None or assinatura != self._assinatura:
+                linhas = db.query(
+                    Cliente.id, Cliente.nome, Cliente.email, Cliente.cpf, Cliente.telefone, Cliente.whatsapp
+                ).yield_per(5000)
+                self._indice = IndiceNgramas(PerfilCliente(*linha) for linha in linhas)
+                self._assinatura = assinatura
+            return self._indice
+
+
+_cache_indice = _CacheIndice()
+
+
+class ClienteSimilaridadeService:
+    """Busca aproximada de clientes e relatório de duplicatas
+
+    PostgreSQL com pg_trgm: candidatos vêm dos índices GIN de trigramas e de
+    expressão (CPF/telefone só com dígitos). Sem pg_trgm: índice de trigramas
+    em memória. A pontuação final é sempre calculada por comparar().
+    """
+
+    _pg_trgm: Optional[bool] = None
+
+    @staticmethod
+    def preparar_indices(engine: Engine) -> bool:
+        """Instalar pg_trgm e criar os índices de busca aproximada (idempotente)"""
+        if engine.dialect.name != "postgresql":
+            ClienteSimilaridadeService._pg_trgm = False
+            return False
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_clientes_nome_trgm "
+                    "ON clientes USING GIN (lower(nome) gin_trgm_ops)"
+                ))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_clientes_email_lower ON clientes (lower(email))"))
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_clientes_cpf_digitos "
+                    "ON clientes (regexp_replace(cpf, '\\D', '', 'g'))"
+                ))
+                for campo in ("telefone", "whatsapp"):
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_clientes_{campo}_sufixo "
+                        f"ON clientes (right(regexp_replace({campo}, '\\D', '', 'g'), {DIGITOS_TELEFONE}))"
+                    ))
+            ClienteSimilaridadeService._pg_trgm = True
+        except DBAPIError as e:
+            # Ex.: usuário do banco sem permissão para CREATE EXTENSION
+            logger.warning(f"pg_trgm indisponível, usando índice de trigramas em memória: {e}")
+            ClienteSimilaridadeService._pg_trgm = False
+        return ClienteSimilaridadeService._pg_trgm
+
+    @staticmethod
+    def _usar_pg_trgm(db: Session) -> bool:
+        if ClienteSimilaridadeService._pg_trgm is None:
+            if db.get_bind().dialect.name == "postgresql":
+                ClienteSimilaridadeService._pg_trgm = db.execute(text(
+                    "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+                )).first() is not None
+            else:
+                ClienteSimilaridadeService._pg_trgm = False
+        return ClienteSimilaridadeService._pg_trgm
+
+    @staticmethod
+    def buscar_similares(
+        db: Session,
+        nome: Optional[str] = None,
+        email: Optional[str] = None,
+        cpf: Optional[str] = None,
+        telefone: Optional[str] = None,
+        whatsapp: Optional[str] = None,
+        excluir_id=None,
+        min_score: float = 0.45,
+        limit: int = 10
+    ) -> List[Tuple[Cliente, float, List[str]]]:
+        """Clientes parecidos com os dados informados, do mais para o menos parecido"""
+        alvo = PerfilCliente(None, nome, email, cpf, telefone, whatsapp)
+        if not (alvo.trigramas or alvo.email or alvo.cpf or alvo.telefones):
+            return []
+
+        if ClienteSimilaridadeService._usar_pg_trgm(db):
+            filtros = []
+            if nome:
+                filtros.append(func.lower(Cliente.nome).op("%")(nome.lower()))
+            if alvo.email:
+                filtros.append(func.lower(Cliente.email) == alvo.email)
+            if alvo.cpf:
+                filtros.append(func.regexp_replace(Cliente.cpf, r"\D", "", "g") == alvo.cpf)
+            for sufixo in alvo.telefones:
+                for campo in (Cliente.telefone, Cliente.whatsapp):
+                    filtros.append(func.right(func.regexp_replace(campo, r"\D", "", "g"), DIGITOS_TELEFONE) == sufixo)
+            query = db.query(Cliente).filter(or_(*filtros))
+            if nome:
+                query = query.order_by(func.similarity(func.lower(Cliente.nome), nome.lower()).desc())
+            candidatos = query.limit(limit * 5).all()
+        else:
+            indice = _cache_indice.obter(db)
+            ids = indice.candidatos(alvo, min_score)
+            candidatos = []
+            if ids:
+                # Pontuar em memória e só buscar do banco os melhores
+                pontuados = sorted(
+                    ids, key=lambda i: comparar(alvo, indice.perfis[i], min_score)[0], reverse=True
+                )[:limit * 5]
+                candidatos = db.query(Cliente).filter(Cliente.id.in_(pontuados)).all()
+
+        resultados = []
+        for cliente in candidatos:
+            if excluir_id is not None and cliente.id == excluir_id:
+                continue
+            score, motivos = comparar(alvo, PerfilCliente.de_cliente(cliente), min_score)
+            if motivos and score >= min_score:
+                resultados.append((cliente, score, motivos))
+        resultados.sort(key=lambda r: r[1], reverse=True)
+        return resultados[:limit]
+
+    @staticmethod
+    def relatorio_duplicatas(db: Session, min_score: float = 0.6, max_bloco: int = 50, max_postagem: int = 1000) -> dict:
+        """Relatório de possíveis duplicatas em toda a tabela, em passadas por blocos
+
+        1ª passada: blocos por CPF, e-mail e telefone (chaves exatas).
+        2ª passada: nomes via índice invertido de trigramas, ignorando trigramas
+        muito frequentes (mais de max_postagem clientes), que só geram ruído.
+        Nunca compara todos contra todos.
+        """
+        inicio = time.perf_counter()
+        linhas = db.query(
+            Cliente.id, Cliente.nome, Cliente.email, Cliente.cpf, Cliente.telefone, Cliente.whatsapp
+        ).yield_per(5000)
+        perfis = [PerfilCliente(*linha) for linha in linhas]
+        indice = IndiceNgramas(perfis)
+        posicao = {perfil.id: i for i, perfil in enumerate(perfis)}
+
+        pares: Dict[Tuple, Tuple[float, List[str]]] = {}
+        comparacoes = 0
+        blocos_ignorados = []
+
+        def avaliar(a: PerfilCliente, b: PerfilCliente):
+            nonlocal comparacoes
+            chave = (a.id, b.id) if posicao[a.id] < posicao[b.id] else (b.id, a.id)
+            if chave in pares:
+                return
+            comparacoes += 1
+            score, motivos = comparar(a, b, min_score)
+            if motivos and score >= min_score:
+                pares[chave] = (score, motivos)
+
+        # 1ª passada: chaves exatas
+        for campo, blocos in (("cpf", indice.por_cpf), ("email", indice.por_email), ("telefone", indice.por_telefone)):
+            for chave, ids in blocos.items():
+                if len(ids) < 2:
+                    continue
+                if len(ids) > max_bloco:
+                    # Valor genérico (ex.: e-mail de preenchimento) não é sinal de duplicata
+                    blocos_ignorados.append({"campo": campo, "valor": chave, "clientes": len(ids)})
+                    continue
+                membros = sorted(ids, key=posicao.get)
+                for i, a in enumerate(membros):
+                    for b in membros[i + 1:]:
+                        avaliar(indice.perfis[a], indice.perfis[b])
+
+        # 2ª passada: nomes parecidos
+        for perfil in perfis:
+            if not perfil.trigramas:
+                continue
+            uteis = [g for g in perfil.trigramas if len(indice.postagens[g]) <= max_postagem]
+            minimo = max(1, int(min_score * len(uteis)))
+            contagem: Dict[object, int] = defaultdict(int)
+            for gram in uteis:
+                for cliente_id in indice.postagens[gram]:
+                    if posicao[cliente_id] > posicao[perfil.id]:
+                        contagem[cliente_id] += 1
+            for cliente_id, n in contagem.items():
+                if n >= minimo:
+                    avaliar(perfil, indice.perfis[cliente_id])
+
+        # Agrupar pares encadeados (A~B, B~C) com union-find
+        pai = {}
+
+        def raiz(x):
+            pai.setdefault(x, x)
+            while pai[x] != x:
+                pai[x] = pai[pai[x]]
+                x = pai[x]
+            return x
+
+        for a, b in pares:
+            pai[raiz(a)] = raiz(b)
+
+        grupos: Dict[object, dict] = {}
+        for (a, b), (score, motivos) in pares.items():
+            grupo = grupos.setdefault(raiz(a), {"clientes": set(), "pares": [], "score_max": 0.0})
+            grupo["clientes"].update((a, b))
+            grupo["pares"].append({"cliente_id": a, "similar_id": b, "score": score, "motivos": motivos})
+            grupo["score_max"] = max(grupo["score_max"], score)
+
+        resultado = []
+        for grupo in sorted(grupos.values(), key=lambda g: g["score_max"], reverse=True):
+            resultado.append({
+                "clientes": [
+                    {
+                        "id": cliente_id,
+                        "nome": indice.perfis[cliente_id].nome,
+                        "email": indice.perfis[cliente_id].email,
+                        "cpf": indice.perfis[cliente_id].cpf,
+                    }
+                    for cliente_id in sorted(grupo["clientes"], key=posicao.get)
+                ],
+                "pares": sorted(grupo["pares"], key=lambda p: p["score"], reverse=True),
+                "score_max": grupo["score_max"],
+            })
+
+        return {
+            "total_clientes": len(perfis),
+            "comparacoes": comparacoes,
+            "grupos": resultado,
+            "blocos_ignorados": blocos_ignorados,
+            "duracao_segundos": round(time.perf_counter() - inicio, 3),
+        }
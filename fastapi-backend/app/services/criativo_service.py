@@ -5,20 +5,159 @@ from uuid import UUID
 from datetime import datetime
 
 from ..models.criativo import Criativo, StatusCriativo, TipoArquivo
+from ..models.criativo_status_counter import CriativoStatusCounter
 from ..models.project import Project
 from ..models.user_project import UserProject
 from ..services.user_project_service import UserProjectService
 from ..schemas.criativo import (
     CriativoCreate, CriativoUpdate, CriativoResponse, 
     CriativoKanban, CriativosKanbanResponse, CriativosStats,
-    PRIORIDADE_REVERSE_MAP
+    PRIORIDADE_MAP, PRIORIDADE_REVERSE_MAP
 )
+from ..schemas import criativo as criativo_schemas
+from ..schemas.serializacao import Serializador, conversor_enum
+
+
+def _prioridade_para_enum(valor):
+    return PRIORIDADE_MAP.get(valor, criativo_schemas.PrioridadeCriativo.MEDIA)
+
+
+_CONVERSORES_CRIATIVO = {
+    "status": conversor_enum(criativo_schemas.StatusCriativo),
+    "tipo_arquivo": conversor_enum(criativo_schemas.TipoArquivo),
+    "prioridade": _prioridade_para_enum,
+}
+
+# Colunas do banco -> campos de resposta (titulo = nome, tipo_arquivo = tipo, ...)
+CRIATIVO_RESPONSE = Serializador(CriativoResponse, {
+    "id": Criativo.id,
+    "titulo": Criativo.nome,
+    "descricao": Criativo.descricao,
+    "status": Criativo.status,
+    "tipo_arquivo": Criativo.tipo,
+    "arquivo_bruto_url": Criativo.arquivo_cru_key,
+    "arquivo_editado_url": Criativo.arquivo_editado_key,
+    "criado_por_id": Criativo.criado_por_id,
+    "editado_por_id": Criativo.editor_id,
+    "projeto_id": Criativo.projeto_id,
+    "prioridade": Criativo.prioridade,
+    "prazo": Criativo.prazo,
+    "observacoes": Criativo.observacoes,
+    "created_at": Criativo.created_at,
+    "updated_at": Criativo.updated_at,
+}, _CONVERSORES_CRIATIVO)
+
+CRIATIVO_KANBAN = Serializador(CriativoKanban, {
+    "id": Criativo.id,
+    "titulo": Criativo.nome,
+    "descricao": Criativo.descricao,
+    "status": Criativo.status,
+    "tipo_arquivo": Criativo.tipo,
+    "prioridade": Criativo.prioridade,
+    "prazo": Criativo.prazo,
+    "criado_por_id": Criativo.criado_por_id,
+    "editado_por_id": Criativo.editor_id,
+    "projeto_id": Criativo.projeto_id,
+    "created_at": Criativo.created_at,
+    "updated_at": Criativo.updated_at,
+}, _CONVERSORES_CRIATIVO)
 
 
 class CriativoService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _ajustar_contador_status(self, projeto_id: Optional[UUID], status, delta: int) -> None:
+        """Somar delta ao contador (projeto, status) sem fazer commit"""
+        if not projeto_id or not status or not delta:
+            return
+        # Aceitar tanto o enum do modelo quanto o do schema
+        status = StatusCriativo(getattr(status, "value", status))
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+        
+        if insert is not None:
+            # Upsert atômico: incrementa a linha existente ou cria uma nova
+            stmt = insert(CriativoStatusCounter).values(
+                projeto_id=projeto_id,
+                status=status,
+                count=delta,
+                updated_at=datetime.utcnow()
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["projeto_id", "status"],
+                set_={
+                    "count": CriativoStatusCounter.__table__.c.count + delta,
+                    "updated_at": datetime.utcnow()
+                }
+            )
+            self.db.execute(stmt)
+            return
+        
+        counter = self.db.query(CriativoStatusCounter).filter(
+            CriativoStatusCounter.projeto_id == projeto_id,
+            CriativoStatusCounter.status == status
+        ).with_for_update().first()
+        if counter:
+            counter.count = counter.count + delta
+        else:
+            self.db.add(CriativoStatusCounter(projeto_id=projeto_id, status=status, count=delta))
+        self.db.flush()
+
+    def _stats_from_counters(self, projeto_ids: Optional[List[UUID]] = None) -> CriativosStats:
+        """Montar estatísticas a partir dos contadores materializados
+
+        Só contam projetos existentes: no SQLite (sem PRAGMA foreign_keys) o
+        ON DELETE CASCADE não roda e bancos antigos podem ter linhas órfãs.
+        """
+        query = self.db.query(
+            CriativoStatusCounter.status,
+            func.sum(CriativoStatusCounter.count).label('count')
+        ).join(Project, Project.id == CriativoStatusCounter.projeto_id)
+        
+        if projeto_ids is not None:
+            query = query.filter(CriativoStatusCounter.projeto_id.in_(projeto_ids))
+        
+        # Inicializar contadores
+        stats = {
+            "total": 0,
+            "material_cru": 0,
+            "em_edicao": 0,
+            "aguardando_revisao": 0,
+            "aprovado": 0,
+            "rejeitado": 0
+        }
+        
+        for status, count in query.group_by(CriativoStatusCounter.status).all():
+            count = max(int(count or 0), 0)
+            stats[status.value] = count
+            stats["total"] += count
+        
+        return CriativosStats(**stats)
+
+    def rebuild_status_counters(self) -> int:
+        """Recalcular todos os contadores de status a partir da tabela de criativos"""
+        rows = self.db.query(
+            Criativo.projeto_id,
+            Criativo.status,
+            func.count(Criativo.id).label('count')
+        ).join(Project, Project.id == Criativo.projeto_id).group_by(Criativo.projeto_id, Criativo.status).all()
+        
+        self.db.query(CriativoStatusCounter).delete(synchronize_session=False)
+        now = datetime.utcnow()
+        self.db.add_all([
+            CriativoStatusCounter(projeto_id=projeto_id, status=status, count=count, updated_at=now)
+            for projeto_id, status, count in rows
+        ])
+        self.db.commit()
+        return len(rows)
+
     def create_criativo(self, criativo_data: CriativoCreate, user_id: UUID, user_is_admin: bool = False) -> CriativoResponse:
         """Criar novo criativo"""
         # Converter dados para o formato do DB
@@ -68,17 +207,19 @@ class CriativoService:
         )
         
         self.db.add(criativo)
+        self.db.flush()
+        self._ajustar_contador_status(criativo.projeto_id, criativo.status, 1)
         self.db.commit()
         self.db.refresh(criativo)
         
-        return CriativoResponse.from_orm_with_mapping(criativo)
+        return CRIATIVO_RESPONSE.de_objeto(criativo)
 
     def get_criativo(self, criativo_id: UUID) -> Optional[CriativoResponse]:
         """Buscar criativo por ID"""
         criativo = self.db.query(Criativo).filter(Criativo.id == criativo_id).first()
         
         if criativo:
-            return CriativoResponse.from_orm_with_mapping(criativo)
+            return CRIATIVO_RESPONSE.de_objeto(criativo)
         return None
 
     def get_criativos(
@@ -90,7 +231,8 @@ class CriativoService:
         limit: int = 100
     ) -> List[CriativoResponse]:
         """Listar criativos com filtros"""
-        query = self.db.query(Criativo)
+        # Projeção de colunas: sem materializar objetos ORM
+        query = self.db.query(*CRIATIVO_RESPONSE.colunas())
         
         if projeto_id:
             query = query.filter(Criativo.projeto_id == projeto_id)
@@ -101,9 +243,9 @@ class CriativoService:
         if tipo_arquivo:
             query = query.filter(Criativo.tipo == tipo_arquivo)
         
-        criativos = query.offset(skip).limit(limit).all()
+        linhas = query.offset(skip).limit(limit).all()
         
-        return [CriativoResponse.from_orm_with_mapping(criativo) for criativo in criativos]
+        return [CRIATIVO_RESPONSE.de_linha(linha) for linha in linhas]
 
     def get_user_criativos(
         self, 
@@ -135,7 +277,7 @@ class CriativoService:
             return []
         
         # Filtrar criativos apenas dos projetos acessíveis
-        query = self.db.query(Criativo).filter(Criativo.projeto_id.in_(accessible_project_ids))
+        query = self.db.query(*CRIATIVO_RESPONSE.colunas()).filter(Criativo.projeto_id.in_(accessible_project_ids))
         
         if projeto_id and projeto_id in accessible_project_ids:
             query = query.filter(Criativo.projeto_id == projeto_id)
@@ -146,9 +288,9 @@ class CriativoService:
         if tipo_arquivo:
             query = query.filter(Criativo.tipo == tipo_arquivo)
         
-        criativos = query.offset(skip).limit(limit).all()
+        linhas = query.offset(skip).limit(limit).all()
         
-        return [CriativoResponse.from_orm_with_mapping(criativo) for criativo in criativos]
+        return [CRIATIVO_RESPONSE.de_linha(linha) for linha in linhas]
 
     def update_criativo(
         self, 
@@ -188,26 +330,38 @@ class CriativoService:
         if 'editado_por_id' in update_data:
             update_data['editor_id'] = update_data.pop('editado_por_id')
         
+        # Converter status do schema para o enum do modelo
+        if update_data.get('status') is not None:
+            update_data['status'] = StatusCriativo(getattr(update_data['status'], 'value', update_data['status']))
+        
         # Se o status foi alterado e há um usuário, marcar como editado por
         if "status" in update_data and user_id:
             update_data["editor_id"] = user_id
         
         update_data["updated_at"] = datetime.utcnow()
         
+        projeto_anterior, status_anterior = criativo.projeto_id, criativo.status
+        
         for field, value in update_data.items():
             if hasattr(criativo, field):
                 setattr(criativo, field, value)
         
+        # Manter contadores de status na mesma transação
+        if (projeto_anterior, status_anterior) != (criativo.projeto_id, criativo.status):
+            self._ajustar_contador_status(projeto_anterior, status_anterior, -1)
+            self._ajustar_contador_status(criativo.projeto_id, criativo.status, 1)
+        
         self.db.commit()
         self.db.refresh(criativo)
         
-        return CriativoResponse.from_orm_with_mapping(criativo)
+        return CRIATIVO_RESPONSE.de_objeto(criativo)
 
     def delete_criativo(self, criativo_id: UUID) -> bool:
         """Deletar criativo"""
         criativo = self.db.query(Criativo).filter(Criativo.id == criativo_id).first()
         
         if criativo:
+            self._ajustar_contador_status(criativo.projeto_id, criativo.status, -1)
             self.db.delete(criativo)
             self.db.commit()
             return True
@@ -216,12 +370,12 @@ class CriativoService:
 
     def get_kanban_view(self, projeto_id: Optional[UUID] = None) -> CriativosKanbanResponse:
         """Buscar criativos organizados por status para visualização Kanban"""
-        query = self.db.query(Criativo)
+        query = self.db.query(*CRIATIVO_KANBAN.colunas())
         
         if projeto_id:
             query = query.filter(Criativo.projeto_id == projeto_id)
         
-        criativos = query.all()
+        linhas = query.all()
         
         # Agrupar por status
         kanban_data = {
@@ -232,11 +386,11 @@ class CriativoService:
             "rejeitado": []
         }
         
-        for criativo in criativos:
-            criativo_kanban = CriativoKanban.from_orm_with_mapping(criativo)
-            kanban_data[criativo.status.value].append(criativo_kanban)
+        for linha in linhas:
+            criativo_kanban = CRIATIVO_KANBAN.de_linha(linha)
+            kanban_data[criativo_kanban.status.value].append(criativo_kanban)
         
-        return CriativosKanbanResponse(**kanban_data)
+        return CriativosKanbanResponse.model_construct(**kanban_data)
 
     def get_user_kanban_view(
         self, 
@@ -265,12 +419,12 @@ class CriativoService:
             )
         
         # Filtrar criativos apenas dos projetos acessíveis
-        query = self.db.query(Criativo).filter(Criativo.projeto_id.in_(accessible_project_ids))
+        query = self.db.query(*CRIATIVO_KANBAN.colunas()).filter(Criativo.projeto_id.in_(accessible_project_ids))
         
         if projeto_id and projeto_id in accessible_project_ids:
             query = query.filter(Criativo.projeto_id == projeto_id)
         
-        criativos = query.all()
+        linhas = query.all()
         
         # Agrupar por status
         kanban_data = {
@@ -281,43 +435,15 @@ class CriativoService:
             "rejeitado": []
         }
         
-        for criativo in criativos:
-            criativo_kanban = CriativoKanban.from_orm_with_mapping(criativo)
-            kanban_data[criativo.status.value].append(criativo_kanban)
+        for linha in linhas:
+            criativo_kanban = CRIATIVO_KANBAN.de_linha(linha)
+            kanban_data[criativo_kanban.status.value].append(criativo_kanban)
         
-        return CriativosKanbanResponse(**kanban_data)
+        return CriativosKanbanResponse.model_construct(**kanban_data)
 
     def get_stats(self, projeto_id: Optional[UUID] = None) -> CriativosStats:
         """Buscar estatísticas dos criativos"""
-        query = self.db.query(Criativo)
-        
-        if projeto_id:
-            query = query.filter(Criativo.projeto_id == projeto_id)
-        
-        # Contar total
-        total = query.count()
-        
-        # Contar por status
-        stats_query = query.with_entities(
-            Criativo.status,
-            func.count(Criativo.id).label('count')
-        ).group_by(Criativo.status).all()
-        
-        # Inicializar contadores
-        stats = {
-            "total": total,
-            "material_cru": 0,
-            "em_edicao": 0,
-            "aguardando_revisao": 0,
-            "aprovado": 0,
-            "rejeitado": 0
-        }
-        
-        # Preencher contadores com dados reais
-        for status, count in stats_query:
-            stats[status.value] = count
-        
-        return CriativosStats(**stats)
+        return self._stats_from_counters([projeto_id] if projeto_id else None)
 
     def get_user_stats(
         self, 
@@ -345,36 +471,10 @@ class CriativoService:
                 total=0, material_cru=0, em_edicao=0, aguardando_revisao=0, aprovado=0, rejeitado=0
             )
         
-        # Filtrar criativos apenas dos projetos acessíveis
-        query = self.db.query(Criativo).filter(Criativo.projeto_id.in_(accessible_project_ids))
-        
         if projeto_id and projeto_id in accessible_project_ids:
-            query = query.filter(Criativo.projeto_id == projeto_id)
-        
-        # Contar total
-        total = query.count()
-        
-        # Contar por status
-        stats_query = query.with_entities(
-            Criativo.status,
-            func.count(Criativo.id).label('count')
-        ).group_by(Criativo.status).all()
-        
-        # Inicializar contadores
-        stats = {
-            "total": total,
-            "material_cru": 0,
-            "em_edicao": 0,
-            "aguardando_revisao": 0,
-            "aprovado": 0,
-            "rejeitado": 0
-        }
-        
-        # Preencher contadores com dados reais
-        for status, count in stats_query:
-            stats[status.value] = count
+            return self._stats_from_counters([projeto_id])
         
-        return CriativosStats(**stats)
+        return self._stats_from_counters(accessible_project_ids)
 
     def change_status(
         self, 
@@ -402,7 +502,10 @@ class CriativoService:
             # Se a transição não for válida, ainda permitir (pode ser necessário pular etapas)
             pass
         
-        # Atualizar status
+        # Atualizar status (e contadores na mesma transação)
+        if current_status != new_status:
+            self._ajustar_contador_status(criativo.projeto_id, current_status, -1)
+            self._ajustar_contador_status(criativo.projeto_id, new_status, 1)
         criativo.status = new_status
         criativo.editor_id = user_id
         criativo.updated_at = datetime.utcnow()
@@ -416,4 +519,4 @@ class CriativoService:
         self.db.commit()
         self.db.refresh(criativo)
         
-        return CriativoResponse.from_orm_with_mapping(criativo) 
\ No newline at end of file
+        return CRIATIVO_RESPONSE.de_objeto(criativo) 
\ No newline at end of file
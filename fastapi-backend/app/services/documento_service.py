@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from typing import List, Optional, Union
 import uuid
 
@@ -25,6 +25,14 @@ class DocumentoService:
     def get_all_documentos(db: Session, skip: int = 0, limit: int = 100) -> List[Documento]:
         return db.query(Documento).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def query_documentos(db: Session, pasta: Optional[str] = None) -> Query:
+        """Query (sem executar) dos documentos, para respostas em streaming"""
+        query = db.query(Documento)
+        if pasta:
+            query = query.filter(Documento.pasta == pasta)
+        return query.order_by(Documento.created_at)
+
     @staticmethod
     def create_documento(db: Session, documento: DocumentoCreate) -> Documento:
         db_documento = Documento(
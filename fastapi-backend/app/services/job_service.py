@@ -0,0 +1,361 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+from datetime import datetime, timedelta
+import logging
+import random
+import uuid
+
+from ..models.job import Job, StatusJob
+from ..core.config import settings
+from ..core.cron import ExpressaoCron
+
+logger = logging.getLogger(__name__)
+
+STATUS_FINAIS = (StatusJob.CONCLUIDO, StatusJob.FALHOU, StatusJob.CANCELADO)
+
+
+class JobCancelado(Exception):
+    """O job foi cancelado (ou perdeu o lease) enquanto executava"""
+
+
+class FalhaDefinitiva(Exception):
+    """Erro que não adianta tentar de novo (dados inválidos, recurso inexistente)"""
+
+
+class Tarefa:
+    """Função registrada com @tarefa e executada pelos workers"""
+
+    def __init__(self, nome: str, funcao: Callable, max_tentativas: int, prioridade: int, cron: Optional[str]):
+        self.nome = nome
+        self.funcao = funcao
+        self.max_tentativas = max_tentativas
+        self.prioridade = prioridade
+        self.cron = ExpressaoCron(cron) if cron else None
+
+
+TAREFAS: Dict[str, Tarefa] = {}
+
+
+def tarefa(nome: str, max_tentativas: int = 3, prioridade: int = 0, cron: Optional[str] = None):
+    """Registrar uma função como tipo de job
+
+    A função recebe o ContextoJob e o payload como argumentos nomeados, e o
+    retorno (dict serializável em JSON) vira o resultado do job. Com `cron`, o
+    agendador dos workers enfileira uma execução a cada ocorrência.
+    """
+    def registrar(funcao: Callable) -> Callable:
+        TAREFAS[nome] = Tarefa(nome, funcao, max_tentativas, prioridade, cron)
+        return funcao
+    return registrar
+
+
+class ContextoJob:
+    """Passado à função da tarefa: sessão, tentativa atual e progresso
+
+    progresso() grava em sessão própria (visível na API na hora), renova o
+    lease e levanta JobCancelado se o job foi cancelado. `estado` guarda um
+    checkpoint da tentativa anterior, para retomar em vez de repetir o trabalho.
+    """
+
+    def __init__(self, db: Session, job: Job, worker_id: str, abrir_sessao: Callable[[], Session]):
+        self.db = db
+        self.job_id = job.id
+        self.tipo = job.tipo
+        self.tentativa = job.tentativas
+        self.criado_por_id = job.criado_por_id
+        self.estado: dict = dict(job.resultado or {})
+        self.worker_id = worker_id
+        self._abrir_sessao = abrir_sessao
+
+    def progresso(self, percentual: float, mensagem: Optional[str] = None, estado: Optional[dict] = None):
+        if estado is not None:
+            self.estado = estado
+        sessao = self._abrir_sessao()
+        try:
+            ativo = JobService.registrar_progresso(
+                sessao, self.job_id, self.worker_id, percentual, mensagem, estado
+            )
+        finally:
+            sessao.close()
+        if not ativo:
+            raise JobCancelado(f"Job {self.job_id} cancelado")
+
+
+class JobService:
+    """Fila de jobs persistente na tabela jobs
+
+    No PostgreSQL a reivindicação é um UPDATE ... WHERE id = (SELECT ... FOR
+    UPDATE SKIP LOCKED): vários workers consultam ao mesmo tempo sem disputar a
+    mesma linha. No SQLite (escritas já serializadas) é um SELECT seguido de
+    UPDATE condicionado ao status. Em ambos os workers fazem polling.
+    """
+
+    @staticmethod
+    def enfileirar(
+        db: Session,
+        tipo: str,
+        payload: Optional[dict] = None,
+        executar_em: Optional[datetime] = None,
+        atraso: Optional[float] = None,
+        prioridade: Optional[int] = None,
+        max_tentativas: Optional[int] = None,
+        chave_idempotencia: Optional[str] = None,
+        criado_por_id: Optional[uuid.UUID] = None,
+        renovar_finalizado: bool = False
+    ) -> Job:
+        """Criar um job; com chave_idempotencia já usada, devolve o job existente
+
+        Com renovar_finalizado, a chave só deduplica jobs ativos: se o job dela já
+        terminou (concluído, falho ou cancelado), a chave é liberada e um novo job
+        é criado (regerar um artefato que sumiu, tentar de novo após falha).
+        """
+        registrada = TAREFAS.get(tipo)
+        if chave_idempotencia:
+            existente = db.query(Job).filter(Job.chave_idempotencia == chave_idempotencia).first()
+            if existente and renovar_finalizado and existente.status in STATUS_FINAIS:
+                existente.chave_idempotencia = None
+                db.flush()
+            elif existente:
+                return existente
+        if executar_em is None:
+            executar_em = datetime.utcnow() + timedelta(seconds=atraso or 0)
+        job = Job(
+            tipo=tipo,
+            payload=payload or {},
+            status=StatusJob.PENDENTE,
+            prioridade=prioridade if prioridade is not None else (registrada.prioridade if registrada else 0),
+            executar_em=executar_em,
+            tentativas=0,
+            max_tentativas=max_tentativas or (registrada.max_tentativas if registrada else 3),
+            progresso=0,
+            chave_idempotencia=chave_idempotencia,
+            criado_por_id=criado_por_id,
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Outra requisição/worker gravou a mesma chave entre a consulta e o INSERT
+            db.rollback()
+            if not chave_idempotencia:
+                raise
+            return db.query(Job).filter(Job.chave_idempotencia == chave_idempotencia).one()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def obter(db: Session, job_id: Union[str, uuid.UUID]) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    @staticmethod
+    def listar(
+        db: Session,
+        usuario_id: Optional[uuid.UUID] = None,
+        status: Optional[StatusJob] = None,
+        tipo: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[Job]:
+        """Jobs mais recentes primeiro; usuario_id=None lista de todos"""
+        query = db.query(Job)
+        if usuario_id is not None:
+            query = query.filter(Job.criado_por_id == usuario_id)
+        if status is not None:
+            query = query.filter(Job.status == status)
+        if tipo:
+            query = query.filter(Job.tipo == tipo)
+        return query.order_by(Job.created_at.desc()).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def existe_ativo(db: Session, tipo: str) -> bool:
+        """Se há um job do tipo pendente ou executando"""
+        return db.query(Job.id).filter(
+            Job.tipo == tipo, Job.status.in_((StatusJob.PENDENTE, StatusJob.EXECUTANDO))
+        ).first() is not None
+
+    @staticmethod
+    def reivindicar(db: Session, worker_id: str, tipos: Optional[Iterable[str]] = None) -> Optional[Job]:
+        """Marcar como executando o próximo job vencido (maior prioridade, mais antigo)"""
+        agora = datetime.utcnow()
+        candidato = select(Job.id).where(Job.status == StatusJob.PENDENTE, Job.executar_em <= agora)
+        if tipos is not None:
+            candidato = candidato.where(Job.tipo.in_(list(tipos)))
+        candidato = candidato.order_by(Job.prioridade.desc(), Job.executar_em).limit(1)
+        valores = dict(
+            status=StatusJob.EXECUTANDO,
+            bloqueado_por=worker_id,
+            bloqueado_ate=agora + timedelta(seconds=settings.jobs_lease_segundos),
+            iniciado_em=agora,
+            tentativas=Job.tentativas + 1,
+        )
+
+        if db.bind.dialect.name == "postgresql":
+            job_id = db.execute(
+                update(Job)
+                .where(Job.id == candidato.with_for_update(skip_locked=True).scalar_subquery())
+                .values(**valores)
+                .returning(Job.id)
+                .execution_options(synchronize_session=False)
+            ).scalar()
+        else:
+            job_id = db.execute(candidato).scalar()
+            if job_id is not None:
+                alteradas = db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == StatusJob.PENDENTE)
+                    .values(**valores)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not alteradas:
+                    # Outro worker reivindicou primeiro; a próxima volta tenta de novo
+                    job_id = None
+        db.commit()
+        if job_id is None:
+            return None
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    @staticmethod
+    def _do_worker(job_id: uuid.UUID, worker_id: str) -> tuple:
+        return (Job.id == job_id, Job.bloqueado_por == worker_id, Job.status == StatusJob.EXECUTANDO)
+
+    @staticmethod
+    def concluir(db: Session, job_id: uuid.UUID, worker_id: str, resultado: Optional[Any] = None) -> bool:
+        """Marcar como concluído (False se o job foi cancelado ou perdeu o lease)"""
+        alteradas = db.execute(
+            update(Job).where(*JobService._do_worker(job_id, worker_id)).values(
+                status=StatusJob.CONCLUIDO,
+                progresso=100,
+                resultado=resultado,
+                erro=None,
+                concluido_em=datetime.utcnow(),
+                bloqueado_por=None,
+                bloqueado_ate=None,
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return bool(alteradas)
+
+    @staticmethod
+    def atraso_nova_tentativa(tentativas: int) -> float:
+        """Backoff exponencial: base, 2x base, 4x base... até o teto, com até 10% de jitter"""
+        atraso = min(settings.jobs_backoff_max, settings.jobs_backoff_base * 2 ** max(tentativas - 1, 0))
+        return atraso * (1 + random.random() * 0.1)
+
+    @staticmethod
+    def falhar(db: Session, job_id: uuid.UUID, worker_id: str, erro: str, definitiva: bool = False) -> Optional[StatusJob]:
+        """Registrar a falha: volta para a fila com backoff ou, esgotadas as tentativas, FALHOU"""
+        job = db.query(Job).filter(*JobService._do_worker(job_id, worker_id)).first()
+        if job is None:
+            db.rollback()
+            return None
+        agora = datetime.utcnow()
+        job.erro = erro[:10000]
+        job.bloqueado_por = None
+        job.bloqueado_ate = None
+        if definitiva or job.tentativas >= job.max_tentativas:
+            job.status = StatusJob.FALHOU
+            job.concluido_em = agora
+        else:
+            job.status = StatusJob.PENDENTE
+            job.executar_em = agora + timedelta(seconds=JobService.atraso_nova_tentativa(job.tentativas))
+        db.commit()
+        return job.status
+
+    @staticmethod
+    def registrar_progresso(
+        db: Session,
+        job_id: uuid.UUID,
+        worker_id: str,
+        percentual: float,
+        mensagem: Optional[str] = None,
+        estado: Optional[dict] = None
+    ) -> bool:
+        """Gravar progresso e renovar o lease; False se o job não está mais com este worker"""
+        valores = dict(
+            progresso=max(0, min(100, int(percentual))),
+            bloqueado_ate=datetime.utcnow() + timedelta(seconds=settings.jobs_lease_segundos),
+        )
+        if mensagem is not None:
+            valores["progresso_mensagem"] = mensagem[:500]
+        if estado is not None:
+            # Checkpoint da execução, lido pela próxima tentativa (ContextoJob.estado)
+            valores["resultado"] = estado
+        alteradas = db.execute(
+            update(Job).where(*JobService._do_worker(job_id, worker_id)).values(**valores)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return bool(alteradas)
+
+    @staticmethod
+    def cancelar(db: Session, job: Job) -> bool:
+        """Cancelar um job pendente ou em execução (este para no próximo progresso)"""
+        if job.status in STATUS_FINAIS:
+            return False
+        job.status = StatusJob.CANCELADO
+        job.concluido_em = datetime.utcnow()
+        job.bloqueado_por = None
+        job.bloqueado_ate = None
+        db.commit()
+        return True
+
+    @staticmethod
+    def recuperar_expirados(db: Session) -> int:
+        """Devolver à fila os jobs cujo worker morreu (lease vencido sem progresso)"""
+        agora = datetime.utcnow()
+        expirado = (Job.status == StatusJob.EXECUTANDO, Job.bloqueado_ate < agora)
+        recolocados = db.execute(
+            update(Job).where(*expirado, Job.tentativas < Job.max_tentativas).values(
+                status=StatusJob.PENDENTE, executar_em=agora, bloqueado_por=None, bloqueado_ate=None,
+                erro="Lease expirado: o worker parou sem concluir",
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        esgotados = db.execute(
+            update(Job).where(*expirado).values(
+                status=StatusJob.FALHOU, concluido_em=agora, bloqueado_por=None, bloqueado_ate=None,
+                erro="Lease expirado na última tentativa",
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if recolocados or esgotados:
+            logger.warning(f"Jobs com lease expirado: {recolocados} recolocados, {esgotados} falharam")
+        return recolocados + esgotados
+
+    @staticmethod
+    def agendar_cron(db: Session, agora: Optional[datetime] = None) -> int:
+        """Enfileirar a próxima ocorrência de cada tarefa com cron
+
+        A chave de idempotência cron:<tarefa>:<horário> garante um job por
+        ocorrência mesmo com vários workers agendando ao mesmo tempo.
+        """
+        agora = agora or datetime.utcnow()
+        criados = 0
+        for registrada in TAREFAS.values():
+            if registrada.cron is None:
+                continue
+            proxima = registrada.cron.proxima(agora)
+            chave = f"cron:{registrada.nome}:{proxima:%Y%m%d%H%M}"
+            if db.query(Job.id).filter(Job.chave_idempotencia == chave).first() is not None:
+                continue
+            JobService.enfileirar(db, registrada.nome, executar_em=proxima, chave_idempotencia=chave)
+            criados += 1
+        return criados
+
+    @staticmethod
+    def limpar_finalizados(db: Session, dias: int) -> int:
+        """Remover jobs finalizados há mais de `dias` dias"""
+        limite = datetime.utcnow() - timedelta(days=dias)
+        removidos = db.query(Job).filter(
+            Job.status.in_(STATUS_FINAIS), Job.concluido_em < limite
+        ).delete(synchronize_session=False)
+        db.commit()
+        return removidos
+
+    @staticmethod
+    def contagem_por_status(db: Session) -> Dict[str, int]:
+        contagem = {status.value: 0 for status in StatusJob}
+        for status, total in db.query(Job.status, func.count(Job.id)).group_by(Job.status):
+            contagem[status.value] = total
+        return contagem
@@ -0,0 +1,182 @@
+from typing import Iterable, List, Optional
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from .job_service import TAREFAS, FalhaDefinitiva, JobCancelado, ContextoJob, JobService
+
+logger = logging.getLogger(__name__)
+
+# Agendamento de cron e recuperação de leases expirados
+INTERVALO_MANUTENCAO = 30.0
+
+
+def worker_no_processo() -> bool:
+    """JOBS_WORKER_NO_PROCESSO explícito ou, sem valor, apenas em development"""
+    if settings.jobs_worker_no_processo is not None:
+        return settings.jobs_worker_no_processo
+    return settings.environment == "development"
+
+
+class WorkerJobs:
+    """Executores da fila de jobs em threads
+
+    Cada executor reivindica um job por vez, roda a tarefa registrada e grava
+    conclusão ou falha (com backoff). Uma thread de manutenção enfileira as
+    tarefas com cron e devolve à fila jobs de workers que morreram. parar()
+    espera os jobs em andamento terminarem.
+    """
+
+    def __init__(self, concorrencia: Optional[int] = None, intervalo: Optional[float] = None, tipos: Optional[Iterable[str]] = None):
+        # Registrar as tarefas da aplicação
+        from . import tarefas  # noqa: F401
+
+        self.concorrencia = max(1, concorrencia or settings.jobs_concorrencia)
+        self.intervalo = settings.jobs_intervalo_polling if intervalo is None else intervalo
+        self.tipos = list(tipos) if tipos else None
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._parar = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.executados = 0
+        self.falhas = 0
+        self.em_execucao = 0
+
+    def iniciar(self):
+        if self._threads:
+            return
+        self._parar.clear()
+        self._threads.append(threading.Thread(target=self._loop_manutencao, name="jobs-manutencao", daemon=True))
+        for indice in range(self.concorrencia):
+            self._threads.append(threading.Thread(target=self._loop_executor, name=f"jobs-executor-{indice}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Worker de jobs {self.id} iniciado com {self.concorrencia} executor(es)")
+
+    def parar(self, timeout: Optional[float] = 30.0):
+        self._parar.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Worker de jobs {self.id} parado")
+
+    def aguardar(self):
+        """Bloquear até parar() (processo worker dedicado)"""
+        while not self._parar.wait(1.0):
+            pass
+
+    def manutencao(self):
+        db = SessionLocal()
+        try:
+            JobService.recuperar_expirados(db)
+            JobService.agendar_cron(db)
+        finally:
+            db.close()
+
+    def _loop_manutencao(self):
+        while not self._parar.is_set():
+            try:
+                self.manutencao()
+            except Exception as e:
+                logger.error(f"Erro na manutenção da fila de jobs: {e}")
+            self._parar.wait(INTERVALO_MANUTENCAO)
+
+    def _loop_executor(self):
+        while not self._parar.is_set():
+            try:
+                executou = self.executar_proximo()
+            except Exception as e:
+                # Banco indisponível, por exemplo: espera e tenta de novo
+                logger.error(f"Erro ao reivindicar job: {e}")
+                executou = False
+            if not executou:
+                self._parar.wait(self.intervalo)
+
+    def executar_pendentes(self) -> int:
+        """Executar na thread atual todos os jobs vencidos (python worker.py --uma-vez)"""
+        total = 0
+        while self.executar_proximo():
+            total += 1
+        return total
+
+    def executar_proximo(self) -> bool:
+        """Reivindicar e executar um job; False se a fila não tem job vencido"""
+        db = SessionLocal()
+        try:
+            job = JobService.reivindicar(db, self.id, self.tipos)
+            if job is None:
+                return False
+            with self._lock:
+                self.em_execucao += 1
+            try:
+                self._executar(db, job)
+            finally:
+                with self._lock:
+                    self.em_execucao -= 1
+            return True
+        finally:
+            db.close()
+
+    def _executar(self, db, job):
+        job_id, tipo, payload = job.id, job.tipo, dict(job.payload or {})
+        registrada = TAREFAS.get(tipo)
+        if registrada is None:
+            JobService.falhar(db, job_id, self.id, f"Tarefa desconhecida: {tipo}", definitiva=True)
+            return
+        contexto = ContextoJob(db, job, self.id, SessionLocal)
+        logger.info(f"Job {job_id} ({tipo}) tentativa {contexto.tentativa}/{job.max_tentativas}")
+        try:
+            resultado = registrada.funcao(contexto, **payload)
+        except JobCancelado:
+            db.rollback()
+            logger.info(f"Job {job_id} ({tipo}) cancelado durante a execução")
+            return
+        except Exception as e:
+            db.rollback()
+            definitiva = isinstance(e, (FalhaDefinitiva, TypeError))
+            status = JobService.falhar(
+                db, job_id, self.id, f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}", definitiva=definitiva
+            )
+            with self._lock:
+                self.falhas += 1
+            logger.warning(f"Job {job_id} ({tipo}) falhou ({status.value if status else 'cancelado'}): {e}")
+            return
+        JobService.concluir(db, job_id, self.id, resultado)
+        with self._lock:
+            self.executados += 1
+        logger.info(f"Job {job_id} ({tipo}) concluído")
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "ativo": bool(self._threads) and not self._parar.is_set(),
+                "concorrencia": self.concorrencia,
+                "em_execucao": self.em_execucao,
+                "executados": self.executados,
+                "falhas": self.falhas,
+            }
+
+
+# Worker dentro do processo da API (development, ou JOBS_WORKER_NO_PROCESSO=true)
+worker_api: Optional[WorkerJobs] = None
+
+
+def iniciar_worker_api() -> Optional[WorkerJobs]:
+    global worker_api
+    if worker_api is None and worker_no_processo():
+        worker_api = WorkerJobs()
+        worker_api.iniciar()
+    return worker_api
+
+
+def parar_worker_api():
+    global worker_api
+    if worker_api is not None:
+        worker_api.parar()
+        worker_api = None
@@ -1,6 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from uuid import UUID
 from typing import List, Optional
+from datetime import date, timedelta
 
 from ..models.lead import Lead, LeadStage
 from ..schemas.lead import LeadCreate, LeadUpdate, LeadResponse
@@ -23,12 +24,42 @@ class LeadService:
         self.db.refresh(db_lead)
         return LeadResponse.model_validate(db_lead)
     
-    def get_leads(self, user_id: UUID, skip: int = 0, limit: int = 100) -> List[LeadResponse]:
+    def get_leads(
+        self,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        projeto_id: Optional[UUID] = None,
+        stage: Optional[LeadStage] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> List[LeadResponse]:
         """Listar leads do usuário (ou todos se admin)"""
+        leads = self.query_leads(user_id, projeto_id, stage, data_inicio, data_fim).offset(skip).limit(limit).all()
+        return [LeadResponse.model_validate(lead) for lead in leads]
+    
+    def query_leads(
+        self,
+        user_id: UUID,
+        projeto_id: Optional[UUID] = None,
+        stage: Optional[LeadStage] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Query:
+        """Query (sem executar) dos leads com os filtros da listagem, para listagem e exportação"""
         # Por enquanto retornar todos os leads para o funil funcionar
         # TODO: Filtrar por usuário se necessário
-        leads = self.db.query(Lead).order_by(Lead.created_at.desc()).offset(skip).limit(limit).all()
-        return [LeadResponse.model_validate(lead) for lead in leads]
+        query = self.db.query(Lead)
+        if projeto_id:
+            query = query.filter(Lead.projeto_id == projeto_id)
+        if stage:
+            query = query.filter(Lead.stage == stage)
+        if data_inicio:
+            query = query.filter(Lead.created_at >= data_inicio)
+        if data_fim:
+            # Até o fim do dia: created_at tem hora
+            query = query.filter(Lead.created_at < data_fim + timedelta(days=1))
+        return query.order_by(Lead.created_at.desc())
     
     def get_leads_by_stage(self, user_id: UUID, stage: LeadStage) -> List[LeadResponse]:
         """Listar leads por estágio"""
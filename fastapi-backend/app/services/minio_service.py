@@ -1,52 +1,93 @@
 from minio import Minio
 from minio.error import S3Error
 from fastapi import UploadFile, HTTPException
+import io
 import logging
 from typing import IO, Union
+import threading
+import time
+import urllib3
 import uuid
 from datetime import timedelta
 
 from ..core.config import settings
+from ..core.metricas import medir_chamada
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class MinioService:
+    """Cliente MinIO inicializado sob demanda
+
+    Nada de rede no import: o cliente e a verificação do bucket são criados no
+    primeiro uso (ou no aquecimento em segundo plano do startup). Se a
+    inicialização falhar, nova tentativa só depois de MINIO_RETRY_SEGUNDOS, para
+    um MinIO fora do ar não travar cada requisição.
+    """
+
     def __init__(self):
-        try:
-            self.client = Minio(
-                endpoint=settings.minio_endpoint,
-                access_key=settings.minio_access_key,
-                secret_key=settings.minio_secret_key,
-                secure=settings.minio_use_ssl
-            )
-            self.bucket_name = settings.minio_bucket_name
-            self._ensure_bucket_exists()
-            logger.info(f"MinIO client initialized. Endpoint: {settings.minio_endpoint}, Bucket: {self.bucket_name}")
-        except Exception as e:
-            logger.error(f"Error initializing MinIO client: {e}")
-            # Depending on the desired behavior, you might want to re-raise the exception
-            # or handle it in a way that allows the app to start with MinIO disabled.
-            self.client = None 
-            self.bucket_name = None
-            # raise HTTPException(status_code=500, detail=f"Could not initialize MinIO service: {e}")
+        self.bucket_name = settings.minio_bucket_name
+        self._client = None
+        self._inicializado = False
+        self._proxima_tentativa = 0.0
+        self._lock = threading.Lock()
 
+    @property
+    def client(self):
+        if not self._inicializado:
+            self._inicializar()
+        return self._client
 
-    def _ensure_bucket_exists(self):
-        if not self.client:
-            logger.warning("MinIO client not available. Skipping bucket check.")
-            return
+    @property
+    def pronto(self) -> bool:
+        """Cliente criado e bucket verificado (usado pelo /ready)"""
+        return self._inicializado and self._client is not None
+
+    def aquecer(self) -> bool:
+        """Inicializar agora (chamado em segundo plano no startup)"""
+        return self.client is not None
+
+    def _inicializar(self):
+        with self._lock:
+            if self._inicializado or time.monotonic() < self._proxima_tentativa:
+                return
+            try:
+                # Timeouts curtos e poucas tentativas: o padrão do cliente (5 min por
+                # chamada, com retries) segura requisições e o startup quando o MinIO está lento
+                http_client = urllib3.PoolManager(
+                    timeout=urllib3.Timeout(connect=settings.minio_timeout_conexao, read=settings.minio_timeout_leitura),
+                    retries=urllib3.Retry(total=2, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+                    maxsize=10,
+                )
+                client = Minio(
+                    endpoint=settings.minio_endpoint,
+                    access_key=settings.minio_access_key,
+                    secret_key=settings.minio_secret_key,
+                    secure=settings.minio_use_ssl,
+                    region=settings.minio_region or None,
+                    http_client=http_client
+                )
+                self._ensure_bucket_exists(client)
+                self._client = client
+                self._inicializado = True
+                logger.info(f"MinIO client initialized. Endpoint: {settings.minio_endpoint}, Bucket: {self.bucket_name}")
+            except Exception as e:
+                logger.error(f"Error initializing MinIO client: {e}")
+                self._proxima_tentativa = time.monotonic() + settings.minio_retry_segundos
+
+    def _ensure_bucket_exists(self, client: Minio):
         try:
-            found = self.client.bucket_exists(self.bucket_name)
+            with medir_chamada("minio", "bucket_exists"):
+                found = client.bucket_exists(self.bucket_name)
             if not found:
-                self.client.make_bucket(self.bucket_name)
+                client.make_bucket(self.bucket_name)
                 logger.info(f"Bucket '{self.bucket_name}' created successfully.")
             else:
                 logger.info(f"Bucket '{self.bucket_name}' already exists.")
         except S3Error as e:
+            # Erro do servidor (ex.: permissão): o MinIO respondeu, o cliente segue utilizável
             logger.error(f"Error checking or creating bucket '{self.bucket_name}': {e}")
-            # raise HTTPException(status_code=500, detail=f"MinIO bucket operation failed: {e}")
 
 
     def upload_file(self, file: UploadFile, folder: str = "general") -> str:
@@ -61,13 +102,14 @@ class MinioService:
             file.file.seek(0) # Ensure reading from the beginning
             content_length = file.size
 
-            self.client.put_object(
-                bucket_name=self.bucket_name,
-                object_name=object_name,
-                data=file.file,
-                length=content_length, # Pass the content length
-                content_type=file.content_type
-            )
+            with medir_chamada("minio", "put_object"):
+                self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    data=file.file,
+                    length=content_length, # Pass the content length
+                    content_type=file.content_type
+                )
             logger.info(f"File '{file.filename}' uploaded successfully as '{object_name}' to bucket '{self.bucket_name}'.")
             return object_name # Return the object key/name
         except S3Error as e:
@@ -77,15 +119,35 @@ class MinioService:
             logger.error(f"An unexpected error occurred during file upload: {e}")
             raise HTTPException(status_code=500, detail=f"Unexpected error during upload: {e}")
 
+    def upload_bytes(self, content: bytes, object_name: str, content_type: str = "application/octet-stream") -> str:
+        """Gravar conteúdo gerado pela aplicação (relatórios) com a chave informada"""
+        if not self.client:
+            raise HTTPException(status_code=503, detail="MinIO service is not available.")
+        try:
+            with medir_chamada("minio", "put_object"):
+                self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    data=io.BytesIO(content),
+                    length=len(content),
+                    content_type=content_type
+                )
+            logger.info(f"Object '{object_name}' ({len(content)} bytes) uploaded to bucket '{self.bucket_name}'.")
+            return object_name
+        except S3Error as e:
+            logger.error(f"Error uploading object '{object_name}' to MinIO: {e}")
+            raise HTTPException(status_code=500, detail=f"MinIO upload failed: {e}")
+
     def get_download_url(self, object_name: str, expires_in_seconds: int = 3600) -> str:
         if not self.client:
             raise HTTPException(status_code=503, detail="MinIO service is not available.")
         try:
-            url = self.client.presigned_get_object(
-                bucket_name=self.bucket_name,
-                object_name=object_name,
-                expires=timedelta(seconds=expires_in_seconds)  # Convert to timedelta
-            )
+            with medir_chamada("minio", "presigned_get_object"):
+                url = self.client.presigned_get_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    expires=timedelta(seconds=expires_in_seconds)  # Convert to timedelta
+                )
             logger.info(f"Generated presigned URL for '{object_name}'.")
             return url
         except S3Error as e:
@@ -99,11 +161,12 @@ class MinioService:
         if not self.client:
             raise HTTPException(status_code=503, detail="MinIO service is not available.")
         try:
-            self.client.remove_object(self.bucket_name, object_name)
+            with medir_chamada("minio", "remove_object"):
+                self.client.remove_object(self.bucket_name, object_name)
             logger.info(f"File '{object_name}' deleted successfully from bucket '{self.bucket_name}'.")
         except S3Error as e:
             logger.error(f"Error deleting file '{object_name}' from MinIO: {e}")
             raise HTTPException(status_code=500, detail=f"MinIO deletion failed: {e}")
 
-# Global instance of the service
+# Global instance of the service (sem rede até o primeiro uso)
 minio_service = MinioService() 
\ No newline at end of file
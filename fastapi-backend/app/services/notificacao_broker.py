@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+from ..core.config import settings
+from ..core.difusao import LocalBackend, difusao
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # Dependência opcional, só necessária com NOTIFICACAO_BROKER_URL=redis://...
+    redis = None
+
+
+class Assinatura:
+    """Conexão (SSE ou WebSocket) inscrita nos eventos de um usuário"""
+
+    def __init__(self, usuario_id: str, loop: asyncio.AbstractEventLoop, max_eventos: int):
+        self.usuario_id = usuario_id
+        self.loop = loop
+        self.fila: asyncio.Queue = asyncio.Queue(maxsize=max_eventos)
+        self.descartados = 0
+
+    def _entregar(self, evento: dict):
+        """Executado no event loop da conexão"""
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Backpressure: cliente lento não segura memória nem o publicador
+            self.descartados += 1
+
+    async def proximo(self, timeout: float) -> Optional[dict]:
+        """Próximo evento, ou None se nada chegou dentro do timeout (heartbeat)"""
+        if self.descartados:
+            # Eventos foram perdidos: limpar a fila e pedir que o cliente recarregue
+            self.descartados = 0
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            return {"tipo": "resync"}
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBackend:
+    """Backend em processo: entrega direto para as assinaturas locais"""
+
+    def __init__(self, despachar: Callable[[str, dict], None]):
+        self.despachar = despachar
+
+    def publicar(self, usuario_id: str, evento: dict):
+        self.despachar(usuario_id, evento)
+
+
+class DifusaoBackend:
+    """Backend sobre a difusão entre processos (CACHE_INVALIDACAO_URL)
+
+    Sem NOTIFICACAO_BROKER_URL, mas com vários workers, os eventos seguem pelo
+    mesmo canal das invalidações de cache (LISTEN/NOTIFY no PostgreSQL ou Redis).
+    A difusão não devolve as mensagens ao próprio processo: a entrega local é
+    feita aqui. O NOTIFY limita a mensagem a 8000 bytes; eventos maiores viram
+    um "resync" (o cliente recarrega a lista).
+    """
+
+    TIPO = "notificacao_evento"
+    LIMITE_BYTES = 7000
+
+    def __init__(self, despachar: Callable[[str, dict], None], ressincronizar: Callable[[], None]):
+        self.despachar = despachar
+        self.ressincronizar = ressincronizar
+        difusao.registrar(self.TIPO, self._receber)
+
+    def publicar(self, usuario_id: str, evento: dict):
+        self.despachar(usuario_id, evento)
+        if len(json.dumps(evento, default=str)) > self.LIMITE_BYTES:
+            evento = {"tipo": "resync"}
+        difusao.publicar(self.TIPO, {"usuario_id": usuario_id, "evento": evento})
+
+    def _receber(self, dados: Optional[dict]):
+        if dados is None:
+            # Escuta reconectada: eventos podem ter se perdido
+            self.ressincronizar()
+        else:
+            self.despachar(dados["usuario_id"], dados["evento"])
+
+
+class RedisBackend:
+    """Backend Redis pub/sub: entrega para as assinaturas de todos os workers"""
+
+    CANAL = "sistemaxi:notificacoes"
+
+    def __init__(self, url: str, despachar: Callable[[str, dict], None]):
+        self.client = redis.Redis.from_url(url)
+        self.despachar = despachar
+        self._thread = threading.Thread(target=self._escutar, name="notificacao-broker", daemon=True)
+        self._thread.start()
+
+    def publicar(self, usuario_id: str, evento: dict):
+        self.client.publish(self.CANAL, json.dumps({"usuario_id": usuario_id, "evento": evento}))
+
+    def _escutar(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CANAL)
+                for mensagem in pubsub.listen():
+                    dados = json.loads(mensagem["data"])
+                    self.despachar(dados["usuario_id"], dados["evento"])
+            except Exception as e:
+                logger.warning(f"Conexão do broker Redis perdida, reconectando: {e}")
+                time.sleep(1)
+
+
+class NotificacaoBroker:
+    """Pub/sub de eventos de notificação por usuário"""
+
+    def __init__(self):
+        self._assinaturas: Dict[str, Set[Assinatura]] = {}
+        self._lock = threading.Lock()
+        self._backend = None
+
+    @property
+    def backend(self):
+        # Criado sob demanda para não conectar em nada durante o import
+        if self._backend is None:
+            url = settings.notificacao_broker_url
+            if url and url.startswith("redis"):
+                if redis is None:
+                    logger.warning("Pacote redis não instalado, usando broker em memória")
+                    self._backend = MemoryBackend(self._despachar)
+                else:
+                    self._backend = RedisBackend(url, self._despachar)
+            elif not isinstance(difusao.backend, LocalBackend):
+                self._backend = DifusaoBackend(self._despachar, self._ressincronizar)
+            else:
+                self._backend = MemoryBackend(self._despachar)
+        return self._backend
+
+    def assinar(self, usuario_id) -> Assinatura:
+        """Inscrever uma conexão; deve ser chamado de dentro do event loop"""
+        assinatura = Assinatura(
+            str(usuario_id),
+            asyncio.get_running_loop(),
+            settings.notificacao_stream_buffer
+        )
+        with self._lock:
+            self._assinaturas.setdefault(assinatura.usuario_id, set()).add(assinatura)
+        self.backend  # garantir que o listener (Redis) esteja ativo
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura):
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.usuario_id)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.usuario_id]
+
+    def publicar(self, usuario_id, evento: dict):
+        """Publicar evento para um usuário (seguro a partir de qualquer thread)"""
+        try:
+            self.backend.publicar(str(usuario_id), evento)
+        except Exception as e:
+            logger.warning(f"Erro ao publicar evento de notificação: {e}")
+
+    def _despachar(self, usuario_id: str, evento: dict):
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(usuario_id, ()))
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(assinatura._entregar, evento)
+            except RuntimeError:
+                # Event loop já encerrado
+                self.cancelar(assinatura)
+
+    def _ressincronizar(self):
+        """Pedir a todas as conexões locais que recarreguem as notificações"""
+        with self._lock:
+            usuarios = list(self._assinaturas)
+        for usuario_id in usuarios:
+            self._despachar(usuario_id, {"tipo": "resync"})
+
+    @property
+    def total_conexoes(self) -> int:
+        with self._lock:
+            return sum(len(a) for a in self._assinaturas.values())
+
+
+# Global instance of the broker
+notificacao_broker = NotificacaoBroker()
@@ -0,0 +1,220 @@
+from sqlalchemy import insert, select, literal, text
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+
+from ..models.notificacao import Notificacao, NotificacaoArquivada, NotificationStatus
+from ..core.config import settings
+from .notificacao_service import contador_cache
+
+logger = logging.getLogger(__name__)
+
+# Só notificações já tratadas pelo usuário entram na política de retenção
+STATUS_RETIDOS = (NotificationStatus.READ, NotificationStatus.DISMISSED)
+
+MODOS_RETENCAO = ("archive", "delete")
+
+_COLUNAS_ARQUIVO = (
+    "id", "tipo", "titulo", "mensagem", "status", "usuario_id", "from_user_id",
+    "contexto_tipo", "contexto_id", "contexto_nome", "action_url", "read_at", "created_at",
+)
+
+
+def _adicionar_meses(data: datetime, meses: int) -> datetime:
+    ano, mes = divmod(data.month - 1 + meses, 12)
+    return data.replace(year=data.year + ano, month=mes + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+class MetricasRetencao:
+    """Métricas acumuladas das execuções da política de retenção neste processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.total_arquivadas = 0
+        self.total_removidas = 0
+        self.ultima_execucao: Optional[dict] = None
+        self.em_execucao = False
+
+    def registrar(self, resultado: dict):
+        with self._lock:
+            self.execucoes += 1
+            self.total_arquivadas += resultado["arquivadas"]
+            self.total_removidas += resultado["removidas"]
+            self.ultima_execucao = resultado
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "execucoes": self.execucoes,
+                "total_arquivadas": self.total_arquivadas,
+                "total_removidas": self.total_removidas,
+                "em_execucao": self.em_execucao,
+                "ultima_execucao": self.ultima_execucao,
+            }
+
+
+metricas_retencao = MetricasRetencao()
+
+
+class NotificacaoRetencaoService:
+    """Política de retenção da tabela de notificações
+
+    Notificações lidas/descartadas mais antigas que N dias são arquivadas em
+    notificacoes_arquivadas (ou apenas removidas), em lotes pequenos, cada um
+    na sua própria transação, para nunca segurar locks longos na tabela.
+    """
+
+    @staticmethod
+    def aplicar_politica(
+        db: Session,
+        dias: Optional[int] = None,
+        modo: Optional[str] = None,
+        tamanho_lote: Optional[int] = None,
+        pausa: Optional[float] = None,
+        max_lotes: Optional[int] = None
+    ) -> dict:
+        """Executar a política de retenção e retornar as métricas da execução"""
+        dias = settings.notificacao_retencao_dias if dias is None else dias
+        modo = modo or settings.notificacao_retencao_modo
+        tamanho_lote = tamanho_lote or settings.notificacao_retencao_lote
+        pausa = settings.notificacao_retencao_pausa if pausa is None else pausa
+        if modo not in MODOS_RETENCAO:
+            raise ValueError(f"Modo de retenção inválido: {modo}")
+        if dias < 1:
+            raise ValueError("A retenção deve ser de pelo menos 1 dia")
+
+        limite = datetime.utcnow() - timedelta(days=dias)
+        inicio = time.perf_counter()
+        arquivadas = removidas = lotes = 0
+        metricas_retencao.em_execucao = True
+
+        try:
+            if NotificacaoRetencaoService.tabela_particionada(db):
+                NotificacaoRetencaoService.garantir_particoes(db)
+
+            while max_lotes is None or lotes < max_lotes:
+                # SKIP LOCKED (PostgreSQL): não espera linhas que um usuário está alterando
+                linhas = db.query(Notificacao.id, Notificacao.usuario_id).filter(
+                    Notificacao.status.in_(STATUS_RETIDOS),
+                    Notificacao.created_at < limite
+                ).order_by(Notificacao.created_at).limit(tamanho_lote).with_for_update(skip_locked=True).all()
+                if not linhas:
+                    break
+
+                ids = [linha.id for linha in linhas]
+                # Revalidar o status: a linha pode ter mudado desde o SELECT (SQLite não trava)
+                filtro = (Notificacao.id.in_(ids), Notificacao.status.in_(STATUS_RETIDOS))
+                if modo == "archive":
+                    colunas = [getattr(Notificacao, nome) for nome in _COLUNAS_ARQUIVO]
+                    arquivadas += db.execute(
+                        insert(NotificacaoArquivada).from_select(
+                            list(_COLUNAS_ARQUIVO) + ["archived_at"],
+                            select(*colunas, literal(datetime.utcnow())).where(*filtro)
+                        )
+                    ).rowcount
+                removidas += db.query(Notificacao).filter(*filtro).delete(synchronize_session=False)
+                db.commit()
+                lotes += 1
+
+                for usuario_id in {linha.usuario_id for linha in linhas}:
+                    contador_cache.invalidar(usuario_id)
+
+                if len(linhas) < tamanho_lote:
+                    break
+                if pausa:
+                    time.sleep(pausa)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            metricas_retencao.em_execucao = False
+
+        resultado = {
+            "modo": modo,
+            "dias": dias,
+            "limite": limite.isoformat(),
+            "lotes": lotes,
+            "arquivadas": arquivadas,
+            "removidas": removidas,
+            "duracao_segundos": round(time.perf_counter() - inicio, 3),
+            "executado_em": datetime.utcnow().isoformat(),
+        }
+        metricas_retencao.registrar(resultado)
+        logger.info(f"Retenção de notificações: {resultado}")
+        return resultado
+
+    @staticmethod
+    def tamanho_tabelas(db: Session) -> Dict[str, dict]:
+        """Linhas e bytes ocupados por notificacoes e notificacoes_arquivadas
+
+        No PostgreSQL usa as estatísticas do catálogo (somando as partições),
+        para não fazer COUNT(*) numa tabela grande.
+        """
+        tamanhos = {}
+        postgres = db.bind.dialect.name == "postgresql"
+        for modelo in (Notificacao, NotificacaoArquivada):
+            tabela = modelo.__tablename__
+            if postgres:
+                linhas, tamanho = db.execute(text(
+                    "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint, "
+                    "COALESCE(SUM(pg_total_relation_size(c.oid)), 0)::bigint "
+                    "FROM pg_class c "
+                    "WHERE c.oid = to_regclass(:tabela) "
+                    "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:tabela))"
+                ), {"tabela": tabela}).one()
+                tamanhos[tabela] = {"linhas": int(linhas), "bytes": int(tamanho), "estimado": True}
+            else:
+                linhas = db.query(modelo).count()
+                tamanhos[tabela] = {"linhas": linhas, "bytes": None, "estimado": False}
+        return tamanhos
+
+    @staticmethod
+    def tabela_particionada(db: Session) -> bool:
+        """Se notificacoes foi convertida para particionamento por mês (PostgreSQL)"""
+        if db.bind.dialect.name != "postgresql":
+            return False
+        return db.execute(text(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('notificacoes')"
+        )).scalar() or False
+
+    @staticmethod
+    def garantir_particoes(db: Session, meses_a_frente: int = 3, desde: Optional[datetime] = None) -> List[str]:
+        """Criar as partições mensais que faltam até meses_a_frente meses no futuro"""
+        de = _adicionar_meses(desde or datetime.utcnow(), 0)
+        fim = _adicionar_meses(datetime.utcnow(), meses_a_frente)
+        criadas = []
+        while de <= fim:
+            ate = _adicionar_meses(de, 1)
+            nome = f"notificacoes_p{de:%Y%m}"
+            if db.execute(text("SELECT to_regclass(:nome)"), {"nome": nome}).scalar() is None:
+                db.execute(text(
+                    f"CREATE TABLE {nome} PARTITION OF notificacoes "
+                    f"FOR VALUES FROM ('{de:%Y-%m-%d}') TO ('{ate:%Y-%m-%d}')"
+                ))
+                criadas.append(nome)
+            de = ate
+        db.commit()
+        if criadas:
+            logger.info(f"Partições de notificações criadas: {criadas}")
+        return criadas
+
+
+def executar_retencao(**opcoes) -> Optional[dict]:
+    """Rodar a política de retenção numa sessão própria (tarefas em segundo plano e scripts)"""
+    from ..core.database import SessionLocal
+
+    if metricas_retencao.em_execucao:
+        logger.info("Retenção de notificações já em execução, ignorando")
+        return None
+    db = SessionLocal()
+    try:
+        return NotificacaoRetencaoService.aplicar_politica(db, **opcoes)
+    except Exception as e:
+        logger.error(f"Erro na retenção de notificações: {e}")
+        return None
+    finally:
+        db.close()
@@ -1,10 +1,140 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import insert, func, case, and_
+from sqlalchemy.orm import Session, joinedload
+from typing import Callable, Dict, Iterable, List, Optional
+from contextlib import contextmanager
+import threading
 import uuid
 from datetime import datetime
 from ..models.notificacao import Notificacao, NotificationType, NotificationStatus
 from ..schemas.notificacao import NotificacaoCreate, NotificacaoUpdate
 from ..models.user import User
+from ..core.config import settings
+from ..core.difusao import difusao
+from .notificacao_broker import notificacao_broker
+
+TIPOS_URGENTES = (NotificationType.NUDGE, NotificationType.URGENT)
+
+
+def evento_notificacao(notificacao: Notificacao) -> dict:
+    """Payload publicado no broker quando uma notificação é criada"""
+    return {
+        "tipo": "notificacao",
+        "notificacao": {
+            "id": str(notificacao.id),
+            "tipo": notificacao.tipo.value if notificacao.tipo else None,
+            "titulo": notificacao.titulo,
+            "mensagem": notificacao.mensagem,
+            "contexto_tipo": notificacao.contexto_tipo,
+            "contexto_id": str(notificacao.contexto_id) if notificacao.contexto_id else None,
+            "contexto_nome": notificacao.contexto_nome,
+            "action_url": notificacao.action_url,
+            "created_at": notificacao.created_at.isoformat() if notificacao.created_at else None
+        }
+    }
+
+
+class ContadorNotificacoesCache:
+    """Cache em processo dos contadores (total/unread/urgent) por usuário
+
+    Atualizado pelas escritas do NotificacaoService após o commit. Cada usuário
+    tem uma geração incrementada a cada escrita: um recálculo vindo do banco só
+    é armazenado se nenhuma escrita aconteceu enquanto a consulta rodava, nem
+    enquanto houver escrita em andamento (entre o commit e o ajuste, um
+    recálculo já enxerga a linha nova e o ajuste a somaria de novo). Os
+    outros workers recebem a escrita pela difusão e descartam os contadores do
+    usuário (o próximo GET recalcula).
+    """
+
+    def __init__(self):
+        self._contadores: Dict[uuid.UUID, Dict[str, int]] = {}
+        self._geracoes: Dict[uuid.UUID, int] = {}
+        self._pendentes: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+        difusao.registrar("contador_notificacoes", self._invalidacao_remota)
+
+    @property
+    def ativo(self) -> bool:
+        return settings.notificacao_count_cache
+
+    def obter(self, usuario_id: uuid.UUID) -> Optional[Dict[str, int]]:
+        with self._lock:
+            contadores = self._contadores.get(usuario_id)
+            return dict(contadores) if contadores is not None else None
+
+    def geracao(self, usuario_id: uuid.UUID) -> int:
+        with self._lock:
+            return self._geracoes.get(usuario_id, 0)
+
+    def armazenar(self, usuario_id: uuid.UUID, contadores: Dict[str, int], geracao: int):
+        with self._lock:
+            if self._geracoes.get(usuario_id, 0) == geracao and not self._pendentes.get(usuario_id):
+                self._contadores[usuario_id] = dict(contadores)
+
+    @contextmanager
+    def escrita(self, usuario_ids: Iterable[uuid.UUID]):
+        """Envolver commit + ajuste: recálculos concluídos no meio não são armazenados"""
+        usuario_ids = set(usuario_ids)
+        with self._lock:
+            for usuario_id in usuario_ids:
+                self._pendentes[usuario_id] = self._pendentes.get(usuario_id, 0) + 1
+                self._geracoes[usuario_id] = self._geracoes.get(usuario_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for usuario_id in usuario_ids:
+                    restantes = self._pendentes.get(usuario_id, 0) - 1
+                    if restantes > 0:
+                        self._pendentes[usuario_id] = restantes
+                    else:
+                        self._pendentes.pop(usuario_id, None)
+                    self._geracoes[usuario_id] = self._geracoes.get(usuario_id, 0) + 1
+
+    def ajustar(self, usuario_id: uuid.UUID, total: int = 0, unread: int = 0, urgent: int = 0):
+        with self._lock:
+            self._geracoes[usuario_id] = self._geracoes.get(usuario_id, 0) + 1
+            contadores = self._contadores.get(usuario_id)
+            if contadores is not None:
+                contadores["total"] = max(contadores["total"] + total, 0)
+                contadores["unread"] = max(contadores["unread"] + unread, 0)
+                contadores["urgent"] = max(contadores["urgent"] + urgent, 0)
+        self._difundir(usuario_id)
+
+    def invalidar(self, usuario_id: Optional[uuid.UUID] = None):
+        self._invalidar_local(usuario_id)
+        self._difundir(usuario_id)
+
+    def _difundir(self, usuario_id: Optional[uuid.UUID]):
+        if self.ativo:
+            difusao.publicar("contador_notificacoes", str(usuario_id) if usuario_id is not None else None)
+
+    def _invalidacao_remota(self, usuario_id: Optional[str]):
+        """Escrita feita em outro worker (None = descartar todos os usuários)"""
+        self._invalidar_local(uuid.UUID(usuario_id) if usuario_id is not None else None)
+
+    def _invalidar_local(self, usuario_id: Optional[uuid.UUID] = None):
+        with self._lock:
+            if usuario_id is None:
+                for key in self._contadores:
+                    self._geracoes[key] = self._geracoes.get(key, 0) + 1
+                self._contadores.clear()
+            else:
+                self._geracoes[usuario_id] = self._geracoes.get(usuario_id, 0) + 1
+                self._contadores.pop(usuario_id, None)
+
+
+contador_cache = ContadorNotificacoesCache()
+
+
+def _registrar_criadas(notificacoes: List[Notificacao]):
+    """Atualizar o cache de contadores para notificações recém-criadas (não lidas)"""
+    for n in notificacoes:
+        contador_cache.ajustar(
+            n.usuario_id,
+            total=1,
+            unread=1,
+            urgent=1 if n.tipo in TIPOS_URGENTES else 0
+        )
 
 
 class NotificacaoService:
@@ -33,8 +163,11 @@ class NotificacaoService:
             status=NotificationStatus.UNREAD
         )
         db.add(db_notificacao)
-        db.commit()
-        db.refresh(db_notificacao)
+        with contador_cache.escrita([notificacao.usuario_id]):
+            db.commit()
+            db.refresh(db_notificacao)
+            _registrar_criadas([db_notificacao])
+        notificacao_broker.publicar(db_notificacao.usuario_id, evento_notificacao(db_notificacao))
         return db_notificacao
     
     @staticmethod
@@ -42,31 +175,147 @@ class NotificacaoService:
         db: Session,
         notificacao: NotificacaoCreate,
         usuario_ids: List[uuid.UUID],
-        from_user_id: Optional[uuid.UUID] = None
+        from_user_id: Optional[uuid.UUID] = None,
+        commit: bool = True
     ) -> List[Notificacao]:
-        """Criar notificações para múltiplos usuários"""
-        notificacoes = []
-        for usuario_id in usuario_ids:
-            db_notificacao = Notificacao(
-                tipo=notificacao.tipo,
-                titulo=notificacao.titulo,
-                mensagem=notificacao.mensagem,
-                usuario_id=usuario_id,
-                from_user_id=from_user_id or notificacao.from_user_id,
-                contexto_tipo=notificacao.contexto_tipo,
-                contexto_id=notificacao.contexto_id,
-                contexto_nome=notificacao.contexto_nome,
-                action_url=notificacao.action_url,
-                status=NotificationStatus.UNREAD
-            )
-            db.add(db_notificacao)
-            notificacoes.append(db_notificacao)
+        """Criar notificações para múltiplos usuários (um único INSERT ... RETURNING)"""
+        if not usuario_ids:
+            return []
         
-        db.commit()
-        for notif in notificacoes:
-            db.refresh(notif)
+        base = {
+            "tipo": notificacao.tipo,
+            "titulo": notificacao.titulo,
+            "mensagem": notificacao.mensagem,
+            "from_user_id": from_user_id or notificacao.from_user_id,
+            "contexto_tipo": notificacao.contexto_tipo,
+            "contexto_id": notificacao.contexto_id,
+            "contexto_nome": notificacao.contexto_nome,
+            "action_url": notificacao.action_url,
+            "status": NotificationStatus.UNREAD
+        }
+        rows = [{**base, "id": uuid.uuid4(), "usuario_id": usuario_id} for usuario_id in usuario_ids]
+        
+        # Bulk insert com RETURNING (executemany em lote no SQLite), sem refresh por linha
+        notificacoes = db.scalars(
+            insert(Notificacao).returning(Notificacao),
+            rows
+        ).all()
+        
+        if commit:
+            with contador_cache.escrita(usuario_ids):
+                db.commit()
+                # O commit expira os objetos: recarregar todos com um único SELECT
+                # em vez de um refresh implícito por linha na serialização
+                db.query(Notificacao).options(
+                    joinedload(Notificacao.from_user)
+                ).filter(Notificacao.id.in_([row["id"] for row in rows])).all()
+                _registrar_criadas(notificacoes)
+            for n in notificacoes:
+                notificacao_broker.publicar(n.usuario_id, evento_notificacao(n))
         return notificacoes
     
+    @staticmethod
+    def criar_notificacoes_em_lotes(
+        db: Session,
+        notificacao: NotificacaoCreate,
+        usuario_ids: List[uuid.UUID],
+        from_user_id: Optional[uuid.UUID] = None,
+        tamanho_lote: int = 1000,
+        ao_progredir: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """Criar notificações em lotes, com um commit por lote (para audiências grandes)
+
+        ao_progredir recebe o total já gravado após o commit de cada lote.
+        """
+        total = 0
+        for inicio in range(0, len(usuario_ids), tamanho_lote):
+            lote = usuario_ids[inicio:inicio + tamanho_lote]
+            criadas = NotificacaoService.criar_notificacao_multiplos_usuarios(
+                db, notificacao, lote, from_user_id=from_user_id, commit=False
+            )
+            # Montar eventos antes do commit, enquanto os objetos ainda estão carregados
+            eventos = [(n.usuario_id, evento_notificacao(n)) for n in criadas]
+            with contador_cache.escrita(usuario_id for usuario_id, _ in eventos):
+                db.commit()
+                _registrar_criadas(criadas)
+            for usuario_id, evento in eventos:
+                notificacao_broker.publicar(usuario_id, evento)
+            # Liberar objetos do lote anterior da sessão
+            db.expunge_all()
+            total += len(lote)
+            if ao_progredir is not None:
+                ao_progredir(total)
+        return total
+
+    @staticmethod
+    def criar_notificacoes(
+        db: Session,
+        notificacoes: List[NotificacaoCreate],
+        tamanho_lote: int = 1000
+    ) -> int:
+        """Criar notificações diferentes entre si (uma por usuario_id), em lotes
+
+        Para avisos agregados por destinatário gerados por jobs: um INSERT em lote
+        e um commit por lote, sem recarregar as linhas.
+        """
+        total = 0
+        for inicio in range(0, len(notificacoes), tamanho_lote):
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "tipo": n.tipo,
+                    "titulo": n.titulo,
+                    "mensagem": n.mensagem,
+                    "usuario_id": n.usuario_id,
+                    "from_user_id": n.from_user_id,
+                    "contexto_tipo": n.contexto_tipo,
+                    "contexto_id": n.contexto_id,
+                    "contexto_nome": n.contexto_nome,
+                    "action_url": n.action_url,
+                    "status": NotificationStatus.UNREAD
+                }
+                for n in notificacoes[inicio:inicio + tamanho_lote]
+            ]
+            criadas = db.scalars(insert(Notificacao).returning(Notificacao), rows).all()
+            eventos = [(n.usuario_id, evento_notificacao(n)) for n in criadas]
+            with contador_cache.escrita(usuario_id for usuario_id, _ in eventos):
+                db.commit()
+                _registrar_criadas(criadas)
+            for usuario_id, evento in eventos:
+                notificacao_broker.publicar(usuario_id, evento)
+            db.expunge_all()
+            total += len(rows)
+        return total
+
+    @staticmethod
+    def resolver_destinatarios(
+        db: Session,
+        usuario_ids: Optional[List[uuid.UUID]] = None,
+        projeto_id: Optional[uuid.UUID] = None,
+        setor_id: Optional[uuid.UUID] = None
+    ) -> List[uuid.UUID]:
+        """Resolver a audiência: IDs explícitos + membros do projeto + usuários do setor"""
+        from ..models.project import Project
+        from ..models.user_project import UserProject
+        
+        destinatarios = dict.fromkeys(usuario_ids or [])
+        
+        if projeto_id:
+            membros = db.query(UserProject.user_id).filter(UserProject.project_id == projeto_id)
+            owner = db.query(Project.owner_id).filter(Project.id == projeto_id)
+            for (user_id,) in membros.union(owner).all():
+                destinatarios.setdefault(user_id)
+        
+        if setor_id:
+            usuarios_setor = db.query(User.id).filter(
+                User.setor_id == setor_id,
+                User.is_active == True
+            ).all()
+            for (user_id,) in usuarios_setor:
+                destinatarios.setdefault(user_id)
+        
+        return list(destinatarios)
+    
     @staticmethod
     def listar_notificacoes_usuario(
         db: Session,
@@ -75,8 +324,10 @@ class NotificacaoService:
         limit: int = 100,
         apenas_nao_lidas: bool = False
     ) -> List[Notificacao]:
-        """Listar notificações de um usuário"""
-        query = db.query(Notificacao).filter(Notificacao.usuario_id == usuario_id)
+        """Listar notificações de um usuário (com o remetente carregado)"""
+        query = db.query(Notificacao).options(
+            joinedload(Notificacao.from_user)
+        ).filter(Notificacao.usuario_id == usuario_id)
         
         if apenas_nao_lidas:
             query = query.filter(Notificacao.status == NotificationStatus.UNREAD)
@@ -89,23 +340,28 @@ class NotificacaoService:
         db: Session,
         usuario_id: uuid.UUID
     ) -> dict:
-        """Contar notificações de um usuário"""
-        total = db.query(Notificacao).filter(Notificacao.usuario_id == usuario_id).count()
-        unread = db.query(Notificacao).filter(
-            Notificacao.usuario_id == usuario_id,
-            Notificacao.status == NotificationStatus.UNREAD
-        ).count()
-        urgent = db.query(Notificacao).filter(
-            Notificacao.usuario_id == usuario_id,
-            Notificacao.status == NotificationStatus.UNREAD,
-            Notificacao.tipo.in_([NotificationType.NUDGE, NotificationType.URGENT])
-        ).count()
-        
-        return {
-            "total": total,
-            "unread": unread,
-            "urgent": urgent
+        """Contar notificações de um usuário (uma única agregação condicional)"""
+        if contador_cache.ativo:
+            contadores = contador_cache.obter(usuario_id)
+            if contadores is not None:
+                return contadores
+            geracao = contador_cache.geracao(usuario_id)
+        
+        nao_lida = Notificacao.status == NotificationStatus.UNREAD
+        total, unread, urgent = db.query(
+            func.count(Notificacao.id),
+            func.count(case((nao_lida, 1))),
+            func.count(case((and_(nao_lida, Notificacao.tipo.in_(TIPOS_URGENTES)), 1)))
+        ).filter(Notificacao.usuario_id == usuario_id).one()
+        
+        contadores = {
+            "total": total or 0,
+            "unread": unread or 0,
+            "urgent": urgent or 0
         }
+        if contador_cache.ativo:
+            contador_cache.armazenar(usuario_id, contadores, geracao)
+        return contadores
     
     @staticmethod
     def marcar_como_lida(
@@ -114,16 +370,30 @@ class NotificacaoService:
         usuario_id: uuid.UUID
     ) -> Optional[Notificacao]:
         """Marcar notificação como lida"""
-        notificacao = db.query(Notificacao).filter(
+        # UPDATE condicional: apenas quem de fato muda o status ajusta os contadores,
+        # mesmo com várias requisições concorrentes para a mesma notificação
+        alteradas = db.query(Notificacao).filter(
             Notificacao.id == notificacao_id,
-            Notificacao.usuario_id == usuario_id
-        ).first()
-        
-        if notificacao:
-            notificacao.status = NotificationStatus.READ
-            notificacao.read_at = datetime.utcnow().isoformat()
+            Notificacao.usuario_id == usuario_id,
+            Notificacao.status == NotificationStatus.UNREAD
+        ).update({
+            "status": NotificationStatus.READ,
+            "read_at": datetime.utcnow().isoformat()
+        }, synchronize_session=False)
+        with contador_cache.escrita([usuario_id]):
             db.commit()
-            db.refresh(notificacao)
+            
+            notificacao = db.query(Notificacao).filter(
+                Notificacao.id == notificacao_id,
+                Notificacao.usuario_id == usuario_id
+            ).first()
+            
+            if alteradas and notificacao:
+                contador_cache.ajustar(
+                    usuario_id,
+                    unread=-1,
+                    urgent=-1 if notificacao.tipo in TIPOS_URGENTES else 0
+                )
         
         return notificacao
     
@@ -141,6 +411,9 @@ class NotificacaoService:
             "read_at": datetime.utcnow().isoformat()
         })
         db.commit()
+        # Descartar em vez de zerar: uma notificação criada entre o commit e o
+        # ajuste do cache já teria somado 1 e seria apagada junto
+        contador_cache.invalidar(usuario_id)
         return count
     
     @staticmethod
@@ -155,11 +428,37 @@ class NotificacaoService:
             Notificacao.usuario_id == usuario_id
         ).first()
         
-        if notificacao:
-            db.delete(notificacao)
+        if not notificacao:
+            return False
+        
+        urgente = notificacao.tipo in TIPOS_URGENTES
+        
+        # O status lido acima pode mudar antes do DELETE (marcar como lida em
+        # paralelo): a condição de não lida vai no próprio DELETE, e só ele
+        # decide se o contador de não lidas cai
+        nao_lidas_removidas = db.query(Notificacao).filter(
+            Notificacao.id == notificacao_id,
+            Notificacao.usuario_id == usuario_id,
+            Notificacao.status == NotificationStatus.UNREAD
+        ).delete(synchronize_session=False)
+        removidas = nao_lidas_removidas or db.query(Notificacao).filter(
+            Notificacao.id == notificacao_id,
+            Notificacao.usuario_id == usuario_id
+        ).delete(synchronize_session=False)
+        with contador_cache.escrita([usuario_id]):
             db.commit()
-            return True
-        return False
+            
+            # DELETE com verificação de linhas afetadas (exclusões concorrentes contam uma vez)
+            if not removidas:
+                return False
+            
+            contador_cache.ajustar(
+                usuario_id,
+                total=-1,
+                unread=-1 if nao_lidas_removidas else 0,
+                urgent=-1 if nao_lidas_removidas and urgente else 0
+            )
+        return True
     
     @staticmethod
     def verificar_permissao_criar(
@@ -2,9 +2,12 @@ from sqlalchemy.orm import Session
 from typing import List, Optional, Union
 import uuid
 import logging
+from ..models.criativo_status_counter import CriativoStatusCounter
 from ..models.project import Project
+from ..models.relatorio_mensal import RelatorioMensal
 from ..models.user_project import UserProject
 from ..schemas.project import ProjectCreate, ProjectUpdate
+from .relatorio_mensal_service import RelatorioMensalService
 
 logger = logging.getLogger(__name__)
 
@@ -162,9 +165,24 @@ class ProjectService:
                 # Log do erro mas continua (pode ser que as tabelas não existam)
                 logger.warning(f"Aviso ao limpar tabelas relacionadas: {e}")
             
+            # Contadores de status dos criativos: o ON DELETE CASCADE não roda no
+            # SQLite sem PRAGMA foreign_keys, e linhas órfãs inflariam as estatísticas
+            db.query(CriativoStatusCounter).filter(
+                CriativoStatusCounter.projeto_id == db_project.id
+            ).delete(synchronize_session=False)
+            
+            # Relatórios mensais: mesmo motivo; os arquivos no MinIO só são
+            # apagados depois do commit (um rollback não perde os arquivos)
+            relatorios_mensais = RelatorioMensalService.chaves_projeto(db, db_project.id)
+            db.query(RelatorioMensal).filter(
+                RelatorioMensal.projeto_id == db_project.id
+            ).delete(synchronize_session=False)
+            
             # As atividades e outros relacionamentos serão excluídos em cascata devido ao cascade="delete"
             db.delete(db_project)
             db.commit()
+            for objeto_key in relatorios_mensais:
+                RelatorioMensalService.remover_arquivo(objeto_key)
             return True
         except ValueError:
             # Re-raise ValueError para que o endpoint possa retornar mensagem apropriada
@@ -1,7 +1,7 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from ..models.proposta import Proposta
 from ..schemas.proposta import PropostaCreate, PropostaUpdate
 
@@ -10,12 +10,39 @@ class PropostaService:
     """Service for managing propostas"""
     
     @staticmethod
-    def get_propostas(db: Session, skip: int = 0, limit: int = 100, cliente_id: Optional[UUID] = None) -> List[Proposta]:
+    def get_propostas(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        cliente_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> List[Proposta]:
         """Get all propostas"""
+        return PropostaService.query_propostas(
+            db, cliente_id, status, data_inicio, data_fim
+        ).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def query_propostas(
+        db: Session,
+        cliente_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        data_inicio: Optional[date] = None,
+        data_fim: Optional[date] = None
+    ) -> Query:
+        """Query (sem executar) das propostas com os filtros da listagem, para listagem e exportação"""
         query = db.query(Proposta)
         if cliente_id:
             query = query.filter(Proposta.cliente_id == cliente_id)
-        return query.order_by(Proposta.ordem, Proposta.prioridade).offset(skip).limit(limit).all()
+        if status:
+            query = query.filter(Proposta.status == status)
+        if data_inicio:
+            query = query.filter(Proposta.data_criacao >= data_inicio)
+        if data_fim:
+            query = query.filter(Proposta.data_criacao < data_fim + timedelta(days=1))
+        return query.order_by(Proposta.ordem, Proposta.prioridade)
     
     @staticmethod
     def get_proposta(db: Session, proposta_id: UUID) -> Optional[Proposta]:
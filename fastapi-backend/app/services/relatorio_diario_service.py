@@ -1,19 +1,90 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import Query, Session
+from sqlalchemy import func, and_, or_, case, extract
 from typing import List, Optional
-from datetime import date, datetime
-from decimal import Decimal
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 import uuid
 
+from ..models.project import Project
 from ..models.relatorio_diario import RelatorioDiario
 from ..schemas.relatorio_diario import (
     RelatorioDiarioCreate, 
     RelatorioDiarioUpdate, 
     RelatorioDiarioResponse,
     EstatisticasRelatorio,
+    MetricasGrupo,
     FiltroRelatorio
 )
 
+CENTAVO = Decimal("0.01")
+
+# Custos unitários derivados: coluna -> quantidade que divide o valor_investido.
+# Calculados no servidor a cada gravação (os valores enviados pelo cliente são
+# ignorados) e, nos períodos, como razão das somas (média ponderada).
+CUSTOS_DERIVADOS = {
+    "custo_por_lead": "leads",
+    "custo_por_registro": "registros",
+    "custo_por_ftd": "ftd",
+}
+
+# ?agrupar_por= de get_metricas_agrupadas
+AGRUPAMENTOS = ("projeto", "mes")
+
+
+def custo_unitario(valor, quantidade) -> Optional[Decimal]:
+    """valor / quantidade arredondado ao centavo; None sem valor ou com quantidade zero"""
+    if valor is None or not quantidade:
+        return None
+    return (Decimal(str(valor)) / Decimal(str(quantidade))).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def calcular_custos(relatorio: RelatorioDiario):
+    """Preencher custo_por_lead/registro/ftd a partir do investimento e das quantidades"""
+    for coluna, quantidade in CUSTOS_DERIVADOS.items():
+        setattr(relatorio, coluna, custo_unitario(relatorio.valor_investido, getattr(relatorio, quantidade)))
+
+
+def _colunas_agregadas() -> list:
+    """Somas de um grupo de relatórios, numa única linha de agregação
+
+    Para cada custo derivado, numerador e denominador são somados só nas linhas
+    que têm os dois (investimento sem a quantidade não entra no custo). A média
+    das razões diárias daria o mesmo peso a um dia com 1 lead e a um com 1000.
+    """
+    colunas = [
+        func.count(RelatorioDiario.id).label("total_relatorios"),
+        func.coalesce(func.sum(RelatorioDiario.valor_investido), 0).label("total_valor_investido"),
+        func.coalesce(func.sum(RelatorioDiario.leads), 0).label("total_leads"),
+        func.coalesce(func.sum(RelatorioDiario.registros), 0).label("total_registros"),
+        func.coalesce(func.sum(RelatorioDiario.deposito), 0).label("total_deposito"),
+        func.coalesce(func.sum(RelatorioDiario.ftd), 0).label("total_ftd"),
+        func.coalesce(func.sum(RelatorioDiario.total_comissao_dia), 0).label("total_comissao"),
+    ]
+    for coluna, quantidade in CUSTOS_DERIVADOS.items():
+        quantidade = getattr(RelatorioDiario, quantidade)
+        pareados = and_(RelatorioDiario.valor_investido.isnot(None), quantidade.isnot(None))
+        colunas.append(func.sum(case((pareados, RelatorioDiario.valor_investido))).label(f"investido_{coluna}"))
+        colunas.append(func.sum(case((pareados, quantidade))).label(f"quantidade_{coluna}"))
+    return colunas
+
+
+def _estatisticas(linha) -> dict:
+    """Campos de EstatisticasRelatorio a partir de uma linha de _colunas_agregadas()"""
+    estatisticas = {
+        "total_relatorios": linha.total_relatorios or 0,
+        "total_valor_investido": Decimal(str(linha.total_valor_investido or 0)),
+        "total_leads": linha.total_leads or 0,
+        "total_registros": linha.total_registros or 0,
+        "total_deposito": Decimal(str(linha.total_deposito or 0)),
+        "total_ftd": linha.total_ftd or 0,
+        "total_comissao": Decimal(str(linha.total_comissao or 0)),
+    }
+    for coluna in CUSTOS_DERIVADOS:
+        estatisticas[f"media_{coluna}"] = custo_unitario(
+            getattr(linha, f"investido_{coluna}"), getattr(linha, f"quantidade_{coluna}")
+        )
+    return estatisticas
+
 
 class RelatorioDiarioService:
     def __init__(self, db: Session):
@@ -27,6 +98,7 @@ class RelatorioDiarioService:
         relatorio_dict.pop('atividades_realizadas_ids', None)
         
         relatorio = RelatorioDiario(**relatorio_dict)
+        calcular_custos(relatorio)
         self.db.add(relatorio)
         self.db.flush()  # Para obter o ID antes do commit
         
@@ -69,17 +141,16 @@ class RelatorioDiarioService:
         filtro: Optional[FiltroRelatorio] = None
     ) -> List[RelatorioDiario]:
         """Listar relatórios de um projeto com filtros opcionais"""
+        return self.query_relatorios(projeto_id, filtro).offset(skip).limit(limit).all()
+    
+    def query_relatorios(self, projeto_id: uuid.UUID, filtro: Optional[FiltroRelatorio] = None) -> Query:
+        """Query (sem executar) dos relatórios do projeto, para listagem e exportação"""
         query = self.db.query(RelatorioDiario).filter(
             RelatorioDiario.projeto_id == projeto_id
         )
+        query = self._filtrar_periodo(query, filtro)
         
-        if filtro:
-            if filtro.data_inicio:
-                query = query.filter(RelatorioDiario.data_referente >= filtro.data_inicio)
-            if filtro.data_fim:
-                query = query.filter(RelatorioDiario.data_referente <= filtro.data_fim)
-        
-        return query.order_by(RelatorioDiario.data_referente.desc()).offset(skip).limit(limit).all()
+        return query.order_by(RelatorioDiario.data_referente.desc())
     
     def update_relatorio(
         self, 
@@ -99,6 +170,7 @@ class RelatorioDiarioService:
         # Atualizar campos normais
         for field, value in update_data.items():
             setattr(relatorio, field, value)
+        calcular_custos(relatorio)
         
         # Atualizar atividades se fornecidas
         if atividades_ids is not None:
@@ -131,43 +203,62 @@ class RelatorioDiarioService:
         projeto_id: uuid.UUID,
         filtro: Optional[FiltroRelatorio] = None
     ) -> EstatisticasRelatorio:
-        """Calcular estatísticas de um projeto"""
+        """Calcular estatísticas de um projeto (custos médios ponderados pelas quantidades)"""
         query = self.db.query(RelatorioDiario).filter(
             RelatorioDiario.projeto_id == projeto_id
         )
+        query = self._filtrar_periodo(query, filtro)
         
+        return EstatisticasRelatorio(**_estatisticas(query.with_entities(*_colunas_agregadas()).first()))
+
+    def get_metricas_agrupadas(
+        self,
+        agrupar_por: str = "projeto",
+        filtro: Optional[FiltroRelatorio] = None
+    ) -> List[MetricasGrupo]:
+        """Estatísticas por projeto ou por mês numa única consulta agregada
+
+        Mesmas métricas de get_estatisticas_projeto, uma linha por grupo
+        (filtro.projeto_id restringe a um projeto). Por projeto, em ordem de
+        investimento decrescente; por mês, em ordem cronológica.
+        """
+        if agrupar_por not in AGRUPAMENTOS:
+            raise ValueError(f"agrupar_por inválido: {agrupar_por} (permitidos: {', '.join(AGRUPAMENTOS)})")
+
+        if agrupar_por == "projeto":
+            chaves = [RelatorioDiario.projeto_id, Project.name]
+            query = self.db.query(*chaves, *_colunas_agregadas()).join(Project, Project.id == RelatorioDiario.projeto_id)
+        else:
+            chaves = [
+                extract("year", RelatorioDiario.data_referente).label("ano"),
+                extract("month", RelatorioDiario.data_referente).label("mes"),
+            ]
+            query = self.db.query(*chaves, *_colunas_agregadas())
+
+        if filtro and filtro.projeto_id:
+            query = query.filter(RelatorioDiario.projeto_id == filtro.projeto_id)
+        query = self._filtrar_periodo(query, filtro).group_by(*chaves)
+
+        if agrupar_por == "projeto":
+            linhas = query.order_by(func.coalesce(func.sum(RelatorioDiario.valor_investido), 0).desc(), Project.name).all()
+            return [
+                MetricasGrupo(grupo=str(linha.projeto_id), projeto_id=linha.projeto_id, projeto_nome=linha.name, **_estatisticas(linha))
+                for linha in linhas
+            ]
+        return [
+            MetricasGrupo(grupo=f"{int(linha.ano):04d}-{int(linha.mes):02d}", **_estatisticas(linha))
+            for linha in query.order_by(*chaves).all()
+        ]
+
+    @staticmethod
+    def _filtrar_periodo(query: Query, filtro: Optional[FiltroRelatorio]) -> Query:
+        """data_inicio e data_fim inclusivos; data_referente é DateTime, então o fim é exclusivo no dia seguinte"""
         if filtro:
             if filtro.data_inicio:
                 query = query.filter(RelatorioDiario.data_referente >= filtro.data_inicio)
             if filtro.data_fim:
-                query = query.filter(RelatorioDiario.data_referente <= filtro.data_fim)
-        
-        # Agregações
-        stats = query.with_entities(
-            func.count(RelatorioDiario.id).label('total_relatorios'),
-            func.coalesce(func.sum(RelatorioDiario.valor_investido), 0).label('total_valor_investido'),
-            func.coalesce(func.sum(RelatorioDiario.leads), 0).label('total_leads'),
-            func.coalesce(func.sum(RelatorioDiario.registros), 0).label('total_registros'),
-            func.coalesce(func.sum(RelatorioDiario.deposito), 0).label('total_deposito'),
-            func.coalesce(func.sum(RelatorioDiario.ftd), 0).label('total_ftd'),
-            func.coalesce(func.sum(RelatorioDiario.total_comissao_dia), 0).label('total_comissao'),
-            func.avg(RelatorioDiario.custo_por_lead).label('media_custo_por_lead'),
-            func.avg(RelatorioDiario.custo_por_registro).label('media_custo_por_registro'),
-            func.avg(RelatorioDiario.custo_por_ftd).label('media_custo_por_ftd')
-        ).first()
-        
-        return EstatisticasRelatorio(
-            total_relatorios=stats.total_relatorios or 0,
-            total_valor_investido=Decimal(str(stats.total_valor_investido or 0)),
-            total_leads=stats.total_leads or 0,
-            total_registros=stats.total_registros or 0,
-            total_deposito=Decimal(str(stats.total_deposito or 0)),
-            total_ftd=stats.total_ftd or 0,
-            total_comissao=Decimal(str(stats.total_comissao or 0)),
-            media_custo_por_lead=Decimal(str(stats.media_custo_por_lead)) if stats.media_custo_por_lead else None,
-            media_custo_por_registro=Decimal(str(stats.media_custo_por_registro)) if stats.media_custo_por_registro else None,
-            media_custo_por_ftd=Decimal(str(stats.media_custo_por_ftd)) if stats.media_custo_por_ftd else None
-        )
+                query = query.filter(RelatorioDiario.data_referente < filtro.data_fim + timedelta(days=1))
+        return query
     
     def get_relatorios_periodo(
         self,
@@ -175,14 +266,10 @@ class RelatorioDiarioService:
         data_inicio: date,
         data_fim: date
     ) -> List[RelatorioDiario]:
-        """Buscar relatórios em um período específico"""
-        return self.db.query(RelatorioDiario).filter(
-            and_(
-                RelatorioDiario.projeto_id == projeto_id,
-                RelatorioDiario.data_referente >= data_inicio,
-                RelatorioDiario.data_referente <= data_fim
-            )
-        ).order_by(RelatorioDiario.data_referente.asc()).all()
+        """Buscar relatórios em um período específico (data_inicio e data_fim inclusivos)"""
+        query = self.db.query(RelatorioDiario).filter(RelatorioDiario.projeto_id == projeto_id)
+        query = self._filtrar_periodo(query, FiltroRelatorio(data_inicio=data_inicio, data_fim=data_fim))
+        return query.order_by(RelatorioDiario.data_referente.asc()).all()
     
     def get_ultimos_relatorios(
         self,
@@ -211,11 +298,9 @@ class RelatorioDiarioService:
         if projeto_id:
             query = query.filter(RelatorioDiario.projeto_id == projeto_id)
         
-        # Aplicar filtros de data se fornecidos
-        if data_inicio:
-            query = query.filter(RelatorioDiario.data_referente >= data_inicio)
-        if data_fim:
-            query = query.filter(RelatorioDiario.data_referente <= data_fim)
+        # Aplicar filtros de data se fornecidos (o último dia inteiro entra)
+        periodo = FiltroRelatorio(data_inicio=data_inicio, data_fim=data_fim)
+        query = self._filtrar_periodo(query, periodo)
             
         # Se não há filtros, usar últimos 6 meses
         if not data_inicio and not data_fim:
@@ -238,9 +323,10 @@ class RelatorioDiarioService:
         if projeto_id:
             monthly_query = monthly_query.filter(RelatorioDiario.projeto_id == projeto_id)
         
-        monthly_query = monthly_query.filter(
-            RelatorioDiario.data_referente >= (data_inicio or datetime.now().date() - timedelta(days=180))
-        ).group_by(
+        monthly_query = self._filtrar_periodo(monthly_query, FiltroRelatorio(
+            data_inicio=data_inicio or datetime.now().date() - timedelta(days=180),
+            data_fim=data_fim
+        )).group_by(
             extract('year', RelatorioDiario.data_referente),
             extract('month', RelatorioDiario.data_referente)
         ).order_by('ano', 'mes')
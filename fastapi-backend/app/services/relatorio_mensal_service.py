@@ -0,0 +1,500 @@
+"""
+Relatório mensal de projeto para o cliente (HTML ou PDF)
+
+Junta as estatísticas financeiras (RelatorioDiarioService.get_estatisticas_projeto),
+o crescimento das redes sociais e a vazão de criativos do mês em um documento
+único. A geração roda na fila de jobs e o arquivo fica no MinIO; o cache é
+chaveado por (projeto, competência, formato, versão dos dados), então pedir de
+novo o mesmo mês só gera outro arquivo se os dados de origem mudaram.
+"""
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from html import escape
+import hashlib
+import json
+import logging
+import uuid
+
+from ..core.config import settings
+from ..models.criativo import Criativo, StatusCriativo
+from ..models.job import Job
+from ..models.metricas_redes_sociais import MetricasRedesSociais
+from ..models.project import Project
+from ..models.relatorio_diario import RelatorioDiario
+from ..models.relatorio_mensal import RelatorioMensal
+from ..schemas.relatorio_diario import FiltroRelatorio
+from .job_service import JobService
+from .minio_service import minio_service
+from .relatorio_diario_service import RelatorioDiarioService
+
+logger = logging.getLogger(__name__)
+
+try:
+    from weasyprint import HTML as HTMLWeasyPrint
+except ImportError:  # Dependência opcional, só necessária para relatórios em PDF
+    HTMLWeasyPrint = None
+
+# Mudanças no layout ou nos cálculos devem incrementar a versão: invalida o cache
+VERSAO_MODELO = 2
+
+TIPO_JOB = "relatorios.mensal"
+
+MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+REDES_SOCIAIS = [
+    ("seguidores_instagram", "Instagram"),
+    ("inscritos_telegram", "Telegram"),
+    ("leads_whatsapp", "WhatsApp"),
+    ("seguidores_facebook", "Facebook"),
+    ("inscritos_youtube", "YouTube"),
+    ("seguidores_tiktok", "TikTok"),
+]
+
+MESES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro",
+]
+
+
+def formatos_disponiveis() -> List[str]:
+    """PDF só com o weasyprint instalado"""
+    return ["html", "pdf"] if HTMLWeasyPrint is not None else ["html"]
+
+
+def competencia(ano: int, mes: int) -> str:
+    return f"{ano:04d}-{mes:02d}"
+
+
+def periodo(ano: int, mes: int) -> Tuple[date, date]:
+    """Primeiro dia do mês e primeiro dia do mês seguinte (intervalo semiaberto)"""
+    inicio = date(ano, mes, 1)
+    proximo = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    return inicio, proximo
+
+
+def _mes_anterior(ano: int, mes: int) -> Tuple[int, int]:
+    return (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+
+
+def _variacao(atual, anterior) -> Optional[float]:
+    """Variação percentual; None sem base de comparação"""
+    if atual is None or not anterior:
+        return None
+    return round((float(atual) - float(anterior)) / abs(float(anterior)) * 100, 1)
+
+
+def _moeda(valor) -> str:
+    texto = f"{float(valor or 0):,.2f}"
+    return "R$ " + texto.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _inteiro(valor) -> str:
+    return "—" if valor is None else f"{int(valor):,}".replace(",", ".")
+
+
+def _percentual(valor) -> str:
+    if valor is None:
+        return "—"
+    return f"{'+' if valor > 0 else ''}{valor:.1f}%".replace(".", ",")
+
+
+class RelatorioMensalService:
+    """Coleta, versão dos dados, renderização e cache dos relatórios mensais"""
+
+    @staticmethod
+    def versao_dados(db: Session, projeto_id: uuid.UUID, ano: int, mes: int) -> str:
+        """Impressão digital dos dados de origem do mês
+
+        Contagem e maior updated_at de cada fonte no período usado pelo relatório
+        (inclusões e edições mudam o máximo, exclusões mudam a contagem), mais o
+        nome do projeto e VERSAO_MODELO. São agregações sobre os índices por
+        projeto e data, baratas perto de gerar o documento.
+        """
+        inicio, proximo = periodo(ano, mes)
+        inicio_anterior, _ = periodo(*_mes_anterior(ano, mes))
+
+        projeto = db.query(Project.name, Project.updated_at).filter(Project.id == projeto_id).first()
+        diarios = db.query(func.count(RelatorioDiario.id), func.max(RelatorioDiario.updated_at)).filter(
+            RelatorioDiario.projeto_id == projeto_id,
+            RelatorioDiario.data_referente >= inicio_anterior,
+            RelatorioDiario.data_referente < proximo
+        ).one()
+        # Todo o histórico até o fim do mês: a base do crescimento é a última medição anterior
+        metricas = db.query(
+            func.count(MetricasRedesSociais.id),
+            func.max(func.coalesce(MetricasRedesSociais.updated_at, MetricasRedesSociais.created_at))
+        ).filter(
+            MetricasRedesSociais.projeto_id == projeto_id,
+            MetricasRedesSociais.data_referente < proximo
+        ).one()
+        criativos = db.query(func.count(Criativo.id), func.max(Criativo.updated_at)).filter(
+            Criativo.projeto_id == projeto_id,
+            or_(
+                (Criativo.created_at >= inicio) & (Criativo.created_at < proximo),
+                (Criativo.data_finalizacao >= inicio) & (Criativo.data_finalizacao < proximo)
+            )
+        ).one()
+
+        partes = [VERSAO_MODELO, list(projeto or []), list(diarios), list(metricas), list(criativos)]
+        return hashlib.sha256(json.dumps(partes, default=str).encode()).hexdigest()[:32]
+
+    @staticmethod
+    def obter_em_cache(db: Session, projeto_id: uuid.UUID, ano: int, mes: int, formato: str, versao: str) -> Optional[RelatorioMensal]:
+        return db.query(RelatorioMensal).filter(
+            RelatorioMensal.projeto_id == projeto_id,
+            RelatorioMensal.competencia == competencia(ano, mes),
+            RelatorioMensal.formato == formato,
+            RelatorioMensal.versao_dados == versao
+        ).first()
+
+    @staticmethod
+    def obter(db: Session, relatorio_id: uuid.UUID) -> Optional[RelatorioMensal]:
+        return db.query(RelatorioMensal).filter(RelatorioMensal.id == relatorio_id).first()
+
+    @staticmethod
+    def listar(db: Session, projeto_id: uuid.UUID, competencia_filtro: Optional[str] = None, limit: int = 24) -> List[RelatorioMensal]:
+        """Relatórios gerados do projeto, mais recentes primeiro"""
+        query = db.query(RelatorioMensal).filter(RelatorioMensal.projeto_id == projeto_id)
+        if competencia_filtro:
+            query = query.filter(RelatorioMensal.competencia == competencia_filtro)
+        return query.order_by(RelatorioMensal.competencia.desc(), RelatorioMensal.created_at.desc()).limit(limit).all()
+
+    @staticmethod
+    def solicitar(
+        db: Session,
+        projeto_id: uuid.UUID,
+        ano: int,
+        mes: int,
+        formato: str,
+        usuario_id: Optional[uuid.UUID] = None
+    ) -> Tuple[Optional[RelatorioMensal], Optional[Job]]:
+        """Relatório em cache para a versão atual dos dados ou o job que vai gerá-lo
+
+        A chave de idempotência inclui a versão: pedidos simultâneos do mesmo mês
+        compartilham o job, e um job anterior que falhou não impede tentar de novo.
+        """
+        versao = RelatorioMensalService.versao_dados(db, projeto_id, ano, mes)
+        relatorio = RelatorioMensalService.obter_em_cache(db, projeto_id, ano, mes, formato, versao)
+        if relatorio is not None:
+            return relatorio, None
+
+        job = JobService.enfileirar(
+            db,
+            TIPO_JOB,
+            payload={"projeto_id": str(projeto_id), "ano": ano, "mes": mes, "formato": formato},
+            chave_idempotencia=f"{TIPO_JOB}:{projeto_id}:{competencia(ano, mes)}:{formato}:{versao}",
+            criado_por_id=usuario_id,
+            renovar_finalizado=True
+        )
+        return None, job
+
+    @staticmethod
+    def coletar_dados(db: Session, projeto_id: uuid.UUID, ano: int, mes: int) -> dict:
+        """Números do mês: financeiro (com o mês anterior), redes sociais e criativos"""
+        projeto = db.query(Project).filter(Project.id == projeto_id).first()
+        if not projeto:
+            raise ValueError("Projeto não encontrado")
+
+        inicio, proximo = periodo(ano, mes)
+        fim = proximo - timedelta(days=1)
+        inicio_anterior, _ = periodo(*_mes_anterior(ano, mes))
+        fim_anterior = inicio - timedelta(days=1)
+
+        # Financeiro: mesmas estatísticas da tela do projeto, mês atual e anterior
+        relatorios = RelatorioDiarioService(db)
+        atual = relatorios.get_estatisticas_projeto(projeto_id, FiltroRelatorio(data_inicio=inicio, data_fim=fim))
+        anterior = relatorios.get_estatisticas_projeto(projeto_id, FiltroRelatorio(data_inicio=inicio_anterior, data_fim=fim_anterior))
+
+        def resumo(estatisticas) -> dict:
+            faturamento = estatisticas.total_deposito + estatisticas.total_comissao
+            lucro = faturamento - estatisticas.total_valor_investido
+            return {
+                "investido": estatisticas.total_valor_investido,
+                "faturamento": faturamento,
+                "lucro": lucro,
+                "roi": round(float(lucro / estatisticas.total_valor_investido), 2) if estatisticas.total_valor_investido else None,
+                "leads": estatisticas.total_leads,
+                "registros": estatisticas.total_registros,
+                "ftd": estatisticas.total_ftd,
+                "deposito": estatisticas.total_deposito,
+                "comissao": estatisticas.total_comissao,
+                "custo_por_lead": estatisticas.media_custo_por_lead,
+                "custo_por_ftd": estatisticas.media_custo_por_ftd,
+                "dias_reportados": estatisticas.total_relatorios,
+            }
+
+        financeiro = resumo(atual)
+        financeiro_anterior = resumo(anterior)
+        variacoes = {
+            chave: _variacao(financeiro[chave], financeiro_anterior[chave])
+            for chave in ("investido", "faturamento", "lucro", "leads", "registros", "ftd")
+        }
+        diarios = relatorios.get_relatorios_periodo(projeto_id, inicio, fim)
+
+        # Redes sociais: última medição do mês contra a última anterior ao mês (ou a primeira do mês)
+        base = db.query(MetricasRedesSociais).filter(
+            MetricasRedesSociais.projeto_id == projeto_id,
+            MetricasRedesSociais.data_referente < inicio
+        ).order_by(MetricasRedesSociais.data_referente.desc()).first()
+        medicoes_mes = db.query(MetricasRedesSociais).filter(
+            MetricasRedesSociais.projeto_id == projeto_id,
+            MetricasRedesSociais.data_referente >= inicio,
+            MetricasRedesSociais.data_referente < proximo
+        ).order_by(MetricasRedesSociais.data_referente.asc()).all()
+        redes = []
+        if medicoes_mes:
+            base = base or medicoes_mes[0]
+            final = medicoes_mes[-1]
+            for campo, nome in REDES_SOCIAIS:
+                valor_final, valor_base = getattr(final, campo), getattr(base, campo)
+                if valor_final is None and valor_base is None:
+                    continue
+                redes.append({
+                    "rede": nome,
+                    "inicio": valor_base,
+                    "fim": valor_final,
+                    "crescimento": (valor_final - valor_base) if valor_final is not None and valor_base is not None else None,
+                    "variacao": _variacao(valor_final, valor_base),
+                })
+
+        # Criativos: entradas no mês e finalizados no mês (aprovados/rejeitados)
+        criados = db.query(Criativo.tipo, func.count(Criativo.id)).filter(
+            Criativo.projeto_id == projeto_id,
+            Criativo.created_at >= inicio,
+            Criativo.created_at < proximo
+        ).group_by(Criativo.tipo).all()
+        finalizados = db.query(Criativo.status, Criativo.created_at, Criativo.data_finalizacao).filter(
+            Criativo.projeto_id == projeto_id,
+            Criativo.status.in_([StatusCriativo.APROVADO, StatusCriativo.REJEITADO]),
+            Criativo.data_finalizacao >= inicio,
+            Criativo.data_finalizacao < proximo
+        ).all()
+        aprovados = [f for f in finalizados if f.status == StatusCriativo.APROVADO]
+        duracoes = [
+            (f.data_finalizacao - f.created_at).total_seconds() / 86400
+            for f in aprovados if f.created_at and f.data_finalizacao
+        ]
+        criativos = {
+            "criados": sum(total for _, total in criados),
+            "criados_por_tipo": {tipo.value: total for tipo, total in criados},
+            "aprovados": len(aprovados),
+            "rejeitados": len(finalizados) - len(aprovados),
+            "taxa_aprovacao": round(len(aprovados) / len(finalizados) * 100, 1) if finalizados else None,
+            "dias_medios_producao": round(sum(duracoes) / len(duracoes), 1) if duracoes else None,
+        }
+
+        return {
+            "projeto": {"id": str(projeto.id), "nome": projeto.name},
+            "competencia": competencia(ano, mes),
+            "mes_nome": f"{MESES[mes - 1]} de {ano}",
+            "financeiro": financeiro,
+            "financeiro_anterior": financeiro_anterior,
+            "variacoes": variacoes,
+            "diarios": diarios,
+            "redes": redes,
+            "criativos": criativos,
+            "gerado_em": datetime.utcnow(),
+        }
+
+    @staticmethod
+    def renderizar_html(dados: dict) -> str:
+        """Documento HTML autocontido (CSS embutido, pronto para o weasyprint)"""
+        f, v = dados["financeiro"], dados["variacoes"]
+
+        def cartao(titulo: str, valor: str, variacao=None) -> str:
+            classe = "" if variacao is None else (" positivo" if variacao >= 0 else " negativo")
+            detalhe = "" if variacao is None else f'<div class="variacao{classe}">{_percentual(variacao)} vs. mês anterior</div>'
+            return f'<div class="cartao"><div class="rotulo">{escape(titulo)}</div><div class="valor">{valor}</div>{detalhe}</div>'
+
+        cartoes = "".join([
+            cartao("Investimento", _moeda(f["investido"]), v["investido"]),
+            cartao("Faturamento", _moeda(f["faturamento"]), v["faturamento"]),
+            cartao("Lucro", _moeda(f["lucro"]), v["lucro"]),
+            cartao("ROI", "—" if f["roi"] is None else f"{f['roi']:.2f}x".replace(".", ",")),
+            cartao("Leads", _inteiro(f["leads"]), v["leads"]),
+            cartao("Registros", _inteiro(f["registros"]), v["registros"]),
+            cartao("FTD", _inteiro(f["ftd"]), v["ftd"]),
+            cartao("Custo por lead", "—" if f["custo_por_lead"] is None else _moeda(f["custo_por_lead"])),
+        ])
+
+        linhas_diarias = "".join(
+            f"<tr><td>{r.data_referente.strftime('%d/%m')}</td><td>{_moeda(r.valor_investido)}</td>"
+            f"<td>{_inteiro(r.leads or 0)}</td><td>{_inteiro(r.registros or 0)}</td><td>{_inteiro(r.ftd or 0)}</td>"
+            f"<td>{_moeda(r.deposito)}</td><td>{_moeda(r.total_comissao_dia)}</td></tr>"
+            for r in dados["diarios"]
+        ) or '<tr><td colspan="7" class="vazio">Nenhum relatório diário no mês</td></tr>'
+
+        linhas_redes = "".join(
+            f"<tr><td>{escape(r['rede'])}</td><td>{_inteiro(r['inicio'])}</td><td>{_inteiro(r['fim'])}</td>"
+            f"<td>{'—' if r['crescimento'] is None else ('+' if r['crescimento'] > 0 else '') + _inteiro(r['crescimento'])}</td>"
+            f"<td>{_percentual(r['variacao'])}</td></tr>"
+            for r in dados["redes"]
+        ) or '<tr><td colspan="5" class="vazio">Nenhuma métrica de redes sociais no mês</td></tr>'
+
+        c = dados["criativos"]
+        por_tipo = ", ".join(f"{escape(tipo.lower())}: {total}" for tipo, total in sorted(c["criados_por_tipo"].items())) or "—"
+
+        return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Relatório mensal — {escape(dados['projeto']['nome'])} — {dados['mes_nome']}</title>
+<style>
+  @page {{ size: A4; margin: 18mm 14mm; }}
+  body {{ font-family: Helvetica, Arial, sans-serif; color: #1f2937; font-size: 12px; margin: 0; }}
+  h1 {{ font-size: 22px; margin: 0 0 4px; }}
+  h2 {{ font-size: 15px; margin: 28px 0 10px; border-bottom: 2px solid #3b82f6; padding-bottom: 4px; }}
+  .subtitulo {{ color: #6b7280; margin-bottom: 18px; }}
+  .cartoes {{ display: flex; flex-wrap: wrap; gap: 8px; }}
+  .cartao {{ border: 1px solid #e5e7eb; border-radius: 6px; padding: 10px; width: 23%; box-sizing: border-box; }}
+  .rotulo {{ color: #6b7280; font-size: 10px; text-transform: uppercase; }}
+  .valor {{ font-size: 16px; font-weight: bold; margin-top: 2px; }}
+  .variacao {{ font-size: 10px; color: #6b7280; }}
+  .positivo {{ color: #059669; }}
+  .negativo {{ color: #dc2626; }}
+  table {{ width: 100%; border-collapse: collapse; }}
+  th, td {{ text-align: right; padding: 4px 6px; border-bottom: 1px solid #f3f4f6; }}
+  th:first-child, td:first-child {{ text-align: left; }}
+  th {{ background: #f9fafb; font-size: 10px; text-transform: uppercase; color: #6b7280; }}
+  .vazio {{ text-align: center; color: #9ca3af; }}
+  .rodape {{ margin-top: 28px; color: #9ca3af; font-size: 10px; }}
+</style>
+</head>
+<body>
+<h1>{escape(dados['projeto']['nome'])}</h1>
+<div class="subtitulo">Relatório mensal — {dados['mes_nome']} · {f['dias_reportados']} dia(s) reportado(s)</div>
+
+<h2>Resultados financeiros</h2>
+<div class="cartoes">{cartoes}</div>
+
+<h2>Relatórios diários</h2>
+<table>
+<thead><tr><th>Dia</th><th>Investido</th><th>Leads</th><th>Registros</th><th>FTD</th><th>Depósitos</th><th>Comissão</th></tr></thead>
+<tbody>{linhas_diarias}</tbody>
+</table>
+
+<h2>Redes sociais</h2>
+<table>
+<thead><tr><th>Rede</th><th>Início</th><th>Fim</th><th>Crescimento</th><th>Variação</th></tr></thead>
+<tbody>{linhas_redes}</tbody>
+</table>
+
+<h2>Criativos</h2>
+<table>
+<tbody>
+<tr><td>Criados no mês</td><td>{_inteiro(c['criados'])} ({por_tipo})</td></tr>
+<tr><td>Aprovados</td><td>{_inteiro(c['aprovados'])}</td></tr>
+<tr><td>Rejeitados</td><td>{_inteiro(c['rejeitados'])}</td></tr>
+<tr><td>Taxa de aprovação</td><td>{'—' if c['taxa_aprovacao'] is None else str(c['taxa_aprovacao']).replace('.', ',') + '%'}</td></tr>
+<tr><td>Tempo médio até a aprovação</td><td>{'—' if c['dias_medios_producao'] is None else str(c['dias_medios_producao']).replace('.', ',') + ' dia(s)'}</td></tr>
+</tbody>
+</table>
+
+<div class="rodape">Gerado em {dados['gerado_em'].strftime('%d/%m/%Y %H:%M')} UTC</div>
+</body>
+</html>
+"""
+
+    @staticmethod
+    def renderizar(dados: dict, formato: str) -> bytes:
+        html = RelatorioMensalService.renderizar_html(dados)
+        if formato == "pdf":
+            if HTMLWeasyPrint is None:
+                raise ValueError("Formato pdf indisponível: instale o pacote weasyprint")
+            return HTMLWeasyPrint(string=html).write_pdf()
+        return html.encode("utf-8")
+
+    @staticmethod
+    def gerar(
+        db: Session,
+        projeto_id: uuid.UUID,
+        ano: int,
+        mes: int,
+        formato: str,
+        gerado_por_id: Optional[uuid.UUID] = None,
+        job_id: Optional[uuid.UUID] = None,
+        ao_progredir: Optional[Callable[[float, str], None]] = None
+    ) -> RelatorioMensal:
+        """Gerar (ou reaproveitar) o relatório da versão atual dos dados e gravar no MinIO
+
+        A versão é calculada antes da coleta: se os dados mudarem durante a
+        geração, o próximo pedido vê outra versão e gera de novo.
+        """
+        if formato not in MEDIA_TYPES:
+            raise ValueError(f"Formato inválido: {formato}")
+        versao = RelatorioMensalService.versao_dados(db, projeto_id, ano, mes)
+        existente = RelatorioMensalService.obter_em_cache(db, projeto_id, ano, mes, formato, versao)
+        if existente is not None:
+            return existente
+
+        dados = RelatorioMensalService.coletar_dados(db, projeto_id, ano, mes)
+        if ao_progredir:
+            ao_progredir(40, "Dados coletados, gerando o documento")
+        conteudo = RelatorioMensalService.renderizar(dados, formato)
+        if ao_progredir:
+            ao_progredir(80, "Enviando o arquivo")
+
+        objeto_key = f"{settings.relatorio_mensal_pasta.strip('/')}/{projeto_id}/{competencia(ano, mes)}-{versao[:12]}.{formato}"
+        minio_service.upload_bytes(conteudo, objeto_key, MEDIA_TYPES[formato])
+
+        relatorio = RelatorioMensal(
+            projeto_id=projeto_id,
+            competencia=competencia(ano, mes),
+            formato=formato,
+            versao_dados=versao,
+            objeto_key=objeto_key,
+            tamanho_bytes=len(conteudo),
+            gerado_por_id=gerado_por_id,
+            job_id=job_id,
+        )
+        db.add(relatorio)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Outro worker gerou a mesma versão (mesma chave no MinIO)
+            db.rollback()
+            return RelatorioMensalService.obter_em_cache(db, projeto_id, ano, mes, formato, versao)
+        db.refresh(relatorio)
+
+        RelatorioMensalService._remover_versoes_antigas(db, relatorio)
+        logger.info(f"Relatório mensal {relatorio.competencia} do projeto {projeto_id} gerado ({len(conteudo)} bytes, {formato})")
+        return relatorio
+
+    @staticmethod
+    def _remover_versoes_antigas(db: Session, relatorio: RelatorioMensal):
+        """Apagar versões superadas do mesmo mês e formato (registro e arquivo)"""
+        antigos = db.query(RelatorioMensal).filter(
+            RelatorioMensal.projeto_id == relatorio.projeto_id,
+            RelatorioMensal.competencia == relatorio.competencia,
+            RelatorioMensal.formato == relatorio.formato,
+            RelatorioMensal.id != relatorio.id
+        ).all()
+        for antigo in antigos:
+            RelatorioMensalService.remover_arquivo(antigo.objeto_key)
+            db.delete(antigo)
+        if antigos:
+            db.commit()
+
+    @staticmethod
+    def chaves_projeto(db: Session, projeto_id: uuid.UUID) -> List[str]:
+        """Arquivos no MinIO de todos os relatórios mensais do projeto"""
+        return [chave for (chave,) in db.query(RelatorioMensal.objeto_key).filter(RelatorioMensal.projeto_id == projeto_id)]
+
+    @staticmethod
+    def remover_arquivo(objeto_key: str):
+        """Apagar o arquivo de um relatório do MinIO (falha só é registrada)"""
+        try:
+            minio_service.delete_file(objeto_key)
+        except Exception as e:
+            # Arquivo órfão no bucket não impede a limpeza do registro
+            logger.warning(f"Não foi possível remover {objeto_key} do MinIO: {e}")
+
+    @staticmethod
+    def url_download(relatorio: RelatorioMensal) -> str:
+        return minio_service.get_download_url(relatorio.objeto_key, expires_in_seconds=settings.relatorio_mensal_url_expiracao)
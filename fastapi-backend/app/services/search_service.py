@@ -0,0 +1,335 @@
+from sqlalchemy import String, case, event, func, or_, select, text, literal_column, table, column, inspect, type_coerce
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Sequence
+from datetime import datetime
+import logging
+import re
+import unicodedata
+
+from ..models.search_document import SearchDocument
+from ..models.lead import Lead
+from ..models.cliente import Cliente
+from ..models.proposta import Proposta
+from ..models.atividade import Atividade
+from ..models.criativo import Criativo
+from ..models.project import Project
+from ..models.user_project import UserProject
+from ..models.user import User
+from ..schemas.search import SearchHit, SearchResponse
+
+logger = logging.getLogger(__name__)
+
+_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculo e sem acentos, para indexar e consultar do mesmo jeito"""
+    if not texto:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+class IndiceEntidade:
+    """Quais campos de um modelo entram no índice de busca"""
+
+    def __init__(self, modelo, titulo: str, subtitulo: Optional[str], campos: Iterable[str], digitos: Iterable[str] = ()):
+        self.modelo = modelo
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+        self.campos = tuple(campos)
+        # Campos (CPF, telefone) que também são indexados só com os dígitos
+        self.digitos = tuple(digitos)
+        # Só colunas que o modelo tem: clientes e propostas não têm projeto_id
+        self.monitorados = ({titulo, subtitulo, "projeto_id", *self.campos, *self.digitos} - {None}) & set(modelo.__table__.c.keys())
+
+    def documento(self, nome: str, obj) -> dict:
+        def valor(campo):
+            v = getattr(obj, campo, None)
+            return getattr(v, "value", v)
+
+        partes = [valor(campo) for campo in self.campos]
+        partes += [re.sub(r"\D", "", valor(campo) or "") for campo in self.digitos]
+        subtitulo = valor(self.subtitulo) if self.subtitulo else None
+        return {
+            "entidade": nome,
+            "entidade_id": obj.id,
+            "projeto_id": getattr(obj, "projeto_id", None),
+            "titulo": (valor(self.titulo) or "")[:255],
+            "subtitulo": str(subtitulo)[:255] if subtitulo else None,
+            "termos_titulo": normalizar(valor(self.titulo)),
+            "termos": " ".join(normalizar(p) for p in partes if p),
+            "updated_at": datetime.utcnow(),
+        }
+
+
+ENTIDADES: Dict[str, IndiceEntidade] = {
+    "lead": IndiceEntidade(Lead, "nome", "empresa", ("email", "telefone", "empresa", "tags", "observacoes"), ("telefone",)),
+    "cliente": IndiceEntidade(Cliente, "nome", "email", ("cpf", "email", "telefone", "whatsapp", "empreendimento", "observacoes"), ("cpf", "telefone", "whatsapp")),
+    "proposta": IndiceEntidade(Proposta, "titulo", "status", ("descricao", "observacoes")),
+    "atividade": IndiceEntidade(Atividade, "nome", "status", ("descricao", "prioridade")),
+    "criativo": IndiceEntidade(Criativo, "nome", "status", ("descricao", "observacoes", "empresa", "email")),
+}
+
+_POR_MODELO = {indice.modelo: (nome, indice) for nome, indice in ENTIDADES.items()}
+
+_COLUNAS_ATUALIZADAS = ("projeto_id", "titulo", "subtitulo", "termos_titulo", "termos", "updated_at")
+
+_FTS = table("search_documents_fts", column("rowid"))
+
+
+class SearchService:
+    """Busca textual unificada com ranking e prefixo (type-ahead)
+
+    PostgreSQL: coluna tsvector gerada + índice GIN em search_documents.
+    SQLite: tabela FTS5 de conteúdo externo sincronizada por triggers.
+    Outros bancos: LIKE sobre o texto normalizado.
+    """
+
+    _backend: Optional[str] = None  # "postgresql", "fts5" ou "like"
+
+    @staticmethod
+    def preparar_indice(engine: Engine) -> str:
+        """Criar as estruturas de índice fora do ORM (idempotente)"""
+        dialect = engine.dialect.name
+        try:
+            with engine.begin() as conn:
+                if dialect == "postgresql":
+                    conn.execute(text(
+                        "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                        "GENERATED ALWAYS AS ("
+                        "setweight(to_tsvector('simple', termos_titulo), 'A') || "
+                        "setweight(to_tsvector('simple', termos), 'B')) STORED"
+                    ))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_search_documents_vector "
+                        "ON search_documents USING GIN (search_vector)"
+                    ))
+                    SearchService._backend = "postgresql"
+                elif dialect == "sqlite":
+                    conn.execute(text(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+                        "termos_titulo, termos, content='search_documents', content_rowid='id', "
+                        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_documents_ai AFTER INSERT ON search_documents BEGIN "
+                        "INSERT INTO search_documents_fts(rowid, termos_titulo, termos) "
+                        "VALUES (new.id, new.termos_titulo, new.termos); END"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_documents_ad AFTER DELETE ON search_documents BEGIN "
+                        "INSERT INTO search_documents_fts(search_documents_fts, rowid, termos_titulo, termos) "
+                        "VALUES ('delete', old.id, old.termos_titulo, old.termos); END"
+                    ))
+                    conn.execute(text(
+                        "CREATE TRIGGER IF NOT EXISTS search_documents_au AFTER UPDATE ON search_documents BEGIN "
+                        "INSERT INTO search_documents_fts(search_documents_fts, rowid, termos_titulo, termos) "
+                        "VALUES ('delete', old.id, old.termos_titulo, old.termos); "
+                        "INSERT INTO search_documents_fts(rowid, termos_titulo, termos) "
+                        "VALUES (new.id, new.termos_titulo, new.termos); END"
+                    ))
+                    SearchService._backend = "fts5"
+                else:
+                    SearchService._backend = "like"
+        except DBAPIError as e:
+            # Ex.: SQLite compilado sem FTS5 ou PostgreSQL < 12 (sem colunas geradas)
+            logger.warning(f"Índice de busca textual indisponível, usando LIKE: {e}")
+            SearchService._backend = "like"
+        return SearchService._backend
+
+    @staticmethod
+    def _detectar_backend(db: Session) -> str:
+        if SearchService._backend is None:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                existe = db.execute(text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'search_documents' AND column_name = 'search_vector'"
+                )).first()
+                SearchService._backend = "postgresql" if existe else "like"
+            elif dialect == "sqlite":
+                existe = db.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'search_documents_fts'"
+                )).first()
+                SearchService._backend = "fts5" if existe else "like"
+            else:
+                SearchService._backend = "like"
+        return SearchService._backend
+
+    @staticmethod
+    def gravar_documentos(conn: Connection, documentos: List[dict]) -> None:
+        """Inserir ou atualizar documentos do índice"""
+        if not documentos:
+            return
+        dialect = conn.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            # executemany (insertmanyvalues agrupa as linhas): a instrução compilada
+            # fica em cache, em vez de um VALUES com todos os documentos por chamada
+            stmt = insert(SearchDocument.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["entidade", "entidade_id"],
+                set_={c: stmt.excluded[c] for c in _COLUNAS_ATUALIZADAS}
+            )
+            conn.execute(stmt, documentos)
+            return
+
+        tabela = SearchDocument.__table__
+        for doc in documentos:
+            conn.execute(tabela.delete().where(
+                tabela.c.entidade == doc["entidade"],
+                tabela.c.entidade_id == doc["entidade_id"]
+            ))
+        conn.execute(tabela.insert(), documentos)
+
+    @staticmethod
+    def _indexar_alteracoes(session: Session, flush_context) -> None:
+        """after_flush: manter o índice na mesma transação das escritas"""
+        documentos = []
+        removidos: Dict[str, list] = {}
+        projetos_removidos = []
+
+        for obj in session.new:
+            registro = _POR_MODELO.get(type(obj))
+            if registro:
+                documentos.append(registro[1].documento(registro[0], obj))
+
+        for obj in session.dirty:
+            registro = _POR_MODELO.get(type(obj))
+            if registro and obj not in session.deleted:
+                estado = inspect(obj)
+                # Só reindexar quando um campo indexado mudou (ex.: mover lead de coluna não reindexa)
+                if any(estado.attrs[campo].history.has_changes() for campo in registro[1].monitorados):
+                    documentos.append(registro[1].documento(registro[0], obj))
+
+        for obj in session.deleted:
+            registro = _POR_MODELO.get(type(obj))
+            if registro:
+                removidos.setdefault(registro[0], []).append(obj.id)
+            elif isinstance(obj, Project):
+                projetos_removidos.append(obj.id)
+
+        if not (documentos or removidos or projetos_removidos):
+            return
+
+        conn = session.connection()
+        tabela = SearchDocument.__table__
+        SearchService.gravar_documentos(conn, documentos)
+        for entidade, ids in removidos.items():
+            conn.execute(tabela.delete().where(tabela.c.entidade == entidade, tabela.c.entidade_id.in_(ids)))
+        if projetos_removidos:
+            conn.execute(tabela.delete().where(tabela.c.projeto_id.in_(projetos_removidos)))
+
+    @staticmethod
+    def reindexar_ids(db: Session, entidade: str, ids: Sequence, tamanho_lote: int = 1000) -> int:
+        """Regravar os documentos de registros alterados por escritas em lote (sem commit)
+
+        UPDATEs do Core não passam pelo after_flush: quem escreve em lote chama
+        este método na mesma transação. Lê só as colunas indexadas, sem carregar
+        objetos ORM; os ids podem vir crus de um RETURNING (texto no SQLite).
+        """
+        indice = ENTIDADES[entidade]
+        tabela = indice.modelo.__table__
+        colunas = [tabela.c.id, *(tabela.c[campo] for campo in sorted(indice.monitorados))]
+        ids = list(ids)
+        for inicio in range(0, len(ids), tamanho_lote):
+            linhas = db.execute(
+                select(*colunas).where(type_coerce(tabela.c.id, String).in_(ids[inicio:inicio + tamanho_lote]))
+            ).all()
+            SearchService.gravar_documentos(db.connection(), [indice.documento(entidade, linha) for linha in linhas])
+        return len(ids)
+
+    @staticmethod
+    def reindexar(db: Session, entidades: Optional[Iterable[str]] = None, tamanho_lote: int = 1000) -> int:
+        """Reconstruir o índice a partir das tabelas de origem"""
+        total = 0
+        tabela = SearchDocument.__table__
+        for nome in entidades or ENTIDADES:
+            indice = ENTIDADES[nome]
+            db.execute(tabela.delete().where(tabela.c.entidade == nome))
+            lote = []
+            for obj in db.query(indice.modelo).yield_per(tamanho_lote):
+                lote.append(indice.documento(nome, obj))
+                if len(lote) >= tamanho_lote:
+                    SearchService.gravar_documentos(db.connection(), lote)
+                    total += len(lote)
+                    lote = []
+            SearchService.gravar_documentos(db.connection(), lote)
+            total += len(lote)
+            db.commit()
+        return total
+
+    @staticmethod
+    def buscar(
+        db: Session,
+        usuario: User,
+        q: str,
+        tipos: Optional[List[str]] = None,
+        limit: int = 20
+    ) -> SearchResponse:
+        """Busca ranqueada em todas as entidades, respeitando o acesso a projetos
+
+        Todos os termos precisam aparecer; cada termo casa por prefixo.
+        """
+        termos = tokenizar(q)
+        if not termos:
+            return SearchResponse(query=q, total=0, resultados=[])
+
+        backend = SearchService._detectar_backend(db)
+        if backend == "postgresql":
+            vetor = literal_column("search_documents.search_vector")
+            consulta = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in termos))
+            score = func.ts_rank_cd(vetor, consulta)
+            query = db.query(SearchDocument, score.label("score")).filter(vetor.op("@@")(consulta))
+            ordem = score.desc()
+        elif backend == "fts5":
+            fts = literal_column("search_documents_fts")
+            bm25 = func.bm25(fts, 10.0, 1.0)  # título pesa 10x; menor = mais relevante
+            query = db.query(SearchDocument, (-bm25).label("score")).join(
+                _FTS, _FTS.c.rowid == SearchDocument.id
+            ).filter(fts.op("MATCH")(" ".join(f'"{t}"*' for t in termos)))
+            ordem = bm25
+        else:
+            texto = SearchDocument.termos_titulo + " " + SearchDocument.termos
+            score = case((SearchDocument.termos_titulo.like(f"{termos[0]}%"), 2.0), else_=1.0)
+            query = db.query(SearchDocument, score.label("score"))
+            for termo in termos:
+                query = query.filter(texto.like(f"%{termo}%"))
+            ordem = score.desc()
+
+        if tipos:
+            query = query.filter(SearchDocument.entidade.in_(tipos))
+
+        if not usuario.is_admin:
+            # Documentos sem projeto (clientes, propostas) seguem a regra das listagens: visíveis a todos
+            query = query.filter(or_(
+                SearchDocument.projeto_id.is_(None),
+                SearchDocument.projeto_id.in_(select(Project.id).where(Project.owner_id == usuario.id)),
+                SearchDocument.projeto_id.in_(select(UserProject.project_id).where(UserProject.user_id == usuario.id))
+            ))
+
+        resultados = [
+            SearchHit(
+                tipo=doc.entidade,
+                id=doc.entidade_id,
+                titulo=doc.titulo,
+                subtitulo=doc.subtitulo,
+                projeto_id=doc.projeto_id,
+                score=round(float(score or 0), 6)
+            )
+            for doc, score in query.order_by(ordem).limit(limit).all()
+        ]
+        return SearchResponse(query=q, total=len(resultados), resultados=resultados)
+
+
+event.listen(Session, "after_flush", SearchService._indexar_alteracoes)
@@ -0,0 +1,138 @@
+"""
+Tarefas executadas pela fila de jobs (JobService / WorkerJobs)
+
+Cada função recebe o ContextoJob e o payload do job como argumentos nomeados.
+ValueError de regra de negócio vira FalhaDefinitiva: repetir não resolve.
+"""
+from typing import List, Optional
+import logging
+import uuid
+
+from ..core.config import settings
+from ..schemas.notificacao import NotificacaoCreate
+from .atividade_service import AtividadeService
+from .job_service import FalhaDefinitiva, ContextoJob, JobService, tarefa
+from .notificacao_service import NotificacaoService
+from .notificacao_retencao_service import NotificacaoRetencaoService
+from .project_service import ProjectService
+from .relatorio_mensal_service import RelatorioMensalService
+
+logger = logging.getLogger(__name__)
+
+
+@tarefa("notificacoes.fanout", max_tentativas=5)
+def fanout_notificacoes(contexto: ContextoJob, notificacao: dict, usuario_ids: List[str], from_user_id: Optional[str] = None):
+    """Criar as notificações de uma audiência grande, em lotes
+
+    O total enviado vai para o checkpoint a cada lote: uma nova tentativa
+    continua de onde a anterior parou (no pior caso repete um lote).
+    """
+    dados = NotificacaoCreate(**notificacao)
+    destinatarios = [uuid.UUID(usuario_id) for usuario_id in usuario_ids]
+    ja_enviados = int(contexto.estado.get("enviados", 0))
+
+    def ao_progredir(total: int):
+        enviados = ja_enviados + total
+        contexto.progresso(
+            enviados * 100 / len(destinatarios),
+            f"{enviados}/{len(destinatarios)} notificações criadas",
+            {"enviados": enviados}
+        )
+
+    total = NotificacaoService.criar_notificacoes_em_lotes(
+        db=contexto.db,
+        notificacao=dados,
+        usuario_ids=destinatarios[ja_enviados:],
+        from_user_id=uuid.UUID(from_user_id) if from_user_id else None,
+        tamanho_lote=settings.notificacao_fanout_chunk_size,
+        ao_progredir=ao_progredir
+    )
+    logger.info(f"Fan-out de notificações concluído: {ja_enviados + total} destinatários")
+    return {"destinatarios": len(destinatarios), "enviados": ja_enviados + total}
+
+
+@tarefa("notificacoes.retencao", max_tentativas=3)
+def retencao_notificacoes(contexto: ContextoJob, dias: Optional[int] = None, modo: Optional[str] = None):
+    """Política de retenção de notificações (arquivar/remover lidas antigas)"""
+    contexto.progresso(0, "Aplicando a política de retenção")
+    try:
+        return NotificacaoRetencaoService.aplicar_politica(contexto.db, dias=dias, modo=modo)
+    except ValueError as e:
+        raise FalhaDefinitiva(str(e))
+
+
+@tarefa("projetos.excluir", max_tentativas=3)
+def excluir_projeto(contexto: ContextoJob, project_id: str):
+    """Excluir um projeto e tudo que depende dele (ProjectService.delete_project)"""
+    contexto.progresso(0, "Excluindo projeto")
+    try:
+        excluido = ProjectService.delete_project(contexto.db, project_id)
+    except ValueError as e:
+        raise FalhaDefinitiva(str(e))
+    if not excluido:
+        raise FalhaDefinitiva("Projeto não encontrado")
+    return {"project_id": project_id}
+
+
+@tarefa("relatorios.mensal", max_tentativas=3)
+def gerar_relatorio_mensal(contexto: ContextoJob, projeto_id: str, ano: int, mes: int, formato: str = "html"):
+    """Gerar o relatório mensal do projeto e gravar no MinIO (RelatorioMensalService.gerar)"""
+    contexto.progresso(0, "Coletando os dados do mês")
+    try:
+        relatorio = RelatorioMensalService.gerar(
+            contexto.db,
+            uuid.UUID(projeto_id),
+            ano,
+            mes,
+            formato,
+            gerado_por_id=contexto.criado_por_id,
+            job_id=contexto.job_id,
+            ao_progredir=contexto.progresso
+        )
+    except ValueError as e:
+        raise FalhaDefinitiva(str(e))
+    return {
+        "relatorio_id": str(relatorio.id),
+        "competencia": relatorio.competencia,
+        "formato": relatorio.formato,
+        "versao_dados": relatorio.versao_dados,
+        "tamanho_bytes": relatorio.tamanho_bytes,
+    }
+
+
+@tarefa("atividades.atrasadas", max_tentativas=3, cron="*/15 * * * *")
+def marcar_atividades_atrasadas(contexto: ContextoJob):
+    """Marcar as atividades vencidas como Atrasada e avisar cada responsável uma vez
+
+    A agregação por responsável vai para o checkpoint a cada lote: uma nova
+    tentativa continua a varredura sem perder os avisos dos lotes já gravados.
+    """
+    if contexto.estado.get("notificados") is not None:
+        return contexto.estado
+
+    def ao_progredir(total: int, por_responsavel: dict):
+        marcadas = ja_marcadas + total
+        contexto.progresso(0, f"{marcadas} atividades marcadas como atrasadas",
+                           {"marcadas": marcadas, "por_responsavel": por_responsavel})
+
+    ja_marcadas = int(contexto.estado.get("marcadas", 0))
+    total, por_responsavel = AtividadeService.marcar_atrasadas(
+        contexto.db,
+        tamanho_lote=settings.atividades_atraso_lote,
+        por_responsavel=contexto.estado.get("por_responsavel"),
+        ao_progredir=ao_progredir
+    )
+    notificados = AtividadeService.notificar_atrasadas(
+        contexto.db, por_responsavel, tamanho_lote=settings.notificacao_fanout_chunk_size
+    )
+    resultado = {"marcadas": ja_marcadas + total, "notificados": notificados}
+    contexto.progresso(100, f"{resultado['marcadas']} atividades atrasadas, {notificados} responsáveis avisados", resultado)
+    logger.info(f"Varredura de prazos: {resultado['marcadas']} atividades atrasadas, {notificados} responsáveis avisados")
+    return resultado
+
+
+@tarefa("jobs.limpar", cron="30 3 * * *")
+def limpar_jobs(contexto: ContextoJob):
+    """Remover jobs finalizados mais antigos que JOBS_RETENCAO_DIAS (diário)"""
+    removidos = JobService.limpar_finalizados(contexto.db, settings.jobs_retencao_dias)
+    return {"removidos": removidos}
@@ -91,9 +91,10 @@ class UserProjectService:
     
     @staticmethod
     def get_project_users(db: Session, project_id: UUID) -> List[UserProject]:
-        """Buscar todos os usuários de um projeto"""
+        """Buscar todos os usuários de um projeto (com projeto e dono, para serializar sem N+1)"""
         return db.query(UserProject).options(
-            joinedload(UserProject.user)
+            joinedload(UserProject.user),
+            joinedload(UserProject.project).joinedload(Project.owner)
         ).filter(UserProject.project_id == project_id).all()
     
     @staticmethod
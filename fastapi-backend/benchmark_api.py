@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Benchmark repetível da API com dados sintéticos em escala
+
+Popula um banco (SQLite temporário ou o PostgreSQL de --database-url) com o
+volume escolhido, mede p50/p95/p99 e vazão dos 25 endpoints mais usados com um
+driver de carga assíncrono (httpx, requisições concorrentes contra a aplicação
+ASGI em processo ou contra um servidor já rodando em --url) e grava o resultado
+em JSON. Com --comparar, confronta com um JSON anterior e termina com código 1
+se algum endpoint piorar o p95 além da tolerância, para rodar entre commits.
+
+Escalas: pequena (padrão, ~1 min), media e grande (5 anos de relatórios e
+métricas, 1M leads, 100k criativos, 5M notificações). Contagens avulsas
+(--leads, --notificacoes...) sobrescrevem a escala.
+
+Uso:
+    python benchmark_api.py [--escala pequena|media|grande] [--requisicoes 200] [--concorrencia 8]
+    python benchmark_api.py --database-url postgresql://... --pular-carga   # banco já populado
+    python benchmark_api.py --comparar benchmark_api_abc1234.json --tolerancia 0.15
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+ESCALAS = {
+    "pequena": {"usuarios": 50, "projetos": 10, "anos": 1, "leads": 20_000, "criativos": 5_000, "notificacoes": 50_000, "clientes": 5_000},
+    "media": {"usuarios": 200, "projetos": 40, "anos": 3, "leads": 200_000, "criativos": 30_000, "notificacoes": 1_000_000, "clientes": 30_000},
+    "grande": {"usuarios": 500, "projetos": 100, "anos": 5, "leads": 1_000_000, "criativos": 100_000, "notificacoes": 5_000_000, "clientes": 100_000},
+}
+LOTE = 10_000
+ATIVIDADES_POR_PROJETO = 30
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark dos endpoints mais usados da API")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="pequena")
+    for nome in ESCALAS["pequena"]:
+        parser.add_argument(f"--{nome}", type=int, default=None)
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário")
+    parser.add_argument("--pular-carga", action="store_true", help="Usar os dados já existentes no banco")
+    parser.add_argument("--url", default=None, help="Servidor já rodando (padrão: aplicação em processo)")
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições medidas por endpoint")
+    parser.add_argument("--aquecimento", type=int, default=10, help="Requisições descartadas por endpoint")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--endpoints", default="", help="Filtrar por nome (vírgulas)")
+    parser.add_argument("--com-cache", action="store_true", help="Manter o cache de respostas ligado")
+    parser.add_argument("--saida", default=None, help="Padrão: benchmark_api_<commit>.json")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Piora máxima aceita no p95 (fração)")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "benchmark_api.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+    if not ARGS.com_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+import httpx
+from sqlalchemy import func, insert
+
+from app.main import app
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models import (
+    User, Project, UserProject, Setor, Atividade, KanbanColumn, Lead, Cliente, Proposta,
+    Criativo, RelatorioDiario, MetricasRedesSociais, Notificacao
+)
+from app.models.criativo import StatusCriativo, TipoArquivo
+from app.models.lead import LeadStage
+from app.models.notificacao import NotificationStatus, NotificationType
+from app.services.criativo_service import CriativoService
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("app.api.instrumentacao_sql").setLevel(logging.ERROR)
+
+# (nome, caminho); {projeto} é o projeto com mais dados, {inicio}/{fim} os últimos 90 dias
+ENDPOINTS = [
+    ("auth_me", "/api/v1/auth/me"),
+    ("users_me", "/api/v1/users/me"),
+    ("users_lista", "/api/v1/users/"),
+    ("users_atribuicao", "/api/v1/users/for-assignment"),
+    ("projects_lista", "/api/v1/projects/"),
+    ("projects_detalhe", "/api/v1/projects/{projeto}"),
+    ("atividades_lista", "/api/v1/atividades/"),
+    ("atividades_legado_include", "/api/atividades?include=projeto,responsavel,setor"),
+    ("setores_lista", "/api/v1/setores/"),
+    ("kanban_columns_lista", "/api/v1/kanban-columns/"),
+    ("leads_lista", "/api/v1/leads"),
+    ("clientes_lista", "/api/v1/clientes/"),
+    ("propostas_lista", "/api/v1/propostas/"),
+    ("criativos_lista", "/api/v1/criativos/"),
+    ("criativos_kanban", "/api/v1/criativos/kanban"),
+    ("criativos_stats", "/api/v1/criativos/stats"),
+    ("relatorios_projeto", "/api/v1/relatorios-diarios/projeto/{projeto}"),
+    ("relatorios_estatisticas", "/api/v1/relatorios-diarios/projeto/{projeto}/estatisticas"),
+    ("relatorios_periodo", "/api/v1/relatorios-diarios/projeto/{projeto}/periodo?data_inicio={inicio}&data_fim={fim}"),
+    ("relatorios_ultimos", "/api/v1/relatorios-diarios/projeto/{projeto}/ultimos"),
+    ("relatorios_dashboard", "/api/v1/relatorios-diarios/dashboard/consolidado?data_inicio={inicio}&data_fim={fim}"),
+    ("metricas_projeto", "/api/v1/metricas-redes-sociais/projeto/{projeto}"),
+    ("metricas_estatisticas", "/api/v1/metricas-redes-sociais/projeto/{projeto}/estatisticas"),
+    ("notificacoes_lista", "/api/v1/notificacoes/"),
+    ("notificacoes_count", "/api/v1/notificacoes/count"),
+]
+
+
+def _inserir(db, modelo, linhas, total: int) -> int:
+    """Insert em lotes de LOTE linhas (executemany), sem passar pela unit of work"""
+    lote = []
+    inseridas = 0
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= LOTE:
+            db.execute(insert(modelo), lote)
+            db.commit()
+            inseridas += len(lote)
+            lote = []
+            print(f"   {modelo.__tablename__}: {inseridas}/{total}", end="\r", flush=True)
+    if lote:
+        db.execute(insert(modelo), lote)
+        db.commit()
+        inseridas += len(lote)
+    print(f"   {modelo.__tablename__}: {inseridas} linhas" + " " * 20)
+    return inseridas
+
+
+def popular(escala: dict):
+    """Seed the database with synthetic data at the given scale"""
+    print(f"🔧 Populando o banco: {escala}")
+    inicio = time.perf_counter()
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    agora = datetime.utcnow()
+    hoje = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+    dias = 365 * escala["anos"]
+
+    setores = [{"id": uuid.uuid4(), "nome": nome} for nome in ("Comercial", "Criação", "Tráfego", "Financeiro", "Suporte")]
+    _inserir(db, Setor, setores, len(setores))
+    admin_id = uuid.uuid4()
+    usuarios = [admin_id] + [uuid.uuid4() for _ in range(escala["usuarios"] - 1)]
+    _inserir(db, User, (
+        {
+            "id": usuario_id,
+            "name": "Admin Benchmark" if i == 0 else f"Usuário {i}",
+            "username": "benchmark" if i == 0 else f"usuario{i}",
+            "email": "benchmark@example.com" if i == 0 else f"usuario{i}@example.com",
+            "hashed_password": "x",
+            "is_active": True,
+            "is_admin": i == 0,
+            "setor_id": setores[i % len(setores)]["id"],
+        }
+        for i, usuario_id in enumerate(usuarios)
+    ), len(usuarios))
+
+    projetos = [uuid.uuid4() for _ in range(escala["projetos"])]
+    _inserir(db, Project, (
+        {"id": projeto_id, "name": f"Projeto {i}", "description": "Campanha de aquisição", "owner_id": usuarios[i % len(usuarios)]}
+        for i, projeto_id in enumerate(projetos)
+    ), len(projetos))
+    _inserir(db, UserProject, (
+        {"id": uuid.uuid4(), "user_id": usuarios[(i + j) % len(usuarios)], "project_id": projeto_id}
+        for i, projeto_id in enumerate(projetos) for j in range(1, min(6, len(usuarios)))
+    ), len(projetos) * min(5, len(usuarios) - 1))
+    _inserir(db, Atividade, (
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Atividade {j} do projeto {i}",
+            "projeto_id": projeto_id,
+            "responsavel_id": usuarios[(i + j) % len(usuarios)],
+            "setor_id": setores[j % len(setores)]["id"],
+            "prazo": hoje + timedelta(days=j - 10),
+        }
+        for i, projeto_id in enumerate(projetos) for j in range(ATIVIDADES_POR_PROJETO)
+    ), len(projetos) * ATIVIDADES_POR_PROJETO)
+
+    _inserir(db, RelatorioDiario, (
+        {
+            "id": uuid.uuid4(),
+            "projeto_id": projeto_id,
+            "data_referente": hoje - timedelta(days=d),
+            "criacao_criativos": d % 2 == 0,
+            "valor_investido": Decimal("1500.00") + d % 500,
+            "leads": 100 + d % 80,
+            "custo_por_lead": Decimal("15.00"),
+            "registros": 50 + d % 40,
+            "deposito": Decimal("8000.00") + d % 900,
+            "ftd": 20 + d % 7,
+            "observacoes": "Campanha estável, CPL dentro da meta",
+        }
+        for projeto_id in projetos for d in range(dias)
+    ), len(projetos) * dias)
+    _inserir(db, MetricasRedesSociais, (
+        {
+            "id": uuid.uuid4(),
+            "projeto_id": projeto_id,
+            "data_referente": (hoje - timedelta(days=d)).date(),
+            "seguidores_instagram": 10_000 + d,
+            "inscritos_telegram": 2_000 + d // 2,
+            "leads_whatsapp": 30 + d % 20,
+        }
+        for projeto_id in projetos for d in range(dias)
+    ), len(projetos) * dias)
+
+    colunas = [{"id": uuid.uuid4(), "title": titulo, "order": i} for i, titulo in enumerate(("Novos", "Contato", "Proposta", "Negociação", "Fechado"))]
+    _inserir(db, KanbanColumn, colunas, len(colunas))
+    estagios = list(LeadStage)
+    _inserir(db, Lead, (
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Lead {i}",
+            "email": f"lead{i}@example.com",
+            "telefone": f"1199{i:07d}"[:20],
+            "stage": estagios[i % len(estagios)],
+            "criado_por_id": usuarios[i % len(usuarios)],
+            "projeto_id": projetos[i % len(projetos)],
+            "column_id": colunas[i % len(colunas)]["id"],
+            "data_cadastro": agora - timedelta(minutes=i),
+        }
+        for i in range(escala["leads"])
+    ), escala["leads"])
+    clientes = [uuid.uuid4() for _ in range(escala["clientes"])]
+    _inserir(db, Cliente, (
+        {"id": cliente_id, "nome": f"Cliente {i}", "cpf": f"{i:011d}", "email": f"cliente{i}@example.com", "telefone": f"1198{i:07d}"[:20]}
+        for i, cliente_id in enumerate(clientes)
+    ), len(clientes))
+    _inserir(db, Proposta, (
+        {"id": uuid.uuid4(), "titulo": f"Proposta {i}", "valor": Decimal("2500.00"), "cliente_id": cliente_id, "responsavel_id": usuarios[i % len(usuarios)]}
+        for i, cliente_id in enumerate(clientes)
+    ), len(clientes))
+
+    status = list(StatusCriativo)
+    tipos = list(TipoArquivo)
+    _inserir(db, Criativo, (
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Criativo campanha {i % 20} - variação {i}",
+            "status": status[i % len(status)],
+            "tipo": tipos[i % len(tipos)],
+            "arquivo_cru_key": f"criativos/{i}.mp4",
+            "criado_por_id": usuarios[i % len(usuarios)],
+            "projeto_id": projetos[i % len(projetos)],
+            "prioridade": 1 + i % 4,
+            "prazo": agora + timedelta(days=i % 30),
+        }
+        for i in range(escala["criativos"])
+    ), escala["criativos"])
+    CriativoService(db).rebuild_status_counters()
+
+    tipos_notificacao = list(NotificationType)
+    status_notificacao = list(NotificationStatus)
+    _inserir(db, Notificacao, (
+        {
+            "id": uuid.uuid4(),
+            "tipo": tipos_notificacao[i % len(tipos_notificacao)],
+            "titulo": f"Atualização {i}",
+            "mensagem": "Nova atividade atribuída a você no projeto",
+            "status": status_notificacao[i % len(status_notificacao)],
+            "usuario_id": usuarios[i % len(usuarios)],
+            "contexto_tipo": "project",
+            "contexto_id": projetos[i % len(projetos)],
+        }
+        for i in range(escala["notificacoes"])
+    ), escala["notificacoes"])
+    db.close()
+    print(f"✅ Banco populado em {time.perf_counter() - inicio:.1f}s")
+
+
+def _contexto_existente() -> dict:
+    """Usuário admin e projeto com mais relatórios de um banco já populado"""
+    db = SessionLocal()
+    try:
+        admin = db.query(User).filter(User.is_admin == True).order_by(User.created_at).first()
+        if admin is None:
+            raise SystemExit("❌ Nenhum usuário admin no banco; rode sem --pular-carga")
+        projeto_id = db.query(RelatorioDiario.projeto_id).group_by(RelatorioDiario.projeto_id).order_by(
+            func.count(RelatorioDiario.id).desc()
+        ).limit(1).scalar() or db.query(Project.id).limit(1).scalar()
+        return {"usuario": str(admin.id), "projeto": str(projeto_id)}
+    finally:
+        db.close()
+
+
+def _percentil(ordenados: list, fracao: float) -> float:
+    if not ordenados:
+        return 0.0
+    indice = min(len(ordenados) - 1, max(0, round(fracao * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+async def _medir_endpoint(client: httpx.AsyncClient, caminho: str, requisicoes: int, aquecimento: int, concorrencia: int) -> dict:
+    for _ in range(aquecimento):
+        await client.get(caminho)
+
+    tempos = []
+    status = {}
+    fila = iter(range(requisicoes))
+
+    async def trabalhador():
+        for _ in fila:
+            inicio = time.perf_counter()
+            resposta = await client.get(caminho)
+            tempos.append(time.perf_counter() - inicio)
+            status[resposta.status_code] = status.get(resposta.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    tempos.sort()
+    return {
+        "requisicoes": len(tempos),
+        "p50_ms": round(_percentil(tempos, 0.50) * 1000, 3),
+        "p95_ms": round(_percentil(tempos, 0.95) * 1000, 3),
+        "p99_ms": round(_percentil(tempos, 0.99) * 1000, 3),
+        "max_ms": round(tempos[-1] * 1000, 3) if tempos else 0.0,
+        "rps": round(len(tempos) / duracao, 1) if duracao else 0.0,
+        "erros": sum(vezes for codigo, vezes in status.items() if codigo >= 400),
+        "status": {str(codigo): vezes for codigo, vezes in sorted(status.items())},
+    }
+
+
+async def medir(contexto: dict, args) -> dict:
+    """Run the load driver against each endpoint and collect latency percentiles"""
+    token = create_access_token({"sub": contexto["usuario"]})
+    fim = datetime.utcnow().date()
+    valores = {"projeto": contexto["projeto"], "inicio": (fim - timedelta(days=90)).isoformat(), "fim": fim.isoformat()}
+    filtro = {nome.strip() for nome in args.endpoints.split(",") if nome.strip()}
+    if args.url:
+        transporte = {"base_url": args.url.rstrip("/")}
+    else:
+        transporte = {"transport": httpx.ASGITransport(app=app), "base_url": "http://benchmark"}
+    limites = httpx.Limits(max_connections=args.concorrencia)
+    resultados = {}
+    async with httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"}, timeout=120, limits=limites, **transporte) as client:
+        for nome, modelo in ENDPOINTS:
+            if filtro and nome not in filtro:
+                continue
+            resultado = await _medir_endpoint(client, modelo.format(**valores), args.requisicoes, args.aquecimento, args.concorrencia)
+            resultados[nome] = resultado
+            alerta = f"  ⚠️  {resultado['erros']} erros {resultado['status']}" if resultado["erros"] else ""
+            print(f"   {nome:<28} p50 {resultado['p50_ms']:8.2f}ms  p95 {resultado['p95_ms']:8.2f}ms  "
+                  f"p99 {resultado['p99_ms']:8.2f}ms  {resultado['rps']:8.1f} req/s{alerta}")
+    return resultados
+
+
+def _commit_atual() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "desconhecido"
+
+
+def comparar(atual: dict, anterior: dict, tolerancia: float) -> bool:
+    """Compare p95 per endpoint with a previous run; False if any regressed beyond tolerance"""
+    print(f"\n📊 Comparação com {anterior.get('commit')} ({anterior.get('data')}), tolerância {tolerancia:.0%} no p95")
+    regressoes = []
+    for nome, resultado in atual["endpoints"].items():
+        base = anterior.get("endpoints", {}).get(nome)
+        if not base or not base.get("p95_ms"):
+            print(f"   {nome:<28} (sem referência)")
+            continue
+        variacao = resultado["p95_ms"] / base["p95_ms"] - 1
+        marcador = "❌" if variacao > tolerancia else ("✅" if variacao < -tolerancia else "  ")
+        print(f"   {marcador} {nome:<28} p95 {base['p95_ms']:8.2f}ms -> {resultado['p95_ms']:8.2f}ms ({variacao:+.1%})")
+        if variacao > tolerancia:
+            regressoes.append(nome)
+    if atual.get("escala") != anterior.get("escala") or atual.get("banco") != anterior.get("banco"):
+        print("   ⚠️  Escala ou banco diferentes da execução anterior; a comparação é só indicativa")
+    if regressoes:
+        print(f"❌ {len(regressoes)} endpoint(s) mais lentos: {', '.join(regressoes)}")
+        return False
+    print("✅ Nenhuma regressão acima da tolerância")
+    return True
+
+
+def benchmark_api(args) -> bool:
+    """Seed (optionally), measure the top endpoints and store/compare the results as JSON"""
+    escala = dict(ESCALAS[args.escala])
+    for nome in escala:
+        if getattr(args, nome) is not None:
+            escala[nome] = getattr(args, nome)
+
+    if not args.pular_carga:
+        popular(escala)
+    contexto = _contexto_existente()
+
+    print(f"\n⏱️  {args.requisicoes} requisições por endpoint, concorrência {args.concorrencia} "
+          f"({'servidor ' + args.url if args.url else 'aplicação em processo'}, banco {engine.dialect.name})")
+    resultados = asyncio.run(medir(contexto, args))
+
+    commit = _commit_atual()
+    saida = {
+        "versao": 1,
+        "commit": commit,
+        "data": datetime.utcnow().isoformat(timespec="seconds"),
+        "banco": engine.dialect.name,
+        "escala": None if args.pular_carga else escala,
+        "parametros": {
+            "requisicoes": args.requisicoes,
+            "aquecimento": args.aquecimento,
+            "concorrencia": args.concorrencia,
+            "cache": args.com_cache,
+            "servidor": args.url,
+            "python": sys.version.split()[0],
+        },
+        "endpoints": resultados,
+    }
+    arquivo = args.saida or f"benchmark_api_{commit}.json"
+    with open(arquivo, "w", encoding="utf-8") as f:
+        json.dump(saida, f, indent=2, ensure_ascii=False)
+    print(f"\n📍 Resultados gravados em {arquivo}")
+
+    ok = all(resultado["erros"] == 0 for resultado in resultados.values())
+    if not ok:
+        print("❌ Houve respostas com erro; veja a coluna de status no JSON")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            ok = comparar(saida, json.load(f), args.tolerancia) and ok
+    return ok
+
+
+if __name__ == "__main__":
+    sucesso = benchmark_api(ARGS)
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compressão das respostas típicas (kanban, relatórios, usuários)
+
+Gera dados sintéticos num SQLite temporário, busca os payloads reais pelos
+endpoints e compara, para cada codificação, o tamanho no fio, o custo de CPU da
+compressão e o tempo estimado de entrega em links de 5, 20 e 100 Mbit/s. Também
+mede a latência no servidor (TestClient) com e sem Accept-Encoding.
+
+Uso: python benchmark_compressao.py [--criativos 500] [--usuarios 300] [--dias 180]
+"""
+import argparse
+import gzip
+import logging
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+_ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "benchmark_compressao.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import create_access_token
+from app.models import User, Project, Criativo, RelatorioDiario
+from app.models.criativo import StatusCriativo, TipoArquivo
+from app.api.compressao import brotli
+
+LINKS_MBPS = (5, 20, 100)
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _popular(criativos: int, usuarios: int, dias: int):
+    db = SessionLocal()
+    admin = User(name="Admin Bench", username="bench", email="bench@example.com", hashed_password="x", is_admin=True)
+    db.add(admin)
+    db.flush()
+    projeto = Project(name="Projeto Bench", owner_id=admin.id)
+    db.add(projeto)
+    db.flush()
+    agora = datetime.utcnow()
+    hoje = agora.replace(hour=0, minute=0, second=0, microsecond=0)
+    status = list(StatusCriativo)
+    tipos = list(TipoArquivo)
+    db.bulk_insert_mappings(User, [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Usuário {i}",
+            "username": f"usuario{i}",
+            "email": f"usuario{i}@example.com",
+            "hashed_password": "x",
+            "is_active": True,
+        }
+        for i in range(usuarios)
+    ])
+    db.bulk_insert_mappings(Criativo, [
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Criativo campanha {i % 20} - variação {i}",
+            "descricao": "Vídeo vertical para stories com chamada para cadastro",
+            "status": status[i % len(status)],
+            "tipo": tipos[i % len(tipos)],
+            "arquivo_cru_key": f"criativos/{uuid.uuid4()}.mp4",
+            "criado_por_id": admin.id,
+            "projeto_id": projeto.id,
+            "prioridade": 1 + i % 4,
+            "prazo": agora,
+            "created_at": agora,
+            "updated_at": agora,
+        }
+        for i in range(criativos)
+    ])
+    db.bulk_insert_mappings(RelatorioDiario, [
+        {
+            "id": uuid.uuid4(),
+            "projeto_id": projeto.id,
+            "data_referente": hoje - timedelta(days=i),
+            "criacao_criativos": i % 2 == 0,
+            "valor_investido": Decimal("1500.00") + i,
+            "leads": 100 + i,
+            "custo_por_lead": Decimal("15.00"),
+            "registros": 50 + i,
+            "deposito": Decimal("8000.00") + i * 3,
+            "ftd": 20 + i % 7,
+            "observacoes": "Campanha estável, CPL dentro da meta",
+        }
+        for i in range(dias)
+    ])
+    db.commit()
+    token = create_access_token({"sub": str(admin.id)})
+    inicio = (agora - timedelta(days=dias)).date().isoformat()
+    fim = agora.date().isoformat()
+    rotas = {
+        "kanban de criativos": "/api/v1/criativos/kanban",
+        "relatórios do período": f"/api/v1/relatorios-diarios/projeto/{projeto.id}/periodo?data_inicio={inicio}&data_fim={fim}",
+        "usuários (legado)": "/api/users",
+    }
+    db.close()
+    return token, rotas
+
+
+def _comprimir(dados: bytes):
+    codecs = [
+        ("gzip-1", lambda d: gzip.compress(d, 1)),
+        ("gzip-6", lambda d: gzip.compress(d, 6)),
+        ("gzip-9", lambda d: gzip.compress(d, 9)),
+    ]
+    if brotli is not None:
+        codecs += [
+            ("br-4", lambda d: brotli.compress(d, quality=4)),
+            ("br-11", lambda d: brotli.compress(d, quality=11)),
+        ]
+    resultados = [("identity", len(dados), 0.0)]
+    for nome, funcao in codecs:
+        inicio = time.perf_counter()
+        for _ in range(5):
+            comprimido = funcao(dados)
+        resultados.append((nome, len(comprimido), (time.perf_counter() - inicio) / 5 * 1000))
+    return resultados
+
+
+def _latencia(client, url: str, headers: dict, repeticoes: int = 20) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        client.get(url, headers=headers)
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2] * 1000
+
+
+def benchmark_compressao(criativos: int = 500, usuarios: int = 300, dias: int = 180):
+    """Compare wire size and delivery time of typical payloads per encoding"""
+    Base.metadata.create_all(engine)
+    token, rotas = _popular(criativos, usuarios, dias)
+    client = TestClient(app)
+    auth = {"Authorization": f"Bearer {token}"}
+
+    for nome, url in rotas.items():
+        dados = client.get(url, headers={**auth, "Accept-Encoding": "identity"}).content
+        print(f"\n⏱️  {nome}: {len(dados) / 1024:.1f} KB de JSON")
+        cabecalho = "".join(f"{f'{mbps} Mbit/s':>12}" for mbps in LINKS_MBPS)
+        print(f"   {'codificação':<10} {'tamanho':>10} {'razão':>7} {'CPU':>9}{cabecalho}")
+        for codec, tamanho, cpu_ms in _comprimir(dados):
+            entregas = "".join(
+                f"{cpu_ms + tamanho * 8 / (mbps * 1_000_000) * 1000:10.1f}ms" for mbps in LINKS_MBPS
+            )
+            print(f"   {codec:<10} {tamanho / 1024:8.1f}KB {len(dados) / tamanho:6.1f}x {cpu_ms:7.2f}ms{entregas}")
+
+        sem = _latencia(client, url, {**auth, "Accept-Encoding": "identity"})
+        com_gzip = _latencia(client, url, {**auth, "Accept-Encoding": "gzip"})
+        linha = f"   servidor (mediana): identity {sem:.1f}ms, gzip {com_gzip:.1f}ms"
+        if brotli is not None:
+            linha += f", br {_latencia(client, url, {**auth, 'Accept-Encoding': 'br'}):.1f}ms"
+        print(linha)
+
+    os.remove(_ARQUIVO_DB)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de compressão de respostas")
+    parser.add_argument("--criativos", type=int, default=500)
+    parser.add_argument("--usuarios", type=int, default=300)
+    parser.add_argument("--dias", type=int, default=180)
+    args = parser.parse_args()
+    benchmark_compressao(args.criativos, args.usuarios, args.dias)
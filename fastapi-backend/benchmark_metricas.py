@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do overhead do MetricasMiddleware (orçamento: < 50µs por requisição)
+
+Mede a mesma aplicação ASGI mínima com e sem o middleware, chamada direto (sem
+servidor HTTP, para isolar o custo do middleware), e também uma rota FastAPI
+real com parâmetro de caminho. Termina com código 1 se o overhead passar do
+orçamento, para poder rodar em CI.
+
+Uso: python benchmark_metricas.py [--requisicoes 50000] [--orcamento-us 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi import FastAPI
+
+from app.api.metricas import MetricasMiddleware
+from app.core.metricas import registro
+
+
+class _Rota:
+    path = "/api/v1/projects/{project_id}"
+
+
+async def _app_minima(scope, receive, send):
+    scope["route"] = _Rota
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+def _fastapi(com_metricas: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/projects/{project_id}")
+    def ler(project_id: int):
+        return {"id": project_id}
+
+    if com_metricas:
+        app.add_middleware(MetricasMiddleware)
+    return app
+
+
+def _scope(caminho: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": caminho, "raw_path": caminho.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def _medir(app, caminho: str, requisicoes: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Aquecimento (rotas, caches internos do Starlette)
+    for _ in range(200):
+        await app(_scope(caminho), receive, send)
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await app(_scope(caminho), receive, send)
+    return (time.perf_counter() - inicio) / requisicoes * 1_000_000
+
+
+def benchmark_metricas(requisicoes: int = 50000, orcamento_us: float = 50.0) -> bool:
+    """Measure per-request overhead of the metrics middleware"""
+    print(f"⏱️  Overhead do MetricasMiddleware ({requisicoes} requisições por cenário)")
+
+    async def rodar():
+        # Melhor de 3 rodadas, para reduzir ruído de agendamento
+        base = min([await _medir(_app_minima, "/api/v1/projects/1", requisicoes) for _ in range(3)])
+        com = min([await _medir(MetricasMiddleware(_app_minima), "/api/v1/projects/1", requisicoes) for _ in range(3)])
+        api_sem = await _medir(_fastapi(False), "/api/v1/projects/1", requisicoes // 5)
+        api_com = await _medir(_fastapi(True), "/api/v1/projects/1", requisicoes // 5)
+        return base, com, api_sem, api_com
+
+    base, com, api_sem, api_com = asyncio.run(rodar())
+    overhead = com - base
+    print(f"   app ASGI mínima:   {base:7.2f}µs sem, {com:7.2f}µs com middleware -> overhead {overhead:.2f}µs")
+    print(f"   rota FastAPI real: {api_sem:7.2f}µs sem, {api_com:7.2f}µs com middleware -> overhead {api_com - api_sem:.2f}µs")
+    print(f"   /metrics com as séries geradas: {len(registro.texto()) / 1024:.1f} KB")
+
+    if overhead > orcamento_us:
+        print(f"❌ Overhead {overhead:.2f}µs acima do orçamento de {orcamento_us:.0f}µs")
+        return False
+    print(f"✅ Overhead dentro do orçamento de {orcamento_us:.0f}µs")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do overhead das métricas")
+    parser.add_argument("--requisicoes", type=int, default=50000)
+    parser.add_argument("--orcamento-us", type=float, default=50.0)
+    args = parser.parse_args()
+    sys.exit(0 if benchmark_metricas(args.requisicoes, args.orcamento_us) else 1)
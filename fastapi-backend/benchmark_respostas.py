@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark das respostas de listas grandes (50k atividades por padrão)
+
+Compara memória de pico (tracemalloc) e vazão do caminho antigo (lista completa +
+jsonable_encoder + JSONResponse) com ORJSONResponse e com as respostas em
+streaming (array JSON e NDJSON via yield_per), usando um banco SQLite temporário
+com dados sintéticos.
+
+Uso: python benchmark_respostas.py [--linhas 50000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+_ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "benchmark_respostas.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.database import Base, SessionLocal, engine
+from app.models import User, Project, Atividade
+from app.api.streaming import DefaultJSONResponse, resposta_streaming
+from app.services.atividade_service import AtividadeService
+from app.main import _atividade_legacy
+
+
+def _popular(linhas: int):
+    db = SessionLocal()
+    user = User(name="Bench", username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    projeto = Project(name="Bench", owner_id=user.id)
+    db.add(projeto)
+    db.flush()
+    agora = datetime.utcnow()
+    db.bulk_insert_mappings(Atividade, [
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Atividade {i}",
+            "descricao": "Descrição da atividade " * 4,
+            "status": "Não iniciada",
+            "prioridade": "Média",
+            "projeto_id": projeto.id,
+            "responsavel_id": user.id,
+            "created_at": agora,
+            "updated_at": agora,
+        }
+        for i in range(linhas)
+    ])
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id
+
+
+def _consumir_streaming(resposta) -> int:
+    """Consumir o corpo como o servidor faria, descartando cada pedaço enviado"""
+    async def consumir():
+        total = 0
+        async for pedaco in resposta.body_iterator:
+            total += len(pedaco)
+        return total
+    return asyncio.run(consumir())
+
+
+def _medir(nome: str, funcao, linhas: int):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    tamanho = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"   {nome:<40} {duracao * 1000:8.0f} ms {linhas / duracao:10.0f} linhas/s "
+        f"{pico / 1024 / 1024:8.1f} MB pico {tamanho / 1024 / 1024:7.1f} MB corpo"
+    )
+
+
+def benchmark_respostas(linhas: int = 50000):
+    """Serialize N atividades with each response strategy"""
+    print(f"⏱️  Respostas com {linhas} atividades (tempo, vazão e memória de pico)")
+    Base.metadata.create_all(engine)
+    user_id = _popular(linhas)
+
+    def lista(classe):
+        def executar():
+            db = SessionLocal()
+            try:
+                atividades = AtividadeService.query_atividades(db, user_id=user_id).all()
+                dados = [_atividade_legacy(atividade, "") for atividade in atividades]
+                if classe is JSONResponse:
+                    # Sem response_class o FastAPI passa o conteúdo pelo jsonable_encoder
+                    dados = jsonable_encoder(dados)
+                return len(classe(dados).body)
+            finally:
+                db.close()
+        return executar
+
+    def streaming(formato):
+        def executar():
+            return _consumir_streaming(resposta_streaming(
+                lambda s: AtividadeService.query_atividades(s, user_id=user_id),
+                lambda atividade: _atividade_legacy(atividade, ""),
+                formato
+            ))
+        return executar
+
+    _medir("lista + jsonable_encoder + JSONResponse", lista(JSONResponse), linhas)
+    _medir(f"lista + {DefaultJSONResponse.__name__}", lista(DefaultJSONResponse), linhas)
+    _medir("streaming JSON (yield_per)", streaming("json"), linhas)
+    _medir("streaming NDJSON (yield_per)", streaming("ndjson"), linhas)
+
+    os.remove(_ARQUIVO_DB)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de respostas de listas grandes")
+    parser.add_argument("--linhas", type=int, default=50000)
+    args = parser.parse_args()
+    benchmark_respostas(args.linhas)
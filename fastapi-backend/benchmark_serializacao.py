@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark da serialização de criativos (10k linhas por padrão)
+
+Compara o caminho antigo (objetos ORM + from_orm_with_mapping + revalidação
+do response_model) com a projeção de colunas + model_construct, usando um
+banco SQLite em memória com dados sintéticos.
+
+Uso: python benchmark_serializacao.py [--linhas 10000] [--repeticoes 5]
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from pydantic import TypeAdapter
+
+from app.core.database import Base
+from app.models import User, Project, Criativo
+from app.models.criativo import StatusCriativo, TipoArquivo
+from app.schemas.criativo import CriativoResponse, PRIORIDADE_MAP, PrioridadeCriativo
+from app.services.criativo_service import CRIATIVO_RESPONSE
+
+
+def _legado(orm_obj) -> CriativoResponse:
+    """Implementação anterior de CriativoResponse.from_orm_with_mapping"""
+    data = {}
+    for field_name in CriativoResponse.model_fields.keys():
+        if hasattr(orm_obj, field_name):
+            value = getattr(orm_obj, field_name)
+            if field_name == 'prioridade' and isinstance(value, int):
+                value = PRIORIDADE_MAP.get(value, PrioridadeCriativo.MEDIA)
+            data[field_name] = value
+    return CriativoResponse(**data)
+
+
+def _popular(db, linhas: int):
+    user = User(name="Bench", username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    projeto = Project(name="Bench", owner_id=user.id)
+    db.add(projeto)
+    db.flush()
+    status = list(StatusCriativo)
+    tipos = list(TipoArquivo)
+    agora = datetime.utcnow()
+    db.bulk_insert_mappings(Criativo, [
+        {
+            "id": uuid.uuid4(),
+            "nome": f"Criativo {i}",
+            "descricao": "Descrição do criativo " * 3,
+            "status": status[i % len(status)],
+            "tipo": tipos[i % len(tipos)],
+            "arquivo_cru_key": f"criativos/{i}.mp4",
+            "criado_por_id": user.id,
+            "projeto_id": projeto.id,
+            "prioridade": 1 + i % 4,
+            "prazo": agora,
+            "created_at": agora,
+            "updated_at": agora,
+        }
+        for i in range(linhas)
+    ])
+    db.commit()
+
+
+def _medir(nome: str, funcao, repeticoes: int):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    melhor = min(tempos) * 1000
+    print(f"   {nome:<48} {melhor:8.1f} ms")
+    return melhor
+
+
+def benchmark_serializacao(linhas: int = 10000, repeticoes: int = 5):
+    """Serialize N criativos end-to-end with the old and the new path"""
+    print(f"⏱️  Serializando {linhas} criativos ({repeticoes} repetições, melhor tempo)")
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    _popular(db, linhas)
+
+    adapter = TypeAdapter(List[CriativoResponse])
+
+    def antigo():
+        db.expunge_all()
+        itens = [_legado(c) for c in db.query(Criativo).all()]
+        # O FastAPI faz dump + validação contra o response_model antes de gerar o JSON
+        dumped = [item.model_dump() for item in itens]
+        return adapter.dump_json(adapter.validate_python(dumped))
+
+    def objeto_orm():
+        db.expunge_all()
+        itens = [CRIATIVO_RESPONSE.de_objeto(c) for c in db.query(Criativo).all()]
+        return CRIATIVO_RESPONSE.json_lista(itens)
+
+    def projecao():
+        itens = [CRIATIVO_RESPONSE.de_linha(linha) for linha in db.query(*CRIATIVO_RESPONSE.colunas()).all()]
+        return CRIATIVO_RESPONSE.json_lista(itens)
+
+    assert antigo() == objeto_orm() == projecao(), "As três serializações devem gerar o mesmo JSON"
+
+    base = _medir("ORM + from_orm_with_mapping + revalidação", antigo, repeticoes)
+    for nome, funcao in (("ORM + Serializador.de_objeto", objeto_orm), ("Projeção de colunas + de_linha", projecao)):
+        tempo = _medir(nome, funcao, repeticoes)
+        print(f"   {'':<48} {base / tempo:8.1f}x")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialização de criativos")
+    parser.add_argument("--linhas", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    benchmark_serializacao(args.linhas, args.repeticoes)
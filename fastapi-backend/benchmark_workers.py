@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Comparação de vazão do servidor de produção com 1, 2, 4 e 8 workers
+
+Sobe o gunicorn com gunicorn.conf.py, como o start_server.py em produção
+(workers uvicorn, preload), uma vez para cada quantidade de workers (inclusive
+1, para comparar o mesmo servidor), espera o /ready e mede
+req/s e p95 de um conjunto de endpoints do benchmark_api.py com requisições
+concorrentes por HTTP. O banco é o mesmo para todas as rodadas (SQLite
+temporário populado na escala escolhida, ou o PostgreSQL de --database-url).
+
+O driver de carga é um processo só; com muitos workers num host com poucos
+núcleos ele mesmo pode virar o gargalo (veja o uso de CPU do driver na saída).
+
+Uso:
+    python benchmark_workers.py [--workers 1,2,4,8] [--concorrencia 32] [--requisicoes 400]
+    python benchmark_workers.py --database-url postgresql://... --pular-carga --saida workers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PADRAO_ENDPOINTS = "auth_me,projects_detalhe,leads_lista,criativos_stats,relatorios_estatisticas,notificacoes_count"
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Vazão do servidor de produção por quantidade de workers")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--escala", default="pequena", help="Escala do benchmark_api.py")
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário")
+    parser.add_argument("--pular-carga", action="store_true", help="Usar os dados já existentes no banco")
+    parser.add_argument("--endpoints", default=PADRAO_ENDPOINTS, help="Nomes do benchmark_api.py (vírgulas)")
+    parser.add_argument("--requisicoes", type=int, default=400, help="Requisições medidas por endpoint")
+    parser.add_argument("--aquecimento", type=int, default=20, help="Requisições descartadas por endpoint")
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--porta", type=int, default=3991)
+    parser.add_argument("--com-cache", action="store_true", help="Manter o cache de respostas ligado")
+    parser.add_argument("--saida", default=None, help="Gravar os resultados neste JSON")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "benchmark_workers.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+import httpx
+
+from benchmark_api import ENDPOINTS, ESCALAS, _contexto_existente, _medir_endpoint, popular
+from app.core.security import create_access_token
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def subir_servidor(workers: int, porta: int, com_cache: bool) -> subprocess.Popen:
+    """gunicorn em subprocesso, com o ambiente de produção"""
+    ambiente = dict(os.environ)
+    ambiente.update({
+        "PORT": str(porta),
+        "WEB_CONCURRENCY": str(workers),
+        "ENVIRONMENT": "production",
+        "SCHEMA_NO_STARTUP": "false",
+        "READINESS_DEPENDENCIAS": "banco",
+        "RESPONSE_CACHE_ENABLED": "true" if com_cache else "false",
+        "GUNICORN_LOG_LEVEL": "warning",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"], cwd=DIRETORIO, env=ambiente,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+
+def esperar_pronto(url: str, processo: subprocess.Popen, limite_s: float = 120) -> float:
+    """Segundos até o /ready responder 200 (todos os workers sobem do mesmo preload)"""
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < limite_s:
+        if processo.poll() is not None:
+            raise SystemExit(f"❌ Servidor terminou com código {processo.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=2).status_code == 200:
+                return time.perf_counter() - inicio
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"❌ /ready não respondeu 200 em {limite_s:.0f}s")
+
+
+def parar_servidor(processo: subprocess.Popen):
+    """SIGTERM no grupo (mestre do gunicorn e workers) e espera o encerramento gracioso"""
+    try:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait(timeout=60)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(processo.pid, signal.SIGKILL)
+        processo.wait()
+
+
+async def _medir(url: str, token: str, caminhos: dict, args) -> dict:
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    resultados = {}
+    async with httpx.AsyncClient(base_url=url, headers={"Authorization": f"Bearer {token}"}, timeout=120, limits=limites) as client:
+        for nome, caminho in caminhos.items():
+            resultados[nome] = await _medir_endpoint(client, caminho, args.requisicoes, args.aquecimento, args.concorrencia)
+    return resultados
+
+
+def benchmark_workers(args) -> bool:
+    """Measure throughput and p95 of the production server for each worker count"""
+    if not args.pular_carga:
+        popular(dict(ESCALAS[args.escala]))
+    contexto = _contexto_existente()
+    token = create_access_token({"sub": contexto["usuario"]})
+    fim = datetime.utcnow().date()
+    valores = {"projeto": contexto["projeto"], "inicio": (fim - timedelta(days=90)).isoformat(), "fim": fim.isoformat()}
+    nomes = [nome.strip() for nome in args.endpoints.split(",") if nome.strip()]
+    caminhos = {nome: modelo.format(**valores) for nome, modelo in ENDPOINTS if nome in nomes}
+
+    quantidades = [int(n) for n in args.workers.split(",") if n.strip()]
+    print(f"\n⏱️  {len(caminhos)} endpoints, {args.requisicoes} requisições cada, concorrência {args.concorrencia}, "
+          f"{os.cpu_count()} núcleo(s) no host")
+    resultados = {}
+    for workers in quantidades:
+        url = f"http://127.0.0.1:{args.porta}"
+        processo = subir_servidor(workers, args.porta, args.com_cache)
+        try:
+            pronto = esperar_pronto(url, processo)
+            cpu_inicio = time.process_time()
+            inicio = time.perf_counter()
+            medidas = asyncio.run(_medir(url, token, caminhos, args))
+            duracao = time.perf_counter() - inicio
+            cpu_driver = (time.process_time() - cpu_inicio) / duracao if duracao else 0.0
+        finally:
+            parar_servidor(processo)
+        total = sum(medida["requisicoes"] for medida in medidas.values())
+        erros = sum(medida["erros"] for medida in medidas.values())
+        resultados[workers] = {
+            "pronto_s": round(pronto, 2),
+            "rps_total": round(total / duracao, 1) if duracao else 0.0,
+            "cpu_driver": round(cpu_driver, 2),
+            "erros": erros,
+            "endpoints": medidas,
+        }
+        print(f"   {workers} worker(s): {resultados[workers]['rps_total']:8.1f} req/s  (pronto em {pronto:.1f}s, "
+              f"CPU do driver {cpu_driver:.0%}{', ' + str(erros) + ' erros' if erros else ''})")
+
+    base = resultados[quantidades[0]]
+    print(f"\n   {'endpoint':<26}" + "".join(f"{str(n) + 'w req/s':>13}{'p95':>9}" for n in quantidades))
+    for nome in caminhos:
+        linha = f"   {nome:<26}"
+        for workers in quantidades:
+            medida = resultados[workers]["endpoints"][nome]
+            linha += f"{medida['rps']:13.1f}{medida['p95_ms']:8.1f}ms"
+        print(linha)
+    linha = f"   {'total (ganho)':<26}"
+    for workers in quantidades:
+        ganho = resultados[workers]["rps_total"] / base["rps_total"] if base["rps_total"] else 0.0
+        linha += f"{resultados[workers]['rps_total']:13.1f}{ganho:8.2f}x"
+    print(linha)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump({
+                "data": datetime.utcnow().isoformat(timespec="seconds"),
+                "nucleos": os.cpu_count(),
+                "parametros": {"requisicoes": args.requisicoes, "concorrencia": args.concorrencia, "cache": args.com_cache},
+                "workers": resultados,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n📍 Resultados gravados em {args.saida}")
+
+    ok = all(resultado["erros"] == 0 for resultado in resultados.values())
+    print("✅ Comparação concluída" if ok else "❌ Houve respostas com erro")
+    return ok
+
+
+if __name__ == "__main__":
+    sucesso = benchmark_workers(ARGS)
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
@@ -0,0 +1,71 @@
+"""
+Configuração do gunicorn para produção: N workers uvicorn no mesmo container
+
+Usado por start_server.py (python start_server.py) quando há mais de um worker:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Variáveis de ambiente:
+    WEB_CONCURRENCY                  workers (padrão: núcleos disponíveis)
+    GUNICORN_PRELOAD                 importar a aplicação no mestre antes do fork (padrão true)
+    GUNICORN_MAX_REQUESTS            reciclar o worker após N requisições (padrão 5000, 0 = nunca)
+    GUNICORN_MAX_REQUESTS_JITTER     variação aleatória do limite, para não reciclar todos juntos (padrão 500)
+    GUNICORN_TIMEOUT                 segundos sem resposta do worker até ele ser reiniciado (padrão 120)
+    GUNICORN_GRACEFUL_TIMEOUT        segundos para terminar as requisições em andamento ao parar/recarregar (padrão 30)
+
+Recarga sem derrubar conexões: `kill -HUP <pid do mestre>` sobe workers novos e
+encerra os antigos depois das requisições em andamento. Com GUNICORN_PRELOAD o
+código já está carregado no mestre, então o HUP recicla os workers mas não lê
+código novo; para trocar a versão use um deploy novo (ou USR2 + WINCH no mestre).
+
+Cada worker tem os seus caches em memória (respostas, contadores de
+notificações) e as suas conexões SSE/WebSocket; com mais de um worker,
+CACHE_INVALIDACAO_URL passa a "postgres" (LISTEN/NOTIFY) se não estiver
+definida, para as invalidações e os eventos de notificação (sem
+NOTIFICACAO_BROKER_URL) chegarem a todos.
+"""
+import logging
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '3001')}"
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+
+try:
+    import uvicorn_worker  # noqa: F401
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:  # uvicorn.workers: mesma classe, descontinuada a partir do uvicorn 0.30
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+# Proxy do Railway/Docker na frente: confiar no X-Forwarded-* vindo dele
+forwarded_allow_ips = "*"
+
+if workers > 1 and not os.getenv("CACHE_INVALIDACAO_URL"):
+    if (os.getenv("DATABASE_URL") or "").startswith("postgres"):
+        os.environ["CACHE_INVALIDACAO_URL"] = "postgres"
+    else:
+        logging.getLogger("gunicorn.error").warning(
+            "Vários workers sem PostgreSQL nem CACHE_INVALIDACAO_URL: caches por processo podem "
+            "servir dados antigos até o TTL"
+        )
+        if not os.getenv("NOTIFICACAO_BROKER_URL"):
+            logging.getLogger("gunicorn.error").warning(
+                "Vários workers sem NOTIFICACAO_BROKER_URL nem CACHE_INVALIDACAO_URL: notificações em "
+                "tempo real só chegam às conexões SSE/WebSocket do worker que as criou"
+            )
+
+
+def post_fork(server, worker):
+    # Com preload o engine foi criado no mestre: descartar o pool herdado sem
+    # fechar as conexões (são do mestre) para o worker abrir as suas
+    from app.core.database import engine
+    engine.dispose(close=False)
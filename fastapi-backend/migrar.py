@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Migrações versionadas (migrations/NNN_*.py, registradas na tabela schema_revisoes)
+
+Comandos:
+    status      revisões disponíveis e quando cada uma foi aplicada
+    upgrade     aplicar as pendentes (--ate NNN para parar numa revisão, --simular para só listar)
+    verificar   EXPLAIN da consulta de verificação de cada índice das revisões;
+                termina com código 1 se algum índice não for usado
+
+No PostgreSQL os índices são criados com CREATE INDEX CONCURRENTLY, sem travar
+escritas. preparar_banco.py também aplica as pendentes antes do deploy.
+
+Uso: python migrar.py [status|upgrade|verificar] [--ate 005] [--simular] [-v]
+"""
+import argparse
+import sys
+
+from app.core.database import engine
+from app.core.migracoes import aplicar_revisoes, revisoes_aplicadas, revisoes_disponiveis, verificar_indices
+
+
+def status() -> bool:
+    aplicadas = revisoes_aplicadas(engine)
+    print(f"📊 Revisões ({engine.dialect.name}):")
+    for revisao in revisoes_disponiveis():
+        quando = aplicadas.get(revisao.revisao)
+        marcador = f"✅ aplicada em {quando:%Y-%m-%d %H:%M}" if quando else "⏳ pendente"
+        print(f"   {revisao.revisao}  {marcador}  {revisao.descricao}")
+    return True
+
+
+def upgrade(ate: str = None, simular: bool = False) -> bool:
+    try:
+        revisoes = aplicar_revisoes(engine, ate=ate, simular=simular)
+    except Exception as e:
+        print(f"❌ Erro ao aplicar revisões: {e}")
+        return False
+    if not revisoes:
+        print("✅ Nenhuma revisão pendente")
+    elif simular:
+        print(f"🔎 Seriam aplicadas: {', '.join(revisoes)}")
+    else:
+        print(f"✅ Revisões aplicadas: {', '.join(revisoes)}")
+    return True
+
+
+def verificar(detalhado: bool = False) -> bool:
+    ok = True
+    for indice, usado, plano in verificar_indices(engine):
+        print(f"   {'✅' if usado else '❌'} {indice.nome:<42} {indice.tabela}")
+        if detalhado or not usado:
+            for linha in plano.splitlines():
+                print(f"        {linha}")
+        ok = ok and usado
+    print("✅ Todos os índices usados pelas consultas de verificação" if ok else "❌ Há índices que o planejador não usa")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrações versionadas do banco")
+    parser.add_argument("comando", nargs="?", default="status", choices=("status", "upgrade", "verificar"))
+    parser.add_argument("--ate", default=None, help="Aplicar só até esta revisão (inclusive)")
+    parser.add_argument("--simular", action="store_true", help="Listar as pendentes sem aplicar")
+    parser.add_argument("-v", "--detalhado", action="store_true", help="Mostrar os planos completos")
+    args = parser.parse_args()
+    if args.comando == "upgrade":
+        sucesso = upgrade(args.ate, args.simular)
+    elif args.comando == "verificar":
+        sucesso = verificar(args.detalhado)
+    else:
+        sucesso = status()
+    sys.exit(0 if sucesso else 1)
@@ -0,0 +1,59 @@
+"""
+Índices das colunas de filtro e ordenação das consultas mais frequentes dos
+services (leads, criativos, atividades, propostas, relatórios, métricas)
+
+Os mesmos índices estão declarados nos modelos (__table_args__), então bancos
+novos já nascem com eles via create_all; aqui eles chegam aos bancos
+existentes, com CREATE INDEX CONCURRENTLY no PostgreSQL.
+"""
+from app.core.migracoes import Indice
+
+REVISAO = "005"
+DESCRICAO = "Índices compostos das consultas quentes dos services"
+
+_UUID = "'00000000-0000-0000-0000-000000000000'"
+
+INDICES = [
+    # LeadService.get_leads: ORDER BY created_at DESC LIMIT
+    Indice("ix_leads_created_at", "leads", ("created_at",),
+           "SELECT id FROM leads ORDER BY created_at DESC LIMIT 100"),
+    # LeadService.get_leads_by_stage / get_lead: criado_por_id (+ stage)
+    Indice("ix_leads_criado_por_stage", "leads", ("criado_por_id", "stage"),
+           f"SELECT id FROM leads WHERE criado_por_id = {_UUID} AND stage = 'LEAD'"),
+    # Funil por coluna do kanban
+    Indice("ix_leads_column_id", "leads", ("column_id",),
+           f"SELECT id FROM leads WHERE column_id = {_UUID}"),
+    # CriativoService: projeto_id IN (...) com filtro opcional de status
+    Indice("ix_criativos_projeto_status", "criativos", ("projeto_id", "status"),
+           f"SELECT id FROM criativos WHERE projeto_id = {_UUID} AND status = 'MATERIAL_CRU'"),
+    # AtividadeService.query_atividades: responsavel_id = ? OR projeto do usuário
+    Indice("ix_atividades_responsavel_id", "atividades", ("responsavel_id",),
+           f"SELECT id FROM atividades WHERE responsavel_id = {_UUID}"),
+    Indice("ix_atividades_projeto_id", "atividades", ("projeto_id",),
+           f"SELECT id FROM atividades WHERE projeto_id = {_UUID}"),
+    # Acesso por dono do projeto (has(owner_id=...), projetos acessíveis)
+    Indice("ix_projects_owner_id", "projects", ("owner_id",),
+           f"SELECT id FROM projects WHERE owner_id = {_UUID}"),
+    Indice("ix_user_projects_user_project", "user_projects", ("user_id", "project_id"),
+           f"SELECT project_id FROM user_projects WHERE user_id = {_UUID}"),
+    # PropostaService.get_propostas: filtro por cliente, ordem (ordem, prioridade)
+    Indice("ix_propostas_cliente_id", "propostas", ("cliente_id",),
+           f"SELECT id FROM propostas WHERE cliente_id = {_UUID}"),
+    Indice("ix_propostas_ordem_prioridade", "propostas", ("ordem", "prioridade"),
+           "SELECT id FROM propostas ORDER BY ordem, prioridade LIMIT 100"),
+    # Relatórios e métricas por projeto e período, ordenados pela data
+    Indice("ix_relatorios_diarios_projeto_data", "relatorios_diarios", ("projeto_id", "data_referente"),
+           f"SELECT id FROM relatorios_diarios WHERE projeto_id = {_UUID} AND data_referente >= '2024-01-01' "
+           "ORDER BY data_referente DESC"),
+    Indice("ix_metricas_redes_sociais_projeto_data", "metricas_redes_sociais", ("projeto_id", "data_referente"),
+           f"SELECT id FROM metricas_redes_sociais WHERE projeto_id = {_UUID} AND data_referente >= '2024-01-01' "
+           "ORDER BY data_referente DESC"),
+    # ClienteService.get_clientes: ORDER BY created_at DESC LIMIT
+    Indice("ix_clientes_created_at", "clientes", ("created_at",),
+           "SELECT id FROM clientes ORDER BY created_at DESC LIMIT 100"),
+]
+
+
+def upgrade(ctx):
+    for indice in INDICES:
+        ctx.criar_indice(indice)
@@ -0,0 +1,25 @@
+"""
+Índices dos filtros da listagem de atividades (status + faixa de prazo, setor)
+
+A checagem de acesso (responsável ou dono do projeto) já usa os índices da
+revisão 005; estes servem os filtros aplicados sobre ela e a busca de
+atividades vencidas por status e prazo. Também declarados no modelo.
+"""
+from app.core.migracoes import Indice
+
+REVISAO = "006"
+DESCRICAO = "Índices de status/prazo e setor das atividades"
+
+INDICES = [
+    # AtividadeService.query_atividades: ?status=...&prazo_de=&prazo_ate=
+    Indice("ix_atividades_status_prazo", "atividades", ("status", "prazo"),
+           "SELECT id FROM atividades WHERE status = 'Em andamento' AND prazo < '2025-01-01'"),
+    # ?setor_id=
+    Indice("ix_atividades_setor_id", "atividades", ("setor_id",),
+           "SELECT id FROM atividades WHERE setor_id = '00000000-0000-0000-0000-000000000000'"),
+]
+
+
+def upgrade(ctx):
+    for indice in INDICES:
+        ctx.criar_indice(indice)
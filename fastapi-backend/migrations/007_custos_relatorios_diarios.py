@@ -0,0 +1,51 @@
+"""
+Recalcular custo_por_lead/registro/ftd dos relatórios diários existentes
+
+A partir desta revisão os custos unitários são derivados no servidor
+(valor_investido / quantidade, RelatorioDiarioService.calcular_custos); os
+valores antigos foram digitados ou calculados pelo cliente e podem não bater
+com o investimento e as quantidades gravados. O cálculo é feito em Python com
+o mesmo custo_unitario do service (Decimal, arredondamento half-up): no SQL,
+o SQLite dividiria inteiros e o ROUND de cada banco arredonda de outro jeito.
+Idempotente: repetir a revisão dá o mesmo resultado.
+"""
+from sqlalchemy import Numeric, bindparam, text
+
+from app.services.relatorio_diario_service import CUSTOS_DERIVADOS, custo_unitario
+
+REVISAO = "007"
+DESCRICAO = "Custos unitários dos relatórios diários derivados do investimento"
+
+TAMANHO_LOTE = 1000
+
+
+def upgrade(ctx):
+    quantidades = ", ".join(CUSTOS_DERIVADOS.values())
+    atribuicoes = ", ".join(f"{coluna} = :{coluna}" for coluna in CUSTOS_DERIVADOS)
+    # Numeric nos parâmetros: o driver do SQLite não aceita Decimal
+    atualizar = text(f"UPDATE relatorios_diarios SET {atribuicoes} WHERE id = :id").bindparams(
+        *(bindparam(coluna, type_=Numeric(10, 2)) for coluna in CUSTOS_DERIVADOS)
+    )
+
+    # Lotes em ordem de id (keyset): cada UPDATE em lote é um executemany
+    ultimo = None
+    while True:
+        filtro = "WHERE id > :ultimo " if ultimo is not None else ""
+        linhas = ctx.executar(
+            f"SELECT id, valor_investido, {quantidades} FROM relatorios_diarios "
+            f"{filtro}ORDER BY id LIMIT {TAMANHO_LOTE}",
+            **({"ultimo": ultimo} if ultimo is not None else {})
+        ).mappings().all()
+        if not linhas:
+            break
+        ctx.conexao.execute(atualizar, [
+            {
+                "id": linha["id"],
+                **{
+                    coluna: custo_unitario(linha["valor_investido"], linha[quantidade])
+                    for coluna, quantidade in CUSTOS_DERIVADOS.items()
+                },
+            }
+            for linha in linhas
+        ])
+        ultimo = linhas[-1]["id"]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script para converter a tabela notificacoes em tabela particionada por mês
+(PostgreSQL apenas, opcional)
+
+Cria uma tabela particionada por RANGE (created_at), uma partição por mês
+desde a notificação mais antiga até 3 meses à frente (mais uma partição
+DEFAULT), copia os dados e troca as tabelas numa única transação. A tabela
+antiga fica como notificacoes_legado para conferência.
+
+Rode numa janela de manutenção: a tabela fica bloqueada durante a cópia.
+Depois, a política de retenção cria as partições futuras automaticamente.
+"""
+from app.core.database import engine, SessionLocal
+from app.services.notificacao_retencao_service import NotificacaoRetencaoService, _adicionar_meses
+from sqlalchemy import text
+from datetime import datetime
+
+def particionar_notificacoes():
+    """Convert notificacoes into a monthly range-partitioned table"""
+    if engine.dialect.name != "postgresql":
+        print("❌ Particionamento disponível apenas no PostgreSQL")
+        return False
+
+    db = SessionLocal()
+    try:
+        if NotificacaoRetencaoService.tabela_particionada(db):
+            criadas = NotificacaoRetencaoService.garantir_particoes(db)
+            print(f"✅ Tabela já particionada ({len(criadas)} partições novas criadas)")
+            return True
+    finally:
+        db.close()
+
+    print("🔧 Convertendo notificacoes para particionamento mensal...")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("LOCK TABLE notificacoes IN ACCESS EXCLUSIVE MODE"))
+            conn.execute(text("UPDATE notificacoes SET created_at = now() WHERE created_at IS NULL"))
+
+            indices = conn.execute(text(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = 'notificacoes'"
+            )).all()
+            fks = conn.execute(text(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = 'notificacoes'::regclass AND contype = 'f'"
+            )).all()
+            mais_antiga = conn.execute(text("SELECT min(created_at) FROM notificacoes")).scalar()
+
+            conn.execute(text(
+                "CREATE TABLE notificacoes_particionada "
+                "(LIKE notificacoes INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+            ))
+            conn.execute(text("ALTER TABLE notificacoes_particionada ALTER COLUMN created_at SET NOT NULL"))
+
+            de = _adicionar_meses(mais_antiga or datetime.utcnow(), 0)
+            fim = _adicionar_meses(datetime.utcnow(), 3)
+            while de <= fim:
+                ate = _adicionar_meses(de, 1)
+                conn.execute(text(
+                    f"CREATE TABLE notificacoes_p{de:%Y%m} PARTITION OF notificacoes_particionada "
+                    f"FOR VALUES FROM ('{de:%Y-%m-%d}') TO ('{ate:%Y-%m-%d}')"
+                ))
+                de = ate
+            conn.execute(text("CREATE TABLE notificacoes_pdefault PARTITION OF notificacoes_particionada DEFAULT"))
+
+            copiadas = conn.execute(text("INSERT INTO notificacoes_particionada SELECT * FROM notificacoes")).rowcount
+            print(f"📦 {copiadas} notificações copiadas")
+
+            # Trocar as tabelas; os nomes de índices são globais no schema, então os antigos ganham sufixo
+            conn.execute(text("ALTER TABLE notificacoes RENAME TO notificacoes_legado"))
+            for nome, _ in indices:
+                conn.execute(text(f"ALTER INDEX {nome} RENAME TO {nome}_legado"))
+            conn.execute(text("ALTER TABLE notificacoes_particionada RENAME TO notificacoes"))
+
+            # A chave primária de uma tabela particionada precisa incluir a chave de partição
+            conn.execute(text("ALTER TABLE notificacoes ADD CONSTRAINT notificacoes_pkey PRIMARY KEY (id, created_at)"))
+            for nome, definicao in indices:
+                if nome != "notificacoes_pkey":
+                    conn.execute(text(definicao))
+            for nome, definicao in fks:
+                conn.execute(text(f"ALTER TABLE notificacoes ADD CONSTRAINT {nome} {definicao}"))
+
+        print("✅ Tabela notificacoes particionada por mês!")
+        print("ℹ️  Após conferir os dados, remova a tabela antiga: DROP TABLE notificacoes_legado;")
+        return True
+    except Exception as e:
+        print(f"❌ Erro ao particionar notificacoes: {e}")
+        return False
+
+if __name__ == "__main__":
+    particionar_notificacoes()
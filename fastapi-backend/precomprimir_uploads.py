@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Script para gerar as variantes pré-comprimidas (.gz e .br) dos arquivos em uploads/
+
+O /uploads (ArquivosPrecomprimidos) serve a variante quando o cliente aceita a
+codificação e ela é mais nova que o original. Só arquivos de tipo comprimível
+(texto, JSON, SVG...) acima do tamanho mínimo são processados, e a variante só
+é mantida se ficar menor que o original. Pode rodar em cron: arquivos já
+processados e inalterados são pulados.
+
+Uso: python precomprimir_uploads.py [--diretorio uploads] [--min-bytes 1024]
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+
+from app.api.compressao import EXTENSOES_CODIFICACAO, brotli, tipo_comprimivel
+from app.core.config import settings
+
+EXTENSOES_VARIANTES = tuple(extensao for _, extensao in EXTENSOES_CODIFICACAO)
+
+
+def _comprimir(dados: bytes, codificacao: str) -> bytes:
+    if codificacao == "br":
+        return brotli.compress(dados, quality=11)
+    return gzip.compress(dados, compresslevel=9, mtime=0)
+
+
+def precomprimir_uploads(diretorio: str = "uploads", min_bytes: int = None):
+    """Write .br/.gz siblings for compressible upload files"""
+    min_bytes = settings.compressao_min_bytes if min_bytes is None else min_bytes
+    codificacoes = [(c, e) for c, e in EXTENSOES_CODIFICACAO if c != "br" or brotli is not None]
+    if brotli is None:
+        print("⚠️  Pacote brotli não instalado, gerando apenas .gz")
+    print(f"🔧 Pré-comprimindo arquivos de {diretorio}/ (mínimo {min_bytes} bytes)...")
+
+    gerados = pulados = economia = 0
+    for raiz, _, arquivos in os.walk(diretorio):
+        for nome in arquivos:
+            if nome.endswith(EXTENSOES_VARIANTES):
+                continue
+            caminho = os.path.join(raiz, nome)
+            tipo = mimetypes.guess_type(caminho)[0] or ""
+            tamanho = os.path.getsize(caminho)
+            if tamanho < min_bytes or not tipo_comprimivel(tipo):
+                continue
+            mtime = os.path.getmtime(caminho)
+            dados = None
+            for codificacao, extensao in codificacoes:
+                destino = caminho + extensao
+                if os.path.exists(destino) and os.path.getmtime(destino) >= mtime:
+                    pulados += 1
+                    continue
+                if dados is None:
+                    with open(caminho, "rb") as arquivo:
+                        dados = arquivo.read()
+                comprimido = _comprimir(dados, codificacao)
+                if len(comprimido) >= tamanho:
+                    # Não compensa: remover variante antiga para o original ser servido
+                    if os.path.exists(destino):
+                        os.remove(destino)
+                    continue
+                with open(destino + ".tmp", "wb") as arquivo:
+                    arquivo.write(comprimido)
+                os.replace(destino + ".tmp", destino)
+                gerados += 1
+                economia += tamanho - len(comprimido)
+
+    print(f"✅ {gerados} variantes geradas, {pulados} já atualizadas, {economia / 1024:.1f} KB economizados")
+    return gerados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pré-comprimir arquivos de uploads/")
+    parser.add_argument("--diretorio", default="uploads")
+    parser.add_argument("--min-bytes", type=int, default=None)
+    args = parser.parse_args()
+    precomprimir_uploads(args.diretorio, args.min_bytes)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Etapa de migração: criar/verificar tabelas, índices de busca, contadores e o
+admin padrão antes de subir a aplicação
+
+Roda no preDeploy do Railway (railway.json) / release do Procfile, para que o
+startup do servidor não precise fazer isso. Termina com código 1 se o banco
+estiver inacessível ou alguma etapa falhar.
+
+Uso: python preparar_banco.py
+"""
+import sys
+
+from app.core.database import test_connection
+from app.core.inicializacao import preparar_banco
+
+
+def executar_preparacao() -> bool:
+    """Run every schema/derived-data step and report failures"""
+    print("🔧 Preparando o banco de dados...")
+    if not test_connection():
+        return False
+    falhas = {nome: erro for nome, erro in preparar_banco().items() if erro}
+    for nome, erro in falhas.items():
+        print(f"❌ Etapa '{nome}' falhou: {erro}")
+    if falhas:
+        return False
+    print("✅ Banco preparado com sucesso!")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if executar_preparacao() else 1)
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular do zero os contadores de status dos criativos
+(tabela criativo_status_counters) a partir da tabela criativos
+"""
+from app.core.database import SessionLocal, create_tables
+from app.services.criativo_service import CriativoService
+
+def rebuild_criativo_counters():
+    """Recompute every (projeto_id, status) counter from scratch"""
+    print("🔧 Recalculando contadores de status dos criativos...")
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        total = CriativoService(db).rebuild_status_counters()
+        print(f"✅ {total} contadores recalculados com sucesso!")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao recalcular contadores: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_criativo_counters()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir o índice de busca unificado (tabela search_documents)
+a partir de leads, clientes, propostas, atividades e criativos
+"""
+from app.core.database import SessionLocal, create_tables, engine
+from app.services.search_service import SearchService
+
+def rebuild_search_index():
+    """Recreate the full-text structures and reindex every entity"""
+    print("🔧 Reconstruindo índice de busca...")
+
+    create_tables()
+    backend = SearchService.preparar_indice(engine)
+    db = SessionLocal()
+    try:
+        total = SearchService.reindexar(db)
+        print(f"✅ {total} documentos indexados ({backend})!")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao reconstruir índice de busca: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_search_index()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script para gerar o relatório de possíveis clientes duplicados
+(mesmo CPF, e-mail, telefone ou nome parecido)
+
+Uso: python relatorio_duplicatas_clientes.py [--min-score 0.6]
+"""
+import argparse
+from app.core.database import SessionLocal
+from app.services.cliente_similaridade_service import ClienteSimilaridadeService
+
+def relatorio_duplicatas_clientes(min_score=0.6):
+    """Print duplicate groups found in blocked passes over the clientes table"""
+    print("🔍 Procurando clientes duplicados...")
+
+    db = SessionLocal()
+    try:
+        relatorio = ClienteSimilaridadeService.relatorio_duplicatas(db, min_score=min_score)
+        for grupo in relatorio["grupos"]:
+            print(f"\n📋 Grupo (score {grupo['score_max']}):")
+            for cliente in grupo["clientes"]:
+                print(f"   - {cliente['id']} | {cliente['nome']} | {cliente['email'] or '-'} | {cliente['cpf'] or '-'}")
+            for par in grupo["pares"]:
+                print(f"     {par['cliente_id']} ~ {par['similar_id']}: {par['score']} ({', '.join(par['motivos'])})")
+        for bloco in relatorio["blocos_ignorados"]:
+            print(f"⚠️  {bloco['campo']} '{bloco['valor']}' compartilhado por {bloco['clientes']} clientes (ignorado)")
+        print(f"\n✅ {len(relatorio['grupos'])} grupos em {relatorio['total_clientes']} clientes "
+              f"({relatorio['comparacoes']} comparações, {relatorio['duracao_segundos']}s)")
+        return True
+    except Exception as e:
+        print(f"❌ Erro ao gerar relatório: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório de clientes duplicados")
+    parser.add_argument("--min-score", type=float, default=0.6)
+    args = parser.parse_args()
+    relatorio_duplicatas_clientes(args.min_score)
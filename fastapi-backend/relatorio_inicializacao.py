@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Relatório do tempo de inicialização: importação por módulo e tempo até o /ready
+
+Importa app.main num subprocesso com `python -X importtime`, agrupa o tempo
+próprio por módulo da aplicação e por pacote de terceiros e mostra os maiores.
+Depois sobe a aplicação em processo (TestClient, banco SQLite temporário) e mede
+quanto tempo o /ready leva para responder 200. Termina com código 1 se a
+importação ou a prontidão passarem do orçamento, para poder rodar em CI.
+
+Uso: python relatorio_inicializacao.py [--top 15] [--orcamento-importacao-ms 3000] [--orcamento-prontidao-ms 10000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+_ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "relatorio_inicializacao.db")
+
+
+def _ambiente() -> dict:
+    ambiente = dict(os.environ)
+    ambiente.setdefault("DATABASE_URL", f"sqlite:///{_ARQUIVO_DB}")
+    return ambiente
+
+
+def tempos_importacao() -> tuple:
+    """(total_ms, [(módulo, próprio_ms, cumulativo_ms)]) da importação de app.main"""
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=_ambiente(), cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if processo.returncode != 0:
+        raise SystemExit(f"❌ Falha ao importar app.main:\n{processo.stderr[-2000:]}")
+    modulos = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        modulos.append((nome.strip(), int(proprio) / 1000, int(cumulativo) / 1000))
+    total = next((cumulativo for nome, _, cumulativo in modulos if nome == "app.main"), 0.0)
+    return total, modulos
+
+
+def _agrupar(modulos: list) -> dict:
+    """Tempo próprio somado: por módulo para app.*, por pacote raiz para o resto"""
+    grupos = {}
+    for nome, proprio, _ in modulos:
+        chave = nome if nome.startswith("app.") or nome == "app" else nome.split(".")[0]
+        grupos[chave] = grupos.get(chave, 0.0) + proprio
+    return grupos
+
+
+def tempo_prontidao(limite_s: float) -> float:
+    """Segundos entre o startup da aplicação e o primeiro 200 do /ready"""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{_ARQUIVO_DB}")
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < limite_s:
+            resposta = client.get("/ready")
+            if resposta.status_code == 200:
+                return time.perf_counter() - inicio
+            time.sleep(0.05)
+        print(f"   /ready ainda em {resposta.json()}")
+    return float("inf")
+
+
+def relatorio_inicializacao(top: int = 15, orcamento_importacao_ms: float = 3000, orcamento_prontidao_ms: float = 10000) -> bool:
+    """Print per-module import time and time to readiness, checking both budgets"""
+    total, modulos = tempos_importacao()
+    print(f"⏱️  Importação de app.main: {total:.0f}ms (orçamento {orcamento_importacao_ms:.0f}ms)")
+
+    grupos = _agrupar(modulos)
+    print(f"\n   {'módulo / pacote':<50} {'próprio':>10}")
+    for nome, proprio in sorted(grupos.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {nome:<50} {proprio:8.1f}ms")
+
+    cumulativos = {}
+    for nome, _, cumulativo in modulos:
+        if nome.startswith("app."):
+            cumulativos[nome] = max(cumulativo, cumulativos.get(nome, 0.0))
+    aplicacao = sorted(cumulativos.items(), key=lambda item: -item[1])
+    print(f"\n   {'módulo da aplicação (com dependências)':<50} {'cumulativo':>10}")
+    for nome, cumulativo in aplicacao[:top]:
+        print(f"   {nome:<50} {cumulativo:8.1f}ms")
+
+    prontidao = tempo_prontidao(orcamento_prontidao_ms / 1000 * 2) * 1000
+    print(f"\n⏱️  Startup até /ready 200: {prontidao:.0f}ms (orçamento {orcamento_prontidao_ms:.0f}ms)")
+
+    ok = True
+    if total > orcamento_importacao_ms:
+        print("❌ Importação acima do orçamento")
+        ok = False
+    if prontidao > orcamento_prontidao_ms:
+        print("❌ Prontidão acima do orçamento")
+        ok = False
+    if ok:
+        print("✅ Inicialização dentro do orçamento")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório do tempo de inicialização da API")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--orcamento-importacao-ms", type=float, default=3000)
+    parser.add_argument("--orcamento-prontidao-ms", type=float, default=10000)
+    args = parser.parse_args()
+    sucesso = relatorio_inicializacao(args.top, args.orcamento_importacao_ms, args.orcamento_prontidao_ms)
+    if os.path.exists(_ARQUIVO_DB):
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
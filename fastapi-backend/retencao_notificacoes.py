@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Script para aplicar a política de retenção de notificações (para cron)
+
+Arquiva (ou remove) notificações lidas/descartadas mais antigas que
+NOTIFICACAO_RETENCAO_DIAS, em lotes de NOTIFICACAO_RETENCAO_LOTE linhas.
+
+Uso: python retencao_notificacoes.py [--dias 90] [--modo archive|delete] [--lote 500]
+"""
+import argparse
+from app.core.database import SessionLocal, create_tables
+from app.services.notificacao_retencao_service import NotificacaoRetencaoService, MODOS_RETENCAO
+
+def retencao_notificacoes(dias=None, modo=None, lote=None):
+    """Apply the retention policy and print before/after table sizes"""
+    print("🧹 Aplicando política de retenção de notificações...")
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        antes = NotificacaoRetencaoService.tamanho_tabelas(db)
+        resultado = NotificacaoRetencaoService.aplicar_politica(db, dias=dias, modo=modo, tamanho_lote=lote)
+        depois = NotificacaoRetencaoService.tamanho_tabelas(db)
+
+        print(f"✅ {resultado['removidas']} notificações removidas, {resultado['arquivadas']} arquivadas "
+              f"em {resultado['lotes']} lotes ({resultado['duracao_segundos']}s)")
+        for tabela in antes:
+            print(f"   {tabela}: {antes[tabela]['linhas']} → {depois[tabela]['linhas']} linhas"
+                  + (f", {depois[tabela]['bytes']} bytes" if depois[tabela]['bytes'] is not None else ""))
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao aplicar retenção: {e}")
+        return False
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Retenção de notificações")
+    parser.add_argument("--dias", type=int, default=None)
+    parser.add_argument("--modo", choices=MODOS_RETENCAO, default=None)
+    parser.add_argument("--lote", type=int, default=None)
+    args = parser.parse_args()
+    retencao_notificacoes(args.dias, args.modo, args.lote)
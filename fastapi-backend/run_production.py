@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import uvicorn
 import os
 
+from start_server import iniciar_servidor, quantidade_workers
+
 if __name__ == "__main__":
     print("🚀 Iniciando FastAPI Server - PRODUÇÃO...")
     print("📡 API será executada em: http://localhost:3001")
@@ -12,11 +13,7 @@ if __name__ == "__main__":
     
     # Use config.prod.env for production
     os.environ["ENV_FILE"] = "config.prod.env"
+    os.environ.setdefault("ENVIRONMENT", "production")
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=3001,
-        reload=False,  # Disable auto-reload in production
-        log_level="info"
-    ) 
\ No newline at end of file
+    # Um worker por núcleo (WEB_CONCURRENCY para ajustar), sem auto-reload
+    iniciar_servidor(3001, quantidade_workers())
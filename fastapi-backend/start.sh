@@ -6,6 +6,7 @@ PORT=${PORT:-3001}
 
 echo "🚀 Iniciando FastAPI na porta $PORT..."
 
-# Executar uvicorn
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
+# Servidor (gunicorn com N workers ou uvicorn único; ver start_server.py)
+export PORT
+exec python start_server.py
 
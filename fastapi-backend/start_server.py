@@ -2,10 +2,59 @@
 """
 Script para iniciar o servidor FastAPI no Railway
 Lê a variável PORT do ambiente e inicia o servidor
+
+Com mais de um worker (WEB_CONCURRENCY; em produção o padrão são os núcleos
+disponíveis) o servidor é o gunicorn com workers uvicorn, configurado em
+gunicorn.conf.py (preload, reciclagem de workers, recarga com HUP). Com um
+worker, uvicorn direto como antes.
 """
+import importlib.util
+import multiprocessing
 import os
+import sys
+
 import uvicorn
 
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def quantidade_workers() -> int:
+    """WEB_CONCURRENCY explícito; sem valor, núcleos em produção e 1 no resto"""
+    if os.getenv("WEB_CONCURRENCY"):
+        return max(1, int(os.environ["WEB_CONCURRENCY"]))
+    if os.getenv("ENVIRONMENT", "development") == "production":
+        return multiprocessing.cpu_count()
+    return 1
+
+
+def iniciar_servidor(port: int, workers: int):
+    """Subir o servidor HTTP (não retorna)"""
+    if workers > 1:
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        if sys.platform == "win32" or importlib.util.find_spec("gunicorn") is None:
+            # Sem gunicorn (não roda no Windows): processos do próprio uvicorn,
+            # sem preload nem recarga graciosa
+            print("⚠️  gunicorn não instalado, usando uvicorn --workers")
+            uvicorn.run(
+                "app.main:app",
+                host="0.0.0.0",
+                port=port,
+                workers=workers,
+                limit_max_requests=int(os.getenv("GUNICORN_MAX_REQUESTS", "5000")) or None,
+                log_level="info"
+            )
+            return
+        os.chdir(DIRETORIO)
+        os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"])
+
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=port,
+        log_level="info"
+    )
+
+
 if __name__ == "__main__":
     # Debug: mostrar variáveis importantes
     print("=" * 60)
@@ -21,18 +70,13 @@ if __name__ == "__main__":
     print(f"📍 PORT: {os.getenv('PORT', '3001')}")
     print(f"🌍 ENVIRONMENT: {os.getenv('ENVIRONMENT', 'development')}")
     print("=" * 60)
-    
+
     # Obter porta do ambiente ou usar padrão
     port = int(os.getenv("PORT", "3001"))
-    
-    print(f"\n🚀 Iniciando FastAPI na porta {port}...")
+    workers = quantidade_workers()
+
+    print(f"\n🚀 Iniciando FastAPI na porta {port} com {workers} worker(s)...")
     print(f"📡 API será executada em: http://0.0.0.0:{port}")
     print(f"📚 Documentação em: http://0.0.0.0:{port}/docs")
-    
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=port,
-        log_level="info"
-    )
 
+    iniciar_servidor(port, workers)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Verificação do índice de busca (search_documents) mantido pelo after_flush
+
+Para cada entidade indexada (SearchService.ENTIDADES), cria um registro e:
+
+- altera, um de cada vez, cada campo que não entra no índice e faz commit: a
+  escrita precisa passar e o documento continuar igual;
+- altera o título: o documento precisa ser regravado na mesma transação.
+
+Também confere as escritas em lote fora do ORM: depois de
+AtividadeService.marcar_atrasadas (UPDATE do Core, em lotes), o status no
+índice precisa ser o da tabela.
+
+Termina com código 1 se algum problema for encontrado.
+
+Uso:
+    python verificar_busca.py                    # SQLite temporário
+    python verificar_busca.py --database-url postgresql://...   # banco descartável
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Verificar a manutenção do índice de busca nas escritas")
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "verificar_busca.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+from sqlalchemy import Boolean, Date, DateTime, Enum, Integer, Numeric, String, Text
+
+from app import models  # noqa: F401 - registrar todos os modelos (e o after_flush da busca)
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Atividade, Cliente, Criativo, Lead, Project, Proposta, SearchDocument, User
+from app.models.criativo import TipoArquivo
+from app.services.atividade_service import STATUS_ATRASADA, AtividadeService
+from app.services.search_service import ENTIDADES, SearchService
+
+
+def _novo_valor(coluna, atual):
+    """A different value of the column's type (None if the type is not handled)"""
+    tipo = coluna.type
+    if isinstance(tipo, Enum):
+        opcoes = [o for o in (tipo.enum_class or tipo.enums) if o != atual]
+        return opcoes[0] if opcoes else None
+    if isinstance(tipo, Boolean):
+        return not atual
+    if isinstance(tipo, Integer):
+        return (atual or 0) + 1
+    if isinstance(tipo, Numeric):
+        return Decimal(atual or 0) + Decimal("1.5")
+    if isinstance(tipo, DateTime):
+        return (atual or datetime(2025, 1, 1)) + timedelta(days=1)
+    if isinstance(tipo, Date):
+        return (atual or date(2025, 1, 1)) + timedelta(days=1)
+    if isinstance(tipo, (String, Text)):
+        return "alterado"[:tipo.length or None]
+    return None
+
+
+def _registros(db, usuario_id, projeto_id) -> dict:
+    return {
+        "lead": Lead(nome="Lead Verificação", criado_por_id=usuario_id, projeto_id=projeto_id),
+        "cliente": Cliente(nome="Cliente Verificação"),
+        "proposta": Proposta(titulo="Proposta Verificação"),
+        "atividade": Atividade(nome="Atividade Verificação", projeto_id=projeto_id),
+        "criativo": Criativo(nome="Criativo Verificação", tipo=list(TipoArquivo)[0],
+                             criado_por_id=usuario_id, projeto_id=projeto_id),
+    }
+
+
+def _documento(db, entidade: str, entidade_id):
+    return db.query(SearchDocument).filter(
+        SearchDocument.entidade == entidade,
+        SearchDocument.entidade_id == entidade_id
+    ).one_or_none()
+
+
+def verificar_entidade(db, nome: str, obj) -> list:
+    """Update every non-indexed column, then the title, checking the search document each time"""
+    indice = ENTIDADES[nome]
+    db.add(obj)
+    db.commit()
+    original = _documento(db, nome, obj.id)
+    if original is None:
+        return [f"{nome}: documento não criado no INSERT"]
+    termos = (original.titulo, original.termos)
+
+    problemas = []
+    for coluna in indice.modelo.__table__.columns:
+        if coluna.primary_key or coluna.foreign_keys or coluna.key in indice.monitorados:
+            continue
+        valor = _novo_valor(coluna, getattr(obj, coluna.key))
+        if valor is None:
+            continue
+        try:
+            setattr(obj, coluna.key, valor)
+            db.commit()
+        except Exception as e:  # noqa: BLE001 - a falha é o que se verifica
+            db.rollback()
+            problemas.append(f"{nome}.{coluna.key}: a escrita falhou ({e!r})")
+            continue
+        db.expire_all()
+        documento = _documento(db, nome, obj.id)
+        if documento is None or (documento.titulo, documento.termos) != termos:
+            problemas.append(f"{nome}.{coluna.key}: documento alterado por um campo fora do índice")
+
+    setattr(obj, indice.titulo, f"Renomeado {nome}")
+    db.commit()
+    db.expire_all()
+    documento = _documento(db, nome, obj.id)
+    if documento is None or documento.titulo != f"Renomeado {nome}":
+        problemas.append(f"{nome}.{indice.titulo}: documento não regravado ({documento and documento.titulo})")
+    return problemas
+
+
+def verificar_atrasadas(db, projeto_id) -> list:
+    """Bulk overdue marking (Core UPDATE, several batches) must leave the index in sync with the table"""
+    vencido = datetime.now() - timedelta(days=1)
+    atividades = [
+        Atividade(nome=f"Vencida {i}", projeto_id=projeto_id, status=status, prazo=vencido)
+        for i, status in enumerate(["Não iniciada"] * 3 + ["Em andamento"] * 2)
+    ]
+    atividades.append(Atividade(nome="No prazo", projeto_id=projeto_id, status="Em andamento",
+                                prazo=datetime.now() + timedelta(days=1)))
+    db.add_all(atividades)
+    db.commit()
+
+    AtividadeService.marcar_atrasadas(db, tamanho_lote=2)
+    db.expire_all()
+    problemas = []
+    for atividade in atividades:
+        documento = _documento(db, "atividade", atividade.id)
+        if documento is None or documento.subtitulo != atividade.status:
+            problemas.append(f"atrasadas.{atividade.nome}: índice com {documento and documento.subtitulo!r}, "
+                             f"tabela com {atividade.status!r}")
+    if sum(a.status == STATUS_ATRASADA for a in atividades) != 5:
+        problemas.append("atrasadas: as 5 atividades vencidas não foram marcadas")
+    return problemas
+
+
+def verificar_busca() -> bool:
+    """Run the checks for every indexed entity and report the first failures"""
+    create_tables()
+    SearchService.preparar_indice(engine)
+    db = SessionLocal()
+    try:
+        usuario = User(name="Verificação", username="verificacao-busca",
+                       email="verificacao-busca@example.com", hashed_password="-", is_active=True)
+        db.add(usuario)
+        db.flush()
+        projeto = Project(name="Projeto Verificação", owner_id=usuario.id)
+        db.add(projeto)
+        db.commit()
+
+        problemas = []
+        for nome, obj in _registros(db, usuario.id, projeto.id).items():
+            encontrados = verificar_entidade(db, nome, obj)
+            print(f"   {'❌' if encontrados else '✅'} {nome}")
+            problemas += encontrados
+
+        encontrados = verificar_atrasadas(db, projeto.id)
+        print(f"   {'❌' if encontrados else '✅'} atividades marcadas como atrasadas em lote")
+        problemas += encontrados
+    finally:
+        db.close()
+
+    for problema in problemas:
+        print(f"❌ {problema}")
+    if not problemas:
+        print(f"✅ Índice de busca consistente nas {len(ENTIDADES)} entidades e na escrita em lote")
+    return not problemas
+
+
+if __name__ == "__main__":
+    print("🔎 Escritas nas entidades indexadas")
+    sucesso = verificar_busca()
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Verificação dos contadores de notificações (cache em processo) sob escritas concorrentes
+
+Com NOTIFICACAO_COUNT_CACHE ligado, várias threads marcam como lidas, marcam
+todas como lidas, excluem, criam e leem os contadores das mesmas notificações
+ao mesmo tempo. Ao final de cada rodada, os contadores em cache do usuário
+precisam ser iguais a uma contagem nova no banco (total, não lidas,
+urgentes). Termina com código 1 na primeira divergência.
+
+Uso:
+    python verificar_contadores_notificacoes.py                    # SQLite temporário
+    python verificar_contadores_notificacoes.py --rodadas 50 --threads 16
+    python verificar_contadores_notificacoes.py --database-url postgresql://...   # banco descartável
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Verificar os contadores de notificações sob concorrência")
+    parser.add_argument("--rodadas", type=int, default=20, help="Rodadas independentes")
+    parser.add_argument("--threads", type=int, default=8, help="Threads por rodada")
+    parser.add_argument("--notificacoes", type=int, default=30, help="Notificações criadas no início de cada rodada")
+    parser.add_argument("--operacoes", type=int, default=25, help="Operações por thread")
+    parser.add_argument("--semente", type=int, default=None, help="Semente do sorteio das operações")
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    os.environ["NOTIFICACAO_COUNT_CACHE"] = "true"
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "verificar_contadores.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import SessionLocal, create_tables
+from app.models import User
+from app.models.notificacao import Notificacao, NotificationStatus, NotificationType
+from app.schemas.notificacao import NotificacaoCreate
+from app.services.notificacao_service import NotificacaoService, TIPOS_URGENTES, contador_cache
+
+
+def contagem_banco(db, usuario_id) -> dict:
+    """Fresh counters straight from the table, bypassing the cache"""
+    nao_lida = Notificacao.status == NotificationStatus.UNREAD
+    total, unread, urgent = db.query(
+        func.count(Notificacao.id),
+        func.count(case((nao_lida, 1))),
+        func.count(case((nao_lida & Notificacao.tipo.in_(TIPOS_URGENTES), 1)))
+    ).filter(Notificacao.usuario_id == usuario_id).one()
+    return {"total": total, "unread": unread, "urgent": urgent}
+
+
+def _nova(usuario_id, sorteio: random.Random) -> NotificacaoCreate:
+    return NotificacaoCreate(
+        tipo=sorteio.choice(list(NotificationType)),
+        titulo="Verificação",
+        mensagem="Contadores sob concorrência",
+        usuario_id=usuario_id
+    )
+
+
+def _operar(usuario_id, ids: list, semente: int, operacoes: int, erros: list):
+    sorteio = random.Random(semente)
+    db = SessionLocal()
+    try:
+        for _ in range(operacoes):
+            escolha = sorteio.random()
+            try:
+                if escolha < 0.35:
+                    NotificacaoService.marcar_como_lida(db, sorteio.choice(ids), usuario_id)
+                elif escolha < 0.65:
+                    NotificacaoService.deletar_notificacao(db, sorteio.choice(ids), usuario_id)
+                elif escolha < 0.7:
+                    NotificacaoService.marcar_todas_como_lidas(db, usuario_id)
+                elif escolha < 0.85:
+                    NotificacaoService.criar_notificacao(db, _nova(usuario_id, sorteio))
+                else:
+                    NotificacaoService.contar_notificacoes_usuario(db, usuario_id)
+            except OperationalError:
+                # SQLite: "database is locked" numa escrita disputada; a operação
+                # não aconteceu e o cache não foi ajustado
+                db.rollback()
+    except Exception as e:  # noqa: BLE001 - a rodada falha com o erro da thread
+        erros.append(repr(e))
+    finally:
+        db.close()
+
+
+def verificar_rodada(rodada: int, usuario_id, semente: int) -> list:
+    """Seed notifications, hammer them from several threads and compare cache with a fresh count"""
+    sorteio = random.Random(semente)
+    db = SessionLocal()
+    try:
+        db.query(Notificacao).filter(Notificacao.usuario_id == usuario_id).delete()
+        db.commit()
+        contador_cache.invalidar(usuario_id)
+        ids = [NotificacaoService.criar_notificacao(db, _nova(usuario_id, sorteio)).id for _ in range(ARGS.notificacoes)]
+        # Cache populado antes das escritas: os ajustes incrementais é que são verificados
+        NotificacaoService.contar_notificacoes_usuario(db, usuario_id)
+    finally:
+        db.close()
+
+    erros: list = []
+    threads = [
+        threading.Thread(target=_operar, args=(usuario_id, ids, semente * 1000 + i, ARGS.operacoes, erros))
+        for i in range(ARGS.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if erros:
+        return [f"rodada {rodada}: erro numa thread: {erros[0]}"]
+
+    db = SessionLocal()
+    try:
+        em_cache = contador_cache.obter(usuario_id)
+        if em_cache is None:
+            # Descartado por uma escrita (marcar todas): o próximo GET recalcula
+            NotificacaoService.contar_notificacoes_usuario(db, usuario_id)
+            em_cache = contador_cache.obter(usuario_id)
+        no_banco = contagem_banco(db, usuario_id)
+    finally:
+        db.close()
+    if em_cache != no_banco:
+        return [f"rodada {rodada} (semente {semente}): cache {em_cache} != banco {no_banco}"]
+    return []
+
+
+def verificar_contadores(args) -> bool:
+    """Run the concurrent rounds and stop at the first cache/database mismatch"""
+    create_tables()
+    db = SessionLocal()
+    try:
+        usuario = db.query(User).filter(User.email == "verificacao-contadores@example.com").first()
+        if usuario is None:
+            usuario = User(name="Verificação", username="verificacao-contadores",
+                           email="verificacao-contadores@example.com", hashed_password="-", is_active=True)
+            db.add(usuario)
+            db.commit()
+        usuario_id = usuario.id
+    finally:
+        db.close()
+
+    semente_inicial = args.semente if args.semente is not None else random.randrange(1_000_000)
+    print(f"🔎 {args.rodadas} rodadas, {args.threads} threads x {args.operacoes} operações "
+          f"(semente {semente_inicial})")
+    for rodada in range(args.rodadas):
+        problemas = verificar_rodada(rodada, usuario_id, semente_inicial + rodada)
+        if problemas:
+            for problema in problemas:
+                print(f"❌ {problema}")
+            return False
+
+    db = SessionLocal()
+    try:
+        db.query(Notificacao).filter(Notificacao.usuario_id == usuario_id).delete()
+        db.query(User).filter(User.id == usuario_id).delete()
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Contadores em cache iguais ao banco nas {args.rodadas} rodadas")
+    return True
+
+
+if __name__ == "__main__":
+    sucesso = verificar_contadores(ARGS)
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Verificação das métricas dos relatórios diários contra uma implementação de referência
+
+Gera casos aleatórios (reprodutíveis pela --semente) de relatórios com
+investimento e quantidades ausentes, zerados ou grandes, grava pelo
+RelatorioDiarioService e compara com a referência calculada fora do banco:
+
+- custos unitários gravados em create/update (valor_investido / quantidade);
+- get_estatisticas_projeto num período aleatório: totais e custos médios
+  ponderados (soma investida / soma das quantidades, só nos dias com os dois);
+- get_metricas_agrupadas por projeto e por mês;
+- get_relatorios_periodo e os totais de get_dashboard_consolidado no mesmo
+  período (metade das vezes ele termina num dia com relatório: o último dia
+  é inclusivo).
+
+A referência usa frações exatas; com o numpy instalado os custos também são
+conferidos com arrays (NaN para ausentes). Termina com código 1 na primeira
+divergência, mostrando o caso e a semente.
+
+Uso:
+    python verificar_metricas.py                    # SQLite temporário, 200 casos
+    python verificar_metricas.py --casos 1000 --semente 7
+    python verificar_metricas.py --database-url postgresql://...   # banco descartável
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Verificar as métricas ponderadas dos relatórios diários")
+    parser.add_argument("--casos", type=int, default=200, help="Número de casos aleatórios")
+    parser.add_argument("--semente", type=int, default=None, help="Semente do primeiro caso (padrão: aleatória)")
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário (as tabelas são esvaziadas a cada caso)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar cada caso")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "verificar_metricas.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+try:
+    import numpy as np
+except ImportError:  # Dependência opcional, só para a segunda referência
+    np = None
+
+from app.core.database import SessionLocal, create_tables
+from app.models import Project, RelatorioDiario, User
+from app.schemas.relatorio_diario import FiltroRelatorio, RelatorioDiarioCreate, RelatorioDiarioUpdate
+from app.services.relatorio_diario_service import CUSTOS_DERIVADOS, RelatorioDiarioService
+
+# No SQLite o Numeric é gravado em ponto flutuante: somas podem errar na última
+# casa e mudar o arredondamento do centavo. No PostgreSQL a comparação é exata.
+CENTAVO = Decimal("0.01")
+INICIO_ANO = date(2025, 1, 1)
+TOTAIS = ("valor_investido", "leads", "registros", "deposito", "ftd", "total_comissao_dia")
+
+
+def _centavos(valor: Fraction) -> Decimal:
+    return (Decimal(valor.numerator) / Decimal(valor.denominator)).quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+
+def _dinheiro(sorteio: random.Random, maximo: int, negativo: bool = False):
+    if sorteio.random() < 0.15:
+        return None
+    centavos = sorteio.randint(-maximo * 10 if negativo else 0, maximo * 100)
+    return Decimal(centavos) / 100
+
+
+def _quantidade(sorteio: random.Random, maximo: int):
+    escolha = sorteio.random()
+    if escolha < 0.15:
+        return None
+    if escolha < 0.25:
+        return 0
+    return sorteio.randint(1, maximo)
+
+
+def gerar_caso(sorteio: random.Random, projetos: list) -> list:
+    """Random daily reports (with missing and zero values) for the given projects"""
+    relatorios = []
+    for projeto_id in projetos:
+        dias = sorteio.sample(range(365), sorteio.randint(0, 40))
+        for dia in dias:
+            relatorios.append({
+                "projeto_id": projeto_id,
+                "data_referente": INICIO_ANO + timedelta(days=dia),
+                "valor_investido": _dinheiro(sorteio, 50_000),
+                "leads": _quantidade(sorteio, 5_000),
+                "registros": _quantidade(sorteio, 2_000),
+                "deposito": _dinheiro(sorteio, 200_000),
+                "ftd": _quantidade(sorteio, 300),
+                "total_comissao_dia": _dinheiro(sorteio, 10_000, negativo=True),
+            })
+    return relatorios
+
+
+def referencia_custo(valor, quantidade):
+    if valor is None or not quantidade:
+        return None
+    return _centavos(Fraction(valor) / quantidade)
+
+
+def referencia_estatisticas(relatorios: list) -> dict:
+    """Totals and weighted unit costs computed with exact fractions"""
+    resultado = {"total_relatorios": len(relatorios)}
+    for campo in TOTAIS:
+        resultado[campo] = sum((Fraction(r[campo]) for r in relatorios if r[campo] is not None), Fraction(0))
+    for coluna, quantidade in CUSTOS_DERIVADOS.items():
+        pares = [(r["valor_investido"], r[quantidade]) for r in relatorios
+                 if r["valor_investido"] is not None and r[quantidade] is not None]
+        denominador = sum(q for _, q in pares)
+        resultado[coluna] = _centavos(sum(Fraction(v) for v, _ in pares) / denominador) if denominador else None
+    return resultado
+
+
+def referencia_numpy(relatorios: list) -> dict:
+    """Weighted unit costs with NumPy masked sums (NaN = missing)"""
+    investido = np.array([np.nan if r["valor_investido"] is None else float(r["valor_investido"]) for r in relatorios], dtype=float)
+    custos = {}
+    for coluna, quantidade in CUSTOS_DERIVADOS.items():
+        quantidades = np.array([np.nan if r[quantidade] is None else r[quantidade] for r in relatorios], dtype=float)
+        pareados = ~np.isnan(investido) & ~np.isnan(quantidades)
+        denominador = quantidades[pareados].sum()
+        custos[coluna] = investido[pareados].sum() / denominador if denominador else None
+    return custos
+
+
+def _divergencias(rotulo: str, obtido, esperado: dict, relatorios: list) -> list:
+    problemas = []
+
+    def comparar(nome, valor, referencia, tolerancia):
+        if (valor is None) != (referencia is None):
+            problemas.append(f"{rotulo}.{nome}: {valor} != {referencia}")
+        elif valor is not None and abs(Decimal(str(valor)) - Decimal(str(referencia))) > tolerancia:
+            problemas.append(f"{rotulo}.{nome}: {valor} != {referencia}")
+
+    comparar("total_relatorios", obtido.total_relatorios, esperado["total_relatorios"], 0)
+    for campo, atributo in (("valor_investido", "total_valor_investido"), ("leads", "total_leads"),
+                            ("registros", "total_registros"), ("deposito", "total_deposito"),
+                            ("ftd", "total_ftd"), ("total_comissao_dia", "total_comissao")):
+        comparar(atributo, getattr(obtido, atributo), _centavos(esperado[campo]), CENTAVO / 2)
+    for coluna in CUSTOS_DERIVADOS:
+        comparar(f"media_{coluna}", getattr(obtido, f"media_{coluna}"), esperado[coluna], CENTAVO)
+
+    if np is not None and relatorios:
+        for coluna, valor in referencia_numpy(relatorios).items():
+            comparar(f"media_{coluna}[numpy]", getattr(obtido, f"media_{coluna}"),
+                     None if valor is None else round(valor, 6), CENTAVO)
+    return problemas
+
+
+def _divergencias_periodo(service, nome: str, projeto_id, filtro, do_projeto: list) -> list:
+    """Reports and dashboard totals for [data_inicio, data_fim], last day included"""
+    problemas = []
+    esperados = sorted(r["id"] for r in do_projeto)
+    obtidos = sorted(r.id for r in service.get_relatorios_periodo(projeto_id, filtro.data_inicio, filtro.data_fim))
+    if obtidos != esperados:
+        problemas.append(f"periodo[{nome}]: {len(obtidos)} relatórios != {len(esperados)} "
+                         f"({filtro.data_inicio} a {filtro.data_fim})")
+
+    totais = service.get_dashboard_consolidado(filtro.data_inicio, filtro.data_fim, projeto_id)["metricas_totais"]
+    esperado = referencia_estatisticas(do_projeto)
+    for chave, campo in (("total_relatorios", "total_relatorios"), ("total_leads", "leads"),
+                         ("total_registros", "registros"), ("total_ftd", "ftd")):
+        if totais[chave] != esperado[campo]:
+            problemas.append(f"dashboard[{nome}].{chave}: {totais[chave]} != {esperado[campo]}")
+    return problemas
+
+
+def verificar_caso(db, semente: int, usuario_id) -> list:
+    """Write one random case through the service and compare every metric with the reference"""
+    sorteio = random.Random(semente)
+    db.query(RelatorioDiario).delete()
+    db.query(Project).delete()
+    projetos = []
+    for i in range(sorteio.randint(1, 4)):
+        projeto = Project(name=f"Projeto {i}", owner_id=usuario_id)
+        db.add(projeto)
+        db.flush()
+        projetos.append(projeto.id)
+    nomes = {projeto_id: f"Projeto {i}" for i, projeto_id in enumerate(projetos)}
+    db.commit()
+
+    service = RelatorioDiarioService(db)
+    relatorios = gerar_caso(sorteio, projetos)
+    problemas = []
+    for dados in relatorios:
+        # Custos enviados pelo cliente são ignorados
+        criado = service.create_relatorio(RelatorioDiarioCreate(**dados, custo_por_lead=Decimal("999.99")))
+        dados["id"] = criado.id
+        if sorteio.random() < 0.2:
+            mudancas = {"valor_investido": _dinheiro(sorteio, 50_000), "leads": _quantidade(sorteio, 5_000)}
+            criado = service.update_relatorio(criado.id, RelatorioDiarioUpdate(**mudancas))
+            dados.update(mudancas)
+        for coluna, quantidade in CUSTOS_DERIVADOS.items():
+            esperado = referencia_custo(dados["valor_investido"], dados[quantidade])
+            if getattr(criado, coluna) != esperado:
+                problemas.append(f"gravação.{coluna}: {getattr(criado, coluna)} != {esperado} ({dados})")
+
+    inicio = INICIO_ANO + timedelta(days=sorteio.randint(0, 200))
+    fim = inicio + timedelta(days=sorteio.randint(0, 200))
+    depois_do_inicio = sorted(r["data_referente"] for r in relatorios if r["data_referente"] >= inicio)
+    if depois_do_inicio and sorteio.random() < 0.5:
+        fim = sorteio.choice(depois_do_inicio)
+    filtro = sorteio.choice([None, FiltroRelatorio(data_inicio=inicio, data_fim=fim)])
+    no_periodo = [r for r in relatorios if filtro is None
+                  or filtro.data_inicio <= r["data_referente"] <= filtro.data_fim]
+
+    for projeto_id in projetos:
+        do_projeto = [r for r in no_periodo if r["projeto_id"] == projeto_id]
+        obtido = service.get_estatisticas_projeto(projeto_id, filtro)
+        problemas += _divergencias(f"estatisticas[{nomes[projeto_id]}]", obtido, referencia_estatisticas(do_projeto), do_projeto)
+        if filtro is not None:
+            problemas += _divergencias_periodo(service, nomes[projeto_id], projeto_id, filtro, do_projeto)
+
+    por_projeto = defaultdict(list)
+    por_mes = defaultdict(list)
+    for r in no_periodo:
+        por_projeto[r["projeto_id"]].append(r)
+        por_mes[f"{r['data_referente']:%Y-%m}"].append(r)
+    for agrupar_por, grupos in (("projeto", por_projeto), ("mes", por_mes)):
+        obtidos = {
+            (grupo.projeto_id if agrupar_por == "projeto" else grupo.grupo): grupo
+            for grupo in service.get_metricas_agrupadas(agrupar_por, filtro)
+        }
+        if set(obtidos) != set(grupos):
+            problemas.append(f"agrupadas[{agrupar_por}]: grupos {sorted(map(str, obtidos))} != {sorted(map(str, grupos))}")
+            continue
+        for chave, linhas in grupos.items():
+            problemas += _divergencias(f"agrupadas[{agrupar_por}={chave}]", obtidos[chave], referencia_estatisticas(linhas), linhas)
+
+    if ARGS.verbose:
+        print(f"   {'❌' if problemas else '✅'} semente {semente}: {len(projetos)} projetos, {len(relatorios)} relatórios, "
+              f"{len(no_periodo)} no período")
+    return problemas
+
+
+def verificar_metricas(args) -> bool:
+    """Run the random cases and stop at the first divergence from the reference"""
+    create_tables()
+    db = SessionLocal()
+    try:
+        usuario = db.query(User).first()
+        if usuario is None:
+            usuario = User(name="Verificação", username="verificacao", email="verificacao@example.com",
+                           hashed_password="-", is_active=True)
+            db.add(usuario)
+            db.commit()
+
+        semente_inicial = args.semente if args.semente is not None else random.randrange(1_000_000)
+        print(f"🔎 {args.casos} casos a partir da semente {semente_inicial} "
+              f"(referência: frações exatas{' + numpy' if np is not None else ''})")
+        for semente in range(semente_inicial, semente_inicial + args.casos):
+            problemas = verificar_caso(db, semente, usuario.id)
+            if problemas:
+                print(f"\n❌ Divergência na semente {semente} (python verificar_metricas.py --casos 1 --semente {semente} -v):")
+                for problema in problemas[:20]:
+                    print(f"   {problema}")
+                return False
+        db.query(RelatorioDiario).delete()
+        db.query(Project).delete()
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ {args.casos} casos conferem com a referência")
+    return True
+
+
+if __name__ == "__main__":
+    sucesso = verificar_metricas(ARGS)
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
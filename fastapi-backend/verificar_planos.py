@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Verificação dos planos de execução das consultas representativas dos services
+
+Chama os services (CriativoService, RelatorioDiarioService, NotificacaoService,
+LeadService, AtividadeService...) contra um banco populado com os dados
+sintéticos do benchmark_api.py, captura cada SELECT que eles emitem e roda o
+EXPLAIN com os mesmos parâmetros. Termina com código 1 se algum plano fizer
+varredura sequencial numa tabela grande (--min-linhas), se uma chamada emitir
+mais consultas que o seu max_consultas (N+1 de relacionamentos) ou se, com
+--base, o custo estimado piorar além da tolerância (ou surgir uma varredura
+nova) em relação a uma execução anterior gravada com --gravar-base.
+
+O custo estimado só existe no PostgreSQL; no SQLite a verificação se limita às
+varreduras e aos índices usados (EXPLAIN QUERY PLAN).
+
+Uso:
+    python verificar_planos.py                                        # SQLite temporário, escala pequena
+    python verificar_planos.py --database-url postgresql://... --gravar-base planos_base.json
+    python verificar_planos.py --database-url postgresql://... --pular-carga --base planos_base.json [--analisar]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from itertools import combinations
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Verificar os planos de execução das consultas dos services")
+    parser.add_argument("--escala", default="pequena", help="Escala do benchmark_api.py (pequena, media, grande)")
+    parser.add_argument("--database-url", default=None, help="Padrão: SQLite temporário")
+    parser.add_argument("--pular-carga", action="store_true", help="Usar os dados já existentes no banco")
+    parser.add_argument("--analisar", action="store_true", help="EXPLAIN ANALYZE (executa as consultas)")
+    parser.add_argument("--min-linhas", type=int, default=1000, help="Tabelas a partir deste tamanho não podem ter varredura sequencial")
+    parser.add_argument("--base", default=None, help="JSON de uma execução anterior para comparar o custo")
+    parser.add_argument("--gravar-base", default=None, help="Gravar os planos desta execução neste JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora máxima aceita no custo estimado (fração)")
+    parser.add_argument("--consultas", default="", help="Filtrar por nome (vírgulas)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar o plano de cada instrução")
+    return parser.parse_args()
+
+
+ARGS = _argumentos() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    if ARGS.database_url:
+        os.environ["DATABASE_URL"] = ARGS.database_url
+    else:
+        _ARQUIVO_DB = os.path.join(tempfile.mkdtemp(), "verificar_planos.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{_ARQUIVO_DB}"
+
+from sqlalchemy import func, text
+
+from benchmark_api import ESCALAS, popular
+from app.core.database import SessionLocal, engine
+from app.core.planos_consulta import (
+    CONSULTAS_REPRESENTATIVAS, capturar_instrucoes, consulta_representativa, explicar,
+    problemas_plano, regressoes_plano, tamanhos_tabelas
+)
+from app.models import Cliente, Project, RelatorioDiario, User, UserProject
+from app.models.criativo import StatusCriativo
+from app.models.lead import LeadStage
+from app.schemas.atividade import AtividadeResponse
+from app.schemas.relatorio_diario import FiltroRelatorio
+from app.services.atividade_service import AtividadeService, RELACOES_ATIVIDADE, STATUS_PENDENTES
+from app.services.cliente_service import ClienteService
+from app.services.criativo_service import CriativoService
+from app.services.lead_service import LeadService
+from app.services.metricas_redes_sociais_service import MetricasRedesSociaisService
+from app.services.notificacao_service import NotificacaoService, contador_cache
+from app.services.project_service import ProjectService
+from app.services.proposta_service import PropostaService
+from app.services.relatorio_diario_service import RelatorioDiarioService
+from app.services.search_service import SearchService
+
+
+# Catálogo: uma entrada por chamada de service relevante. `ctx` traz o admin, um
+# usuário comum membro do projeto, o projeto com mais relatórios e o período dos
+# últimos 90 dias.
+
+@consulta_representativa("CriativoService", "get_user_criativos")
+def _criativos_usuario(db, ctx):
+    CriativoService(db).get_user_criativos(ctx["usuario"], False, status=StatusCriativo.EM_EDICAO)
+
+
+@consulta_representativa("CriativoService", "get_criativos_projeto")
+def _criativos_projeto(db, ctx):
+    CriativoService(db).get_criativos(ctx["projeto"], StatusCriativo.APROVADO)
+
+
+@consulta_representativa("CriativoService", "get_user_kanban_view")
+def _criativos_kanban(db, ctx):
+    CriativoService(db).get_user_kanban_view(ctx["usuario"], False, ctx["projeto"])
+
+
+@consulta_representativa("CriativoService", "get_user_stats")
+def _criativos_stats(db, ctx):
+    CriativoService(db).get_user_stats(ctx["usuario"], False)
+
+
+@consulta_representativa("RelatorioDiarioService", "get_relatorios_by_projeto")
+def _relatorios_projeto(db, ctx):
+    RelatorioDiarioService(db).get_relatorios_by_projeto(
+        ctx["projeto"], filtro=FiltroRelatorio(data_inicio=ctx["inicio"], data_fim=ctx["fim"])
+    )
+
+
+@consulta_representativa("RelatorioDiarioService", "get_estatisticas_projeto")
+def _relatorios_estatisticas(db, ctx):
+    RelatorioDiarioService(db).get_estatisticas_projeto(ctx["projeto"])
+
+
+@consulta_representativa("RelatorioDiarioService", "get_relatorios_periodo")
+def _relatorios_periodo(db, ctx):
+    RelatorioDiarioService(db).get_relatorios_periodo(ctx["projeto"], ctx["inicio"], ctx["fim"])
+
+
+@consulta_representativa("RelatorioDiarioService", "get_ultimos_relatorios")
+def _relatorios_ultimos(db, ctx):
+    RelatorioDiarioService(db).get_ultimos_relatorios(ctx["projeto"])
+
+
+# Sem projeto, o consolidado agrega o período de todos os projetos
+@consulta_representativa("RelatorioDiarioService", "get_dashboard_consolidado", permitir_varredura=("relatorios_diarios",))
+def _relatorios_dashboard(db, ctx):
+    RelatorioDiarioService(db).get_dashboard_consolidado(ctx["inicio"], ctx["fim"])
+
+
+@consulta_representativa("RelatorioDiarioService", "get_dashboard_consolidado_projeto")
+def _relatorios_dashboard_projeto(db, ctx):
+    RelatorioDiarioService(db).get_dashboard_consolidado(ctx["inicio"], ctx["fim"], ctx["projeto"])
+
+
+# Agrupado por projeto, o período de todos os projetos; por mês, um projeto
+@consulta_representativa("RelatorioDiarioService", "get_metricas_agrupadas_projeto", permitir_varredura=("relatorios_diarios",), max_consultas=1)
+def _relatorios_metricas_projeto(db, ctx):
+    RelatorioDiarioService(db).get_metricas_agrupadas("projeto", FiltroRelatorio(data_inicio=ctx["inicio"], data_fim=ctx["fim"]))
+
+
+@consulta_representativa("RelatorioDiarioService", "get_metricas_agrupadas_mes", max_consultas=1)
+def _relatorios_metricas_mes(db, ctx):
+    RelatorioDiarioService(db).get_metricas_agrupadas(
+        "mes", FiltroRelatorio(data_inicio=ctx["inicio"], data_fim=ctx["fim"], projeto_id=ctx["projeto"])
+    )
+
+
+@consulta_representativa("MetricasRedesSociaisService", "get_estatisticas_projeto")
+def _metricas_estatisticas(db, ctx):
+    MetricasRedesSociaisService(db).get_estatisticas_projeto(ctx["projeto"])
+
+
+@consulta_representativa("MetricasRedesSociaisService", "get_ultimas_metricas")
+def _metricas_ultimas(db, ctx):
+    MetricasRedesSociaisService(db).get_ultimas_metricas(ctx["projeto"])
+
+
+@consulta_representativa("NotificacaoService", "listar_notificacoes_usuario")
+def _notificacoes_lista(db, ctx):
+    NotificacaoService.listar_notificacoes_usuario(db, ctx["usuario"], limit=50)
+
+
+@consulta_representativa("NotificacaoService", "listar_nao_lidas")
+def _notificacoes_nao_lidas(db, ctx):
+    NotificacaoService.listar_notificacoes_usuario(db, ctx["usuario"], limit=50, apenas_nao_lidas=True)
+
+
+@consulta_representativa("NotificacaoService", "contar_notificacoes_usuario")
+def _notificacoes_contagem(db, ctx):
+    contador_cache.invalidar(ctx["usuario"])
+    NotificacaoService.contar_notificacoes_usuario(db, ctx["usuario"])
+
+
+@consulta_representativa("LeadService", "get_leads")
+def _leads_lista(db, ctx):
+    LeadService(db).get_leads(ctx["usuario"], limit=100)
+
+
+@consulta_representativa("LeadService", "get_leads_by_stage")
+def _leads_estagio(db, ctx):
+    LeadService(db).get_leads_by_stage(ctx["usuario"], LeadStage.LEAD)
+
+
+# Uma entrada por combinação de ?include=, serializada como no endpoint: o
+# número de consultas não pode depender do número de linhas
+def _registrar_atividades_usuario(relacoes):
+    @consulta_representativa("AtividadeService", f"get_atividades_usuario[{','.join(relacoes)}]", max_consultas=1)
+    def _atividades_usuario(db, ctx):
+        for atividade in AtividadeService.get_atividades(db, user_id=ctx["usuario"], relacoes=relacoes):
+            AtividadeResponse.model_validate(atividade)
+
+
+for _quantidade in range(len(RELACOES_ATIVIDADE) + 1):
+    for _relacoes in combinations(RELACOES_ATIVIDADE, _quantidade):
+        _registrar_atividades_usuario(_relacoes)
+
+
+@consulta_representativa("AtividadeService", "get_atividades_filtradas", max_consultas=1)
+def _atividades_filtradas(db, ctx):
+    AtividadeService.get_atividades(
+        db, user_id=ctx["usuario"], relacoes=tuple(RELACOES_ATIVIDADE),
+        status=["Em andamento", "Atrasada"], prazo_de=ctx["inicio"], prazo_ate=ctx["fim"], ordenar="prazo"
+    )
+
+
+@consulta_representativa("AtividadeService", "marcar_atrasadas", max_consultas=2)
+def _atividades_atrasadas(db, ctx):
+    # Um lote da varredura de prazos e a releitura para o índice de busca (o verificador desfaz o UPDATE).
+    # A releitura usa poucos ids: com boa parte da tabela na lista, o SCAN é o plano certo
+    marcadas = AtividadeService._marcar_lote(db, STATUS_PENDENTES[0], datetime.now(), None, 5000)
+    SearchService.reindexar_ids(db, "atividade", [linha[0] for linha in marcadas[:10]])
+
+
+@consulta_representativa("ProjectService", "get_user_accessible_projects")
+def _projetos_acessiveis(db, ctx):
+    ProjectService.get_user_accessible_projects(db, ctx["usuario"])
+
+
+@consulta_representativa("PropostaService", "get_propostas_cliente")
+def _propostas_cliente(db, ctx):
+    PropostaService.get_propostas(db, cliente_id=ctx["cliente"])
+
+
+@consulta_representativa("ClienteService", "get_clientes")
+def _clientes_lista(db, ctx):
+    ClienteService.get_clientes(db)
+
+
+def _contexto() -> dict:
+    """Admin, usuário comum membro do projeto com mais relatórios e período de 90 dias"""
+    db = SessionLocal()
+    try:
+        admin = db.query(User.id).filter(User.is_admin == True).order_by(User.created_at).limit(1).scalar()
+        projeto = db.query(RelatorioDiario.projeto_id).group_by(RelatorioDiario.projeto_id).order_by(
+            func.count(RelatorioDiario.id).desc()
+        ).limit(1).scalar() or db.query(Project.id).limit(1).scalar()
+        usuario = db.query(UserProject.user_id).join(User, User.id == UserProject.user_id).filter(
+            UserProject.project_id == projeto, User.is_admin == False
+        ).limit(1).scalar()
+        if admin is None or projeto is None or usuario is None:
+            raise SystemExit("❌ Banco sem admin, projeto ou membro de projeto; rode sem --pular-carga")
+        fim = date.today()
+        return {
+            "admin": admin,
+            "usuario": usuario,
+            "projeto": projeto,
+            "cliente": db.query(Cliente.id).limit(1).scalar(),
+            "inicio": fim - timedelta(days=90),
+            "fim": fim,
+        }
+    finally:
+        db.close()
+
+
+def verificar_planos(args) -> bool:
+    """Capture the SQL issued by each registered service call, EXPLAIN it and check scans and cost"""
+    if not args.pular_carga:
+        popular(dict(ESCALAS[args.escala]))
+    # Estatísticas atualizadas para o planejador (pg_statistic / sqlite_stat1)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+        conexao.execute(text("ANALYZE"))
+        tamanhos = tamanhos_tabelas(conexao)
+
+    contexto = _contexto()
+    filtro = {nome.strip() for nome in args.consultas.split(",") if nome.strip()}
+    base = {}
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f).get("planos", {})
+        print(f"📊 Comparando com {args.base} (tolerância {args.tolerancia:.0%} no custo estimado)")
+
+    print(f"\n🔎 {len(CONSULTAS_REPRESENTATIVAS)} consultas representativas, banco {engine.dialect.name}, "
+          f"varredura proibida a partir de {args.min_linhas} linhas\n")
+    planos, falhas = {}, []
+    for consulta in CONSULTAS_REPRESENTATIVAS:
+        if filtro and consulta.chave not in filtro and consulta.nome not in filtro and consulta.servico not in filtro:
+            continue
+        db = SessionLocal()
+        try:
+            with capturar_instrucoes(engine) as instrucoes:
+                consulta.executar(db, contexto)
+        finally:
+            db.rollback()
+            db.close()
+
+        if consulta.max_consultas is not None and len(instrucoes) > consulta.max_consultas:
+            print(f"   ❌ {consulta.chave}: {len(instrucoes)} consultas (máximo {consulta.max_consultas})")
+            falhas.append(consulta.chave)
+
+        with engine.connect() as conexao:
+            for i, (instrucao, parametros) in enumerate(instrucoes, 1):
+                chave = f"{consulta.chave}#{i}"
+                plano = explicar(conexao, instrucao, parametros, analisar=args.analisar)
+                conexao.rollback()
+                planos[chave] = plano.para_json()
+
+                problemas = problemas_plano(plano, tamanhos, args.min_linhas, consulta.permitir_varredura)
+                if chave in base:
+                    problemas += regressoes_plano(planos[chave], base[chave], args.tolerancia)
+                    if base[chave].get("formato") != plano.formato:
+                        print(f"   ⚠️  {chave}: o SQL mudou desde a base")
+
+                custo = f"custo {plano.custo:10.1f}" if plano.custo is not None else ""
+                tempo = f"{plano.tempo_ms:8.2f}ms" if plano.tempo_ms is not None else ""
+                indices = ", ".join(plano.indices) or "-"
+                print(f"   {'❌' if problemas else '✅'} {chave:<58} {custo} {tempo} índices: {indices}")
+                for problema in problemas:
+                    print(f"      {problema}")
+                if args.verbose or problemas:
+                    print("      " + plano.texto.replace("\n", "\n      ")[:3000])
+                if problemas:
+                    falhas.append(chave)
+
+    ausentes = sorted(set(base) - set(planos)) if not filtro else []
+    if ausentes:
+        print(f"\n   ⚠️  Instruções da base que não foram emitidas agora: {', '.join(ausentes)}")
+
+    if args.gravar_base:
+        with open(args.gravar_base, "w", encoding="utf-8") as f:
+            json.dump({
+                "banco": engine.dialect.name,
+                "data": datetime.utcnow().isoformat(timespec="seconds"),
+                "min_linhas": args.min_linhas,
+                "planos": planos,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n📍 Planos gravados em {args.gravar_base}")
+
+    if falhas:
+        print(f"\n❌ {len(falhas)} instrução(ões) com plano problemático: {', '.join(falhas)}")
+        return False
+    print(f"\n✅ {len(planos)} instruções verificadas, nenhum plano problemático")
+    return True
+
+
+if __name__ == "__main__":
+    sucesso = verificar_planos(ARGS)
+    if not ARGS.database_url:
+        os.remove(_ARQUIVO_DB)
+    sys.exit(0 if sucesso else 1)
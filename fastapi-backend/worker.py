@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Processo worker da fila de jobs (tabela jobs)
+
+Executa os jobs enfileirados pela API (fan-out de notificações, retenção,
+exclusão de projetos...) e as tarefas com cron. Pode haver vários workers
+em paralelo: no PostgreSQL cada job é reivindicado com SKIP LOCKED. SIGTERM
+espera os jobs em andamento terminarem antes de sair.
+
+Uso:
+    python worker.py [--concorrencia 2] [--tipos notificacoes.fanout,projetos.excluir]
+    python worker.py --uma-vez   # executa os jobs vencidos e sai (cron externo, testes)
+"""
+import argparse
+import logging
+import signal
+import sys
+
+from app.core.database import test_connection
+from app.services.job_service import TAREFAS
+from app.services.job_worker import WorkerJobs
+
+
+def executar_worker(concorrencia=None, tipos=None, uma_vez=False) -> bool:
+    """Run the job worker until SIGTERM/SIGINT (or once, with --uma-vez)"""
+    if not test_connection():
+        print("❌ Banco de dados inacessível")
+        return False
+
+    worker = WorkerJobs(concorrencia=concorrencia, tipos=tipos)
+    print(f"⚙️  Tarefas registradas: {', '.join(sorted(TAREFAS))}")
+
+    if uma_vez:
+        worker.manutencao()
+        total = worker.executar_pendentes()
+        print(f"✅ {total} job(s) executado(s), {worker.falhas} com falha")
+        return True
+
+    def encerrar(sinal, _frame):
+        print(f"🛑 Sinal {sinal} recebido, aguardando os jobs em andamento...")
+        worker.parar()
+
+    signal.signal(signal.SIGTERM, encerrar)
+    signal.signal(signal.SIGINT, encerrar)
+
+    worker.iniciar()
+    print(f"🚀 Worker {worker.id} com {worker.concorrencia} executor(es)")
+    worker.aguardar()
+    print("✅ Worker encerrado")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker da fila de jobs")
+    parser.add_argument("--concorrencia", type=int, default=None, help="Padrão: JOBS_CONCORRENCIA")
+    parser.add_argument("--tipos", default=None, help="Só estes tipos de job (vírgulas)")
+    parser.add_argument("--uma-vez", action="store_true", help="Executar os jobs vencidos e sair")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    tipos = [tipo.strip() for tipo in args.tipos.split(",") if tipo.strip()] if args.tipos else None
+    sys.exit(0 if executar_worker(args.concorrencia, tipos, args.uma_vez) else 1)